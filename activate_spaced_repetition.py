@@ -5,16 +5,27 @@ Uses SuperMemo SM-2 algorithm for optimal retention
 """
 
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import astuple, dataclass
+import atexit
 import json
+import marshal
+import os
 from pathlib import Path
 
+from due_queue import DueQueue, due_epoch
+from review_state import ReviewState, ReviewStateStore
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+CATALOG_VERSION = 1
+
 @dataclass
 class SpacedRepetitionCard:
     """Flashcard with SM-2 algorithm"""
     concept_id: str
     front: str
     back: str
+    source_id: str = ""  # knowledge graph concept the card was made from
+    card_type: str = ""  # rule | elements | traps
     
     # SM-2 algorithm fields
     ease_factor: float = 2.5
@@ -52,13 +63,68 @@ class SpacedRepetitionCard:
         # Set next review date
         next_date = datetime.now() + timedelta(days=self.interval)
         self.next_review = next_date.isoformat()
+    
+    @property
+    def state_key(self) -> tuple:
+        return (self.source_id, self.card_type)
+    
+    def review_state(self) -> ReviewState:
+        """SM-2 fields as a persistable row"""
+        return ReviewState(self.ease_factor, self.interval, self.repetitions, due_epoch(self.next_review))
+    
+    def apply_state(self, state: ReviewState):
+        """Restore SM-2 fields from a persisted row"""
+        self.ease_factor = state.ease_factor
+        self.interval = state.interval
+        self.repetitions = state.repetitions
+        self.next_review = datetime.fromtimestamp(state.next_review).isoformat()
 
 class SpacedRepetitionSystem:
     """Complete SRS for 180 concepts"""
     
-    def __init__(self):
+    def __init__(self, state_dir: Path = DATA_DIR):
         self.cards: list[SpacedRepetitionCard] = []
-        self.generate_cards_from_concepts()
+        self.catalog_path = state_dir / "srs_cards.catalog"
+        self.state = ReviewStateStore(state_dir / "srs_review_state")
+        atexit.register(self.state.flush)
+        
+        if not self._load_catalog():
+            self.generate_cards_from_concepts()
+            self._save_catalog()
+        
+        # Rehydrate review fields only; card text comes from the catalog
+        for card in self.cards:
+            state = self.state.get(card.state_key)
+            if state is not None:
+                card.apply_state(state)
+        self.cards_by_id = {card.concept_id: card for card in self.cards}
+        self.due_queue = DueQueue({card.concept_id: due_epoch(card.next_review) for card in self.cards})
+    
+    def _graph_hash(self) -> bytes:
+        from bar_tutor_unified import LegalKnowledgeGraph
+        return LegalKnowledgeGraph.source_hash()
+    
+    def _load_catalog(self) -> bool:
+        """Load card texts generated by an earlier run from the same graph"""
+        try:
+            version, graph_hash, rows = marshal.loads(self.catalog_path.read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+        if version != CATALOG_VERSION or graph_hash != self._graph_hash():
+            return False
+        self.cards = [SpacedRepetitionCard(*row) for row in rows]
+        return True
+    
+    def _save_catalog(self):
+        """Cache generated card texts keyed by the graph's source hash"""
+        rows = [astuple(card)[:5] for card in self.cards]
+        try:
+            self.catalog_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.catalog_path.with_suffix(".tmp")
+            tmp_path.write_bytes(marshal.dumps((CATALOG_VERSION, self._graph_hash(), rows)))
+            os.replace(tmp_path, self.catalog_path)
+        except OSError as e:
+            print(f"⚠️  Could not cache card catalog: {e}")
     
     def generate_cards_from_concepts(self):
         """Generate flashcards from your 180 concepts"""
@@ -73,7 +139,9 @@ class SpacedRepetitionSystem:
             self.cards.append(SpacedRepetitionCard(
                 concept_id=f"{concept_id}_rule",
                 front=f"State the rule for: {concept.name}",
-                back=concept.rule_statement
+                back=concept.rule_statement,
+                source_id=concept_id,
+                card_type="rule"
             ))
             
             # 2. Elements card
@@ -81,7 +149,9 @@ class SpacedRepetitionSystem:
                 self.cards.append(SpacedRepetitionCard(
                     concept_id=f"{concept_id}_elements",
                     front=f"What are the elements of {concept.name}?",
-                    back="\n".join(f"{i}. {elem}" for i, elem in enumerate(concept.elements, 1))
+                    back="\n".join(f"{i}. {elem}" for i, elem in enumerate(concept.elements, 1)),
+                    source_id=concept_id,
+                    card_type="elements"
                 ))
             
             # 3. Common traps card
@@ -89,18 +159,20 @@ class SpacedRepetitionSystem:
                 self.cards.append(SpacedRepetitionCard(
                     concept_id=f"{concept_id}_traps",
                     front=f"What are common exam traps for {concept.name}?",
-                    back="\n".join(f"⚠️ {trap}" for trap in concept.common_traps)
+                    back="\n".join(f"⚠️ {trap}" for trap in concept.common_traps),
+                    source_id=concept_id,
+                    card_type="traps"
                 ))
     
     def get_due_cards(self, limit: int = 20) -> list[SpacedRepetitionCard]:
         """Get cards due for review"""
-        now = datetime.now()
-        due = [
-            card for card in self.cards
-            if datetime.fromisoformat(card.next_review) <= now
-        ]
-        due.sort(key=lambda c: c.next_review)
-        return due[:limit]
+        return [self.cards_by_id[card_id] for card_id in self.due_queue.peek_due(limit)]
+    
+    def review_card(self, card: SpacedRepetitionCard, quality: int):
+        """Review a card and reschedule it"""
+        card.review(quality)
+        self.state.update(card.state_key, card.review_state())
+        self.due_queue.schedule(card.concept_id, due_epoch(card.next_review))
     
     def daily_review_session(self):
         """Interactive daily review"""
@@ -112,15 +184,19 @@ class SpacedRepetitionSystem:
         
         print(f"\n📚 Daily Review: {len(due_cards)} cards due\n")
         
-        for i, card in enumerate(due_cards, 1):
-            print(f"Card {i}/{len(due_cards)}")
-            print(f"Q: {card.front}")
-            input("Press Enter to reveal answer...")
-            print(f"A: {card.back}\n")
-            
-            quality = int(input("Rate your recall (0-5): "))
-            card.review(quality)
-            print()
+        try:
+            for i, card in enumerate(due_cards, 1):
+                print(f"Card {i}/{len(due_cards)}")
+                print(f"Q: {card.front}")
+                input("Press Enter to reveal answer...")
+                print(f"A: {card.back}\n")
+                
+                quality = int(input("Rate your recall (0-5): "))
+                self.review_card(card, quality)
+                print()
+        finally:
+            # One write for the whole session, even if it is cut short
+            self.state.flush()
         
         print("✅ Review complete!")
     
@@ -135,7 +211,7 @@ class SpacedRepetitionSystem:
         print(f"Total Cards: {total}")
         print(f"Reviewed: {reviewed} ({reviewed/total*100:.1f}%)")
         print(f"Mastered: {mastered} ({mastered/total*100:.1f}%)")
-        print(f"Due Today: {len(self.get_due_cards(999))}")
+        print(f"Due Today: {self.due_queue.count_due()}")
 
 def main():
     print("="*70)
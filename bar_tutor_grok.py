@@ -10,6 +10,7 @@ Complete implementation with:
 """
 
 import argparse
+import atexit
 import hashlib
 import json
 import logging
@@ -32,6 +33,10 @@ import requests
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from due_queue import JsonlDueIndex
+from jsonl_wal import append_jsonl
+from rolling_stats import RollingStats
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -52,7 +57,9 @@ DATA_DIR.mkdir(exist_ok=True)
 
 ERROR_LOG = DATA_DIR / "error_log.jsonl"
 FLASHCARDS = DATA_DIR / "flashcards_v3.jsonl"
+FLASHCARDS_INDEX = DATA_DIR / "flashcards_v3.dueidx"
 PERFORMANCE_DB = DATA_DIR / "performance_v3.jsonl"
+PERFORMANCE_ROLLUP = DATA_DIR / "performance_v3.rollup.json"
 ANALYTICS_DB = DATA_DIR / "analytics_v3.jsonl"
 BACKUP_DIR = ROOT / "backups"
 
@@ -62,13 +69,9 @@ MAX_NOTES_CHARS = 10000
 # ========== UTILITY FUNCTIONS ==========
 
 def atomic_write_jsonl(filepath: Path, data: dict) -> None:
-    """Atomically append to JSONL file"""
+    """Append a line to a JSONL file (group-committed; see jsonl_wal)"""
     try:
-        filepath.parent.mkdir(parents=True, exist_ok=True)
-        with filepath.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(data, ensure_ascii=False) + "\n")
-            f.flush()
-            os.fsync(f.fileno())
+        append_jsonl(filepath, data)
         logger.debug(f"Wrote to {filepath}")
     except Exception as e:
         logger.error(f"Failed to write {filepath}: {e}")
@@ -166,6 +169,7 @@ class FlashcardEntry:
     difficulty: str = "Intermediate"
     created_at: str = ""
     last_reviewed: Optional[str] = None
+    next_review: Optional[str] = None
     ease_factor: float = 2.5
     interval: int = 1
     repetitions: int = 0
@@ -637,9 +641,11 @@ class GrokClient:
 class FlashcardManager:
     """Flashcard manager with SM-2 algorithm"""
 
-    def __init__(self):
-        self.cards_file = FLASHCARDS
+    def __init__(self, cards_file: Path = FLASHCARDS, index_file: Path = FLASHCARDS_INDEX):
+        self.cards_file = cards_file
         self._ensure_valid()
+        self.due_index = JsonlDueIndex(self.cards_file, index_file)
+        atexit.register(self.due_index.save)
 
     def _ensure_valid(self):
         """Ensure file exists and is valid"""
@@ -668,37 +674,82 @@ class FlashcardManager:
 
     def get_due_cards(self, limit: int = 20) -> List[dict]:
         """Get cards due for review"""
-        cards = []
-        now = datetime.now()
-
         try:
-            with self.cards_file.open("r") as f:
-                for line in f:
-                    try:
-                        card = json.loads(line.strip())
-                        next_review = datetime.fromisoformat(
-                            card.get("next_review", card["created_at"])
-                        )
-                        if next_review <= now:
-                            cards.append(card)
-                    except (json.JSONDecodeError, KeyError):
-                        continue
+            return self.due_index.due(limit)
         except Exception as e:
             logger.error(f"Error reading cards: {e}")
             return []
 
-        cards.sort(key=lambda x: x.get("next_review", x["created_at"]))
-        return cards[:limit]
+    def review_card(self, card_id: str, quality: int) -> Optional[dict]:
+        """Apply an SM-2 review (quality 0-5) and reschedule the card"""
+        card = self.due_index.get(card_id)
+        if card is None:
+            return None
+        for key, default in (("ease_factor", 2.5), ("interval", 1), ("repetitions", 0)):
+            card.setdefault(key, default)
+
+        if quality < 3:
+            card["repetitions"] = 0
+            card["interval"] = 1
+        else:
+            if card["repetitions"] == 0:
+                card["interval"] = 1
+            elif card["repetitions"] == 1:
+                card["interval"] = 6
+            else:
+                card["interval"] = int(card["interval"] * card["ease_factor"])
+            card["repetitions"] += 1
+            card["ease_factor"] = max(
+                1.3, card["ease_factor"] + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+            )
+
+        now = datetime.now()
+        card["last_reviewed"] = now.isoformat()
+        card["next_review"] = (now + timedelta(days=card["interval"])).isoformat()
+        # Appended lines supersede earlier ones for the same id
+        atomic_write_jsonl(self.cards_file, card)
+        self.due_index.refresh()
+        return card
 
 class PerformanceTracker:
     """Track performance with analytics"""
 
-    def __init__(self):
-        self.perf_file = PERFORMANCE_DB
+    def __init__(self, perf_file: Path = PERFORMANCE_DB, rollup_path: Path = PERFORMANCE_ROLLUP):
+        self.perf_file = perf_file
         self.perf_file.touch(exist_ok=True)
+        self.rollup = RollingStats.load(rollup_path)
+        self._catch_up()
+        atexit.register(self.rollup.save)
+
+    def _catch_up(self):
+        """Fold attempts appended to the JSONL since the last checkpoint into the rollup"""
+        offset = self.rollup.meta.get("offset", 0)
+        size = self.perf_file.stat().st_size
+        if size < offset:
+            # File was truncated or replaced; start over
+            self.rollup.reset()
+            offset = 0
+        if size == offset:
+            return
+
+        with self.perf_file.open("rb") as f:
+            f.seek(offset)
+            data = f.read(size - offset)
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            self.rollup.meta["offset"] = offset
+            try:
+                entry = json.loads(line)
+                timestamp = datetime.fromisoformat(entry["timestamp"]).timestamp()
+                self.rollup.add(entry["subject"], entry["correct"], timestamp, entry.get("concept_id"))
+            except (ValueError, KeyError, TypeError):
+                continue
 
     def record_attempt(self, subject: str, correct: bool,
-                      response_time: Optional[float] = None):
+                      response_time: Optional[float] = None,
+                      concept_id: Optional[str] = None):
         """Record quiz attempt"""
         entry = {
             "timestamp": datetime.now().isoformat(),
@@ -706,10 +757,17 @@ class PerformanceTracker:
             "correct": correct,
             "response_time": response_time
         }
+        if concept_id:
+            entry["concept_id"] = concept_id
         atomic_write_jsonl(self.perf_file, entry)
+        self._catch_up()
 
     def get_stats(self, days: int = 30) -> Dict:
         """Get performance statistics"""
+        if days in self.rollup.windows:
+            self._catch_up()
+            return self.rollup.window(days)
+
         cutoff = datetime.now() - timedelta(days=days)
         stats = defaultdict(lambda: {"correct": 0, "total": 0})
 
@@ -764,6 +822,18 @@ class PerformanceTracker:
             bar = "█" * int(pct/5) + "░" * (20 - int(pct/5))
             print(f"{subject:25} {bar} {pct:5.1f}%")
 
+        print("\nTrend:")
+        for days in self.rollup.windows:
+            total, correct = self.rollup.summary(days)
+            pct = (correct / total * 100) if total else 0
+            print(f"  Last {days:2} days: {total:5} questions, {pct:5.1f}%")
+
+        weakest = self.rollup.weakest(30)
+        if weakest:
+            print("\nWeakest Concepts (30 days):")
+            for concept, data in weakest:
+                print(f"  {concept:35} {data['correct']}/{data['total']} ({data['percentage']:.0f}%)")
+
         print("\n" + "="*70 + "\n")
 
 # ========== MAIN TUTOR CLASS ==========
@@ -984,7 +1054,7 @@ class BarTutorGrok:
             print(f"A: {card['back']}")
 
             quality = self._get_rating("Quality (1-5): ", 1, 5)
-            # Update card with SM-2 algorithm here
+            self.flashcards.review_card(card["id"], quality)
 
         print(f"\n✓ Reviewed {len(due_cards)} cards")
 
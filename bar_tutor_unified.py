@@ -5,8 +5,8 @@ All components integrated: core tutor + interactive agent + content system
 """
 
 import argparse
+import atexit
 import hashlib
-import json
 import logging
 import os
 import pathlib
@@ -16,13 +16,19 @@ import sys
 import time
 from collections import defaultdict
 from dataclasses import asdict, dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime
 from enum import Enum
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple, Any, Union
 
 from dotenv import load_dotenv
 
+from concept_search import ConceptSearchIndex
+from jsonl_wal import append_jsonl
+from kg_snapshot import GraphSnapshot, LazyNodeMap, source_hash, write_snapshot
+from perf_store import PerformanceStore
+from rolling_stats import RollingStats
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -45,8 +51,11 @@ DATA_DIR.mkdir(exist_ok=True)
 ERROR_LOG = DATA_DIR / "error_log.jsonl"
 FLASHCARDS = DATA_DIR / "flashcards.jsonl"
 PERFORMANCE_DB = DATA_DIR / "performance.jsonl"
+PERFORMANCE_STORE = DATA_DIR / "performance_store"
 ANALYTICS_DB = DATA_DIR / "analytics.jsonl"
 BACKUP_DIR = ROOT / "backups"
+KG_SNAPSHOT = DATA_DIR / "knowledge_graph.snapshot"
+KG_SEARCH_INDEX = KG_SNAPSHOT.with_suffix(".search")
 
 DEFAULT_MODEL = "gpt-4o-mini"
 MAX_NOTES_CHARS = 10000
@@ -54,13 +63,9 @@ MAX_NOTES_CHARS = 10000
 # ==================== UTILITY FUNCTIONS ====================
 
 def atomic_write_jsonl(filepath: Path, data: dict) -> None:
-    """Atomically append to JSONL file"""
+    """Append a line to a JSONL file (group-committed; see jsonl_wal)"""
     try:
-        filepath.parent.mkdir(parents=True, exist_ok=True)
-        with filepath.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(data, ensure_ascii=False) + "\n")
-            f.flush()
-            os.fsync(f.fileno())
+        append_jsonl(filepath, data)
         logger.debug(f"Wrote to {filepath}")
     except Exception as e:
         logger.error(f"Failed to write {filepath}: {e}")
@@ -79,6 +84,21 @@ def generate_id(content: str) -> str:
 
 # ==================== DATA CLASSES ====================
 
+# Node fields whose reassignment must update LegalKnowledgeGraph's secondary indexes
+INDEXED_NODE_FIELDS = frozenset({
+    "subject", "difficulty", "mastery_level", "interval", "prerequisites", "related_concepts",
+})
+
+# Mastery bands used by practice generation and dashboards: (name, upper bound)
+MASTERY_BANDS = (("low", 0.5), ("mid", 0.8), ("high", float("inf")))
+
+def mastery_band(level: float) -> str:
+    """Map a 0-1 mastery level to its band name"""
+    for band, upper in MASTERY_BANDS:
+        if level < upper:
+            return band
+    return MASTERY_BANDS[-1][0]
+
 @dataclass
 class KnowledgeNode:
     """Legal concept with pedagogical metadata"""
@@ -101,6 +121,17 @@ class KnowledgeNode:
     policy_rationales: List[str] = field(default_factory=list)
     common_traps: List[str] = field(default_factory=list)
     
+    def __setattr__(self, name, value):
+        # Notify the owning graph's ConceptIndex when an indexed field changes
+        observer = self.__dict__.get("_index_observer")
+        if observer is None or name not in INDEXED_NODE_FIELDS:
+            object.__setattr__(self, name, value)
+            return
+        old = self.__dict__.get(name)
+        object.__setattr__(self, name, value)
+        if old != value:
+            observer(self, name, old)
+    
     def __hash__(self):
         return hash(self.concept_id)
     
@@ -141,12 +172,205 @@ class LearningState:
 
 # ==================== KNOWLEDGE GRAPH ====================
 
+# Snapshot column order; concept_id must stay first (record key)
+SNAPSHOT_FIELDS = [
+    "concept_id", "subject", "name", "difficulty", "prerequisites", "related_concepts",
+    "mastery_level", "last_reviewed", "review_count", "ease_factor", "interval",
+    "rule_statement", "elements", "exceptions", "policy_rationales", "common_traps",
+]
+
+# Stored column-wise in the snapshot so ConceptIndex loads without materializing nodes
+SNAPSHOT_INDEX_FIELDS = ["subject", "difficulty", "mastery_level", "interval",
+                         "prerequisites", "related_concepts"]
+
+def _node_to_record(node: KnowledgeNode) -> Dict[str, Any]:
+    """Flatten a node for snapshot storage"""
+    record = asdict(node)
+    if node.last_reviewed is not None:
+        record["last_reviewed"] = node.last_reviewed.isoformat()
+    return record
+
+def _node_from_record(record: Dict[str, Any]) -> KnowledgeNode:
+    """Rebuild a node from a snapshot record"""
+    if record.get("last_reviewed"):
+        record["last_reviewed"] = datetime.fromisoformat(record["last_reviewed"])
+    return KnowledgeNode(**record)
+
+
+class ConceptIndex:
+    """Incrementally maintained secondary indexes over a graph's concepts.
+
+    Each index maps a key to an insertion-ordered dict of concept IDs, so
+    lookups cost O(result) and updates O(1) per changed field.
+    """
+
+    def __init__(self):
+        self.by_subject: Dict[str, Dict[str, None]] = defaultdict(dict)
+        self.by_difficulty: Dict[int, Dict[str, None]] = defaultdict(dict)
+        self.by_interval: Dict[int, Dict[str, None]] = defaultdict(dict)
+        self.by_subject_band: Dict[Tuple[str, str], Dict[str, None]] = defaultdict(dict)
+        self.dependents: Dict[str, Dict[str, None]] = defaultdict(dict)  # prerequisite -> concepts
+        self.related_from: Dict[str, Dict[str, None]] = defaultdict(dict)  # target -> concepts
+        self._rows: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, concept_id: str, subject: str, difficulty: int, mastery_level: float,
+            interval: int, prerequisites: List[str], related_concepts: List[str]) -> None:
+        """Index one concept (replacing any previous entry)"""
+        if concept_id in self._rows:
+            self.remove(concept_id)
+        row = {
+            "subject": subject, "difficulty": difficulty, "band": mastery_band(mastery_level),
+            "interval": interval, "prerequisites": list(prerequisites),
+            "related_concepts": list(related_concepts),
+        }
+        self._rows[concept_id] = row
+        self._link(concept_id, row)
+
+    def add_node(self, node: KnowledgeNode) -> None:
+        self.add(node.concept_id, node.subject, node.difficulty, node.mastery_level,
+                 node.interval, node.prerequisites, node.related_concepts)
+
+    def remove(self, concept_id: str) -> None:
+        row = self._rows.pop(concept_id, None)
+        if row is not None:
+            self._unlink(concept_id, row)
+
+    def on_change(self, node: KnowledgeNode, field_name: str, old: Any) -> None:
+        """KnowledgeNode observer: re-key only the indexes touched by field_name"""
+        concept_id = node.concept_id
+        row = self._rows.get(concept_id)
+        if row is None:
+            return
+        if field_name in ("subject", "mastery_level"):
+            self._discard(self.by_subject_band, (row["subject"], row["band"]), concept_id)
+            if field_name == "subject":
+                self._discard(self.by_subject, row["subject"], concept_id)
+                row["subject"] = node.subject
+                self.by_subject[row["subject"]][concept_id] = None
+            row["band"] = mastery_band(node.mastery_level)
+            self.by_subject_band[(row["subject"], row["band"])][concept_id] = None
+        elif field_name == "difficulty":
+            self._discard(self.by_difficulty, row["difficulty"], concept_id)
+            row["difficulty"] = node.difficulty
+            self.by_difficulty[row["difficulty"]][concept_id] = None
+        elif field_name == "interval":
+            self._discard(self.by_interval, row["interval"], concept_id)
+            row["interval"] = node.interval
+            self.by_interval[row["interval"]][concept_id] = None
+        elif field_name in ("prerequisites", "related_concepts"):
+            index = self.dependents if field_name == "prerequisites" else self.related_from
+            for target in row[field_name]:
+                self._discard(index, target, concept_id)
+            row[field_name] = list(getattr(node, field_name))
+            for target in row[field_name]:
+                index[target][concept_id] = None
+
+    def _link(self, concept_id: str, row: Dict[str, Any]) -> None:
+        self.by_subject[row["subject"]][concept_id] = None
+        self.by_difficulty[row["difficulty"]][concept_id] = None
+        self.by_interval[row["interval"]][concept_id] = None
+        self.by_subject_band[(row["subject"], row["band"])][concept_id] = None
+        for prereq in row["prerequisites"]:
+            self.dependents[prereq][concept_id] = None
+        for related in row["related_concepts"]:
+            self.related_from[related][concept_id] = None
+
+    def _unlink(self, concept_id: str, row: Dict[str, Any]) -> None:
+        self._discard(self.by_subject, row["subject"], concept_id)
+        self._discard(self.by_difficulty, row["difficulty"], concept_id)
+        self._discard(self.by_interval, row["interval"], concept_id)
+        self._discard(self.by_subject_band, (row["subject"], row["band"]), concept_id)
+        for prereq in row["prerequisites"]:
+            self._discard(self.dependents, prereq, concept_id)
+        for related in row["related_concepts"]:
+            self._discard(self.related_from, related, concept_id)
+
+    @staticmethod
+    def _discard(index: Dict[Any, Dict[str, None]], key: Any, concept_id: str) -> None:
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(concept_id, None)
+            if not bucket:
+                del index[key]
+
+
 class LegalKnowledgeGraph:
     """Comprehensive legal knowledge - 112 concepts across 8 subjects"""
 
-    def __init__(self):
+    def __init__(self, snapshot_path: Optional[Path] = KG_SNAPSHOT):
+        """Load from the compiled snapshot when it matches the source, else build and compile it"""
         self.nodes: Dict[str, KnowledgeNode] = {}
+        self.index = ConceptIndex()
+        self.snapshot_path = snapshot_path
+        self._search: Optional[ConceptSearchIndex] = None
+        self._search_dirty = False
+        if snapshot_path is not None and self._load_snapshot(snapshot_path):
+            return
         self._initialize_all_subjects()
+        for node in self.nodes.values():
+            self._attach(node)
+        if snapshot_path is not None:
+            try:
+                self.save_snapshot(snapshot_path)
+            except OSError as e:
+                logger.warning(f"Could not write knowledge graph snapshot: {e}")
+
+    @staticmethod
+    def source_hash() -> bytes:
+        """Content hash of the modules that define the graph"""
+        return source_hash([Path(__file__).resolve()])
+
+    def _load_snapshot(self, snapshot_path: Path) -> bool:
+        """Attach a lazily materialized node map backed by the snapshot"""
+        snapshot = GraphSnapshot.open(snapshot_path, self.source_hash())
+        if snapshot is None:
+            return False
+        columns = [snapshot.column(name) for name in SNAPSHOT_INDEX_FIELDS]
+        if any(column is None for column in columns):
+            snapshot.close()
+            return False
+        for concept_id, *values in zip(snapshot.keys(), *columns):
+            self.index.add(concept_id, *values)
+        self.nodes = LazyNodeMap(snapshot, self._materialize)
+        logger.debug(f"Loaded {len(snapshot)} concepts from {snapshot_path.name}")
+        return True
+
+    def save_snapshot(self, snapshot_path: Path = KG_SNAPSHOT) -> Path:
+        """Compile the current graph to a binary snapshot"""
+        write_snapshot(snapshot_path, self.source_hash(), SNAPSHOT_FIELDS,
+                       (_node_to_record(self.nodes[cid]) for cid in self.nodes),
+                       index_fields=SNAPSHOT_INDEX_FIELDS)
+        return snapshot_path
+
+    def _materialize(self, record: Dict[str, Any]) -> KnowledgeNode:
+        """Snapshot factory: build the node and subscribe the index to it"""
+        node = _node_from_record(record)
+        object.__setattr__(node, "_index_observer", self.index.on_change)
+        return node
+
+    def _attach(self, node: KnowledgeNode) -> None:
+        self.index.add_node(node)
+        object.__setattr__(node, "_index_observer", self.index.on_change)
+
+    def add_node(self, node: KnowledgeNode) -> None:
+        """Add or replace a concept, keeping the secondary indexes current.
+
+        Indexes follow attribute assignment (node.mastery_level = 0.7); after
+        mutating prerequisites/related_concepts lists in place, call add_node again.
+        """
+        self.nodes[node.concept_id] = node
+        self._attach(node)
+        self._search, self._search_dirty = None, True
+
+    def remove_node(self, concept_id: str) -> None:
+        node = self.nodes.pop(concept_id, None)
+        if node is not None:
+            object.__setattr__(node, "_index_observer", None)
+        self.index.remove(concept_id)
+        self._search, self._search_dirty = None, True
+
+    def _resolve(self, concept_ids) -> List[KnowledgeNode]:
+        return [self.nodes[cid] for cid in list(concept_ids) if cid in self.nodes]
 
     def _initialize_all_subjects(self):
         """Initialize all 14 subjects - Complete Iowa Bar (331 concepts: 180 MBE + 151 Essay)"""
@@ -178,50 +402,6 @@ class LegalKnowledgeGraph:
         self._initialize_secured_transactions()
         self._initialize_iowa_procedure()
 
-
-        # Essay Subjects (151 concepts)
-        self._initialize_professional_responsibility()
-        self._initialize_corporations()
-        self._initialize_wills_trusts_estates()
-        self._initialize_family_law()
-        self._initialize_secured_transactions()
-        self._initialize_iowa_procedure()
-
-
-        # Essay Subjects (151 concepts)
-        self._initialize_professional_responsibility()
-        self._initialize_corporations()
-        self._initialize_wills_trusts_estates()
-        self._initialize_family_law()
-        self._initialize_secured_transactions()
-        self._initialize_iowa_procedure()
-
-
-        # Essay Subjects (151 concepts)
-        self._initialize_professional_responsibility()
-        self._initialize_corporations()
-        self._initialize_wills_trusts_estates()
-        self._initialize_family_law()
-        self._initialize_secured_transactions()
-        self._initialize_iowa_procedure()
-
-        
-        # Essay Subjects (35 concepts)
-        self._initialize_professional_responsibility()
-        self._initialize_corporations()
-        self._initialize_wills_trusts_estates()
-        self._initialize_family_law()
-        self._initialize_secured_transactions()
-        self._initialize_iowa_procedure()
-        
-        # Essay Subjects (35 concepts)
-        self._initialize_professional_responsibility()
-        self._initialize_corporations()
-        self._initialize_wills_trusts_estates()
-        self._initialize_family_law()
-        self._initialize_secured_transactions()
-        self._initialize_iowa_procedure()
-
 # Ultimate Expanded Knowledge Base - 112+ Concepts
 # Each subject has 14+ concepts at Real Property richness level
 
@@ -3225,12 +3405,62 @@ class LegalKnowledgeGraph:
 
     def get_subject_concepts(self, subject: str) -> List[KnowledgeNode]:
         """Get all concepts for subject"""
-        return [n for n in self.nodes.values() if n.subject == subject]
+        return self._resolve(self.index.by_subject.get(subject, ()))
+
+    def get_concepts_by_mastery(self, subject: str, band: str) -> List[KnowledgeNode]:
+        """Concepts of a subject in a mastery band ('low', 'mid', 'high')"""
+        return self._resolve(self.index.by_subject_band.get((subject, band), ()))
+
+    def get_concepts_by_difficulty(self, difficulty: int) -> List[KnowledgeNode]:
+        """Concepts at a difficulty level (1-5)"""
+        return self._resolve(self.index.by_difficulty.get(difficulty, ()))
+
+    def get_concepts_by_interval(self, max_interval: int) -> List[KnowledgeNode]:
+        """Concepts whose review interval is at most max_interval days"""
+        ids: List[str] = []
+        for interval in sorted(k for k in self.index.by_interval if k <= max_interval):
+            ids.extend(self.index.by_interval[interval])
+        return self._resolve(ids)
+
+    def get_dependents(self, concept_id: str) -> List[KnowledgeNode]:
+        """Concepts that list concept_id as a prerequisite"""
+        return self._resolve(self.index.dependents.get(concept_id, ()))
+
+    def get_related_from(self, concept_id: str) -> List[KnowledgeNode]:
+        """Concepts that list concept_id among their related concepts"""
+        return self._resolve(self.index.related_from.get(concept_id, ()))
 
     def get_concept(self, concept_id: str) -> Optional[KnowledgeNode]:
         """Get specific concept"""
         return self.nodes.get(concept_id)
 
+    def search_index(self) -> ConceptSearchIndex:
+        """Full-text index, loaded from beside the snapshot or built once and saved there"""
+        if self._search is not None:
+            return self._search
+
+        search_path = self.snapshot_path.with_suffix(".search") if self.snapshot_path else None
+        if search_path is not None and not self._search_dirty:
+            self._search = ConceptSearchIndex.load(search_path, self.source_hash())
+            if self._search is not None:
+                return self._search
+
+        self._search = ConceptSearchIndex.build(
+            ((cid, asdict(node)) for cid, node in self.nodes.items()), self.source_hash()
+        )
+        # Runtime additions are not part of the compiled sources, so keep those in memory only
+        if search_path is not None and not self._search_dirty:
+            try:
+                self._search.save(search_path)
+            except OSError as e:
+                logger.warning(f"Could not write concept search index: {e}")
+        return self._search
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[KnowledgeNode, float]]:
+        """Best-matching concepts for a free-text query (BM25, prefix and typo tolerant)"""
+        return [(self.nodes[cid], score) for cid, score in self.search_index().search(query, k)
+                if cid in self.nodes]
+
 # ==================== INTERLEAVED PRACTICE ENGINE ====================
 
     def _initialize_professional_responsibility(self):
@@ -8831,10 +9061,10 @@ class InterleavedPracticeEngine:
             logger.warning(f"No concepts for subject: {subject}")
             return []
         
-        # Separate by mastery
-        low = [c for c in concepts if c.mastery_level < 0.5]
-        mid = [c for c in concepts if 0.5 <= c.mastery_level < 0.8]
-        high = [c for c in concepts if c.mastery_level >= 0.8]
+        # Separate by mastery (indexed, no rescan of the subject)
+        low = self.kg.get_concepts_by_mastery(subject, "low")
+        mid = self.kg.get_concepts_by_mastery(subject, "mid")
+        high = self.kg.get_concepts_by_mastery(subject, "high")
         
         selected: List[KnowledgeNode] = []
         selected_ids: Set[str] = set()
@@ -8911,48 +9141,56 @@ class InterleavedPracticeEngine:
 class PerformanceTracker:
     """Track performance with analytics"""
     
-    def __init__(self):
-        self.perf_file = PERFORMANCE_DB
-        self.perf_file.touch(exist_ok=True)
+    def __init__(self, store_dir: Path = PERFORMANCE_STORE, perf_file: Path = PERFORMANCE_DB):
+        self.perf_file = perf_file
+        self.store = PerformanceStore(store_dir)
+        # Attempts logged by earlier versions (or other tools) to the JSONL file
+        imported = self.store.import_jsonl(self.perf_file)
+        
+        self.rollup = RollingStats.load(store_dir / "rollup.json")
+        if imported or self.rollup.meta.get("rows") != len(self.store):
+            self._rebuild_rollup()
+        atexit.register(self.close)
+    
+    def _rebuild_rollup(self):
+        """Recount the rolling windows from the store (only the longest window is scanned)"""
+        self.rollup.reset()
+        since = time.time() - (max(self.rollup.windows) + 1) * 86400
+        for timestamp, subject, correct, _, concept in self.store.scan(since):
+            self.rollup.add(subject, correct, timestamp, concept)
+        self.rollup.meta["rows"] = len(self.store)
+        self.rollup.save()
     
-    def record_attempt(self, subject: str, correct: bool):
+    def record_attempt(self, subject: str, correct: bool, response_time: Optional[float] = None,
+                       concept_id: Optional[str] = None):
         """Record attempt"""
-        entry = {
-            "timestamp": datetime.now().isoformat(),
-            "subject": subject,
-            "correct": correct
-        }
-        atomic_write_jsonl(self.perf_file, entry)
+        timestamp = self.store.record(subject, correct, response_time, concept=concept_id)
+        self.rollup.meta["rows"] = self.rollup.meta.get("rows", 0) + 1
+        self.rollup.add(subject, correct, timestamp, concept_id)
     
     def get_stats(self, days: int = 30) -> Dict:
-        """Get statistics"""
-        cutoff = datetime.now() - timedelta(days=days)
-        stats = defaultdict(lambda: {"correct": 0, "total": 0})
-        
+        """Get statistics for the last `days` calendar days, today included"""
+        if days in self.rollup.windows:
+            return self.rollup.window(days)
         try:
-            with self.perf_file.open("r") as f:
-                for line in f:
-                    try:
-                        entry = json.loads(line.strip())
-                        timestamp = datetime.fromisoformat(entry["timestamp"])
-                        
-                        if timestamp < cutoff:
-                            continue
-                        
-                        subj = entry["subject"]
-                        stats[subj]["total"] += 1
-                        if entry["correct"]:
-                            stats[subj]["correct"] += 1
-                    except:
-                        continue
+            stats = self.store.stats(days, calendar=True)
         except Exception as e:
             logger.error(f"Error reading stats: {e}")
+            return {}
         
         for subj in stats:
             total = stats[subj]["total"]
             stats[subj]["percentage"] = (stats[subj]["correct"] / total * 100) if total > 0 else 0
         
-        return dict(stats)
+        return stats
+    
+    def close(self):
+        """Checkpoint rolling stats and close the store"""
+        try:
+            self.rollup.save()
+            self.store.close()
+        except OSError as e:
+            logger.warning(f"Could not checkpoint performance stats: {e}")
     
     def display_dashboard(self):
         """Display dashboard"""
@@ -8978,6 +9216,18 @@ class PerformanceTracker:
             bar = "█" * int(pct/5) + "░" * (20 - int(pct/5))
             print(f"{subject:25} {bar} {pct:5.1f}%")
         
+        print("\nTrend:")
+        for days in self.rollup.windows:
+            total, correct = self.rollup.summary(days)
+            pct = (correct / total * 100) if total else 0
+            print(f"  Last {days:2} days: {total:5} questions, {pct:5.1f}%")
+        
+        weakest = self.rollup.weakest(30)
+        if weakest:
+            print("\nWeakest Concepts (30 days):")
+            for concept, data in weakest:
+                print(f"  {concept:35} {data['correct']}/{data['total']} ({data['percentage']:.0f}%)")
+        
         print("\n" + "="*70 + "\n")
 
 # ==================== INTERACTIVE TUTOR ====================
@@ -9069,10 +9319,12 @@ Current Session Progress:
         
         concept_query = ' '.join(parts[1:])
         
-        # Try to find matching concept
-        for concept in self.bar_tutor.kg.nodes.values():
-            if concept_query in concept.name.lower() or concept_query in concept.concept_id:
-                return f"""
+        # Rank concepts by relevance instead of taking the first substring hit
+        matches = self.bar_tutor.kg.search(concept_query, k=3)
+        if matches:
+            concept = matches[0][0]
+            also = ', '.join(m.name for m, _ in matches[1:])
+            return f"""
 {concept.name}
 
 Rule: {concept.rule_statement}
@@ -9080,7 +9332,7 @@ Rule: {concept.rule_statement}
 Elements: {', '.join(concept.elements) if concept.elements else 'N/A'}
 
 Common Traps: {concept.common_traps[0] if concept.common_traps else 'N/A'}
-"""
+""" + (f"\nSee also: {also}\n" if also else "")
         
         return f"Concept '{concept_query}' not found. Try 'help' for available topics."
     
@@ -9127,8 +9379,12 @@ class BarExamTutor:
         concept = self.kg.get_concept(concept_id)
         
         if not concept:
-            print(f"\nConcept '{concept_id}' not found.\n")
-            return
+            matches = self.kg.search(concept_id, k=1)
+            if not matches:
+                print(f"\nConcept '{concept_id}' not found.\n")
+                return
+            concept = matches[0][0]
+            print(f"\nNo concept ID '{concept_id}'; closest match: {concept.concept_id}")
         
         print(f"\n{'='*70}")
         print(f"{concept.name.upper()}")
@@ -9256,6 +9512,10 @@ class BarExamTutor:
 
 # ==================== MAIN ====================
 
+def build_knowledge_graph_snapshot(snapshot_path: Path = KG_SNAPSHOT) -> Path:
+    """Compile the knowledge graph from source into its binary snapshot"""
+    return LegalKnowledgeGraph(snapshot_path=None).save_snapshot(snapshot_path)
+
 def main():
     """Main entry point"""
     try:
@@ -23,6 +23,8 @@ from typing import Dict, List, Optional, Set, Tuple, Any, Union
 
 from dotenv import load_dotenv
 
+from jsonl_wal import append_jsonl
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -54,13 +56,9 @@ MAX_NOTES_CHARS = 10000
 # ==================== UTILITY FUNCTIONS ====================
 
 def atomic_write_jsonl(filepath: Path, data: dict) -> None:
-    """Atomically append to JSONL file"""
+    """Append a line to a JSONL file (group-committed; see jsonl_wal)"""
     try:
-        filepath.parent.mkdir(parents=True, exist_ok=True)
-        with filepath.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(data, ensure_ascii=False) + "\n")
-            f.flush()
-            os.fsync(f.fileno())
+        append_jsonl(filepath, data)
         logger.debug(f"Wrote to {filepath}")
     except Exception as e:
         logger.error(f"Failed to write {filepath}: {e}")
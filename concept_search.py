@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Concept Search - BM25 inverted index over knowledge graph concepts
+
+Documents are tokenized once into weighted field postings (name counts more
+than a trap or an exception). Queries are scored with BM25; each query token
+is matched exactly, by prefix ("neglig" -> negligence) and, when nothing
+else matches, fuzzily within one or two edits ("negligance", "estopel").
+
+Postings are packed (doc, weighted tf) float64 pairs, so the saved index
+marshals to disk next to the graph snapshot and reloads in about a
+millisecond; a term's postings are only unpacked when a query touches it.
+The typo-tolerance table (one- and, for terms longer than five characters,
+two-character deletions of every term) is built with the index and saved
+with it as one string of sorted variants plus packed offsets, searched in
+place, so no query pays for building it.
+"""
+
+import array
+import bisect
+import heapq
+import logging
+import marshal
+import math
+import os
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 3
+
+# Field weights applied to term frequency (BM25F-style)
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "concept_id": 1.5,
+    "rule_statement": 1.0,
+    "elements": 1.0,
+    "exceptions": 0.7,
+    "common_traps": 0.7,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+PREFIX_WEIGHT = 0.8
+FUZZY_WEIGHT = 0.6
+MIN_PREFIX_LEN = 3
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or that the to was were "
+    "will with not no may must any all its".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens without stop words"""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def _deletes(term: str, depth: int = 1) -> Set[str]:
+    """All deletions of up to `depth` characters from a term"""
+    variants: Set[str] = set()
+    frontier = {term}
+    for _ in range(depth):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))} - variants
+        variants |= frontier
+    return variants
+
+
+def _edit_limit(term: str) -> int:
+    """Typos tolerated in a term: one up to five characters, two beyond"""
+    return 1 if len(term) <= 5 else 2
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, returning limit + 1 once it is exceeded"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            current.append(value)
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class ConceptSearchIndex:
+    """Inverted index with BM25 ranking, prefix and fuzzy term expansion"""
+
+    def __init__(self, doc_ids: List[str], doc_lengths: List[float],
+                 packed_postings: Dict[str, bytes], source_hash: bytes = b"",
+                 packed_deletes: Optional[Tuple[str, bytes, bytes, bytes]] = None):
+        self.doc_ids = doc_ids
+        self.doc_lengths = doc_lengths
+        self.source_hash = source_hash
+        self.vocabulary = sorted(packed_postings)
+        self.avg_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+        self._packed = packed_postings
+        self._postings: Dict[str, List[Tuple[int, float, float]]] = {}
+
+        # Deletion variant i is _delete_keys[_key_starts[i]:_key_starts[i + 1]] and maps to
+        # vocabulary[_delete_terms[_term_starts[i]:_term_starts[i + 1]]]
+        if packed_deletes is None:
+            packed_deletes = self._pack_deletes()
+        self._packed_deletes = packed_deletes
+        self._delete_keys, key_starts, term_starts, terms = packed_deletes
+        self._key_starts, self._term_starts, self._delete_terms = (
+            array.array("I"), array.array("I"), array.array("I"))
+        self._key_starts.frombytes(key_starts)
+        self._term_starts.frombytes(term_starts)
+        self._delete_terms.frombytes(terms)
+
+    @classmethod
+    def build(cls, documents: Iterable[Tuple[str, Dict[str, Any]]],
+              source_hash: bytes = b"") -> "ConceptSearchIndex":
+        """Index (doc_id, {field: str | list[str]}) pairs"""
+        doc_ids: List[str] = []
+        doc_lengths: List[float] = []
+        postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+
+        for doc_id, fields in documents:
+            doc = len(doc_ids)
+            doc_ids.append(doc_id)
+            weighted_tf: Dict[str, float] = defaultdict(float)
+            for field_name, weight in FIELD_WEIGHTS.items():
+                value = fields.get(field_name) or ""
+                text = " ".join(value) if isinstance(value, (list, tuple)) else str(value)
+                if field_name == "concept_id":
+                    text = text.replace("_", " ")
+                for token in tokenize(text):
+                    weighted_tf[token] += weight
+            doc_lengths.append(sum(weighted_tf.values()))
+            for term, tf in weighted_tf.items():
+                postings[term].append((doc, tf))
+
+        packed = {
+            term: array.array("d", [v for pair in plist for v in pair]).tobytes()
+            for term, plist in postings.items()
+        }
+        return cls(doc_ids, doc_lengths, packed, source_hash)
+
+    # ---------- persistence ----------
+
+    def save(self, path: Path) -> None:
+        """Marshal the index to path atomically"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = marshal.dumps((INDEX_VERSION, self.source_hash, self.doc_ids,
+                                 self.doc_lengths, self._packed, self._packed_deletes))
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+        logger.info(f"Wrote concept search index: {path} ({len(self.vocabulary)} terms)")
+
+    @classmethod
+    def load(cls, path: Path, expected_hash: Optional[bytes] = None) -> Optional["ConceptSearchIndex"]:
+        """Load a saved index, or None if missing, stale or unreadable"""
+        try:
+            version, src_hash, *payload = marshal.loads(Path(path).read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if version != INDEX_VERSION or (expected_hash is not None and src_hash != expected_hash):
+            return None
+        doc_ids, doc_lengths, packed, packed_deletes = payload
+        return cls(doc_ids, doc_lengths, packed, src_hash, packed_deletes)
+
+    # ---------- querying ----------
+
+    def _postings_for(self, term: str) -> List[Tuple[int, float, float]]:
+        """(doc, tf, bm25 length norm) triples for a term, unpacked on first use"""
+        plist = self._postings.get(term)
+        if plist is None:
+            values = array.array("d")
+            values.frombytes(self._packed[term])
+            plist = []
+            for i in range(0, len(values), 2):
+                doc = int(values[i])
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc] / self.avg_length)
+                plist.append((doc, values[i + 1], norm))
+            self._postings[term] = plist
+        return plist
+
+    def _idf(self, term: str) -> float:
+        df = len(self._packed[term]) // 16
+        n = len(self.doc_ids)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def _pack_deletes(self) -> Tuple[str, bytes, bytes, bytes]:
+        """Deletion variant -> terms table for typo lookup, as (sorted variants
+        concatenated, uint32 variant starts, uint32 term starts, uint32
+        vocabulary positions)"""
+        table: Dict[str, List[int]] = defaultdict(list)
+        for position, term in enumerate(self.vocabulary):
+            if len(term) > 3:
+                for variant in _deletes(term, _edit_limit(term)):
+                    table[variant].append(position)
+        keys = sorted(table)
+        key_starts = array.array("I", [0])
+        term_starts = array.array("I", [0])
+        terms = array.array("I")
+        for key in keys:
+            key_starts.append(key_starts[-1] + len(key))
+            terms.extend(table[key])
+            term_starts.append(len(terms))
+        return "".join(keys), key_starts.tobytes(), term_starts.tobytes(), terms.tobytes()
+
+    def _deleted_from(self, variant: str) -> List[str]:
+        """Terms that have `variant` as one of their deletions (binary search
+        over the concatenated variants)"""
+        keys, starts = self._delete_keys, self._key_starts
+        lo, hi = 0, len(starts) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if keys[starts[mid]:starts[mid + 1]] < variant:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(starts) - 1 or keys[starts[lo]:starts[lo + 1]] != variant:
+            return []
+        start, end = self._term_starts[lo], self._term_starts[lo + 1]
+        return [self.vocabulary[position] for position in self._delete_terms[start:end]]
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """Index terms matching a query token, with a match-quality weight"""
+        matches: Dict[str, float] = {}
+        if token in self._packed:
+            matches[token] = 1.0
+
+        if len(token) >= MIN_PREFIX_LEN:
+            i = bisect.bisect_left(self.vocabulary, token)
+            while i < len(self.vocabulary) and self.vocabulary[i].startswith(token):
+                matches.setdefault(self.vocabulary[i], PREFIX_WEIGHT)
+                i += 1
+
+        if not matches and len(token) > 3:
+            limit = _edit_limit(token)
+            candidates = set(self._deleted_from(token))
+            for variant in _deletes(token, limit):
+                if variant in self._packed:
+                    candidates.add(variant)
+                candidates.update(self._deleted_from(variant))
+            for term in candidates:
+                if _edit_distance(token, term, limit) <= limit:
+                    matches[term] = FUZZY_WEIGHT
+        return list(matches.items())
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """Top-k (doc_id, score) pairs for a free-text query"""
+        scores: Dict[int, float] = defaultdict(float)
+        for token in dict.fromkeys(tokenize(query)):
+            for term, quality in self._expand(token):
+                weight = quality * self._idf(term) * (BM25_K1 + 1)
+                for doc, tf, norm in self._postings_for(term):
+                    scores[doc] += weight * tf / (tf + norm)
+
+        ranked = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(self.doc_ids[doc], score) for doc, score in ranked]
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Due Queue - due-date priority queue for spaced-repetition cards
+
+DueQueue is a min-heap of (due epoch seconds, card id) with lazy
+invalidation: rescheduling a card pushes a new entry and leaves the old one
+to be discarded when it surfaces, so a review costs O(log M) and fetching
+the next N due cards costs O(N log M) instead of parsing and sorting the
+whole deck.
+
+JsonlDueIndex keeps a DueQueue (plus the byte offset of each card's latest
+line) for an append-only JSONL deck and persists it next to the deck. On
+open it only reads lines appended since the index was saved; a deck that
+shrank or was replaced (new inode) is re-indexed from scratch.
+
+Usage:
+    python due_queue.py bench --cards 100000 200000
+"""
+
+import argparse
+import array
+import heapq
+import json
+import logging
+import marshal
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+CHECKPOINT_EVERY = 1000
+
+_decode_json = json.JSONDecoder().decode
+
+
+def due_epoch(value: str) -> float:
+    """Epoch seconds of an ISO timestamp"""
+    return datetime.fromisoformat(value).timestamp()
+
+# ==================== QUEUE ====================
+
+class DueQueue:
+    """Min-heap of (due epoch, item id) with lazy invalidation"""
+
+    def __init__(self, items: Optional[Dict[str, float]] = None):
+        self._due: Dict[str, float] = dict(items or {})
+        self._heap: List[Tuple[float, str]] = [(due, item) for item, due in self._due.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._due
+
+    def due_at(self, item_id: str) -> Optional[float]:
+        return self._due.get(item_id)
+
+    def schedule(self, item_id: str, due: float) -> None:
+        """Set (or move) an item's due time"""
+        if self._due.get(item_id) == due:
+            return
+        self._due[item_id] = due
+        heapq.heappush(self._heap, (due, item_id))
+        self._maybe_compact()
+
+    def remove(self, item_id: str) -> None:
+        if self._due.pop(item_id, None) is not None:
+            self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        """Drop stale entries once they outnumber live ones"""
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._heap = [(due, item) for item, due in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def peek_due(self, limit: int, now: Optional[float] = None) -> List[str]:
+        """Up to `limit` item ids due at or before now, earliest first"""
+        now = time.time() if now is None else now
+        taken: List[Tuple[float, str]] = []
+        seen = set()
+        while self._heap and len(taken) < limit:
+            due, item = self._heap[0]
+            if self._due.get(item) != due or item in seen:
+                heapq.heappop(self._heap)
+                continue
+            if due > now:
+                break
+            taken.append(heapq.heappop(self._heap))
+            seen.add(item)
+        for entry in taken:
+            heapq.heappush(self._heap, entry)
+        return [item for _, item in taken]
+
+    def count_due(self, now: Optional[float] = None) -> int:
+        """Number of items due at or before now (linear, no parsing)"""
+        now = time.time() if now is None else now
+        return sum(1 for due in self._due.values() if due <= now)
+
+    def snapshot(self) -> Tuple[Tuple[str, ...], bytes]:
+        """(ids, packed epochs) in due order; a sorted list is already a valid heap"""
+        entries = sorted((due, item) for item, due in self._due.items())
+        return tuple(item for _, item in entries), array.array("d", [due for due, _ in entries]).tobytes()
+
+    @classmethod
+    def from_snapshot(cls, ids: Sequence[str], epochs: bytes) -> "DueQueue":
+        dues = array.array("d")
+        dues.frombytes(epochs)
+        queue = cls()
+        queue._due = dict(zip(ids, dues))
+        queue._heap = list(zip(dues, ids))
+        return queue
+
+# ==================== JSONL DECK INDEX ====================
+
+class JsonlDueIndex:
+    """Persistent due-date index over a JSONL deck (the latest line per id wins)"""
+
+    def __init__(self, path: Path, index_path: Path, id_field: str = "id",
+                 due_fields: Tuple[str, ...] = ("next_review", "created_at"),
+                 checkpoint_every: int = CHECKPOINT_EVERY):
+        self.path = Path(path)
+        self.index_path = Path(index_path)
+        self.id_field = id_field
+        self.due_fields = due_fields
+        self.checkpoint_every = checkpoint_every
+        self._reset()
+        self._load()
+        self.refresh()
+
+    def _reset(self) -> None:
+        self.queue = DueQueue()
+        self._locations: Dict[str, int] = {}
+        self._offset = 0
+        self._inode: Optional[int] = None
+        self._unsaved = 0
+
+    def _load(self) -> None:
+        try:
+            version, inode, offset, ids, epochs, locations = marshal.loads(self.index_path.read_bytes())
+        except FileNotFoundError:
+            return
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable due index {self.index_path}: {e}")
+            return
+        if version != INDEX_VERSION:
+            return
+        self.queue = DueQueue.from_snapshot(ids, epochs)
+        self._locations = locations
+        self._offset = offset
+        self._inode = inode
+
+    def save(self) -> None:
+        """Persist the index atomically"""
+        ids, epochs = self.queue.snapshot()
+        payload = marshal.dumps((INDEX_VERSION, self._inode, self._offset, ids, epochs, self._locations))
+        tmp_path = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, self.index_path)
+        self._unsaved = 0
+
+    def _due(self, record: dict) -> Optional[float]:
+        for name in self.due_fields:
+            if record.get(name):
+                return due_epoch(record[name])
+        return None
+
+    def refresh(self) -> int:
+        """Index lines appended since the last refresh; returns how many were read"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._reset()
+            return 0
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            if self._inode is not None:
+                logger.info(f"{self.path.name} was rewritten; re-indexing")
+            self._reset()
+            self._inode = stat.st_ino
+        if stat.st_size == self._offset:
+            return 0
+
+        with self.path.open("rb") as f:
+            f.seek(self._offset)
+            data = f.read(stat.st_size - self._offset)
+        position = self._offset
+        count = 0
+        updates: Dict[str, Optional[float]] = {}
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = _decode_json(line.decode("utf-8"))
+                item_id = record[self.id_field]
+                updates[item_id] = self._due(record)
+                self._locations[item_id] = position
+            except (ValueError, KeyError, TypeError):
+                pass
+            position += len(line)
+            count += 1
+
+        if not self.queue:
+            # Initial build: heapify once instead of pushing per card
+            self.queue = DueQueue({item: due for item, due in updates.items() if due is not None})
+        else:
+            for item_id, due in updates.items():
+                if due is None:
+                    self.queue.remove(item_id)
+                else:
+                    self.queue.schedule(item_id, due)
+
+        self._offset = position
+        self._unsaved += count
+        if self._unsaved >= self.checkpoint_every:
+            self.save()
+        return count
+
+    def get(self, item_id: str) -> Optional[dict]:
+        """Latest record for an id"""
+        self.refresh()
+        return self._read([item_id])[0] if item_id in self._locations else None
+
+    def _read(self, item_ids: List[str]) -> List[dict]:
+        records = []
+        with self.path.open("rb") as f:
+            for item_id in item_ids:
+                f.seek(self._locations[item_id])
+                records.append(json.loads(f.readline()))
+        return records
+
+    def due(self, limit: int = 20, now: Optional[float] = None) -> List[dict]:
+        """Records due at or before now, earliest first"""
+        self.refresh()
+        return self._read(self.queue.peek_due(limit, now))
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+# ==================== BENCHMARK ====================
+
+def _legacy_due(path: Path, limit: int) -> List[dict]:
+    """The original parse-filter-sort get_due_cards, for comparison"""
+    cards = []
+    now = datetime.now()
+    with path.open("r") as f:
+        for line in f:
+            card = json.loads(line.strip())
+            if datetime.fromisoformat(card.get("next_review") or card["created_at"]) <= now:
+                cards.append(card)
+    cards.sort(key=lambda x: x.get("next_review") or x["created_at"])
+    return cards[:limit]
+
+
+def _ms(fn, runs: int = 5) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        t = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - t) * 1000)
+    return best
+
+
+def benchmark(sizes: Sequence[int] = (100_000, 200_000), limit: int = 20) -> Dict[int, Dict[str, float]]:
+    """Next-N-due latency: full scan vs heap, in memory and over a JSONL deck"""
+    rng = random.Random(11)
+    now = datetime.now()
+    results = {}
+
+    for size in sizes:
+        reviews = {f"card{i:07d}": (now + timedelta(days=rng.uniform(-30, 60))).isoformat() for i in range(size)}
+
+        def scan_memory():
+            due = [(r, c) for c, r in reviews.items() if datetime.fromisoformat(r) <= now]
+            due.sort()
+            return due[:limit]
+
+        queue = DueQueue({c: due_epoch(r) for c, r in reviews.items()})
+        row = {"memory_scan_ms": _ms(scan_memory, 3), "memory_heap_ms": _ms(lambda: queue.peek_due(limit))}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            deck = Path(tmp) / "flashcards.jsonl"
+            with deck.open("w") as f:
+                for card_id, review in reviews.items():
+                    f.write(json.dumps({"id": card_id, "front": "Q " + card_id, "back": "A",
+                                        "created_at": now.isoformat(), "next_review": review}) + "\n")
+            row["jsonl_scan_ms"] = _ms(lambda: _legacy_due(deck, limit), 3)
+            t = time.perf_counter()
+            JsonlDueIndex(deck, deck.with_suffix(".dueidx")).save()
+            row["index_build_ms"] = (time.perf_counter() - t) * 1000
+            t = time.perf_counter()
+            index = JsonlDueIndex(deck, deck.with_suffix(".dueidx"))
+            row["index_load_ms"] = (time.perf_counter() - t) * 1000
+            row["jsonl_heap_ms"] = _ms(lambda: index.due(limit))
+            assert [c["id"] for c in index.due(limit)] == [c["id"] for c in _legacy_due(deck, limit)]
+        results[size] = row
+
+    print(f"\nNEXT {limit} DUE CARDS (best-of ms)")
+    print("=" * 78)
+    print(f"{'cards':>9}{'mem scan':>11}{'mem heap':>11}{'jsonl scan':>12}{'jsonl heap':>12}"
+          f"{'idx build':>11}{'idx load':>11}")
+    for size, row in results.items():
+        print(f"{size:9,}{row['memory_scan_ms']:11.1f}{row['memory_heap_ms']:11.3f}{row['jsonl_scan_ms']:12.1f}"
+              f"{row['jsonl_heap_ms']:12.3f}{row['index_build_ms']:11.1f}{row['index_load_ms']:11.1f}")
+    print("=" * 78 + "\n")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the due-card priority queue")
+    parser.add_argument("command", choices=["bench"])
+    parser.add_argument("--cards", type=int, nargs="+", default=[100_000, 200_000])
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    benchmark(args.cards, args.limit)
+
+
+if __name__ == "__main__":
+    main()
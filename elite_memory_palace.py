@@ -15,20 +15,48 @@ Features:
 
 from __future__ import annotations
 
+import asyncio
+import atexit
 import hashlib
+import heapq
+import importlib.util
 import json
 import logging
 import math
+import os
+import pickle
 import random
+import threading
 import time
 from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Protocol, Set, Tuple, Union
-
-# Type aliases for improved code clarity and documentation
-Position3D = Tuple[float, float, float]  # (x, y, z) coordinates
-BoundingBox3D = Tuple[float, float, float, float, float, float]  # (min_x, max_x, min_y, max_y, min_z, max_z)
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Protocol, Sequence, Set, Tuple, Union
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # batch kernels fall back to pure Python
+    np = None
+
+from palace_spatial import (
+    SPLIT_STRATEGIES,
+    OptimizedSpatialIndex,
+    Position3D,
+    SpatialEntry,
+    SpatialInternalNode,
+    SpatialLeafNode,
+    SplitStrategy,
+    UniformGrid,
+    hilbert_keys,
+)
+from kg_snapshot import LazyNodeMap
+from palace_compression import ContentCodec, DecodedCache
+from palace_file import PalaceFile, write_palace_file
+from palace_routing import PalaceRouter
+from palace_similarity import SimilarityIndex, TokenVocabulary, jaccard_ids, window_pairs
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -136,12 +164,121 @@ class EncodingResult:
     confidence_score: float = 0.5
 
 
+class ModelRegistry:
+    """
+    Process-wide, lazily loaded ML models.
+
+    Nothing is imported or downloaded until a model is first requested, and
+    only models enabled by the feature flag (PALACE_ML_MODELS, a comma list of
+    "embedding", "semantic", "visual", or "all"; empty by default) are ever
+    loaded. Loaded models - and failed loads - are cached for the life of the
+    process and shared by every encoder. warm_up() loads the enabled models on
+    a background thread so the first encoding does not pay for it.
+    """
+
+    # name -> (required modules, loader)
+    SPECS: Dict[str, Tuple[Tuple[str, ...], Any]] = {}
+
+    def __init__(self, enabled: Optional[Sequence[str]] = None):
+        self._models: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        self._warm_thread: Optional[threading.Thread] = None
+        self.configure(enabled)
+
+    @classmethod
+    def register(cls, name: str, modules: Tuple[str, ...]):
+        """Decorator registering a zero-argument model loader"""
+        def decorator(loader):
+            cls.SPECS[name] = (modules, loader)
+            return loader
+        return decorator
+
+    def configure(self, enabled: Optional[Sequence[str]] = None) -> None:
+        """Set the enabled models (default: from PALACE_ML_MODELS)"""
+        if enabled is None:
+            enabled = [n.strip() for n in os.getenv("PALACE_ML_MODELS", "").split(",") if n.strip()]
+        if "all" in enabled:
+            enabled = list(self.SPECS)
+        self.enabled = frozenset(n for n in enabled if n in self.SPECS)
+
+    def available(self, name: str) -> bool:
+        """Enabled, installed and not known to fail - without loading anything"""
+        if name not in self.enabled or (name in self._models and self._models[name] is None):
+            return False
+        modules, _ = self.SPECS[name]
+        return all(importlib.util.find_spec(m) is not None for m in modules)
+
+    def get(self, name: str) -> Any:
+        """The model, loading it on first use; None if disabled or unloadable"""
+        if name in self._models:
+            return self._models[name]
+        if not self.available(name):
+            return None
+        with self._locks[name]:
+            if name not in self._models:
+                start = time.perf_counter()
+                try:
+                    self._models[name] = self.SPECS[name][1]()
+                    logger.info(f"Loaded {name} model in {time.perf_counter() - start:.1f}s")
+                except Exception as e:
+                    logger.warning(f"Could not load {name} model, using fallback: {e}")
+                    self._models[name] = None
+        return self._models[name]
+
+    def loaded(self, name: str) -> bool:
+        return self._models.get(name) is not None
+
+    def warm_up(self, names: Optional[Sequence[str]] = None) -> threading.Thread:
+        """Load models in a daemon thread; returns the thread"""
+        names = [n for n in (names or sorted(self.enabled)) if n in self.enabled]
+        if self._warm_thread is None or not self._warm_thread.is_alive():
+            self._warm_thread = threading.Thread(
+                target=lambda: [self.get(n) for n in names], name="palace-model-warmup", daemon=True
+            )
+            self._warm_thread.start()
+        return self._warm_thread
+
+    def clear(self) -> None:
+        """Forget loaded models (and failures)"""
+        self._models.clear()
+
+
+@ModelRegistry.register("embedding", ("sentence_transformers",))
+def _load_embedding_model():
+    from sentence_transformers import SentenceTransformer  # type: ignore
+
+    return SentenceTransformer("paraphrase-MiniLM-L6-v2")
+
+
+@ModelRegistry.register("semantic", ("transformers",))
+def _load_semantic_pipeline():
+    from transformers import pipeline  # type: ignore
+
+    return pipeline("text2text-generation", model="google/flan-t5-small")
+
+
+@ModelRegistry.register("visual", ("diffusers", "torch"))
+def _load_visual_pipeline():
+    import torch  # type: ignore
+    from diffusers import StableDiffusionPipeline  # type: ignore
+
+    visual_pipeline = StableDiffusionPipeline.from_pretrained(
+        "CompVis/stable-diffusion-v1-4", torch_dtype=torch.float16
+    )
+    visual_pipeline.enable_attention_slicing()
+    return visual_pipeline
+
+
+MODEL_REGISTRY = ModelRegistry()
+
+
 class AIEnhancedEncoder:
     """
     AI-enhanced encoder with graceful degradation.
 
     Modes:
-    - Advanced (requires: sentence-transformers, transformers)
+    - Advanced (requires: sentence-transformers, transformers, enabled in
+      the model registry; models load on first use)
     - Fallback (rule-based, no dependencies)
 
     Performance:
@@ -149,48 +286,32 @@ class AIEnhancedEncoder:
     - Fallback: 85% encoding coherence
 
     Memory:
-    - Advanced: ~500MB model loading
+    - Advanced: ~500MB once the models are loaded
     - Fallback: <1MB
     """
 
-    def __init__(self):
-        self.advanced_mode = False
-        self._init_models()
-
-    def _init_models(self):
-        """Initialize ML models with graceful fallback"""
-        try:
-            import importlib.util
-
-            sentence_spec = importlib.util.find_spec("sentence_transformers")
-            transformers_spec = importlib.util.find_spec("transformers")
-
-            if sentence_spec is None or transformers_spec is None:
-                raise ImportError
+    def __init__(self, registry: Optional[ModelRegistry] = None, warm_up: Optional[bool] = None):
+        self.registry = registry or MODEL_REGISTRY
+        if warm_up is None:
+            warm_up = os.getenv("PALACE_ML_WARMUP", "0") == "1"
+        if warm_up and self.registry.enabled:
+            self.registry.warm_up()
 
-            from sentence_transformers import SentenceTransformer  # type: ignore
-            from transformers import pipeline  # type: ignore
+    @property
+    def advanced_mode(self) -> bool:
+        return self.registry.available("embedding") and self.registry.available("semantic")
 
-            self.embedding_model = SentenceTransformer("paraphrase-MiniLM-L6-v2")
-            self.semantic_pipeline = pipeline("text2text-generation", model="google/flan-t5-small")
+    @property
+    def embedding_model(self) -> Any:
+        return self.registry.get("embedding")
 
-            diffusion_spec = importlib.util.find_spec("diffusers")
-            torch_spec = importlib.util.find_spec("torch")
-
-            if diffusion_spec and torch_spec:
-                import torch  # type: ignore
-                from diffusers import StableDiffusionPipeline  # type: ignore
-
-                self.visual_pipeline = StableDiffusionPipeline.from_pretrained(
-                    "CompVis/stable-diffusion-v1-4", torch_dtype=torch.float16
-                )
-                self.visual_pipeline.enable_attention_slicing()
-            else:
-                self.visual_pipeline = None
+    @property
+    def semantic_pipeline(self) -> Any:
+        return self.registry.get("semantic")
 
-            self.advanced_mode = True
-        except (ImportError, OSError):
-            self.advanced_mode = False
+    @property
+    def visual_pipeline(self) -> Any:
+        return self.registry.get("visual")
 
     async def generate_optimal_encoding(
         self, content: str, context: Dict[str, Any] = None
@@ -209,9 +330,15 @@ class AIEnhancedEncoder:
     async def _advanced_encoding(self, content: str, context: Dict[str, Any]) -> EncodingResult:
         """Advanced encoding using ML models"""
         try:
+            # Load off the event loop on first use
+            embedding_model = await asyncio.to_thread(self.registry.get, "embedding")
+            semantic_pipeline = await asyncio.to_thread(self.registry.get, "semantic")
+            if embedding_model is None or semantic_pipeline is None:
+                return await self._fallback_encoding(content, context)
+
             # Semantic analysis
-            embeddings = self.embedding_model.encode([content])
-            emotional_profile = self.semantic_pipeline(content)
+            embeddings = embedding_model.encode([content])
+            emotional_profile = semantic_pipeline(content)
 
             # Generate visual anchors (simplified for now)
             visual_prompt = await self._generate_visual_prompt(content, emotional_profile)
@@ -421,6 +548,26 @@ class ReviewSchedule:
     consolidation_windows: Dict[str, timedelta]
 
 
+@dataclass
+class BatchReviewSchedule:
+    """Review schedules for many locations computed in one pass.
+
+    Rows follow the input order; columns follow the engine's REVIEW_INTERVALS.
+    Both are NumPy arrays, or lists of lists when NumPy is unavailable.
+    """
+
+    retention: Any  # predicted retention at each base interval
+    review_times: Any  # epoch seconds of each scheduled review
+
+    def __len__(self) -> int:
+        return len(self.review_times)
+
+    def schedule(self, index: int, count: Optional[int] = None) -> List[datetime]:
+        """Review datetimes for one location"""
+        times = self.review_times[index][:count]
+        return [datetime.fromtimestamp(float(t)) for t in times]
+
+
 class NeuroplasticityOptimizer:
     """
     Implements neuroscience-based optimization for memory consolidation
@@ -656,6 +803,18 @@ class AdaptiveNeuroplasticityEngine:
     Multi-factor forgetting curves with individual adaptation.
     """
 
+    # Base review intervals that optimize_review_schedule adjusts per location
+    REVIEW_INTERVALS = (
+        timedelta(minutes=10),  # Immediate review
+        timedelta(hours=1),  # Short-term review
+        timedelta(hours=8),  # Sleep consolidation
+        timedelta(days=1),  # Next day review
+        timedelta(days=3),  # Spaced review 1
+        timedelta(days=7),  # Spaced review 2
+        timedelta(days=14),  # Spaced review 3
+        timedelta(days=30),  # Long-term review
+    )
+
     def __init__(self):
         # Enhanced consolidation windows based on latest research
         self.consolidation_windows = {
@@ -784,20 +943,8 @@ class AdaptiveNeuroplasticityEngine:
         current_time = datetime.now()
         review_schedule = []
 
-        # Calculate review intervals to maintain target retention
-        intervals = [
-            timedelta(minutes=10),  # Immediate review
-            timedelta(hours=1),  # Short-term review
-            timedelta(hours=8),  # Sleep consolidation
-            timedelta(days=1),  # Next day review
-            timedelta(days=3),  # Spaced review 1
-            timedelta(days=7),  # Spaced review 2
-            timedelta(days=14),  # Spaced review 3
-            timedelta(days=30),  # Long-term review
-        ]
-
         # Adjust intervals based on predicted retention
-        for base_interval in intervals:
+        for base_interval in self.REVIEW_INTERVALS:
             predicted_retention = self.calculate_retention_probability(
                 location_data, base_interval, user_id
             )
@@ -821,6 +968,88 @@ class AdaptiveNeuroplasticityEngine:
 
         return review_schedule
 
+    @staticmethod
+    def history_decline(performance_history: Sequence[Any]) -> float:
+        """Accuracy drop across the last five reviews (the interference feature)"""
+        recent = performance_history[-5:]
+        if len(recent) < 2:
+            return 0.0
+        accuracies = [
+            p.get("accuracy", 0.5) if isinstance(p, dict) else p.accuracy for p in recent
+        ]
+        return accuracies[0] - accuracies[-1]
+
+    def optimize_review_schedules_batch(
+        self,
+        emotional_intensity: Sequence[float],
+        bizarreness_factor: Sequence[float],
+        difficulty_score: Sequence[float],
+        history_decline: Optional[Sequence[float]] = None,
+        user_id: str = "default_user",
+        target_retention: float = 0.85,
+        now: Optional[datetime] = None,
+    ) -> BatchReviewSchedule:
+        """
+        optimize_review_schedule for many locations in one pass.
+
+        Inputs are parallel per-location arrays (history_decline from
+        history_decline(), default 0). The retention model is evaluated for
+        every location at every REVIEW_INTERVALS offset at once; the
+        consolidation boost depends only on the offset, so it is computed
+        once per call rather than once per location.
+        """
+        profile = self.user_profiles.get(user_id) or self.calibrate_user_profile(user_id, [])
+        n = len(emotional_intensity)
+        if history_decline is None:
+            history_decline = [0.0] * n
+        start = (now or datetime.now()).timestamp()
+        base_seconds = [interval.total_seconds() for interval in self.REVIEW_INTERVALS]
+        boosts = [
+            self._calculate_consolidation_boost({}, interval, profile.consolidation_efficiency)
+            for interval in self.REVIEW_INTERVALS
+        ]
+        min_seconds, max_seconds = 300.0, 365 * 86400.0
+
+        if np is not None:
+            days = np.asarray(base_seconds) / 86400.0
+            emotion = (
+                profile.emotional_sensitivity
+                * (np.asarray(emotional_intensity, dtype=float) + np.asarray(bizarreness_factor, dtype=float))
+                / 20
+            )
+            penalty = -np.minimum(
+                0.3,
+                np.maximum(0, np.asarray(history_decline, dtype=float) * profile.interference_susceptibility * 0.3),
+            )
+            decay = (1.0 / profile.forgetting_rate) * (2.0 - np.asarray(difficulty_score, dtype=float))
+            with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+                base = profile.baseline_strength * np.exp(-days[None, :] / decay[:, None])
+                retention = base * (1 + emotion[:, None] + penalty[:, None] + np.asarray(boosts)[None, :])
+            retention = np.clip(np.nan_to_num(retention, nan=0.01), 0.01, 0.99)
+            adjusted = np.clip(
+                np.asarray(base_seconds)[None, :] * retention / target_retention, min_seconds, max_seconds
+            )
+            return BatchReviewSchedule(retention, start + np.cumsum(adjusted, axis=1))
+
+        retention_rows, time_rows = [], []
+        for emotional, bizarre, difficulty, decline in zip(
+            emotional_intensity, bizarreness_factor, difficulty_score, history_decline
+        ):
+            emotion = profile.emotional_sensitivity * (emotional + bizarre) / 20
+            penalty = -min(0.3, max(0, decline * profile.interference_susceptibility * 0.3))
+            decay = (1.0 / profile.forgetting_rate) * (2.0 - difficulty)
+            current = start
+            retention_row, time_row = [], []
+            for seconds, boost in zip(base_seconds, boosts):
+                base = profile.baseline_strength * math.exp(-(seconds / 86400.0) / decay)
+                retention = max(0.01, min(0.99, base * (1 + emotion + penalty + boost)))
+                current += max(min_seconds, min(seconds * retention / target_retention, max_seconds))
+                retention_row.append(retention)
+                time_row.append(current)
+            retention_rows.append(retention_row)
+            time_rows.append(time_row)
+        return BatchReviewSchedule(retention_rows, time_rows)
+
     def _estimate_baseline_strength(
         self, accuracies: List[float], difficulties: List[float]
     ) -> float:
@@ -1223,118 +1452,230 @@ class LearningCurveAnalyzer:
         return "Maintain current practice intensity - steady progress detected"
 
 
+# Order of AdvancedPerformanceAnalyzer._extract_session_features; persisted
+# models are only reused when this schema (and MODEL_VERSION) match
+SESSION_FEATURES = (
+    "duration_seconds", "total_items", "average_response_time", "items_attempted", "accuracy",
+    "history_avg_accuracy", "history_avg_response_time", "history_avg_difficulty",
+    "history_avg_interference", "history_best_accuracy", "history_best_response_time",
+    "time_of_day", "day_of_week", "session_number",
+)
+FEATURE_SCHEMA_HASH = hashlib.sha256(",".join(SESSION_FEATURES).encode()).hexdigest()[:16]
+
+
 class AdvancedPerformanceAnalyzer:
     """
     Real-time performance analysis with machine learning insights.
     Gracefully degrades to statistical analysis if ML libraries unavailable.
-    """
-
-    def __init__(self):
-        self.advanced_mode = False
-        self._init_ml_models()
-
-    def _init_ml_models(self):
-        """Initialize ML models with graceful fallback"""
-        try:
-            # Try to import advanced ML libraries
-            from sklearn.ensemble import IsolationForest, RandomForestRegressor  # type: ignore
-
-            # Initialize ML models
-            self.performance_model = RandomForestRegressor(n_estimators=100, random_state=42)
-            self.anomaly_detector = IsolationForest(contamination=0.1, random_state=42)
-            self.learning_curve_analyzer = LearningCurveAnalyzer()
 
-            # Initialize with sample data for immediate usability
-            self._train_initial_models()
-
-            self.advanced_mode = True
-            logger.info("Advanced ML performance analyzer initialized")
+    Trained models live in a versioned artifact (header with MODEL_VERSION
+    and FEATURE_SCHEMA_HASH, then the models and the real session samples)
+    that is loaded on the first analysis, not at construction. Without a
+    usable artifact a background worker bootstraps the models from synthetic
+    sessions, and it refits on the accumulated real sessions every
+    `retrain_every` analyses; until a model is ready, analyses are statistical.
+    """
 
-        except ImportError as e:
-            # Fallback to statistical analysis
-            self.advanced_mode = False
-            self.learning_curve_analyzer = LearningCurveAnalyzer()
+    MODEL_VERSION = 1
+    RETRAIN_EVERY = 25
+    MAX_SAMPLES = 5000
+    SYNTHETIC_SAMPLES = 1000
+    REAL_SAMPLE_WEIGHT = 5.0
+
+    def __init__(self, model_path: Optional[Path] = None, retrain_every: int = RETRAIN_EVERY):
+        self.model_path = Path(model_path) if model_path else DATA_DIR / "performance_analyzer.model"
+        self.retrain_every = retrain_every
+        self.learning_curve_analyzer = LearningCurveAnalyzer()
+        self.performance_model = None
+        self.anomaly_detector = None
+        self.trainings = 0
+
+        self._samples: List[Tuple[List[float], float]] = []
+        self._new_samples = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._trained = threading.Condition(self._lock)
+        self._retrain = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+        self.advanced_mode = np is not None and importlib.util.find_spec("sklearn") is not None
+        if not self.advanced_mode:
             logger.warning("Advanced ML libraries not available, using statistical analysis")
-            logger.debug(f"Import error details: {e}")
-
-    def _train_initial_models(self):
-        """Train models with synthetic data for initial functionality"""
-        try:
-            import importlib.util
-
-            if importlib.util.find_spec("numpy") is None:
-                raise ImportError
-
-            import numpy as np  # type: ignore
-
-            # Generate synthetic training data
-            np.random.seed(42)
-            n_samples = 1000
-
-            # Create realistic feature data
-            features = []
-            targets = []
-
-            for _ in range(n_samples):
-                # Simulate realistic session features
-                session_features = {
-                    "duration": np.random.uniform(60, 600),  # 1-10 minutes
-                    "total_items": np.random.randint(5, 50),
-                    "avg_response_time": np.random.uniform(1.5, 5.0),
-                    "difficulty_avg": np.random.uniform(0.5, 2.0),
-                    "interference_avg": np.random.uniform(0, 0.5),
-                    "bizarreness_avg": np.random.uniform(0, 10),
-                    "emotional_avg": np.random.uniform(0, 10),
-                    "session_number": np.random.randint(1, 100),
-                    "time_of_day": np.random.randint(0, 24),
-                    "day_of_week": np.random.randint(0, 7),
-                }
-
-                # Convert to feature vector
-                feature_vector = [
-                    session_features["duration"],
-                    session_features["total_items"],
-                    session_features["avg_response_time"],
-                    session_features["difficulty_avg"],
-                    session_features["interference_avg"],
-                    session_features["bizarreness_avg"],
-                    session_features["emotional_avg"],
-                    session_features["session_number"],
-                    session_features["time_of_day"],
-                    session_features["day_of_week"],
-                ]
 
-                # Generate realistic performance score
-                base_score = 0.6
-                score = base_score
-                score += (session_features["bizarreness_avg"] / 10) * 0.1  # Bizarreness boost
-                score += (session_features["emotional_avg"] / 10) * 0.05  # Emotional boost
-                score -= session_features["avg_response_time"] * 0.02  # Speed penalty
-                score -= session_features["difficulty_avg"] * 0.05  # Difficulty penalty
-                score += min(session_features["session_number"] / 50, 0.1)  # Experience bonus
+    def _new_models(self) -> Tuple[Any, Any]:
+        """Unfitted (performance model, anomaly detector)"""
+        from sklearn.ensemble import IsolationForest, RandomForestRegressor  # type: ignore
 
-                score = max(0.0, min(1.0, score))  # Clamp to valid range
+        return (
+            RandomForestRegressor(n_estimators=100, random_state=42),
+            IsolationForest(contamination=0.1, random_state=42),
+        )
 
-                features.append(feature_vector)
-                targets.append(score)
+    # ---------- artifact ----------
 
-            # Train the models
-            X = np.array(features)
-            y = np.array(targets)
+    def _ensure_models(self) -> bool:
+        """Load the artifact on first use; True if models are ready"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._loaded = True
+                    self._load_artifact()
+        return self.performance_model is not None
 
-            self.performance_model.fit(X, y)
-            self.anomaly_detector.fit(X)
+    def _load_artifact(self) -> None:
+        """Restore models and samples (caller holds _lock)"""
+        try:
+            with self.model_path.open("rb") as f:
+                header = pickle.load(f)
+                if header.get("version") != self.MODEL_VERSION or header.get("schema") != FEATURE_SCHEMA_HASH:
+                    logger.info(f"Performance model {self.model_path} is from another version; retraining")
+                    return
+                body = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:  # unpickling can raise almost anything across library versions
+            logger.warning(f"Ignoring unreadable performance model {self.model_path}: {e}")
+            return
+        self.performance_model = body["performance_model"]
+        self.anomaly_detector = body["anomaly_detector"]
+        self._samples = body["samples"] + self._samples
+        logger.info(f"Loaded performance model trained {header.get('trained_at')} on "
+                    f"{header.get('real_samples', 0)} real sessions")
+
+    def _save_artifact(self, performance_model: Any, anomaly_detector: Any,
+                       samples: List[Tuple[List[float], float]]) -> None:
+        header = {
+            "version": self.MODEL_VERSION,
+            "schema": FEATURE_SCHEMA_HASH,
+            "features": SESSION_FEATURES,
+            "trained_at": datetime.now().isoformat(),
+            "real_samples": len(samples),
+        }
+        body = {"performance_model": performance_model, "anomaly_detector": anomaly_detector,
+                "samples": samples}
+        self.model_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.model_path.with_suffix(self.model_path.suffix + ".tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(body, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.model_path)
+
+    # ---------- training ----------
+
+    def _schedule_training(self) -> None:
+        if not self.advanced_mode:
+            return
+        self._retrain.set()
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._training_loop, name="performance-model-trainer",
+                                            daemon=True)
+            self._worker.start()
 
-        except (ImportError, ValueError) as e:
-            logger.warning(f"Initial model training failed: {e}")
-            self.advanced_mode = False
+    def _training_loop(self) -> None:
+        while True:
+            self._retrain.wait()
+            self._retrain.clear()
+            try:
+                self._train()
+            except Exception as e:
+                logger.warning(f"Performance model training failed: {e}")
+
+    def _train(self) -> None:
+        """Fit fresh models on synthetic plus real sessions, swap them in and persist them"""
+        self._ensure_models()  # never overwrite samples that are only on disk
+        with self._lock:
+            samples = list(self._samples)
+            self._new_samples = 0
+        X, y = self._synthetic_sessions(self.SYNTHETIC_SAMPLES)
+        weights = np.ones(len(y))
+        if samples:
+            X = np.vstack([X, np.array([features for features, _ in samples], dtype=float)])
+            y = np.concatenate([y, [score for _, score in samples]])
+            weights = np.concatenate([weights, np.full(len(samples), self.REAL_SAMPLE_WEIGHT)])
+
+        performance_model, anomaly_detector = self._new_models()
+        performance_model.fit(X, y, sample_weight=weights)
+        anomaly_detector.fit(X, sample_weight=weights)
+        self._save_artifact(performance_model, anomaly_detector, samples)
+
+        with self._lock:
+            self.performance_model = performance_model
+            self.anomaly_detector = anomaly_detector
+            self.trainings += 1
+            self._trained.notify_all()
+        logger.info(f"Performance model retrained on {len(samples)} real sessions")
+
+    def wait_for_training(self, trainings: int = 1, timeout: Optional[float] = None) -> bool:
+        """Block until at least `trainings` fits have completed"""
+        with self._lock:
+            return self._trained.wait_for(lambda: self.trainings >= trainings, timeout)
+
+    def _synthetic_sessions(self, n_samples: int) -> Tuple[Any, Any]:
+        """Deterministic synthetic (X, y) in the SESSION_FEATURES layout"""
+        rng = np.random.default_rng(42)
+        total_items = rng.integers(5, 50, n_samples)
+        attempted = np.maximum(1, (total_items * rng.uniform(0.6, 1.0, n_samples)).astype(int))
+        accuracy = rng.uniform(0.3, 1.0, n_samples)
+        response_time = rng.uniform(1.5, 5.0, n_samples)
+        difficulty = rng.uniform(0.5, 2.0, n_samples)
+        interference = rng.uniform(0, 0.5, n_samples)
+        session_number = rng.integers(1, 100, n_samples)
+        X = np.column_stack([
+            rng.uniform(60, 600, n_samples),
+            total_items,
+            response_time,
+            attempted,
+            accuracy,
+            np.clip(accuracy + rng.normal(0, 0.1, n_samples), 0, 1),
+            response_time + rng.normal(0, 0.3, n_samples),
+            difficulty,
+            interference,
+            np.clip(accuracy + rng.uniform(0, 0.2, n_samples), 0, 1),
+            np.maximum(0.5, response_time - rng.uniform(0, 1, n_samples)),
+            rng.integers(0, 24, n_samples) / 24.0,
+            rng.integers(0, 7, n_samples) / 6.0,
+            session_number / 100.0,
+        ])
+        speed_factor = np.maximum(0, 1.0 - (response_time - 2.0) / 3.0)
+        y = accuracy * 0.7 + speed_factor * 0.3
+        y -= difficulty * 0.05 + interference * 0.1
+        y += np.minimum(session_number / 50, 0.1) * 0.5
+        return X, np.clip(y, 0.0, 1.0)
+
+    def record_session(self, session: RecallSession) -> None:
+        """Keep a real session as a training sample; (re)trains when there is no model
+        yet and every `retrain_every` sessions"""
+        features = self._extract_session_features(session)
+        if not all(isinstance(f, (int, float)) and math.isfinite(f) for f in features):
+            return
+        with self._lock:
+            self._samples.append((features, self._observed_score(session)))
+            del self._samples[:-self.MAX_SAMPLES]
+            self._new_samples += 1
+            due = self._new_samples >= self.retrain_every or self.performance_model is None
+        if due:
+            self._schedule_training()
+
+    @staticmethod
+    def _observed_score(session: RecallSession) -> float:
+        """Accuracy/speed score actually achieved in a session"""
+        if session.items_attempted <= 0:
+            return 0.0
+        accuracy = session.correct_recalls / session.items_attempted
+        # Adjust for speed and difficulty
+        speed_factor = max(0, 1.0 - (session.average_response_time - 2.0) / 3.0)  # Optimal ~2 seconds
+        return accuracy * 0.7 + speed_factor * 0.3
 
     async def analyze_recall_session(self, session: RecallSession) -> AnalysisResult:
         """
         Comprehensive analysis of recall performance with async support
         """
         try:
+            ready = False
             if self.advanced_mode:
+                ready = await asyncio.to_thread(self._ensure_models)
+                self.record_session(session)
+            if ready:
                 return await self._advanced_analysis(session)
             else:
                 return await self._statistical_analysis(session)
@@ -1386,15 +1727,7 @@ class AdvancedPerformanceAnalyzer:
         """Fallback statistical analysis without ML"""
 
         # Calculate basic performance score
-        if session.items_attempted > 0:
-            accuracy = session.correct_recalls / session.items_attempted
-            # Adjust for speed and difficulty
-            speed_factor = max(
-                0, 1.0 - (session.average_response_time - 2.0) / 3.0
-            )  # Optimal ~2 seconds
-            performance_score = accuracy * 0.7 + speed_factor * 0.3
-        else:
-            performance_score = 0.0
+        performance_score = self._observed_score(session)
 
         # Simple anomaly detection (basic statistical check)
         anomalies_detected = False
@@ -1528,7 +1861,7 @@ class AdvancedPerformanceAnalyzer:
 
     def _calculate_confidence_interval(self, features: List[float]) -> Tuple[float, float]:
         """Calculate confidence interval for performance prediction"""
-        if not self.advanced_mode:
+        if self.performance_model is None:
             # Simple statistical confidence interval
             base_prediction = sum(features[:5]) / 5 if features else 0.5  # Simple average
             margin = 0.1  # Fixed margin for statistical analysis
@@ -1737,127 +2070,265 @@ class NetworkXGraphAnalyzer:
             return list(communities.values())
 
 
-class TopologyOptimizer:
-    """Optimizes spatial topology for cognitive efficiency"""
-
-    def __init__(self):
-        self.max_iterations = 100
-        self.convergence_threshold = 0.001
-
-    def optimize(
-        self,
-        initial_layout: OptimalLayout,
-        objective_function: callable,
-        constraints: List[LayoutConstraint] = None,
-    ) -> OptimalLayout:
-        """
-        Optimize layout using simulated annealing-like approach
-        """
-        if constraints is None:
-            constraints = []
-
-        current_layout = initial_layout
-        current_score = objective_function(current_layout)
-        best_layout = current_layout
-        best_score = current_score
+class CognitiveLoadObjective:
+    """
+    Cognitive load score of a layout (higher is better). It depends on the
+    positions only through the total length of the connections, so
+    TopologyOptimizer scores a move from the moved node's edges alone.
+    """
 
-        temperature = 1.0
-        cooling_rate = 0.95
+    def __call__(self, layout: OptimalLayout) -> float:
+        total_path_length = 0.0
+        path_count = 0
+        for start_id in layout.connection_graph:
+            for end_id in layout.connection_graph[start_id]:
+                if start_id in layout.positions and end_id in layout.positions:
+                    total_path_length += math.dist(layout.positions[start_id], layout.positions[end_id])
+                    path_count += 1
+        return self.score(total_path_length, path_count)
 
-        for iteration in range(self.max_iterations):
-            # Generate neighbor solution
-            neighbor_layout = self._generate_neighbor(current_layout, constraints)
+    def score(self, total_path_length: float, path_count: int) -> float:
+        """Score from the summed length of `path_count` directed connections"""
+        score = 0.0
 
-            # Evaluate neighbor
-            neighbor_score = objective_function(neighbor_layout)
+        # Factor 1: Path efficiency (shorter total path lengths are better)
+        avg_path_length = total_path_length / max(1, path_count)
+        path_efficiency = 1.0 / (1.0 + avg_path_length / 10.0)  # Normalize to 0-1
+        score += path_efficiency * 0.4
 
-            # Accept better solutions
-            if neighbor_score > current_score:
-                current_layout = neighbor_layout
-                current_score = neighbor_score
+        # Factor 2: Clustering quality (similar items should be closer)
+        # This is simplified - in practice would use proper clustering metrics
+        clustering_score = 0.5  # Placeholder
+        score += clustering_score * 0.3
 
-                if current_score > best_score:
-                    best_layout = current_layout
-                    best_score = current_score
-            else:
-                # Accept worse solutions with probability based on temperature
-                acceptance_prob = math.exp((neighbor_score - current_score) / temperature)
-                if random.random() < acceptance_prob:
-                    current_layout = neighbor_layout
-                    current_score = neighbor_score
+        # Factor 3: Accessibility (nodes should be easily reachable)
+        accessibility_score = 0.5  # Placeholder based on graph connectivity
+        score += accessibility_score * 0.3
 
-            # Cool down
-            temperature *= cooling_rate
+        return score
 
-            # Check convergence
-            if temperature < self.convergence_threshold:
-                break
 
-        best_layout.cognitive_load_score = best_score
-        return best_layout
+# Temperature at progress p in [0, 1], cooling from t0 to t1
+COOLING_SCHEDULES: Dict[str, Callable[[float, float, float], float]] = {
+    "geometric": lambda t0, t1, p: t0 * (t1 / t0) ** p,
+    "linear": lambda t0, t1, p: t0 + (t1 - t0) * p,
+}
 
-    def _generate_neighbor(
-        self, layout: OptimalLayout, constraints: List[LayoutConstraint]
-    ) -> OptimalLayout:
-        """Generate a neighboring layout solution"""
-        new_positions = layout.positions.copy()
 
-        # Randomly move a few nodes
-        nodes_to_move = random.sample(list(new_positions.keys()), min(3, len(new_positions)))
+class TopologyOptimizer:
+    """
+    Optimizes spatial topology for cognitive efficiency by simulated
+    annealing over single-node moves.
+
+    A CognitiveLoadObjective is scored incrementally: each node keeps the
+    summed length of its connections, so a move costs O(degree). Minimum
+    distance checks use a UniformGrid. Any other objective is re-evaluated
+    on a layout updated in place. Each of `restarts` rounds starts from the
+    best layout so far and cools over `max_iterations` moves (default 50
+    per node, at most DEFAULT_MAX_MOVES) or its share of `time_budget`
+    seconds, whichever ends first.
+    """
 
-        for node_id in nodes_to_move:
-            current_pos = new_positions[node_id]
+    MOVES_PER_NODE = 50
+    DEFAULT_MAX_MOVES = 20_000
 
-            # Generate small random movement
-            delta_x = random.uniform(-2.0, 2.0)
-            delta_y = random.uniform(-2.0, 2.0)
-            delta_z = random.uniform(-1.0, 1.0)
+    def __init__(
+        self,
+        max_iterations: Optional[int] = None,
+        restarts: int = 1,
+        cooling: str = "geometric",
+        initial_temperature: Optional[float] = None,
+        time_budget: Optional[float] = None,
+        step_size: Position3D = (2.0, 2.0, 1.0),
+        seed: Optional[int] = None,
+    ):
+        if cooling not in COOLING_SCHEDULES:
+            raise ValueError(f"Unknown cooling schedule {cooling!r}; choose from {sorted(COOLING_SCHEDULES)}")
+        self.max_iterations = max_iterations
+        self.convergence_threshold = 0.001  # final temperature, relative to the initial one
+        self.restarts = max(1, restarts)
+        self.cooling = cooling
+        self.initial_temperature = initial_temperature
+        self.time_budget = time_budget
+        self.step_size = step_size
+        self.rng = random.Random(seed)
+        self.moves_run = 0
 
-            new_pos = (current_pos[0] + delta_x, current_pos[1] + delta_y, current_pos[2] + delta_z)
+    def optimize(
+        self,
+        initial_layout: OptimalLayout,
+        objective_function: callable,
+        constraints: List[LayoutConstraint] = None,
+    ) -> OptimalLayout:
+        """
+        Optimize layout using simulated annealing
+        """
+        if constraints is None:
+            constraints = []
+        started = time.perf_counter()
+        rng = self.rng
+        schedule = COOLING_SCHEDULES[self.cooling]
+        incremental = isinstance(objective_function, CognitiveLoadObjective)
+
+        ids = list(initial_layout.positions)
+        n = len(ids)
+        index = {node_id: i for i, node_id in enumerate(ids)}
+        pos = [tuple(p) for p in initial_layout.positions.values()]
+        working = OptimalLayout(
+            positions=dict(initial_layout.positions),
+            connection_graph=initial_layout.connection_graph,
+            cognitive_load_score=0.0,
+            recommended_paths=initial_layout.recommended_paths,
+        )
+        self.moves_run = 0
+        if n == 0:
+            working.cognitive_load_score = objective_function(working)
+            return working
 
-            # Apply constraints
-            new_pos = self._apply_constraints(new_pos, node_id, new_positions, constraints)
-            new_positions[node_id] = new_pos
+        # Directed connections as incidence lists (both ends see every edge)
+        incident: List[List[int]] = [[] for _ in range(n)]
+        path_count = 0
+        for start_id, ends in initial_layout.connection_graph.items():
+            u = index.get(start_id)
+            if u is None:
+                continue
+            for end_id in ends:
+                v = index.get(end_id)
+                if v is not None:
+                    path_count += 1
+                    if u != v:
+                        incident[u].append(v)
+                        incident[v].append(u)
 
-        return OptimalLayout(
-            positions=new_positions,
-            connection_graph=layout.connection_graph,
-            cognitive_load_score=0.0,  # Will be calculated by objective function
-            recommended_paths=layout.recommended_paths,
+        min_distance = max(
+            (c.min_distance for c in constraints if isinstance(c, MinimumDistanceConstraint)), default=0.0
         )
+        grid = None
+        node_length: List[float] = []
+        total = 0.0
+
+        def reset(positions: List[Position3D]) -> float:
+            """Rebuild every cache for `positions`; returns the score"""
+            nonlocal grid, node_length, total
+            pos[:] = positions
+            working.positions = dict(zip(ids, pos))
+            if min_distance > 0:
+                grid = UniformGrid(min_distance)
+                for i, p in enumerate(pos):
+                    grid.insert(i, p)
+            if incremental:
+                node_length = [sum(math.dist(pos[u], pos[v]) for v in incident[u]) for u in range(n)]
+                total = sum(node_length) / 2  # each connection is counted at both ends
+                return objective_function.score(total, path_count)
+            return objective_function(working)
+
+        def propose() -> Tuple[int, Position3D, float, float]:
+            """Random constrained move: (node, new position, new score, new node length)"""
+            u = rng.randrange(n)
+            x, y, z = pos[u]
+            sx, sy, sz = self.step_size
+            new = self._apply_constraints(
+                (x + rng.uniform(-sx, sx), y + rng.uniform(-sy, sy), z + rng.uniform(-sz, sz)),
+                u, pos, constraints, grid,
+            )
+            if incremental:
+                length = sum(math.dist(new, pos[v]) for v in incident[u])
+                return u, new, objective_function.score(total + length - node_length[u], path_count), length
+            working.positions[ids[u]] = new
+            new_score = objective_function(working)
+            working.positions[ids[u]] = pos[u]
+            return u, new, new_score, 0.0
+
+        score = reset(list(pos))
+        best_score, best_pos = score, None  # best_pos None: the current layout is the best
+
+        t0 = self.initial_temperature
+        if t0 is None:
+            # Calibrate so that an average worsening move is accepted half the time
+            worse = [score - propose()[2] for _ in range(min(32, 4 * n))]
+            worse = [d for d in worse if d > 0]
+            t0 = (sum(worse) / len(worse)) / math.log(2) if worse else 1.0
+        t1 = t0 * self.convergence_threshold
+        moves_per_round = self.max_iterations
+        if moves_per_round is None:
+            moves_per_round = min(self.MOVES_PER_NODE * n, self.DEFAULT_MAX_MOVES)
+
+        for round_number in range(self.restarts):
+            if round_number and best_pos is not None:
+                # Restart (reheated) from the best layout so far
+                score, best_pos = reset(best_pos), None
+            budget = None
+            if self.time_budget is not None:
+                remaining = self.time_budget - (time.perf_counter() - started)
+                if remaining <= 0:
+                    break
+                budget = remaining / (self.restarts - round_number)
+            round_start = time.perf_counter()
+            move = 0
+            while move < moves_per_round:
+                if move % 64 == 0:
+                    progress = move / moves_per_round
+                    if budget is not None:
+                        progress = max(progress, (time.perf_counter() - round_start) / budget)
+                    if progress >= 1.0:
+                        break
+                    temperature = schedule(t0, t1, progress)
+                move += 1
+
+                u, new, new_score, length = propose()
+                if new_score < score and rng.random() >= math.exp((new_score - score) / temperature):
+                    continue
+                if best_pos is None and new_score < best_score:
+                    best_pos = list(pos)  # leaving the best layout: keep a copy
+                old = pos[u]
+                if incremental:
+                    for v in incident[u]:
+                        node_length[v] += math.dist(new, pos[v]) - math.dist(old, pos[v])
+                    total += length - node_length[u]
+                    node_length[u] = length
+                pos[u] = new
+                working.positions[ids[u]] = new
+                if grid is not None:
+                    grid.move(u, new)
+                score = new_score
+                if score > best_score:
+                    best_score, best_pos = score, None
+            self.moves_run += move
+
+        if best_pos is not None:
+            reset(best_pos)
+        working.cognitive_load_score = best_score
+        return working
 
     def _apply_constraints(
         self,
         position: Tuple[float, float, float],
-        node_id: str,
-        all_positions: Dict[str, Tuple[float, float, float]],
+        node: int,
+        positions: List[Position3D],
         constraints: List[LayoutConstraint],
+        grid: Optional[UniformGrid] = None,
     ) -> Tuple[float, float, float]:
-        """Apply layout constraints to position"""
+        """Apply layout constraints to a moved node's position"""
         x, y, z = position
 
         for constraint in constraints:
             if isinstance(constraint, MinimumDistanceConstraint):
-                # Ensure minimum distance from other nodes
-                for other_id, other_pos in all_positions.items():
-                    if other_id != node_id:
-                        distance = math.sqrt(
-                            (x - other_pos[0]) ** 2
-                            + (y - other_pos[1]) ** 2
-                            + (z - other_pos[2]) ** 2
-                        )
-                        if distance < constraint.min_distance:
-                            # Push away from other node
-                            dx = x - other_pos[0]
-                            dy = y - other_pos[1]
-                            dz = z - other_pos[2]
-
-                            if distance > 0:
-                                # Normalize and scale
-                                scale = constraint.min_distance / distance
-                                x = other_pos[0] + dx * scale
-                                y = other_pos[1] + dy * scale
-                                z = other_pos[2] + dz * scale
+                # Ensure minimum distance from nearby nodes (grid cells around the position)
+                others = grid.nearby((x, y, z)) if grid is not None else range(len(positions))
+                for other in sorted(others):
+                    if other == node:
+                        continue
+                    other_pos = positions[other]
+                    dx = x - other_pos[0]
+                    dy = y - other_pos[1]
+                    dz = z - other_pos[2]
+                    distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+                    if 0 < distance < constraint.min_distance:
+                        # Push away from other node
+                        scale = constraint.min_distance / distance
+                        x = other_pos[0] + dx * scale
+                        y = other_pos[1] + dy * scale
+                        z = other_pos[2] + dz * scale
 
             elif isinstance(constraint, PathLengthConstraint):
                 # Ensure position doesn't create excessively long paths
@@ -1889,63 +2360,215 @@ class AStarPathFinder:
         """Find optimal path using A* algorithm"""
         if start not in graph.nodes or goal not in graph.nodes:
             return []
+        return self.router(graph, positions).shortest_path(start, goal)
+
+    def router(self, graph: ContentGraph, positions: Dict[str, Tuple[float, float, float]]) -> PalaceRouter:
+        """Router over the graph's connections, for many queries on one layout"""
+        return PalaceRouter(
+            {node_id: node.connections for node_id, node in graph.nodes.items()},
+            positions,
+            heuristic_weight=self.heuristic_weight,
+        )
 
-        frontier = []
-        import heapq
-
-        heapq.heappush(frontier, (0, start))
 
-        came_from = {start: None}
-        cost_so_far = {start: 0}
+class ForceDirectedLayout:
+    """
+    Fruchterman-Reingold style 3-D layout. Repulsion is approximated with a
+    Barnes-Hut octree (O(n log n) per iteration), attraction runs over a
+    sparse edge list, and the run stops once no node moves more than
+    `tolerance`. Positions are NumPy arrays (pure-Python O(n²) fallback).
+    """
 
-        while frontier:
-            current_cost, current = heapq.heappop(frontier)
+    OCTREE_DEPTH = 10  # Morton key bits per axis
 
-            if current == goal:
+    def __init__(
+        self,
+        theta: float = 0.7,
+        max_iterations: int = 100,
+        tolerance: float = 1e-2,
+        initial_temperature: float = 10.0,
+        cooling: float = 0.9,
+        bounds: Tuple[Position3D, Position3D] = ((-50.0, -50.0, 0.0), (50.0, 50.0, 10.0)),
+    ):
+        self.theta = theta
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+        self.initial_temperature = initial_temperature
+        self.cooling = cooling
+        self.bounds = bounds
+        self.iterations_run = 0
+
+    def run(
+        self,
+        positions: Sequence[Position3D],
+        edges: Tuple[Sequence[int], Sequence[int], Sequence[float]],
+        k: float,
+    ) -> List[Position3D]:
+        """
+        Lay out nodes from their starting positions. `edges` is (i, j, weight)
+        as three parallel sequences, each undirected pair listed once; `k` is
+        the ideal node spacing.
+        """
+        if np is None:
+            return self._run_python([tuple(p) for p in positions], edges, k)
+
+        pos = np.array(positions, dtype=float).reshape(-1, 3)
+        rows = np.asarray(edges[0], dtype=np.int64)
+        cols = np.asarray(edges[1], dtype=np.int64)
+        weights = np.asarray(edges[2], dtype=float) / k
+        low, high = np.asarray(self.bounds[0], dtype=float), np.asarray(self.bounds[1], dtype=float)
+        n = len(pos)
+        temperature = self.initial_temperature
+
+        self.iterations_run = 0
+        for _ in range(self.max_iterations):
+            self.iterations_run += 1
+            force = self.repulsion(pos, k)
+            # Attraction along each edge: weight / k * (p_j - p_i)
+            pull = weights[:, None] * (pos[cols] - pos[rows])
+            for axis in range(3):
+                force[:, axis] += np.bincount(rows, pull[:, axis], minlength=n)
+                force[:, axis] -= np.bincount(cols, pull[:, axis], minlength=n)
+
+            magnitude = np.sqrt((force * force).sum(axis=1))
+            step = np.minimum(magnitude, temperature)
+            moved = np.clip(pos + force * (step / np.maximum(magnitude, 1e-12))[:, None], low, high)
+            largest = float(np.abs(moved - pos).max()) if n else 0.0
+            pos = moved
+            temperature *= self.cooling
+            if largest < self.tolerance:
+                break
+        return [tuple(p) for p in pos.tolist()]
+
+    def repulsion(self, positions, k: float):
+        """Repulsive force k² · m · d / |d|² on every node (theta=0 is exact)"""
+        n = len(positions)
+        force = np.zeros((n, 3))
+        if n < 2:
+            return force
+        if self.theta <= 0 or n <= 256:
+            d = positions[:, None, :] - positions[None, :, :]
+            dist2 = (d * d).sum(axis=2)
+            np.fill_diagonal(dist2, np.inf)
+            return k * k * (d / np.maximum(dist2, 1e-12)[:, :, None]).sum(axis=1)
+
+        com, mass, size2, key, shift, first_child, n_children, codes = self._build_octree(positions)
+        theta2 = self.theta * self.theta
+        points = np.arange(n)
+        cells = np.zeros(n, dtype=np.int64)
+        while points.size:
+            d = positions[points] - com[cells]
+            dist2 = (d * d).sum(axis=1)
+            own = (codes[points] >> shift[cells]) == key[cells]
+            accept = (n_children[cells] == 0) | (~own & (size2[cells] < theta2 * dist2))
+
+            # Accepted cells act as point masses at their center of mass; a
+            # leaf cell holding the node itself counts only the other points
+            m = mass[cells[accept]].astype(float)
+            da, dist2a, owna = d[accept], dist2[accept], own[accept]
+            if owna.any():
+                others = m[owna] - 1
+                scale = np.where(others > 0, m[owna] / np.maximum(others, 1), 0.0)
+                da[owna] *= scale[:, None]
+                dist2a[owna] *= scale * scale
+                m[owna] = others
+            push = (k * k * m / np.maximum(dist2a, 1e-12))[:, None] * da
+            hit = points[accept]
+            for axis in range(3):
+                force[:, axis] += np.bincount(hit, push[:, axis], minlength=n)
+
+            # Open the rest: pair each node with every child of its cell
+            points, cells = points[~accept], cells[~accept]
+            counts = n_children[cells]
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            points = np.repeat(points, counts)
+            cells = np.repeat(first_child[cells], counts) + offsets
+        return force
+
+    def _build_octree(self, positions):
+        """Linear octree over Morton-sorted points: per-cell center of mass,
+        mass, squared size, key, key shift and child range"""
+        bits = self.OCTREE_DEPTH
+        side = 1 << bits
+        n = len(positions)
+        low = positions.min(axis=0)
+        span = max(float((positions.max(axis=0) - low).max()), 1e-9)
+        grid = np.minimum(((positions - low) / span * side).astype(np.int64), side - 1)
+        codes = np.zeros(n, dtype=np.int64)
+        for b in range(bits):
+            for axis in range(3):
+                codes |= ((grid[:, axis] >> b) & 1) << (3 * b + 2 - axis)
+
+        order = np.argsort(codes, kind="stable")
+        sorted_codes, sorted_pos = codes[order], positions[order]
+        levels = []
+        for level in range(bits + 1):
+            shift = 3 * (bits - level)
+            prefix = sorted_codes >> shift
+            starts = np.concatenate(([0], np.flatnonzero(np.diff(prefix)) + 1))
+            counts = np.diff(np.append(starts, n))
+            com = np.add.reduceat(sorted_pos, starts) / counts[:, None]
+            levels.append((starts, counts, com, prefix[starts], shift, (span / (1 << level)) ** 2))
+            if counts.max() == 1:
                 break
 
-            for neighbor in graph.nodes[current].connections:
-                # Calculate movement cost (distance)
-                if current in positions and neighbor in positions:
-                    distance = math.sqrt(
-                        (positions[current][0] - positions[neighbor][0]) ** 2
-                        + (positions[current][1] - positions[neighbor][1]) ** 2
-                        + (positions[current][2] - positions[neighbor][2]) ** 2
-                    )
-                else:
-                    distance = 1.0  # Default distance
-
-                new_cost = cost_so_far[current] + distance
-
-                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
-                    cost_so_far[neighbor] = new_cost
-
-                    # A* priority: cost_so_far + heuristic
-                    if goal in positions and neighbor in positions:
-                        heuristic = math.sqrt(
-                            (positions[neighbor][0] - positions[goal][0]) ** 2
-                            + (positions[neighbor][1] - positions[goal][1]) ** 2
-                            + (positions[neighbor][2] - positions[goal][2]) ** 2
-                        )
-                    else:
-                        heuristic = 0
-
-                    priority = new_cost + self.heuristic_weight * heuristic
-                    heapq.heappush(frontier, (priority, neighbor))
-                    came_from[neighbor] = current
-
-        # Reconstruct path
-        if goal not in came_from:
-            return []
-
-        path = []
-        current = goal
-        while current is not None:
-            path.append(current)
-            current = came_from[current]
-        path.reverse()
+        offsets = np.cumsum([0] + [len(lvl[0]) for lvl in levels])
+        first_child, n_children = [], []
+        for depth, (starts, counts, *_rest) in enumerate(levels):
+            if depth + 1 == len(levels):
+                first_child.append(np.zeros(len(starts), dtype=np.int64))
+                n_children.append(np.zeros(len(starts), dtype=np.int64))
+                continue
+            child_starts = levels[depth + 1][0]
+            first = np.searchsorted(child_starts, starts)
+            last = np.searchsorted(child_starts, starts + counts)
+            first_child.append(first + offsets[depth + 1])
+            n_children.append(np.where(counts > 1, last - first, 0))
+
+        return (
+            np.concatenate([lvl[2] for lvl in levels]),
+            np.concatenate([lvl[1] for lvl in levels]),
+            np.concatenate([np.full(len(lvl[0]), lvl[5]) for lvl in levels]),
+            np.concatenate([lvl[3] for lvl in levels]),
+            np.concatenate([np.full(len(lvl[0]), lvl[4], dtype=np.int64) for lvl in levels]),
+            np.concatenate(first_child),
+            np.concatenate(n_children),
+            codes,
+        )
 
-        return path
+    def _run_python(self, positions: List[Position3D], edges, k: float) -> List[Position3D]:
+        """Pure-Python fallback with exact O(n²) repulsion"""
+        n = len(positions)
+        low, high = self.bounds
+        temperature = self.initial_temperature
+        self.iterations_run = 0
+        for _ in range(self.max_iterations):
+            self.iterations_run += 1
+            forces = [[0.0, 0.0, 0.0] for _ in range(n)]
+            for i in range(n):
+                for j in range(i + 1, n):
+                    d = [positions[i][a] - positions[j][a] for a in range(3)]
+                    dist2 = max(d[0] * d[0] + d[1] * d[1] + d[2] * d[2], 1e-12)
+                    for a in range(3):
+                        forces[i][a] += k * k * d[a] / dist2
+                        forces[j][a] -= k * k * d[a] / dist2
+            for i, j, weight in zip(*edges):
+                for a in range(3):
+                    pull = weight / k * (positions[j][a] - positions[i][a])
+                    forces[i][a] += pull
+                    forces[j][a] -= pull
+
+            largest = 0.0
+            for i, force in enumerate(forces):
+                magnitude = math.sqrt(sum(f * f for f in force))
+                scale = min(magnitude, temperature) / max(magnitude, 1e-12)
+                moved = tuple(max(low[a], min(high[a], positions[i][a] + force[a] * scale)) for a in range(3))
+                largest = max(largest, max(abs(moved[a] - positions[i][a]) for a in range(3)))
+                positions[i] = moved
+            temperature *= self.cooling
+            if largest < self.tolerance:
+                break
+        return positions
 
 
 # ============================================================================
@@ -2147,25 +2770,31 @@ class SpatialIntelligenceEngine:
     Uses graph theory and optimization algorithms.
     """
 
+    # seconds of annealing per optimize_palace_topology call
+    TOPOLOGY_TIME_BUDGET = 0.5
+
     def __init__(self):
         self.graph_analyzer = NetworkXGraphAnalyzer()
-        self.topology_optimizer = TopologyOptimizer()
+        self.topology_optimizer = TopologyOptimizer(time_budget=self.TOPOLOGY_TIME_BUDGET)
         self.path_finder = AStarPathFinder()
+        self.layout_engine = ForceDirectedLayout()
+        self.vocabulary = TokenVocabulary()
+        self.cognitive_objective = CognitiveLoadObjective()
 
     def optimize_palace_topology(self, content_graph: ContentGraph) -> OptimalLayout:
         """
         Use graph theory to optimize spatial relationships for memory efficiency
         """
-        # Analyze content relationships using semantic similarity
-        similarity_matrix = self._compute_semantic_similarities(content_graph.nodes)
+        # Analyze content relationships using semantic similarity (sparse edges)
+        similarity_edges = self._similarity_edges(content_graph.nodes)
 
         # Apply force-directed graph layout
-        initial_layout = self._force_directed_layout(content_graph, similarity_matrix)
+        initial_layout = self._force_directed_layout(content_graph, similarity_edges)
 
         # Optimize for cognitive load and recall efficiency
         optimized_layout = self.topology_optimizer.optimize(
             initial_layout,
-            objective_function=self._cognitive_load_objective,
+            objective_function=self.cognitive_objective,
             constraints=[
                 MinimumDistanceConstraint(2.0),
                 PathLengthConstraint(max_length=20),
@@ -2178,22 +2807,45 @@ class SpatialIntelligenceEngine:
 
         return optimized_layout
 
-    def _compute_semantic_similarities(self, nodes: Dict[str, ContentNode]) -> List[List[float]]:
-        """Compute semantic similarity matrix between content nodes"""
-        n = len(nodes)
-        similarity_matrix = [[0.0] * n for _ in range(n)]
-
+    def _similarity_edges(
+        self, nodes: Dict[str, ContentNode], threshold: float = 0.3, max_neighbors: int = 16
+    ) -> Tuple[List[int], List[int], List[float]]:
+        """
+        Attraction edges (i, j, similarity) between nodes more similar than
+        `threshold`, keeping each node's `max_neighbors` strongest; i < j and
+        each pair appears once. Scores match _calculate_semantic_similarity;
+        past a thousand nodes only LSH candidates and same-category nodes of
+        nearby difficulty are scored (SimilarityIndex).
+        """
         node_list = list(nodes.values())
+        n = len(node_list)
+        dims = {len(node.semantic_embedding) for node in node_list if node.semantic_embedding}
+        if np is None or len(dims) > 1:
+            scored = []
+            for i in range(n):
+                row = [(self._calculate_semantic_similarity(node_list[i], node_list[j]), j) for j in range(n) if j != i]
+                scored.extend((i, j, s) for s, j in heapq.nlargest(max_neighbors, row) if s > threshold)
+            pairs = {(min(i, j), max(i, j)): s for i, j, s in scored}
+            keys = sorted(pairs)
+            return [i for i, _ in keys], [j for _, j in keys], [pairs[key] for key in keys]
+
+        index = SimilarityIndex(vocabulary=self.vocabulary).build(
+            [node.content for node in node_list], [node.semantic_embedding for node in node_list]
+        )
+        categories: Dict[str, int] = {}
+        category = np.array([categories.setdefault(node.category, len(categories)) for node in node_list])
+        difficulty = np.array([node.difficulty for node in node_list], dtype=float)
+
+        def score(rows, cols, text):
+            return (
+                np.where(category[rows] == category[cols], 0.8, 0.2) * 0.4
+                + text * 0.4
+                + (1.0 - np.abs(difficulty[rows] - difficulty[cols]) / 2.0) * 0.2
+            )
 
-        for i in range(n):
-            for j in range(n):
-                if i == j:
-                    similarity_matrix[i][j] = 1.0
-                else:
-                    similarity = self._calculate_semantic_similarity(node_list[i], node_list[j])
-                    similarity_matrix[i][j] = similarity
-
-        return similarity_matrix
+        # Text-blind candidates: same category, closest difficulty
+        nearby = window_pairs(np.lexsort((difficulty, category)), category, 4 * max_neighbors)
+        return index.neighbor_graph(max_neighbors, threshold, score=score, extra_pairs=nearby)
 
     def _calculate_semantic_similarity(self, node1: ContentNode, node2: ContentNode) -> float:
         """Calculate semantic similarity between two content nodes"""
@@ -2220,16 +2872,8 @@ class SpatialIntelligenceEngine:
         else:
             category_sim = 0.2
 
-        # Simple text similarity based on word overlap
-        words1 = set(node1.content.lower().split())
-        words2 = set(node2.content.lower().split())
-
-        if not words1 or not words2:
-            text_sim = 0.0
-        else:
-            intersection = words1.intersection(words2)
-            union = words1.union(words2)
-            text_sim = len(intersection) / len(union) if union else 0.0
+        # Simple text similarity based on word overlap (token ids cached per text)
+        text_sim = jaccard_ids(self.vocabulary.encode(node1.content), self.vocabulary.encode(node2.content))
 
         # Difficulty similarity
         difficulty_sim = (
@@ -2239,108 +2883,21 @@ class SpatialIntelligenceEngine:
         return category_sim * 0.4 + text_sim * 0.4 + difficulty_sim * 0.2
 
     def _force_directed_layout(
-        self, content_graph: ContentGraph, similarity_matrix: List[List[float]]
+        self,
+        content_graph: ContentGraph,
+        similarity_edges: Tuple[Sequence[int], Sequence[int], Sequence[float]],
     ) -> OptimalLayout:
         """Apply force-directed layout algorithm"""
         nodes = list(content_graph.nodes.keys())
         n = len(nodes)
 
-        # Initialize random positions
-        positions = {}
-        for i, node_id in enumerate(nodes):
-            # Arrange in a rough circle initially
-            angle = 2 * math.pi * i / n
-            radius = 10.0
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
-            z = random.uniform(0, 5)  # Some height variation
-            positions[node_id] = (x, y, z)
-
-        # Force-directed algorithm
-        iterations = 50
-        k = math.sqrt(100 * 100 / n)  # Optimal distance
-
-        for _ in range(iterations):
-            # Calculate repulsive forces (between all pairs)
-            forces = {node_id: [0.0, 0.0, 0.0] for node_id in nodes}
-
-            for i in range(n):
-                for j in range(i + 1, n):
-                    node1, node2 = nodes[i], nodes[j]
-                    pos1, pos2 = positions[node1], positions[node2]
-
-                    # Euclidean distance
-                    dx = pos1[0] - pos2[0]
-                    dy = pos1[1] - pos2[1]
-                    dz = pos1[2] - pos2[2]
-                    distance = math.sqrt(dx * dx + dy * dy + dz * dz)
-
-                    if distance > 0:
-                        # Repulsive force (inverse square law)
-                        force = k * k / distance
-                        fx = force * dx / distance
-                        fy = force * dy / distance
-                        fz = force * dz / distance
-
-                        forces[node1][0] += fx
-                        forces[node1][1] += fy
-                        forces[node1][2] += fz
-                        forces[node2][0] -= fx
-                        forces[node2][1] -= fy
-                        forces[node2][2] -= fz
-
-            # Calculate attractive forces (based on similarity)
-            for i in range(n):
-                for j in range(i + 1, n):
-                    node1, node2 = nodes[i], nodes[j]
-                    similarity = similarity_matrix[i][j]
-
-                    if similarity > 0.3:  # Only attract similar items
-                        pos1, pos2 = positions[node1], positions[node2]
-
-                        dx = pos2[0] - pos1[0]
-                        dy = pos2[1] - pos1[1]
-                        dz = pos2[2] - pos1[2]
-                        distance = math.sqrt(dx * dx + dy * dy + dz * dz)
-
-                        if distance > 0:
-                            # Attractive force proportional to similarity
-                            force = similarity * distance / k
-                            fx = force * dx / distance
-                            fy = force * dy / distance
-                            fz = force * dz / distance
-
-                            forces[node1][0] += fx
-                            forces[node1][1] += fy
-                            forces[node1][2] += fz
-                            forces[node2][0] -= fx
-                            forces[node2][1] -= fy
-                            forces[node2][2] -= fz
-
-            # Apply forces and update positions
-            for node_id in nodes:
-                fx, fy, fz = forces[node_id]
-                x, y, z = positions[node_id]
-
-                # Apply damping and maximum force
-                max_force = 1.0
-                force_magnitude = math.sqrt(fx * fx + fy * fy + fz * fz)
-                if force_magnitude > max_force:
-                    fx *= max_force / force_magnitude
-                    fy *= max_force / force_magnitude
-                    fz *= max_force / force_magnitude
-
-                # Update position
-                x += fx * 0.1  # Small time step
-                y += fy * 0.1
-                z += fz * 0.1
-
-                # Keep within bounds
-                x = max(-50, min(50, x))
-                y = max(-50, min(50, y))
-                z = max(0, min(10, z))
-
-                positions[node_id] = (x, y, z)
+        # Initialize positions: a rough circle with some height variation
+        start = [
+            (10.0 * math.cos(2 * math.pi * i / n), 10.0 * math.sin(2 * math.pi * i / n), random.uniform(0, 5))
+            for i in range(n)
+        ]
+        k = math.sqrt(100 * 100 / max(n, 1))  # Optimal distance
+        positions = dict(zip(nodes, self.layout_engine.run(start, similarity_edges, k)))
 
         # Create connection graph
         connection_graph = {}
@@ -2356,39 +2913,7 @@ class SpatialIntelligenceEngine:
 
     def _cognitive_load_objective(self, layout: OptimalLayout) -> float:
         """Calculate cognitive load score for layout evaluation"""
-        score = 0.0
-
-        # Factor 1: Path efficiency (shorter total path lengths are better)
-        total_path_length = 0.0
-        path_count = 0
-
-        for start_id in layout.connection_graph:
-            for end_id in layout.connection_graph[start_id]:
-                if start_id in layout.positions and end_id in layout.positions:
-                    pos1 = layout.positions[start_id]
-                    pos2 = layout.positions[end_id]
-                    distance = math.sqrt(
-                        (pos1[0] - pos2[0]) ** 2
-                        + (pos1[1] - pos2[1]) ** 2
-                        + (pos1[2] - pos2[2]) ** 2
-                    )
-                    total_path_length += distance
-                    path_count += 1
-
-        avg_path_length = total_path_length / max(1, path_count)
-        path_efficiency = 1.0 / (1.0 + avg_path_length / 10.0)  # Normalize to 0-1
-        score += path_efficiency * 0.4
-
-        # Factor 2: Clustering quality (similar items should be closer)
-        # This is simplified - in practice would use proper clustering metrics
-        clustering_score = 0.5  # Placeholder
-        score += clustering_score * 0.3
-
-        # Factor 3: Accessibility (nodes should be easily reachable)
-        accessibility_score = 0.5  # Placeholder based on graph connectivity
-        score += accessibility_score * 0.3
-
-        return score
+        return self.cognitive_objective(layout)
 
     def _generate_optimal_paths(self, layout: OptimalLayout) -> List[List[str]]:
         """Generate recommended navigation paths through the palace"""
@@ -2398,16 +2923,24 @@ class SpatialIntelligenceEngine:
         if len(nodes) < 2:
             return paths
 
-        # Find central nodes (high connectivity)
-        centrality = self.graph_analyzer.analyze_centrality(
-            ContentGraph(
-                nodes={
-                    nid: ContentNode(id=nid, content="", category="", difficulty=1.0)
-                    for nid in nodes
-                },
-                edges=[],
-            )
+        # One graph and one router (adjacency and edge weights) for every query
+        graph = ContentGraph(
+            nodes={
+                nid: ContentNode(
+                    id=nid,
+                    content="",
+                    category="",
+                    difficulty=1.0,
+                    connections=layout.connection_graph.get(nid, set()),
+                )
+                for nid in nodes
+            },
+            edges=[],
         )
+        router = self.path_finder.router(graph, layout.positions)
+
+        # Find central nodes (high connectivity)
+        centrality = self.graph_analyzer.analyze_centrality(graph)
 
         # Sort by centrality
         sorted_nodes = sorted(centrality.keys(), key=lambda x: centrality[x], reverse=True)
@@ -2416,29 +2949,11 @@ class SpatialIntelligenceEngine:
         for i in range(min(3, len(sorted_nodes))):  # Top 3 central nodes
             start_node = sorted_nodes[i]
 
-            # Find path to next most central node
-            for j in range(i + 1, min(i + 4, len(sorted_nodes))):
-                end_node = sorted_nodes[j]
-
-                path = self.path_finder.find_path(
-                    ContentGraph(
-                        nodes={
-                            nid: ContentNode(
-                                id=nid,
-                                content="",
-                                category="",
-                                difficulty=1.0,
-                                connections=layout.connection_graph.get(nid, set()),
-                            )
-                            for nid in nodes
-                        },
-                        edges=[],
-                    ),
-                    start_node,
-                    end_node,
-                    layout.positions,
-                )
-
+            # Find paths to the next most central nodes (one Dijkstra search)
+            targets = sorted_nodes[i + 1:i + 4]
+            found = router.shortest_paths(start_node, targets)
+            for end_node in targets:
+                path = found.get(end_node, [])
                 if len(path) > 1:
                     paths.append(path)
 
@@ -3021,297 +3536,261 @@ class SensoryChannel:
 class SimilarityAnalyzer:
     """Simplified similarity analysis without ML dependencies"""
 
+    def __init__(self):
+        self.vocabulary = TokenVocabulary()
+
     def calculate_similarity(self, text1: str, text2: str) -> float:
         """Calculate simple similarity between two texts"""
         if text1.strip().lower() == text2.strip().lower():
             return 1.0
 
-        # Simple word overlap similarity
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-
-        if not words1 or not words2:
-            return 0.0
-
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
+        # Simple word overlap similarity over cached token ids
+        return jaccard_ids(self.vocabulary.encode(text1), self.vocabulary.encode(text2))
 
-        return len(intersection) / len(union) if union else 0.0
+    def similar_pairs(
+        self, texts: Sequence[str], k: int = 5, threshold: float = 0.5
+    ) -> List[Tuple[int, int, float]]:
+        """Sparse top-k word-overlap neighbors (i, j, similarity), strongest first"""
+        index = SimilarityIndex(vocabulary=self.vocabulary).build(texts)
+        rows, cols, weights = index.neighbor_graph(k, threshold)
+        return sorted(zip(rows, cols, weights), key=lambda pair: -pair[2])
 
 
 # ============================================================================
-# SPATIAL INDEXING SYSTEM
+# COMPRESSED COLUMNAR STORAGE
 # ============================================================================
 
-# ============================================================================
-# OPTIMIZED SPATIAL INDEXING SYSTEM
-# ============================================================================
 
+SENSORY_CHANNELS = (
+    SensoryChannel.VISUAL,
+    SensoryChannel.AUDITORY,
+    SensoryChannel.KINESTHETIC,
+    SensoryChannel.OLFACTORY,
+    SensoryChannel.GUSTATORY,
+    SensoryChannel.EMOTIONAL,
+    SensoryChannel.SPATIAL,
+    SensoryChannel.TEMPORAL,
+    SensoryChannel.SYNESTHETIC,
+)
 
-class OptimizedSpatialIndex:
+
+class SensoryCodeTable:
     """
-    R-tree based spatial indexing for O(log n) queries instead of O(n).
-    Data analysis showed 50x performance improvement for large palaces.
+    Deterministic interning of sensory encodings. Each channel's distinct
+    descriptors get codes 1, 2, ... in first-seen order (0 = channel
+    absent), and each distinct 9-code profile gets a profile id, which is
+    what the uint64 sensory column stores. Nothing depends on hash(), so
+    a table saved with to_dict() gives the same codes in any process.
     """
 
-    def __init__(self, max_entries: int = 16):
-        self.max_entries = max_entries
-        self.root = None
-        self.size = 0
-        self._node_cache = {}  # LRU cache for frequently accessed nodes
-
-    def add_location(self, location_id: str, position: Position3D) -> None:
-        """Add location with O(log n) complexity"""
-        bbox = self._point_to_bbox(position)
-        entry = SpatialEntry(location_id, bbox, position)
+    VERSION = 1
+
+    def __init__(self, channels: Sequence[str] = SENSORY_CHANNELS):
+        self.channels = tuple(channels)
+        self.descriptors: Dict[str, List[str]] = {channel: [] for channel in self.channels}
+        self._codes: Dict[str, Dict[str, int]] = {channel: {} for channel in self.channels}
+        self.profiles: List[Tuple[int, ...]] = []
+        self._profile_ids: Dict[Tuple[int, ...], int] = {}
+        self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def code(self, channel: str, descriptor: Any) -> int:
+        """Code of a descriptor on one channel (0 if never interned)"""
+        return self._codes[channel].get(str(descriptor), 0)
+
+    def intern(self, sensory_data: Dict[str, Any]) -> int:
+        """Profile id of an encoding, interning any new descriptors"""
+        codes = []
+        for channel in self.channels:
+            if channel not in sensory_data:
+                codes.append(0)
+                continue
+            descriptor = str(sensory_data[channel])
+            table = self._codes[channel]
+            code = table.get(descriptor)
+            if code is None:
+                self.descriptors[channel].append(descriptor)
+                code = table[descriptor] = len(self.descriptors[channel])
+            codes.append(code)
+        key = tuple(codes)
+        profile = self._profile_ids.get(key)
+        if profile is None:
+            profile = self._profile_ids[key] = len(self.profiles)
+            self.profiles.append(key)
+        return profile
 
-        if self.root is None:
-            self.root = SpatialLeafNode()
-
-        self._insert_entry(self.root, entry)
-        self.size += 1
-
-        # Clear cache if it gets too large
-        if len(self._node_cache) > 1000:
-            self._node_cache.clear()
-
-    def find_nearest(
-        self, position: Position3D, k: int = 5
-    ) -> List[Tuple[str, float]]:
-        """Find k nearest neighbors with O(log n + k) complexity"""
-        if self.root is None:
-            return []
-
-        candidates = []
-        self._nearest_search(self.root, position, candidates, k * 2)  # Get more candidates
+    def decode(self, profile: int) -> Dict[str, str]:
+        """The descriptors of a profile id, for the channels it has"""
+        return {
+            channel: self.descriptors[channel][code - 1]
+            for channel, code in zip(self.channels, self.profiles[int(profile)])
+            if code
+        }
 
-        # Calculate exact distances and sort
-        distances = []
-        for location_id, stored_pos in candidates:
-            dist = self._euclidean_distance(position, stored_pos)
-            distances.append((location_id, dist))
+    def channel_codes(self, profiles):
+        """(n, channels) descriptor codes for an array of profile ids"""
+        if np is None:
+            return [self.profiles[int(profile)] for profile in profiles]
+        if self._matrix is None or len(self._matrix) != len(self.profiles):
+            self._matrix = np.array(self.profiles, dtype=np.uint32).reshape(-1, len(self.channels))
+        return self._matrix[np.asarray(profiles, dtype=np.int64)]
 
-        distances.sort(key=lambda x: x[1])
-        return distances[:k]
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-compatible form; from_dict() restores identical codes"""
+        return {
+            "version": self.VERSION,
+            "channels": list(self.channels),
+            "descriptors": {channel: list(values) for channel, values in self.descriptors.items()},
+            "profiles": [list(profile) for profile in self.profiles],
+        }
 
-    def remove_location(self, location_id: str) -> None:
-        # Simplified removal - in full implementation would properly update R-tree
-        # For now, we'll rebuild the index when needed
-        pass
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SensoryCodeTable":
+        if data.get("version") != cls.VERSION:
+            raise ValueError(f"Unsupported sensory code table version {data.get('version')!r}")
+        table = cls(data["channels"])
+        for channel, values in data["descriptors"].items():
+            table.descriptors[channel] = list(values)
+            table._codes[channel] = {descriptor: code for code, descriptor in enumerate(values, 1)}
+        table.profiles = [tuple(profile) for profile in data["profiles"]]
+        table._profile_ids = {profile: i for i, profile in enumerate(table.profiles)}
+        return table
+
+
+# Row layout of CompressedLocationStorage: one aligned 40-byte record per location
+LOCATION_FIELDS = (
+    ("x", "f4"),
+    ("y", "f4"),
+    ("z", "f4"),
+    ("bizarreness", "f4"),
+    ("emotional", "f4"),
+    ("created", "i8"),
+    ("sensory", "u8"),  # SensoryCodeTable profile id
+)
+LOCATION_DTYPE = np.dtype(list(LOCATION_FIELDS), align=True) if np is not None else None
+
+
+class RecordBuffer:
+    """
+    Preallocated structured-array rows with a logical length. Capacity
+    doubles when full, so appends are amortized O(1) and `view` is always
+    current (no pending batch to flush). Without NumPy, rows are tuples in
+    a list.
+    """
 
-    def clear(self) -> None:
-        """Clear all locations from the index"""
-        self.root = None
+    def __init__(self, dtype, capacity: int = 1024):
+        self.dtype = dtype
         self.size = 0
-        self._node_cache.clear()
-
-    def _point_to_bbox(
-        self, point: Tuple[float, float, float], margin: float = 0.1
-    ) -> Tuple[float, float, float, float, float, float]:
-        """Convert point to minimal bounding box"""
-        x, y, z = point
-        return (x - margin, y - margin, z - margin, x + margin, y + margin, z + margin)
-
-    def _euclidean_distance(
-        self, p1: Tuple[float, float, float], p2: Tuple[float, float, float]
-    ) -> float:
-        """Calculate 3D Euclidean distance"""
-        return math.sqrt((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2 + (p1[2] - p2[2]) ** 2)
-
-    def _insert_entry(self, node, entry):
-        """Insert entry into R-tree structure"""
-        if isinstance(node, SpatialLeafNode):
-            node.entries.append(entry)
-            if len(node.entries) > self.max_entries:
-                self._split_leaf_node(node)
-        else:
-            # Find best child to insert into
-            best_child = self._choose_subtree(node, entry)
-            self._insert_entry(best_child, entry)
-
-    def _split_leaf_node(self, node):
-        """Split leaf node when it exceeds max entries"""
-        # Simplified quadratic split
-        entries = node.entries
-        if len(entries) <= 1:
+        self.vectorized = np is not None and dtype is not None
+        self.data = np.zeros(max(1, capacity), dtype=dtype) if self.vectorized else []
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def capacity(self) -> int:
+        return len(self.data) if self.vectorized else self.size
+
+    @property
+    def view(self):
+        """The filled rows (a view, not a copy)"""
+        return self.data[:self.size]
+
+    def column(self, name: str):
+        """One field of the filled rows (a strided view when vectorized)"""
+        if self.vectorized:
+            return self.data[name][:self.size]
+        position = [field for field, _ in LOCATION_FIELDS].index(name)
+        return [row[position] for row in self.data]
+
+    def reserve(self, capacity: int) -> None:
+        """Grow (by doubling) until `capacity` rows fit"""
+        if not self.vectorized or capacity <= len(self.data):
             return
-
-        # Choose two most distant entries as seeds
-        max_dist = 0
-        seed1, seed2 = entries[0], entries[1]
-
-        for i in range(len(entries)):
-            for j in range(i + 1, len(entries)):
-                dist = self._bbox_distance(entries[i].bbox, entries[j].bbox)
-                if dist > max_dist:
-                    max_dist = dist
-                    seed1, seed2 = entries[i], entries[j]
-
-        # Create two new nodes
-        node1 = SpatialLeafNode()
-        node2 = SpatialLeafNode()
-        node1.entries = [seed1]
-        node2.entries = [seed2]
-
-        # Assign remaining entries to closer node
-        for entry in entries:
-            if entry not in [seed1, seed2]:
-                dist1 = self._bbox_distance(entry.bbox, seed1.bbox)
-                dist2 = self._bbox_distance(entry.bbox, seed2.bbox)
-                if dist1 < dist2:
-                    node1.entries.append(entry)
-                else:
-                    node2.entries.append(entry)
-
-        # Replace original node with internal node
-        parent = SpatialInternalNode()
-        parent.children = [node1, node2]
-        # Update the reference - simplified for this implementation
-
-    def _choose_subtree(self, node, entry):
-        """Choose best subtree for insertion"""
-        if not node.children:
-            return node
-
-        # Choose child that requires least enlargement
-        min_enlargement = float("inf")
-        best_child = node.children[0]
-
-        for child in node.children:
-            enlargement = self._calculate_enlargement(child, entry)
-            if enlargement < min_enlargement:
-                min_enlargement = enlargement
-                best_child = child
-
-        return best_child
-
-    def _calculate_enlargement(self, node, entry):
-        """Calculate how much the node's bbox would enlarge"""
-        if hasattr(node, "bbox") and node.bbox:
-            # Simplified enlargement calculation
-            return 0.1  # Placeholder
-        return 0
-
-    def _nearest_search(self, node, target_point, candidates, max_candidates):
-        """Recursive nearest neighbor search"""
-        if isinstance(node, SpatialLeafNode):
-            for entry in node.entries:
-                candidates.append((entry.location_id, entry.position))
+        grown = len(self.data)
+        while grown < capacity:
+            grown *= 2
+        data = np.zeros(grown, dtype=self.dtype)
+        data[:self.size] = self.data[:self.size]
+        self.data = data
+
+    def append(self, row: Tuple) -> int:
+        """Store one row (a tuple in field order) and return its index"""
+        index = self.size
+        if self.vectorized:
+            self.reserve(index + 1)
+            self.data[index] = row
         else:
-            # Sort children by distance to target
-            child_distances = []
-            for child in node.children:
-                dist = self._bbox_distance(
-                    child.bbox if hasattr(child, "bbox") else (0, 0, 0, 1, 1, 1), target_point
-                )
-                child_distances.append((dist, child))
-
-            child_distances.sort()
-
-            # Search closest children first
-            for dist, child in child_distances:
-                if len(candidates) < max_candidates:
-                    self._nearest_search(child, target_point, candidates, max_candidates)
-
-    def _bbox_distance(self, bbox, point):
-        """Calculate minimum distance from point to bounding box"""
-        x, y, z = point
-        min_x, min_y, min_z, max_x, max_y, max_z = bbox
-
-        dx = max(0, min_x - x, x - max_x)
-        dy = max(0, min_y - y, y - max_y)
-        dz = max(0, min_z - z, z - max_z)
-
-        return math.sqrt(dx * dx + dy * dy + dz * dz)
-
-
-@dataclass
-class SpatialEntry:
-    """Entry in spatial index"""
-
-    location_id: str
-    bbox: Tuple[float, float, float, float, float, float]
-    position: Tuple[float, float, float]
-
-
-class SpatialLeafNode:
-    """Leaf node in R-tree"""
-
-    def __init__(self):
-        self.entries: List[SpatialEntry] = []
-        self.bbox: Optional[Tuple[float, float, float, float, float, float]] = None
-
-
-class SpatialInternalNode:
-    """Internal node in R-tree"""
-
-    def __init__(self):
-        self.children: List[Union[SpatialLeafNode, "SpatialInternalNode"]] = []
-        self.bbox: Optional[Tuple[float, float, float, float, float, float]] = None
+            self.data.append(tuple(row))
+        self.size += 1
+        return index
 
+    def extend(self, rows: Sequence[Tuple]) -> range:
+        """Store many rows with one copy and return their indices"""
+        first = self.size
+        if self.vectorized:
+            self.reserve(first + len(rows))
+            self.data[first:first + len(rows)] = np.array(list(rows), dtype=self.dtype)
+        else:
+            self.data.extend(tuple(row) for row in rows)
+        self.size += len(rows)
+        return range(first, self.size)
 
-# ============================================================================
-# COMPRESSED COLUMNAR STORAGE
-# ============================================================================
+    def row(self, index: int) -> Tuple:
+        """Row `index` as a tuple of Python scalars"""
+        return self.data[index].item() if self.vectorized else self.data[index]
 
 
 class CompressedLocationStorage:
     """
     Columnar storage with compression for 47% memory reduction.
-    Optimized for bulk operations with 3x speedup.
+    Location rows live in a RecordBuffer of LOCATION_DTYPE records;
+    the legacy column names (positions_x, ...) are views into it.
+    Content is compressed against a shared dictionary (ContentCodec),
+    trained from the stored content once `auto_train_at` rows exist
+    unless a trained codec is passed in.
     """
 
-    def __init__(self):
-        # Import numpy for columnar arrays (fallback if not available)
-        try:
-            import numpy as np  # type: ignore
-
-            self.np = np
-        except ImportError:
-            self.np = None
+    def __init__(
+        self,
+        initial_capacity: int = 1024,
+        codec: Optional[ContentCodec] = None,
+        decoded_cache_size: int = 256,
+        auto_train_at: Optional[int] = 512,
+        sensory_codes: Optional[SensoryCodeTable] = None,
+    ):
+        self.np = np
+        if np is None:
             logger.warning("NumPy not available - using fallback storage")
 
-        # Columnar storage arrays
         self.location_ids: List[str] = []
         self.content_compressed: List[bytes] = []  # Compressed content
-
-        # Temporary lists for batched consolidation (avoid np.append() inefficiency)
-        self._temp_positions_x: List[float] = []
-        self._temp_positions_y: List[float] = []
-        self._temp_positions_z: List[float] = []
-        self._temp_bizarreness: List[float] = []
-        self._temp_emotional: List[float] = []
-        self._temp_timestamps: List[int] = []
-        self._temp_sensory: List[int] = []
-
-        # Consolidated numpy arrays (created periodically)
-        if self.np is not None:
-            self.positions_x = self.np.array([], dtype=self.np.float32)
-            self.positions_y = self.np.array([], dtype=self.np.float32)
-            self.positions_z = self.np.array([], dtype=self.np.float32)
-            self.bizarreness_factors = self.np.array([], dtype=self.np.float32)
-            self.emotional_intensities = self.np.array([], dtype=self.np.float32)
-            self.creation_timestamps = self.np.array([], dtype=self.np.int64)
-            self.sensory_encodings = self.np.array([], dtype=self.np.uint64)
-        else:
-            # Fallback to lists when numpy not available
-            self.positions_x = []
-            self.positions_y = []
-            self.positions_z = []
-            self.bizarreness_factors = []
-            self.emotional_intensities = []
-            self.creation_timestamps = []
-            self.sensory_encodings = []
+        self.rows = RecordBuffer(LOCATION_DTYPE, initial_capacity)
+        self.codec = codec or ContentCodec()
+        self.decoded = DecodedCache(decoded_cache_size)
+        self.auto_train_at = auto_train_at
+        self.sensory_codes = sensory_codes or SensoryCodeTable()
 
         # Index mapping for O(1) lookups
         self.id_to_index: Dict[str, int] = {}
 
-        # Performance history ring buffer (fixed size)
+        # Performance history for every location in one ring store (fixed size)
         self.performance_buffer_size = 20
-        self.performance_histories: Dict[str, "RingBuffer"] = {}
+        self.performance = PerformanceRingStore(self.performance_buffer_size)
+
+    def __len__(self) -> int:
+        return len(self.location_ids)
 
-        # Consolidation threshold (batch size before converting to numpy)
-        self.consolidation_threshold = 100
+    # Column views over the filled rows
+    positions_x = property(lambda self: self.rows.column("x"))
+    positions_y = property(lambda self: self.rows.column("y"))
+    positions_z = property(lambda self: self.rows.column("z"))
+    bizarreness_factors = property(lambda self: self.rows.column("bizarreness"))
+    emotional_intensities = property(lambda self: self.rows.column("emotional"))
+    creation_timestamps = property(lambda self: self.rows.column("created"))
+    sensory_encodings = property(lambda self: self.rows.column("sensory"))
 
     def add_location(
         self,
@@ -3323,207 +3802,149 @@ class CompressedLocationStorage:
         sensory_encoding: Dict[str, Any],
     ) -> int:
         """Add location with compressed storage"""
+        return self.add_locations([(location_id, content, position, bizarreness, emotional, sensory_encoding)])[0]
 
-        # Compress content using simple run-length encoding
-        compressed_content = self._compress_text(content)
-
-        # Convert sensory encoding to bit-packed format
-        sensory_bits = self._pack_sensory_encoding(sensory_encoding)
-
-        # Append to columnar arrays
-        index = len(self.location_ids)
-        self.location_ids.append(location_id)
-        self.content_compressed.append(compressed_content)
-
-        # Use temporary lists for efficient batching (avoid np.append() inefficiency)
+    def add_locations(
+        self, rows: Sequence[Tuple[str, str, Position3D, float, float, Dict[str, Any]]]
+    ) -> List[int]:
+        """Add many (id, content, position, bizarreness, emotional, sensory) rows
+        with one copy into the record buffer"""
         current_time = int(datetime.now().timestamp())
-
-        self._temp_positions_x.append(position[0])
-        self._temp_positions_y.append(position[1])
-        self._temp_positions_z.append(position[2])
-        self._temp_bizarreness.append(bizarreness)
-        self._temp_emotional.append(emotional)
-        self._temp_timestamps.append(current_time)
-        self._temp_sensory.append(sensory_bits)
-
-        # Consolidate to numpy arrays periodically for optimal performance
-        if len(self._temp_positions_x) >= self.consolidation_threshold:
-            self._consolidate_temp_data()
-
-        # Update index mapping
-        self.id_to_index[location_id] = index
-
-        # Initialize performance history ring buffer
-        self.performance_histories[location_id] = RingBuffer(self.performance_buffer_size)
-
-        return index
+        records = []
+        for location_id, content, position, bizarreness, emotional, sensory_encoding in rows:
+            self.location_ids.append(location_id)
+            self.content_compressed.append(self._compress_text(content))
+            records.append((position[0], position[1], position[2], bizarreness, emotional,
+                            current_time, self._pack_sensory_encoding(sensory_encoding)))
+
+        indices = list(self.rows.extend(records))
+        for (location_id, *_), index in zip(rows, indices):
+            self.id_to_index[location_id] = index
+            self.performance.add_location(location_id)
+
+        if not self.codec.trained and self.auto_train_at is not None and len(self) >= self.auto_train_at:
+            self.auto_train_at = None  # once, even if the content shares nothing to learn
+            self.train_codec()
+        return indices
+
+    def train_codec(self, samples: Optional[Sequence[str]] = None, size: int = 16 * 1024) -> ContentCodec:
+        """Train a shared dictionary on `samples` (default: the stored content)
+        and re-encode every stored row with it"""
+        contents = self.get_contents(self.location_ids)
+        codec = ContentCodec.train(contents if samples is None else samples, size)
+        self.content_compressed = [codec.compress(content) for content in contents]
+        self.codec = codec
+        self.decoded.clear()
+        return codec
+
+    def content(self, index: int) -> str:
+        """Decoded content of row `index`, through the LRU"""
+        text = self.decoded.get(index)
+        if text is None:
+            text = self._decompress_text(self.content_compressed[index])
+            self.decoded.put(index, text)
+        return text
+
+    def get_contents(self, location_ids: Sequence[str]) -> List[str]:
+        """Content for many locations, batch-decoding the ones not cached
+        (the LRU is left to single-location reads)"""
+        indices = [self.id_to_index[location_id] for location_id in location_ids]
+        texts = [self.decoded.peek(index) for index in indices]
+        missing = [index for index, text in zip(indices, texts) if text is None]
+        decoded = iter(self.codec.decompress_many([self.content_compressed[index] for index in missing]))
+        return [text if text is not None else next(decoded) for text in texts]
 
     def get_location(self, location_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve location with decompression"""
-        if location_id not in self.id_to_index:
+        index = self.id_to_index.get(location_id)
+        if index is None:
             return None
 
-        # Ensure any temporary data is consolidated before access
-        self.force_consolidation()
-
-        index = self.id_to_index[location_id]
-
+        x, y, z, bizarreness, emotional, created, sensory = self.rows.row(index)
         return {
             "id": location_id,
-            "content": self._decompress_text(self.content_compressed[index]),
-            "position": (
-                float(self.positions_x[index]),
-                float(self.positions_y[index]),
-                float(self.positions_z[index]),
-            ),
-            "bizarreness_factor": float(self.bizarreness_factors[index]),
-            "emotional_intensity": float(self.emotional_intensities[index]),
-            "created_at": datetime.fromtimestamp(int(self.creation_timestamps[index])),
-            "sensory_encoding": self._unpack_sensory_encoding(self.sensory_encodings[index]),
+            "content": self.content(index),
+            "position": (float(x), float(y), float(z)),
+            "bizarreness_factor": float(bizarreness),
+            "emotional_intensity": float(emotional),
+            "created_at": datetime.fromtimestamp(int(created)),
+            "sensory_encoding": self._unpack_sensory_encoding(int(sensory)),
         }
 
     def bulk_query_by_position(
         self, min_pos: Position3D, max_pos: Position3D
     ) -> List[str]:
         """Bulk spatial query - 3x faster than individual lookups"""
-
-        # Track performance
-        start_time = time.time()
-
-        # Ensure any temporary data is consolidated before querying
-        self.force_consolidation()
-
-        if self.np is not None:
-            # Vectorized filtering using numpy
-            x_mask = (self.positions_x >= min_pos[0]) & (self.positions_x <= max_pos[0])
-            y_mask = (self.positions_y >= min_pos[1]) & (self.positions_y <= max_pos[1])
-            z_mask = (self.positions_z >= min_pos[2]) & (self.positions_z <= max_pos[2])
-
-            combined_mask = x_mask & y_mask & z_mask
-            indices = self.np.where(combined_mask)[0]
+        if self.rows.vectorized:
+            # Vectorized filtering over the record columns
+            xs, ys, zs = self.positions_x, self.positions_y, self.positions_z
+            combined_mask = (
+                (xs >= min_pos[0]) & (xs <= max_pos[0])
+                & (ys >= min_pos[1]) & (ys <= max_pos[1])
+                & (zs >= min_pos[2]) & (zs <= max_pos[2])
+            )
+            indices = np.flatnonzero(combined_mask).tolist()
         else:
-            # Fallback to list comprehension
-            indices = []
-            for i in range(len(self.positions_x)):
-                if (
-                    min_pos[0] <= self.positions_x[i] <= max_pos[0]
-                    and min_pos[1] <= self.positions_y[i] <= max_pos[1]
-                    and min_pos[2] <= self.positions_z[i] <= max_pos[2]
-                ):
-                    indices.append(i)
-
-        # Track performance
-        duration = time.time() - start_time
-        self._track_performance('spatial_query', duration)
+            # Fallback to a scan over the row tuples
+            indices = [
+                i for i, (x, y, z, *_) in enumerate(self.rows.data)
+                if min_pos[0] <= x <= max_pos[0] and min_pos[1] <= y <= max_pos[1] and min_pos[2] <= z <= max_pos[2]
+            ]
 
         return [self.location_ids[i] for i in indices]
 
+    def sensory_matrix(self, location_ids: Optional[Sequence[str]] = None):
+        """(n, 9) per-channel descriptor codes, in SENSORY_CHANNELS order,
+        for the given locations (default: all, in storage order)"""
+        profiles = self.sensory_encodings
+        if location_ids is not None:
+            indices = [self.id_to_index[location_id] for location_id in location_ids]
+            profiles = profiles[indices] if self.rows.vectorized else [profiles[i] for i in indices]
+        return self.sensory_codes.channel_codes(profiles)
+
+    def find_by_sensory(self, channel: str, descriptor: Any) -> List[str]:
+        """Locations whose `channel` descriptor is exactly `descriptor`"""
+        code = self.sensory_codes.code(channel, descriptor)
+        if not code or not len(self):
+            return []
+        column = self.sensory_codes.channels.index(channel)
+        codes = self.sensory_matrix()
+        if self.rows.vectorized:
+            return [self.location_ids[i] for i in np.flatnonzero(codes[:, column] == code).tolist()]
+        return [self.location_ids[i] for i, row in enumerate(codes) if row[column] == code]
+
+    def bulk_query_contents(self, min_pos: Position3D, max_pos: Position3D) -> Dict[str, str]:
+        """Content of every location in the box, decoded as one batch"""
+        location_ids = self.bulk_query_by_position(min_pos, max_pos)
+        return dict(zip(location_ids, self.get_contents(location_ids)))
+
     def bulk_update_performance(
         self, performance_updates: List[Tuple[str, Dict[str, Any]]]
     ) -> None:
-        """Bulk performance updates - 10x faster than individual updates"""
+        """Bulk performance updates, scattered into the ring store in one pass"""
+        self.performance.append_batch(
+            [(location_id, data) for location_id, data in performance_updates if location_id in self.performance]
+        )
 
-        for location_id, performance_data in performance_updates:
-            if location_id in self.performance_histories:
-                self.performance_histories[location_id].append(performance_data)
+    def performance_statistics(self, location_ids: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Mean, variance and trend of every location's recent performance at once"""
+        return self.performance.statistics(location_ids)
 
     def _compress_text(self, text: str) -> bytes:
-        """Simple compression for text content"""
-        # Basic run-length encoding for repeated patterns
-        import zlib
-
-        return zlib.compress(text.encode("utf-8"), level=6)
+        """Compress text content against the shared dictionary"""
+        return self.codec.compress(text)
 
     def _decompress_text(self, compressed: bytes) -> str:
         """Decompress text content"""
-        import zlib
-
-        return zlib.decompress(compressed).decode("utf-8")
+        return self.codec.decompress(compressed)
 
     def _pack_sensory_encoding(self, sensory_data: Dict[str, Any]) -> int:
-        """Pack sensory encoding into 64-bit integer"""
-        # Simplified bit packing - each sense gets 7 bits (0-127)
-        packed = 0
-
-        sensory_channels = [
-            "visual",
-            "auditory",
-            "kinesthetic",
-            "olfactory",
-            "gustatory",
-            "emotional",
-            "spatial",
-            "temporal",
-            "synesthetic",
-        ]
-
-        for i, channel in enumerate(sensory_channels):
-            if channel in sensory_data:
-                # Convert to 7-bit value (0-127)
-                value = hash(str(sensory_data[channel])) % 128
-                packed |= value << (i * 7)
-
-        return packed
-
-    def _unpack_sensory_encoding(self, packed: int) -> Dict[str, int]:
-        """Unpack sensory encoding from 64-bit integer"""
-        sensory_channels = [
-            "visual",
-            "auditory",
-            "kinesthetic",
-            "olfactory",
-            "gustatory",
-            "emotional",
-            "spatial",
-            "temporal",
-            "synesthetic",
-        ]
-
-        unpacked = {}
-        for i, channel in enumerate(sensory_channels):
-            value = (packed >> (i * 7)) & 0x7F  # Extract 7 bits
-            unpacked[channel] = value
+        """Sensory encoding as its interned profile id (the uint64 column value)"""
+        return self.sensory_codes.intern(sensory_data)
 
-        return unpacked
-
-    def _consolidate_temp_data(self) -> None:
-        """Consolidate temporary lists to numpy arrays for optimal performance"""
-        if self.np is None or len(self._temp_positions_x) == 0:
-            return
-
-        # Convert temporary lists to numpy arrays with appropriate dtypes
-        temp_positions_x = self.np.array(self._temp_positions_x, dtype=self.np.float32)
-        temp_positions_y = self.np.array(self._temp_positions_y, dtype=self.np.float32)
-        temp_positions_z = self.np.array(self._temp_positions_z, dtype=self.np.float32)
-        temp_bizarreness = self.np.array(self._temp_bizarreness, dtype=self.np.float32)
-        temp_emotional = self.np.array(self._temp_emotional, dtype=self.np.float32)
-        temp_timestamps = self.np.array(self._temp_timestamps, dtype=self.np.int64)
-        temp_sensory = self.np.array(self._temp_sensory, dtype=self.np.uint64)
-
-        # Concatenate with existing arrays (efficient for large arrays)
-        self.positions_x = self.np.concatenate([self.positions_x, temp_positions_x])
-        self.positions_y = self.np.concatenate([self.positions_y, temp_positions_y])
-        self.positions_z = self.np.concatenate([self.positions_z, temp_positions_z])
-        self.bizarreness_factors = self.np.concatenate([self.bizarreness_factors, temp_bizarreness])
-        self.emotional_intensities = self.np.concatenate([self.emotional_intensities, temp_emotional])
-        self.creation_timestamps = self.np.concatenate([self.creation_timestamps, temp_timestamps])
-        self.sensory_encodings = self.np.concatenate([self.sensory_encodings, temp_sensory])
-
-        # Clear temporary lists
-        self._temp_positions_x.clear()
-        self._temp_positions_y.clear()
-        self._temp_positions_z.clear()
-        self._temp_bizarreness.clear()
-        self._temp_emotional.clear()
-        self._temp_timestamps.clear()
-        self._temp_sensory.clear()
-
-        logger.debug(f"Consolidated {len(temp_positions_x)} locations to numpy arrays")
-
-    def force_consolidation(self) -> None:
-        """Force consolidation of any remaining temporary data"""
-        if len(self._temp_positions_x) > 0:
-            self._consolidate_temp_data()
+    def _unpack_sensory_encoding(self, packed: int) -> Dict[str, str]:
+        """Descriptors of a stored profile id"""
+        return self.sensory_codes.decode(packed)
 
 
 class RingBuffer:
@@ -3607,6 +4028,293 @@ class RingBuffer:
         return self._stats_cache
 
 
+class PerformanceRingStore:
+    """
+    Performance history for every location in one preallocated array of
+    shape (locations, capacity, fields) plus a timestamp plane, with head
+    and count pointers in int arrays; rows grow by doubling. About 800
+    bytes per location at capacity 20, and statistics for all locations
+    are computed in one vectorized pass. Without NumPy, each location keeps
+    a bounded deque of dicts behind the same interface.
+
+    Only FIELDS and the timestamp are kept; other keys in a record are
+    dropped.
+    """
+
+    FIELDS = ("accuracy", "response_time", "difficulty_score", "interference_level")
+    _KEPT = ("timestamp",) + FIELDS
+
+    def __init__(self, capacity: int = 20, initial_rows: int = 64):
+        self.capacity = capacity
+        self.row_of: Dict[str, int] = {}
+        rows = max(1, initial_rows)
+        self.vectorized = np is not None
+        if self.vectorized:
+            self.values = np.full((rows, capacity, len(self.FIELDS)), np.nan, dtype=np.float64)
+            self.timestamps = np.full((rows, capacity), np.nan)
+            self.heads = np.zeros(rows, dtype=np.int32)
+            self.counts = np.zeros(rows, dtype=np.int32)
+        else:
+            self._records: List[deque] = []
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    def __contains__(self, location_id: str) -> bool:
+        return location_id in self.row_of
+
+    def add_location(self, location_id: str) -> int:
+        """Row for a location (existing history is kept)"""
+        row = self.row_of.get(location_id)
+        if row is not None:
+            return row
+        row = self.row_of[location_id] = len(self.row_of)
+        if not self.vectorized:
+            self._records.append(deque(maxlen=self.capacity))
+        elif row >= len(self.heads):
+            grow = len(self.heads)
+            self.values = np.concatenate([self.values, np.full((grow,) + self.values.shape[1:], np.nan, dtype=np.float64)])
+            self.timestamps = np.concatenate([self.timestamps, np.full((grow, self.capacity), np.nan)])
+            self.heads = np.concatenate([self.heads, np.zeros(grow, dtype=np.int32)])
+            self.counts = np.concatenate([self.counts, np.zeros(grow, dtype=np.int32)])
+        return row
+
+    def append(self, location_id: str, record: Dict[str, Any]) -> None:
+        """Add one review record (missing fields are stored as absent,
+        keys outside FIELDS and timestamp are dropped)"""
+        row = self.add_location(location_id)
+        if not self.vectorized:
+            self._records[row].append({name: record[name] for name in self._KEPT if name in record})
+            return
+        slot = self.heads[row]
+        self.values[row, slot] = [record.get(name, np.nan) for name in self.FIELDS]
+        timestamp = record.get("timestamp")
+        self.timestamps[row, slot] = timestamp.timestamp() if timestamp is not None else np.nan
+        self.heads[row] = (slot + 1) % self.capacity
+        self.counts[row] = min(self.counts[row] + 1, self.capacity)
+
+    def append_batch(self, updates: Sequence[Tuple[str, Dict[str, Any]]]) -> None:
+        """Add many (location_id, record) pairs, in order, with one scatter per plane"""
+        if not self.vectorized or not updates:
+            for location_id, record in updates:
+                self.append(location_id, record)
+            return
+        row_of = self.row_of
+        rows = np.fromiter(
+            (row_of[location_id] if location_id in row_of else self.add_location(location_id)
+             for location_id, _ in updates),
+            dtype=np.int64, count=len(updates),
+        )
+        # The k-th record for a row in this batch lands k slots past its head
+        order = np.argsort(rows, kind="stable")
+        sorted_rows = rows[order]
+        first = np.r_[0, np.flatnonzero(np.diff(sorted_rows)) + 1]
+        occurrence = np.empty(len(rows), dtype=np.int64)
+        occurrence[order] = np.arange(len(rows)) - np.repeat(first, np.diff(np.r_[first, len(rows)]))
+        slots = (self.heads[rows] + occurrence) % self.capacity
+
+        nan = math.nan
+        self.values[rows, slots] = np.fromiter(
+            (record.get(name, nan) for _, record in updates for name in self.FIELDS),
+            dtype=np.float64, count=len(updates) * len(self.FIELDS),
+        ).reshape(len(updates), len(self.FIELDS))
+        seconds: Dict[Any, float] = {None: nan}  # a batch usually shares a few timestamps
+        stamps = []
+        for _, record in updates:
+            timestamp = record.get("timestamp")
+            value = seconds.get(timestamp)
+            if value is None:
+                value = seconds[timestamp] = timestamp.timestamp()
+            stamps.append(value)
+        self.timestamps[rows, slots] = stamps
+        added = np.bincount(rows, minlength=len(self.heads)).astype(np.int32)
+        self.heads = ((self.heads + added) % self.capacity).astype(np.int32)
+        self.counts = np.minimum(self.counts + added, self.capacity).astype(np.int32)
+
+    def records(self, location_id: str, count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The latest `count` records (default all), oldest first"""
+        row = self.row_of.get(location_id)
+        if row is None:
+            return []
+        if not self.vectorized:
+            items = list(self._records[row])
+            return items[-count:] if count else items
+        size = int(self.counts[row])
+        count = size if count is None else min(count, size)
+        slots = (int(self.heads[row]) - count + np.arange(count)) % self.capacity
+        values = self.values[row, slots].tolist()
+        timestamps = self.timestamps[row, slots].tolist()
+        result = []
+        for fields, timestamp in zip(values, timestamps):
+            record = {name: value for name, value in zip(self.FIELDS, fields) if value == value}
+            if timestamp == timestamp:
+                record["timestamp"] = datetime.fromtimestamp(timestamp)
+            result.append(record)
+        return result
+
+    def history(self, location_id: str) -> "PerformanceHistory":
+        """List-like view of one location's history"""
+        self.add_location(location_id)
+        return PerformanceHistory(self, location_id)
+
+    def statistics(self, location_ids: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Per-location review count, mean accuracy and response time, accuracy
+        variance and trend (least-squares slope per review, oldest to newest;
+        0 below three reviews) as arrays aligned with `location_ids`
+        (default: every location in insertion order)
+        """
+        location_ids = list(self.row_of) if location_ids is None else list(location_ids)
+        if not self.vectorized:
+            return self._statistics_python(location_ids)
+        rows = np.array([self.row_of[location_id] for location_id in location_ids], dtype=np.int64)
+        counts = self.counts[rows].astype(float)
+        # Age 0 is the newest slot; x runs 0..count-1 from oldest to newest
+        age = (self.heads[rows, None] - 1 - np.arange(self.capacity)[None, :]) % self.capacity
+        x = counts[:, None] - 1 - age
+        accuracy = self.values[rows, :, 0].astype(float)
+        response = self.values[rows, :, 1].astype(float)
+        valid = (age < counts[:, None]) & ~np.isnan(accuracy)
+        n = valid.sum(axis=1)
+        acc = np.where(valid, accuracy, 0.0)
+        mean = acc.sum(axis=1) / np.maximum(n, 1)
+        variance = np.where(valid, (accuracy - mean[:, None]) ** 2, 0.0).sum(axis=1) / np.maximum(n, 1)
+        xv = np.where(valid, x, 0.0)
+        sx, sy, sxy, sxx = xv.sum(axis=1), acc.sum(axis=1), (xv * acc).sum(axis=1), (xv * xv).sum(axis=1)
+        denominator = n * sxx - sx * sx
+        trend = np.where((n >= 3) & (denominator != 0), (n * sxy - sx * sy) / np.where(denominator != 0, denominator, 1), 0.0)
+        response_valid = (age < counts[:, None]) & ~np.isnan(response)
+        avg_response = np.where(response_valid, response, 0.0).sum(axis=1) / np.maximum(response_valid.sum(axis=1), 1)
+        return {
+            "location_ids": location_ids,
+            "count": counts.astype(np.int64),
+            "avg_accuracy": mean,
+            "accuracy_variance": variance,
+            "avg_response_time": avg_response,
+            "trend": trend,
+        }
+
+    def _statistics_python(self, location_ids: List[str]) -> Dict[str, Any]:
+        columns: Dict[str, List[float]] = {
+            "count": [], "avg_accuracy": [], "accuracy_variance": [], "avg_response_time": [], "trend": [],
+        }
+        for location_id in location_ids:
+            items = self.records(location_id)
+            accuracies = [item["accuracy"] for item in items if "accuracy" in item]
+            responses = [item["response_time"] for item in items if "response_time" in item]
+            n = len(accuracies)
+            mean = sum(accuracies) / n if n else 0.0
+            trend = 0.0
+            if n >= 3:
+                sx, sxx = sum(range(n)), sum(i * i for i in range(n))
+                sxy = sum(i * a for i, a in enumerate(accuracies))
+                trend = (n * sxy - sx * sum(accuracies)) / (n * sxx - sx * sx)
+            columns["count"].append(len(items))
+            columns["avg_accuracy"].append(mean)
+            columns["accuracy_variance"].append(sum((a - mean) ** 2 for a in accuracies) / n if n else 0.0)
+            columns["avg_response_time"].append(sum(responses) / len(responses) if responses else 0.0)
+            columns["trend"].append(trend)
+        return {"location_ids": location_ids, **columns}
+
+
+class PerformanceHistory(Sequence):
+    """One location's review records in a PerformanceRingStore, oldest first;
+    supports len, indexing, slicing and append like the list it replaces"""
+
+    __slots__ = ("store", "location_id")
+
+    def __init__(self, store: PerformanceRingStore, location_id: str):
+        self.store = store
+        self.location_id = location_id
+
+    def __len__(self) -> int:
+        row = self.store.row_of[self.location_id]
+        if not self.store.vectorized:
+            return len(self.store._records[row])
+        return int(self.store.counts[row])
+
+    def __getitem__(self, item):
+        records = self.store.records(self.location_id)
+        return records[item]
+
+    def __iter__(self):
+        return iter(self.store.records(self.location_id))
+
+    def __repr__(self) -> str:
+        return f"PerformanceHistory({self.store.records(self.location_id)!r})"
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Record a review. Only the store's FIELDS and timestamp are kept;
+        any other key is discarded."""
+        self.store.append(self.location_id, record)
+
+
+# ============================================================================
+# SHARED EVENT LOOP
+# ============================================================================
+
+
+class PalaceEventLoop:
+    """
+    One long-lived event loop on a daemon thread for the palace's sync API.
+
+    Sync wrappers submit coroutines here instead of calling asyncio.run(),
+    so each call costs a thread hand-off rather than a loop setup and
+    teardown, and they work even when the caller is itself inside a running
+    loop (async code should await the *_async methods directly instead).
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop, started on first use"""
+        if self._loop is None or self._loop.is_closed():
+            with self._lock:
+                if self._loop is None or self._loop.is_closed():
+                    loop = asyncio.new_event_loop()
+                    started = threading.Event()
+
+                    def serve():
+                        asyncio.set_event_loop(loop)
+                        loop.call_soon(started.set)
+                        loop.run_forever()
+
+                    self._thread = threading.Thread(target=serve, name="palace-event-loop", daemon=True)
+                    self._thread.start()
+                    started.wait()
+                    self._loop = loop
+        return self._loop
+
+    def run(self, coro) -> Any:
+        """Run a coroutine on the shared loop and return its result"""
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Blocking palace call from the palace event loop; await the *_async method")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def close(self) -> None:
+        """Stop the loop thread (a later run() starts a new one)"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        if not loop.is_running():
+            loop.close()
+
+
+PALACE_EVENT_LOOP = PalaceEventLoop()
+atexit.register(PALACE_EVENT_LOOP.close)
+
+
 # ============================================================================
 # MAIN ELITE MEMORY PALACE SYSTEM
 # ============================================================================
@@ -3637,6 +4345,10 @@ class EliteMemoryPalaceSystem:
         # Session tracking for analysis
         self.session_history: List[List[RecallEvent]] = []
 
+        # Walking routes per (palace, walkway k), rebuilt after the palace's layout changes
+        self._routers: Dict[Tuple[str, int], PalaceRouter] = {}
+        self._file_indexed_palaces: Set[str] = set()  # opened from files, queried via their stored R-tree
+
         # User sensory preferences (could be loaded from user profile)
         self.user_sensory_preferences = SensoryPreferences()
 
@@ -3685,6 +4397,12 @@ class EliteMemoryPalaceSystem:
         # Clear cognitive profiles
         self.cognitive_profiles.clear()
 
+        # Unmap palace files opened with open_palace
+        for palace in self.palaces.values():
+            if "file" in palace:
+                palace["file"].close()
+        self._file_indexed_palaces.clear()
+
         # Clear palaces (optional - could be expensive)
         # self.palaces.clear()  # Uncomment if memory cleanup needed
 
@@ -3719,6 +4437,39 @@ class EliteMemoryPalaceSystem:
         self, palace_id: str, content: str, position: Optional[Position3D] = None
     ) -> ElitePalaceLocation:
         """Add a location with elite multi-sensory encoding"""
+        return PALACE_EVENT_LOOP.run(self.add_elite_location_async(palace_id, content, position))
+
+    async def add_elite_location_async(
+        self, palace_id: str, content: str, position: Optional[Position3D] = None
+    ) -> ElitePalaceLocation:
+        """Add a location with elite multi-sensory encoding (encoders run concurrently)"""
+        positions = [position] if position is not None else None
+        return (await self.add_elite_locations_async(palace_id, [content], positions))[0]
+
+    def add_elite_locations(
+        self,
+        palace_id: str,
+        contents: Sequence[str],
+        positions: Optional[Sequence[Position3D]] = None,
+        concurrency: int = 32,
+    ) -> List[ElitePalaceLocation]:
+        """Add many locations at once (see add_elite_locations_async)"""
+        return PALACE_EVENT_LOOP.run(
+            self.add_elite_locations_async(palace_id, contents, positions, concurrency)
+        )
+
+    async def add_elite_locations_async(
+        self,
+        palace_id: str,
+        contents: Sequence[str],
+        positions: Optional[Sequence[Position3D]] = None,
+        concurrency: int = 32,
+    ) -> List[ElitePalaceLocation]:
+        """
+        Bulk palace ingestion: encoders fan out with at most `concurrency`
+        items in flight, then storage, review schedules and the spatial index
+        are updated once for the whole batch.
+        """
 
         if palace_id not in self.palaces:
             available = list(self.palaces.keys())[:3]
@@ -3727,85 +4478,97 @@ class EliteMemoryPalaceSystem:
                 f"Available palaces: {available if available else 'none created yet'}. "
                 f"Use create_elite_palace() to create a new palace."
             )
+        if positions is not None and len(positions) != len(contents):
+            raise ValueError(f"Got {len(positions)} positions for {len(contents)} contents")
+        if not contents:
+            return []
 
         palace = self.palaces[palace_id]
 
-        # Generate position if not provided
-        if position is None:
-            position = self._generate_optimal_position(palace)
+        # Generate positions if not provided
+        if positions is None:
+            positions = self._generate_optimal_positions(palace, len(contents))
 
-        # Create elite location with full encoding
-        location_id = hashlib.md5(f"{content}{datetime.now()}".encode()).hexdigest()[:8]
+        # Create elite locations with full encoding
+        created = datetime.now()
+        location_ids = [
+            hashlib.md5(f"{content}{created}{i}".encode()).hexdigest()[:8]
+            for i, content in enumerate(contents)
+        ]
 
-        # Generate multi-modal sensory encoding with enhanced coherence
-        import asyncio
+        # Multi-modal encoding (enhanced coherence) and sensory encoding for
+        # compressed storage, generated concurrently
+        semaphore = asyncio.Semaphore(max(1, concurrency))
 
-        try:
-            multi_modal_encoding = asyncio.run(
-                self.multi_modal_system.create_multi_modal_encoding(
-                    content, self.user_sensory_preferences
+        async def encode(content: str):
+            async with semaphore:
+                return await asyncio.gather(
+                    self._create_multi_modal_encoding_async(content),
+                    self._create_multi_sensory_encoding_async(content),
                 )
-            )
-        except Exception as e:
-            logger.debug(f"Multi-modal encoding failed: {e}")
-            multi_modal_encoding = None
-
-        # Generate sensory encoding for compressed storage
-        sensory_encoding = self._create_multi_sensory_encoding(content)
-
-        # Add to compressed columnar storage (47% memory reduction)
-        bizarreness_factor = random.uniform(0, 10)
-        emotional_intensity = random.uniform(0, 10)
-
-        self.compressed_storage.add_location(
-            location_id,
-            content,
-            position,
-            bizarreness_factor,
-            emotional_intensity,
-            sensory_encoding,
-        )
 
-        # Create ElitePalaceLocation object for compatibility
-        location = ElitePalaceLocation(
-            id=location_id,
-            content=content,
-            position=position,
-            sensory_matrix=sensory_encoding,
-            pao_encoding=self._generate_pao_encoding(content),
-            bizarreness_factor=bizarreness_factor,
-            emotional_intensity=emotional_intensity,
-            speed_markers=self._generate_speed_markers(content),
-            error_traps=self._generate_error_traps(content),
-            multi_modal_encoding=multi_modal_encoding,
+        encodings = await asyncio.gather(*(encode(content) for content in contents))
+
+        # Add to compressed columnar storage (47% memory reduction) in one batch
+        bizarreness_factors = [random.uniform(0, 10) for _ in contents]
+        emotional_intensities = [random.uniform(0, 10) for _ in contents]
+
+        self.compressed_storage.add_locations(
+            list(zip(location_ids, contents, positions, bizarreness_factors, emotional_intensities,
+                     (sensory for _, sensory in encodings)))
         )
 
-        # Generate optimal review schedule using adaptive neuroplasticity
-        review_schedule = self.neuro_optimizer.optimize_review_schedule(
-            {
-                "emotional_intensity": emotional_intensity,
-                "bizarreness_factor": bizarreness_factor,
-                "difficulty_score": bizarreness_factor / 10,
-                "performance_history": [],
-            },
-            "default_user",  # Would be actual user ID
+        # Generate optimal review schedules using adaptive neuroplasticity
+        schedules = self.neuro_optimizer.optimize_review_schedules_batch(
+            emotional_intensities,
+            bizarreness_factors,
+            [bizarreness / 10 for bizarreness in bizarreness_factors],
         )
-        location.consolidation_schedule = review_schedule[:3]  # First 3 reviews
 
-        # Add to palace
-        palace["locations"][location_id] = location
+        locations = []
+        for i, content in enumerate(contents):
+            multi_modal_encoding, sensory_encoding = encodings[i]
+            location = ElitePalaceLocation(
+                id=location_ids[i],
+                content=content,
+                position=positions[i],
+                sensory_matrix=sensory_encoding,
+                pao_encoding=self._generate_pao_encoding(content),
+                bizarreness_factor=bizarreness_factors[i],
+                emotional_intensity=emotional_intensities[i],
+                speed_markers=self._generate_speed_markers(content),
+                error_traps=self._generate_error_traps(content),
+                multi_modal_encoding=multi_modal_encoding,
+                performance_history=self.compressed_storage.performance.history(location_ids[i]),
+            )
+            location.consolidation_schedule = schedules.schedule(i, 3)  # First 3 reviews
+
+            # Add to palace
+            palace["locations"][location.id] = location
+            locations.append(location)
 
-        # Add to optimized spatial index (50x faster queries)
-        self.spatial_index.add_location(location_id, position)
+        # Add to optimized spatial index (bulk loaded)
+        self._ensure_spatial_index(palace_id)
+        self.spatial_index.add_locations([(location.id, location.position) for location in locations])
+        self._drop_routers(palace_id)
 
-        logger.info(f"Added elite location: {location_id} to palace {palace_id}")
+        if len(locations) == 1:
+            logger.info(f"Added elite location: {locations[0].id} to palace {palace_id}")
+        else:
+            logger.info(f"Added {len(locations)} elite locations to palace {palace_id}")
 
-        return location
+        return locations
 
     def practice_championship_recall(
         self, palace_id: str, time_limit_seconds: int = 300
     ) -> Dict[str, Any]:
         """Run championship-level recall practice session with neuroplasticity tracking and ML analysis"""
+        return PALACE_EVENT_LOOP.run(self.practice_championship_recall_async(palace_id, time_limit_seconds))
+
+    async def practice_championship_recall_async(
+        self, palace_id: str, time_limit_seconds: int = 300
+    ) -> Dict[str, Any]:
+        """Async practice_championship_recall"""
 
         if palace_id not in self.palaces:
             available = list(self.palaces.keys())[:3]
@@ -3827,6 +4590,7 @@ class EliteMemoryPalaceSystem:
         start_time = datetime.now()
         response_times = []
         recall_events = []
+        well_recalled: List[ElitePalaceLocation] = []
 
         for i, location in enumerate(
             locations[: min(20, len(locations))]
@@ -3870,26 +4634,22 @@ class EliteMemoryPalaceSystem:
                 }
             )
 
-            # Keep only last 20 performance records
-            location.performance_history = location.performance_history[-20:]
-
-            # Update consolidation schedule based on performance
+            # Good performance - extend next review interval (scheduled in one batch below)
             if accuracy >= 0.8:
-                # Good performance - extend next review interval
-                review_schedule = self.neuro_optimizer.optimize_review_schedule(
-                    {
-                        "emotional_intensity": location.emotional_intensity,
-                        "bizarreness_factor": location.bizarreness_factor,
-                        "difficulty_score": location.bizarreness_factor / 10,
-                        "performance_history": [recall_event],
-                    },
-                    "default_user",
-                )
-                location.consolidation_schedule = review_schedule[:2]
+                well_recalled.append(location)
 
             recall_events.append(recall_event)
             response_times.append(recall_time)
 
+        if well_recalled:
+            schedules = self.neuro_optimizer.optimize_review_schedules_batch(
+                [location.emotional_intensity for location in well_recalled],
+                [location.bizarreness_factor for location in well_recalled],
+                [location.bizarreness_factor / 10 for location in well_recalled],
+            )
+            for i, location in enumerate(well_recalled):
+                location.consolidation_schedule = schedules.schedule(i, 2)
+
         # Store session in history for analysis
         self.session_history.append(recall_events)
         self.session_history = self.session_history[-50:]  # Keep last 50 sessions
@@ -3919,8 +4679,6 @@ class EliteMemoryPalaceSystem:
             }
 
             # Add ML-powered performance analysis
-            import asyncio
-
             try:
                 session = RecallSession(
                     session_id=hashlib.md5(f"{palace_id}{start_time}".encode()).hexdigest()[:8],
@@ -3941,9 +4699,7 @@ class EliteMemoryPalaceSystem:
                     },
                 )
 
-                analysis_result = asyncio.run(
-                    self.performance_analyzer.analyze_recall_session(session)
-                )
+                analysis_result = await self.performance_analyzer.analyze_recall_session(session)
 
                 # Add analysis results to output
                 results.update(
@@ -4012,30 +4768,18 @@ class EliteMemoryPalaceSystem:
                 connections=set(),  # Will be populated based on spatial proximity
             )
 
-        # Create connections based on spatial proximity and semantic similarity
-        for i, loc1 in enumerate(locations):
-            for j, loc2 in enumerate(locations):
-                if i != j:
-                    # Spatial proximity
-                    pos1, pos2 = loc1.position, loc2.position
-                    distance = math.sqrt(
-                        (pos1[0] - pos2[0]) ** 2
-                        + (pos1[1] - pos2[1]) ** 2
-                        + (pos1[2] - pos2[2]) ** 2
-                    )
-
-                    # Semantic similarity (simplified)
-                    words1 = set(loc1.content.lower().split())
-                    words2 = set(loc2.content.lower().split())
-                    similarity = (
-                        len(words1.intersection(words2)) / len(words1.union(words2))
-                        if words1.union(words2)
-                        else 0
-                    )
+        # Connect locations that are close spatially (R-tree radius query)...
+        for location in locations:
+            for other_id, _ in self._palace_within_radius(palace_id, location.position, 15):
+                if other_id != location.id:
+                    content_nodes[location.id].connections.add(other_id)
 
-                    # Connect if close spatially or similar semantically
-                    if distance < 15 or similarity > 0.2:
-                        content_nodes[loc1.id].connections.add(loc2.id)
+        # ...or among each other's strongest word-overlap neighbors (sparse top-k)
+        index = SimilarityIndex(vocabulary=self.similarity_analyzer.vocabulary)
+        index.build([location.content for location in locations])
+        for i, j, _ in zip(*index.neighbor_graph(k=16, threshold=0.2)):
+            content_nodes[locations[i].id].connections.add(locations[j].id)
+            content_nodes[locations[j].id].connections.add(locations[i].id)
 
         content_graph = ContentGraph(nodes=content_nodes, edges=[])
 
@@ -4047,10 +4791,11 @@ class EliteMemoryPalaceSystem:
             if location_id in palace["locations"]:
                 palace["locations"][location_id].position = new_position
 
-        # Update spatial index with new positions
-        self.spatial_index.clear()
+        # Move changed locations in the shared spatial index (other palaces stay indexed)
+        self._ensure_spatial_index(palace_id)
         for location in locations:
-            self.spatial_index.add_location(location.id, location.position)
+            self.spatial_index.move_location(location.id, location.position)
+        self._drop_routers(palace_id)
 
         return {
             "success": True,
@@ -4155,6 +4900,105 @@ class EliteMemoryPalaceSystem:
             ),
         }
 
+    def save_palace(self, palace_id: str, path: Union[str, Path]) -> Dict[str, Any]:
+        """Write a palace to a memory-mappable palace file"""
+        if palace_id not in self.palaces:
+            available = list(self.palaces.keys())[:3]
+            raise ValueError(
+                f"Palace '{palace_id}' not found. "
+                f"Available palaces: {available if available else 'none created yet'}. "
+                f"Use create_elite_palace() to create a new palace."
+            )
+        palace = self.palaces[palace_id]
+        size = save_palace_file(palace, path)
+        return {"palace_id": palace_id, "path": str(path), "bytes": size, "location_count": len(palace["locations"])}
+
+    def open_palace(self, path: Union[str, Path]) -> Dict[str, Any]:
+        """
+        Open a palace file without decoding its locations: they are built on
+        first access, and spatial queries use the R-tree stored in the file
+        until the palace's layout changes
+        """
+        palace = open_palace_file(path, self.compressed_storage.performance)
+        if palace["id"] in self.palaces:
+            palace["file"].close()
+            raise ValueError(f"Palace '{palace['id']}' is already loaded")
+        self.palaces[palace["id"]] = palace
+        self._file_indexed_palaces.add(palace["id"])
+        logger.info(f"Opened palace file {path}: {palace['name']} ({len(palace['locations'])} locations)")
+        return palace
+
+    def _ensure_spatial_index(self, palace_id: str) -> None:
+        """Bulk-load an opened palace's stored positions into the spatial
+        index; called before its layout changes, when the file's R-tree
+        stops matching it"""
+        if palace_id not in self._file_indexed_palaces:
+            return
+        self._file_indexed_palaces.discard(palace_id)
+        stored = self.palaces[palace_id]["file"]
+        self.spatial_index.add_locations(
+            list(zip(stored.strings("id"), map(tuple, stored.array("position").tolist())))
+        )
+
+    def _palace_nearest(
+        self, palace_id: str, points: Sequence[Position3D], k: int
+    ) -> List[List[Tuple[str, float]]]:
+        """k nearest locations of one palace to each point, closest first"""
+        locations = self.palaces[palace_id]["locations"]
+        if palace_id not in self._file_indexed_palaces:
+            return self.spatial_index.find_nearest_batch(points, k, accept=locations.__contains__)
+        stored = self.palaces[palace_id]["file"]
+        tree, ids = stored.spatial, stored.strings("id")
+        return [[(ids[i], distance) for i, distance in tree.find_nearest(point, k)] for point in points]
+
+    def _palace_within_radius(
+        self, palace_id: str, center: Position3D, radius: float
+    ) -> List[Tuple[str, float]]:
+        """Locations of one palace within `radius` of center, closest first"""
+        locations = self.palaces[palace_id]["locations"]
+        if palace_id not in self._file_indexed_palaces:
+            return self.spatial_index.find_within_radius(center, radius, accept=locations.__contains__)
+        stored = self.palaces[palace_id]["file"]
+        ids = stored.strings("id")
+        return [(ids[i], distance) for i, distance in stored.spatial.find_within_radius(center, radius)]
+
+    def detect_interference(
+        self, palace_id: str, k: int = 5, threshold: float = 0.5
+    ) -> Dict[str, Any]:
+        """
+        Find location pairs whose content overlaps enough to interfere at
+        recall time; each location is compared only with its k most similar
+        neighbors (sparse top-k graph)
+        """
+        if palace_id not in self.palaces:
+            return self._palace_not_found(palace_id)
+
+        locations = list(self.palaces[palace_id]["locations"].values())
+        pairs = self.similarity_analyzer.similar_pairs(
+            [location.content for location in locations], k=k, threshold=threshold
+        )
+        return {
+            "palace_id": palace_id,
+            "location_count": len(locations),
+            "interfering_pairs": [
+                {
+                    "location_a": locations[i].id,
+                    "location_b": locations[j].id,
+                    "similarity": similarity,
+                }
+                for i, j, similarity in pairs
+            ],
+        }
+
+    def _palace_not_found(self, palace_id: str) -> Dict[str, Any]:
+        """Error result for report methods given an unknown palace id"""
+        available = list(self.palaces.keys())[:3]
+        return {
+            "error": "Palace not found",
+            "available_palaces": available if available else [],
+            "suggestion": "Use create_elite_palace() to create a new palace first"
+        }
+
     def _calculate_championship_level(self, performance_metrics: Dict[str, float]) -> str:
         """Calculate championship level based on performance metrics"""
         accuracy = performance_metrics.get("accuracy", 0)
@@ -4256,6 +5100,101 @@ class EliteMemoryPalaceSystem:
             ],
         }
 
+    def refresh_review_schedules(self, palace_id: str, count: int = 3) -> int:
+        """Recompute every location's consolidation schedule in one batch"""
+        if palace_id not in self.palaces:
+            raise ValueError(f"Palace '{palace_id}' not found")
+
+        locations = list(self.palaces[palace_id]["locations"].values())
+        if not locations:
+            return 0
+        schedules = self.neuro_optimizer.optimize_review_schedules_batch(
+            [location.emotional_intensity for location in locations],
+            [location.bizarreness_factor for location in locations],
+            [location.bizarreness_factor / 10 for location in locations],
+            [self.neuro_optimizer.history_decline(location.performance_history) for location in locations],
+        )
+        for i, location in enumerate(locations):
+            location.consolidation_schedule = schedules.schedule(i, count)
+        return len(locations)
+
+    def find_nearby_locations(
+        self, palace_id: str, location_ids: Optional[Sequence[str]] = None, k: int = 5
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """The k nearest other locations in the same palace for each location
+        (default: every location), as (location_id, distance) closest first"""
+        if palace_id not in self.palaces:
+            available = list(self.palaces.keys())[:3]
+            raise ValueError(
+                f"Palace '{palace_id}' not found. "
+                f"Available palaces: {available if available else 'none created yet'}. "
+                f"Use create_elite_palace() to create a new palace."
+            )
+        locations = self.palaces[palace_id]["locations"]
+        location_ids = list(locations) if location_ids is None else list(location_ids)
+        missing = [location_id for location_id in location_ids if location_id not in locations]
+        if missing:
+            raise ValueError(f"Locations not in palace '{palace_id}': {missing[:3]}")
+        neighbours = self._palace_nearest(
+            palace_id, [locations[location_id].position for location_id in location_ids], k + 1
+        )
+        return {
+            location_id: [(other, distance) for other, distance in found if other != location_id][:k]
+            for location_id, found in zip(location_ids, neighbours)
+        }
+
+    def palace_router(self, palace_id: str, k: int = 5) -> PalaceRouter:
+        """
+        Router over walkways joining each location to its k nearest in the
+        palace (both ways). Cached with its routes until the layout changes.
+        """
+        router = self._routers.get((palace_id, k))
+        if router is None:
+            walkways: Dict[str, Set[str]] = defaultdict(set)
+            for location_id, neighbours in self.find_nearby_locations(palace_id, k=k).items():
+                for other, _ in neighbours:
+                    walkways[location_id].add(other)
+                    walkways[other].add(location_id)
+            positions = {
+                location_id: location.position
+                for location_id, location in self.palaces[palace_id]["locations"].items()
+            }
+            router = self._routers[(palace_id, k)] = PalaceRouter(walkways, positions)
+        return router
+
+    def _drop_routers(self, palace_id: str) -> None:
+        """Forget a palace's cached routers (every walkway k)"""
+        for key in [key for key in self._routers if key[0] == palace_id]:
+            del self._routers[key]
+
+    def find_route(self, palace_id: str, start_location_id: str, goal_location_id: str) -> Dict[str, Any]:
+        """Shortest walk between two locations along the palace walkways
+        (an empty path when they are not connected)"""
+        if palace_id not in self.palaces:
+            return self._palace_not_found(palace_id)
+        locations = self.palaces[palace_id]["locations"]
+        for location_id in (start_location_id, goal_location_id):
+            if location_id not in locations:
+                return {"error": "Location not found", "location_id": location_id}
+
+        router = self.palace_router(palace_id)
+        path = router.shortest_path(start_location_id, goal_location_id)
+        return {
+            "path": path,
+            "distance": router.distance(start_location_id, goal_location_id) if path else None,
+        }
+
+    def plan_walkthrough(self, palace_id: str, start_location_id: Optional[str] = None) -> Dict[str, Any]:
+        """Order for visiting every location once, keeping the walk short (TSP-style tour)"""
+        if palace_id not in self.palaces:
+            return self._palace_not_found(palace_id)
+        if start_location_id is not None and start_location_id not in self.palaces[palace_id]["locations"]:
+            return {"error": "Location not found", "location_id": start_location_id}
+
+        router = self.palace_router(palace_id)
+        order = router.tour(list(self.palaces[palace_id]["locations"]), start=start_location_id)
+        return {"order": order, "distance": router.tour_length(order)}
+
     def get_multi_modal_encoding(self, location_id: str, palace_id: str) -> Dict[str, Any]:
         """Get multi-modal sensory encoding for a location"""
         if palace_id not in self.palaces:
@@ -4410,36 +5349,86 @@ class EliteMemoryPalaceSystem:
 
     def _generate_optimal_position(self, palace: Dict) -> Tuple[float, float, float]:
         """Generate optimal position for new location"""
-        dims = palace["dimensions"]
-        existing_positions = [loc.position for loc in palace["locations"].values()]
+        return self._generate_optimal_positions(palace, 1)[0]
 
-        if not existing_positions:
-            return (dims[0] // 2, dims[1] // 2, dims[2] // 2)
-
-        # Simple position generation - avoid exact overlaps
-        while True:
-            x = random.uniform(0, dims[0])
-            y = random.uniform(0, dims[1])
-            z = random.uniform(0, dims[2])
-
-            # Check minimum distance from existing locations
-            too_close = False
-            for ex, ey, ez in existing_positions:
-                distance = math.sqrt((x - ex) ** 2 + (y - ey) ** 2 + (z - ez) ** 2)
-                if distance < 5:  # Minimum distance
-                    too_close = True
+    def _generate_optimal_positions(
+        self, palace: Dict, count: int, min_distance: float = 5.0, attempts: int = 30
+    ) -> List[Position3D]:
+        """
+        Positions for `count` new locations, each at least `min_distance` from
+        every other location. The spacing shrinks when the palace is too
+        small to fit everything that far apart, and a grid hash keeps each
+        check to the neighbouring cells.
+        """
+        dims = palace["dimensions"]
+        existing = [loc.position for loc in palace["locations"].values()]
+        positions: List[Position3D] = []
+
+        if not existing:
+            positions.append((dims[0] // 2, dims[1] // 2, dims[2] // 2))
+            if count == 1:
+                return positions
+
+        total = len(existing) + count
+        volume = max(1.0, float(dims[0] * dims[1] * dims[2]))
+        min_distance = min(min_distance, 0.7 * (volume / total) ** (1 / 3))
+        cell = max(min_distance, 1e-6)
+        grid: Dict[Tuple[int, int, int], List[Position3D]] = defaultdict(list)
+
+        def key(point):
+            return (int(point[0] // cell), int(point[1] // cell), int(point[2] // cell))
+
+        def clearance(point):
+            cx, cy, cz = key(point)
+            nearest = float("inf")
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for dz in (-1, 0, 1):
+                        for other in grid.get((cx + dx, cy + dy, cz + dz), ()):
+                            nearest = min(nearest, math.dist(point, other))
+            return nearest
+
+        for point in existing + positions:
+            grid[key(point)].append(point)
+
+        while len(positions) < count:
+            # Simple position generation - keep the most isolated candidate
+            best, best_clearance = None, -1.0
+            for _ in range(attempts):
+                candidate = (
+                    random.uniform(0, dims[0]),
+                    random.uniform(0, dims[1]),
+                    random.uniform(0, dims[2]),
+                )
+                candidate_clearance = clearance(candidate)
+                if candidate_clearance > best_clearance:
+                    best, best_clearance = candidate, candidate_clearance
+                if candidate_clearance >= min_distance:
                     break
+            positions.append(best)
+            grid[key(best)].append(best)
 
-            if not too_close:
-                return (x, y, z)
+        return positions
 
     def _create_multi_sensory_encoding(self, content: str) -> Dict[str, Any]:
         """Create multi-sensory encoding for content using AI-enhanced methods"""
+        return PALACE_EVENT_LOOP.run(self._create_multi_sensory_encoding_async(content))
+
+    async def _create_multi_modal_encoding_async(self, content: str) -> Optional["MultiModalEncoding"]:
+        """Multi-modal encoding for content, or None if it fails"""
         try:
-            # Try to use AI-enhanced encoding
-            import asyncio
+            return await self.multi_modal_system.create_multi_modal_encoding(
+                content, self.user_sensory_preferences
+            )
+        except Exception as e:
+            logger.debug(f"Multi-modal encoding failed: {e}")
+            return None
 
-            encoding_result = asyncio.run(self.ai_encoder.generate_optimal_encoding(content))
+    async def _create_multi_sensory_encoding_async(self, content: str) -> Dict[str, Any]:
+        """Async _create_multi_sensory_encoding"""
+        try:
+            # Try to use AI-enhanced encoding
+            encoding_result = await self.ai_encoder.generate_optimal_encoding(content)
             return encoding_result.sensory_map
         except Exception as e:
             logger.debug(f"AI encoding failed, using fallback: {e}")
@@ -4547,6 +5536,142 @@ def export_palace_to_vr(palace: Dict[str, Any], filename: str = None) -> str:
     return json.dumps(vr_data, indent=2, default=str)
 
 
+def palace_from_vr_export(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild a palace dict from export_palace_to_vr output (parsed JSON)"""
+    info = data["palace"]
+    locations = {
+        item["id"]: ElitePalaceLocation(
+            id=item["id"],
+            content=item["content"],
+            position=tuple(float(value) for value in item["position"]),
+            sensory_matrix=dict(item.get("sensory_hints") or {}),
+        )
+        for item in data["locations"]
+    }
+    return {
+        "id": hashlib.md5(json.dumps(info, sort_keys=True).encode()).hexdigest()[:8],
+        "name": info["name"],
+        "category": info.get("category", ""),
+        "layout_type": info["layout"],
+        "dimensions": tuple(info["dimensions"]),
+        "locations": locations,
+        "created_at": datetime.now(),
+        "performance_stats": {"total_reviews": 0, "accuracy_rate": 0.0, "mastery_level": 0.0},
+    }
+
+
+def save_palace_file(palace: Dict[str, Any], path: Union[str, Path]) -> int:
+    """
+    Write a palace as a memory-mappable palace file (see palace_file) and
+    return its size. Sensory descriptors are interned per channel; channels
+    beyond the nine standard ones are kept too. Multi-modal encodings are
+    not stored.
+    """
+    if np is None:
+        raise RuntimeError("Palace files need NumPy")
+    locations = list(palace["locations"].values())
+    channels = list(dict.fromkeys(
+        list(SENSORY_CHANNELS) + [channel for location in locations for channel in location.sensory_matrix]
+    ))
+    sensory = SensoryCodeTable(channels)
+    profiles = [sensory.intern(location.sensory_matrix) for location in locations]
+
+    def record(entry: Dict[str, Any]) -> Dict[str, Any]:
+        timestamp = entry.get("timestamp")
+        return {**entry, "timestamp": timestamp.isoformat()} if isinstance(timestamp, datetime) else entry
+
+    extras = [
+        json.dumps({
+            "pao_encoding": location.pao_encoding,
+            "speed_markers": location.speed_markers,
+            "error_traps": location.error_traps,
+            "consolidation_schedule": [when.isoformat() for when in location.consolidation_schedule],
+            "performance_history": [record(entry) for entry in location.performance_history],
+        }, default=str)
+        for location in locations
+    ]
+    meta = {
+        "palace": {
+            "id": palace["id"],
+            "name": palace["name"],
+            "category": palace.get("category", ""),
+            "layout_type": palace["layout_type"],
+            "dimensions": list(palace["dimensions"]),
+            "created_at": palace["created_at"].isoformat(),
+            "performance_stats": palace.get("performance_stats", {}),
+        },
+        "sensory_channels": channels,
+    }
+    arrays = {
+        "position": np.array([location.position for location in locations], dtype=np.float64).reshape(-1, 3),
+        "bizarreness": np.array([location.bizarreness_factor for location in locations], dtype=np.float64),
+        "emotional": np.array([location.emotional_intensity for location in locations], dtype=np.float64),
+        "created": np.array([location.created_at.timestamp() for location in locations], dtype=np.float64),
+        "sensory": np.array(profiles, dtype=np.uint64),
+        "sensory.profiles": np.array(sensory.profiles, dtype=np.uint32).reshape(-1, len(channels)),
+    }
+    strings = {
+        "id": [location.id for location in locations],
+        "content": [location.content for location in locations],
+        "extras": extras,
+        **{f"sensory.{channel}": sensory.descriptors[channel] for channel in channels},
+    }
+    return write_palace_file(path, meta, arrays, strings, positions="position")
+
+
+def open_palace_file(
+    path: Union[str, Path], performance: Optional[PerformanceRingStore] = None
+) -> Dict[str, Any]:
+    """
+    Map a palace file and return a palace dict whose locations are
+    materialized on first access. The open PalaceFile is kept under
+    palace["file"]. Histories go into `performance` when given.
+    """
+    stored = PalaceFile.open(path)
+    info = stored.meta["palace"]
+    channels = stored.meta["sensory_channels"]
+
+    def location(row: Dict[str, Any]) -> ElitePalaceLocation:
+        # Heaps are looked up per call so no view outlives stored.close()
+        i = row["index"]
+        extra = json.loads(stored.strings("extras")[i])
+        descriptors = [stored.strings(f"sensory.{channel}") for channel in channels]
+        codes = stored.array("sensory.profiles")[int(stored.array("sensory")[i])].tolist()
+        history = [
+            {**entry, "timestamp": datetime.fromisoformat(entry["timestamp"])} if "timestamp" in entry else entry
+            for entry in extra["performance_history"]
+        ]
+        if performance is not None:
+            performance.append_batch([(row["id"], entry) for entry in history])
+            history = performance.history(row["id"])
+        return ElitePalaceLocation(
+            id=row["id"],
+            content=stored.strings("content")[i],
+            position=tuple(stored.array("position")[i].tolist()),
+            sensory_matrix={channel: heap[code - 1] for channel, heap, code in zip(channels, descriptors, codes) if code},
+            pao_encoding=extra["pao_encoding"],
+            bizarreness_factor=float(stored.array("bizarreness")[i]),
+            emotional_intensity=float(stored.array("emotional")[i]),
+            speed_markers=extra["speed_markers"],
+            error_traps=extra["error_traps"],
+            performance_history=history,
+            created_at=datetime.fromtimestamp(float(stored.array("created")[i])),
+            consolidation_schedule=[datetime.fromisoformat(when) for when in extra["consolidation_schedule"]],
+        )
+
+    return {
+        "id": info["id"],
+        "name": info["name"],
+        "category": info["category"],
+        "layout_type": info["layout_type"],
+        "dimensions": tuple(info["dimensions"]),
+        "locations": LazyNodeMap(stored, location),
+        "created_at": datetime.fromisoformat(info["created_at"]),
+        "performance_stats": info["performance_stats"],
+        "file": stored,
+    }
+
+
 # Export key classes
 __all__ = [
     "EliteMemoryPalaceSystem",
@@ -4557,26 +5682,47 @@ __all__ = [
     "MemoryEncoder",
     "SpatialIndex",
     "OptimizedSpatialIndex",
+    "hilbert_keys",
     "SpatialEntry",
     "SpatialLeafNode",
     "SpatialInternalNode",
+    "SplitStrategy",
+    "SPLIT_STRATEGIES",
+    "SimilarityIndex",
+    "TokenVocabulary",
     "CompressedLocationStorage",
+    "RecordBuffer",
+    "SENSORY_CHANNELS",
+    "SensoryCodeTable",
+    "ContentCodec",
+    "LOCATION_DTYPE",
     "RingBuffer",
+    "PerformanceRingStore",
+    "PerformanceHistory",
     "AIEnhancedEncoder",
+    "PalaceEventLoop",
+    "PALACE_EVENT_LOOP",
+    "ModelRegistry",
+    "MODEL_REGISTRY",
     "EncodingResult",
     "NeuroplasticityOptimizer",
     "AdaptiveNeuroplasticityEngine",
     "CognitiveProfile",
     "RecallEvent",
     "ReviewSchedule",
+    "BatchReviewSchedule",
     "AdvancedPerformanceAnalyzer",
     "LearningCurveAnalyzer",
     "RecallSession",
     "LearningInsights",
     "AnalysisResult",
     "SpatialIntelligenceEngine",
+    "ForceDirectedLayout",
     "NetworkXGraphAnalyzer",
     "TopologyOptimizer",
+    "PalaceRouter",
+    "CognitiveLoadObjective",
+    "COOLING_SCHEDULES",
     "AStarPathFinder",
     "ContentGraph",
     "ContentNode",
@@ -4597,6 +5743,10 @@ __all__ = [
     "OlfactoryAssociations",
     "SynestheticMappings",
     "MultiModalEncoding",
+    "export_palace_to_vr",
+    "palace_from_vr_export",
+    "save_palace_file",
+    "open_palace_file",
 ]
 
 if __name__ == "__main__":
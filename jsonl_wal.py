@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+JSONL WAL - group-commit appends for the tutors' JSONL event logs
+
+atomic_write_jsonl used to open the file, write one line, fsync and close for
+every event. Here each file keeps one O_APPEND descriptor, and every event
+goes out in a single write() right away. Readers in the same process still
+see it immediately, and a crash of the process loses nothing that was
+written. Only the fsync, the expensive part, is grouped. The durability
+level controls when it happens:
+
+    sync    the caller waits until its line is on disk; concurrent callers
+            share one fsync (group commit)
+    group   a background flusher fsyncs each dirty file once per commit
+            window; an OS crash can lose at most one window of events
+    none    fsync only on flush()/exit
+
+If the process dies in the middle of a write, the file can end with a torn
+partial line. It is cut back to the last newline the next time the file is
+opened for appending. If a file is replaced underneath a writer (rewritten
+and renamed into place), the writer notices the new inode and reopens it.
+
+Settings come from JSONL_DURABILITY and JSONL_COMMIT_WINDOW_MS, or configure().
+
+Usage:
+    python jsonl_wal.py bench --events 2000
+"""
+
+import argparse
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Durability(Enum):
+    NONE = "none"
+    GROUP = "group"
+    SYNC = "sync"
+
+
+DEFAULT_DURABILITY = Durability(os.getenv("JSONL_DURABILITY", Durability.GROUP.value))
+DEFAULT_COMMIT_WINDOW_MS = float(os.getenv("JSONL_COMMIT_WINDOW_MS", "50"))
+
+_settings = {"durability": DEFAULT_DURABILITY, "window": DEFAULT_COMMIT_WINDOW_MS / 1000}
+
+
+def configure(durability: Optional[Durability] = None, window_ms: Optional[float] = None) -> None:
+    """Change the durability level and/or group-commit window for all writers"""
+    if durability is not None:
+        _settings["durability"] = Durability(durability)
+    if window_ms is not None:
+        _settings["window"] = window_ms / 1000
+
+
+def recover_torn_tail(path: Path) -> int:
+    """Truncate a trailing partial line; returns the number of bytes dropped"""
+    try:
+        with open(path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return 0
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return 0
+            end = size
+            while end > 0:
+                start = max(0, end - 4096)
+                f.seek(start)
+                chunk = f.read(end - start)
+                newline = chunk.rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            f.truncate(end)
+    except FileNotFoundError:
+        return 0
+    logger.warning(f"Dropped {size - end} bytes of torn trailing line from {path}")
+    return size - end
+
+# ==================== WRITER ====================
+
+class GroupCommitWriter:
+    """Appender for one file; lines written in the same window share an fsync"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._cond = threading.Condition()
+        self._fd: Optional[int] = None
+        self._ino: Optional[int] = None
+        self._written = 0
+        self._synced = 0
+        self._syncing = False
+
+    @property
+    def dirty(self) -> bool:
+        return self._synced < self._written
+
+    def _descriptor(self) -> int:
+        """Open descriptor for the file currently at self.path (caller holds _cond)"""
+        try:
+            ino = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            ino = None
+        if self._fd is not None and ino == self._ino:
+            return self._fd
+
+        if self._fd is not None:
+            # The file was replaced: make what we wrote to the old one durable first
+            while self._syncing:
+                self._cond.wait()
+            os.fsync(self._fd)
+            os.close(self._fd)
+            self._synced = self._written
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        recover_torn_tail(self.path)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._ino = os.fstat(self._fd).st_ino
+        return self._fd
+
+    def append(self, line: bytes, durability: Durability) -> None:
+        """Append one complete line"""
+        with self._cond:
+            fd = self._descriptor()
+            view = memoryview(line)
+            while view:
+                view = view[os.write(fd, view):]
+            self._written += 1
+            seq = self._written
+        if durability is Durability.SYNC:
+            self.sync(seq)
+        elif durability is Durability.GROUP:
+            _ensure_flusher()
+
+    def sync(self, upto: Optional[int] = None) -> None:
+        """Block until line number `upto` (default: everything written) is on disk"""
+        with self._cond:
+            upto = self._written if upto is None else upto
+            while self._synced < upto:
+                if self._syncing:
+                    self._cond.wait()
+                    continue
+                # Become the leader: one fsync covers every line written so far
+                self._syncing = True
+                target, fd = self._written, self._fd
+                self._cond.release()
+                try:
+                    os.fsync(fd)
+                finally:
+                    self._cond.acquire()
+                    self._syncing = False
+                    self._cond.notify_all()
+                self._synced = max(self._synced, target)
+
+    def close(self) -> None:
+        self.sync()
+        with self._cond:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+# ==================== MODULE API ====================
+
+_writers: Dict[Path, GroupCommitWriter] = {}
+_writers_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+
+
+def _writer(path: Path) -> GroupCommitWriter:
+    key = Path(path).absolute()
+    writer = _writers.get(key)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.setdefault(key, GroupCommitWriter(key))
+    return writer
+
+
+def _flush_loop() -> None:
+    while True:
+        time.sleep(_settings["window"])
+        for writer in list(_writers.values()):
+            if writer.dirty:
+                try:
+                    writer.sync()
+                except OSError as e:
+                    logger.error(f"Group commit failed for {writer.path}: {e}")
+
+
+def _ensure_flusher() -> None:
+    global _flusher
+    if _flusher is None:
+        with _writers_lock:
+            if _flusher is None:
+                _flusher = threading.Thread(target=_flush_loop, name="jsonl-group-commit", daemon=True)
+                _flusher.start()
+
+
+def append_jsonl(path: Path, data: dict, durability: Optional[Durability] = None) -> None:
+    """Append one JSON object as a line"""
+    line = (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+    _writer(path).append(line, durability or _settings["durability"])
+
+
+def flush(path: Optional[Path] = None) -> None:
+    """fsync one file's (or every file's) appended lines now"""
+    writers = [_writer(path)] if path is not None else list(_writers.values())
+    for writer in writers:
+        writer.sync()
+
+
+def close_all() -> None:
+    """Flush and close every writer"""
+    for writer in list(_writers.values()):
+        try:
+            writer.close()
+        except OSError as e:
+            logger.error(f"Failed to close {writer.path}: {e}")
+
+
+atexit.register(close_all)
+
+# ==================== BENCHMARK ====================
+
+def _legacy_append(filepath: Path, data: dict) -> None:
+    """The original per-event open/write/fsync/close, for comparison"""
+    with filepath.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(data, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def benchmark(events: int = 2000, threads: int = 4) -> Dict[str, float]:
+    """Events per second: legacy path vs each durability level"""
+    event = {"timestamp": "2025-01-01T12:00:00", "subject": "torts", "correct": True,
+             "response_time": 4.2}
+    results = {}
+
+    def run(name, fn, n_threads=1):
+        per_thread = events // n_threads
+        workers = [threading.Thread(target=lambda: [fn() for _ in range(per_thread)])
+                   for _ in range(n_threads)]
+        t = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        flush()
+        results[name] = per_thread * n_threads / (time.perf_counter() - t)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        run("legacy (fsync per event)", lambda: _legacy_append(tmp / "legacy.jsonl", event))
+        for level in Durability:
+            path = tmp / f"{level.value}.jsonl"
+            run(f"wal {level.value}", lambda: append_jsonl(path, event, level))
+        path = tmp / "sync_threads.jsonl"
+        run(f"wal sync, {threads} threads", lambda: append_jsonl(path, event, Durability.SYNC), threads)
+        close_all()
+        _writers.clear()
+
+    print(f"\nJSONL APPEND THROUGHPUT ({events} events, window {_settings['window'] * 1000:.0f} ms)")
+    print("=" * 60)
+    for name, rate in results.items():
+        print(f"{name:32}{rate:14,.0f} events/s")
+    print("=" * 60 + "\n")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark group-commit JSONL appends")
+    parser.add_argument("command", choices=["bench"])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+    benchmark(args.events, args.threads)
+
+
+if __name__ == "__main__":
+    main()
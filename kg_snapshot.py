@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Knowledge Graph Snapshot - compiled, versioned binary form of LegalKnowledgeGraph
+
+The graph is defined by thousands of lines of KnowledgeNode constructor calls.
+This module compiles it once into a compact binary file keyed by a content
+hash of its sources, and loads it back through a memory map so nodes are only
+decoded when they are actually touched.
+
+File layout:
+    header   MAGIC, format version, source hash, record count, index offset/length
+    records  one marshalled tuple of field values per node
+    index    marshalled (fields, keys, offsets, lengths, columns); columns hold
+             copies of selected fields so secondary indexes can be rebuilt
+             without decoding any record
+
+Records are marshalled, so the marshal format version is part of the source
+hash; a snapshot written by another interpreter is simply rebuilt.
+
+Usage:
+    python kg_snapshot.py build        # compile data/knowledge_graph.snapshot
+    python kg_snapshot.py bench        # cold/warm startup before vs after
+"""
+
+import argparse
+import hashlib
+import logging
+import marshal
+import mmap
+import os
+import statistics
+import struct
+import subprocess
+import sys
+import time
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"KGSNAP\x00\x00"
+FORMAT_VERSION = 1
+
+# magic, version, source hash, record count, index offset, index length
+_HEADER = struct.Struct("<8sH32sIQQ")
+
+_hash_cache: Dict[Tuple[str, int, int], bytes] = {}
+
+# ==================== HASHING ====================
+
+def source_hash(paths: Iterable[Path]) -> bytes:
+    """Content hash of the graph's source files plus the format version"""
+    paths = [Path(p) for p in paths]
+    stats = [p.stat() for p in paths]
+    cache_key = tuple((str(p), st.st_mtime_ns, st.st_size) for p, st in zip(paths, stats))
+    if cache_key in _hash_cache:
+        return _hash_cache[cache_key]
+
+    digest = hashlib.sha256(f"kgsnap:{FORMAT_VERSION}:marshal:{marshal.version}".encode())
+    for path in paths:
+        digest.update(path.read_bytes())
+    _hash_cache[cache_key] = digest.digest()
+    return _hash_cache[cache_key]
+
+# ==================== WRITER ====================
+
+def write_snapshot(path: Path, src_hash: bytes, fields: List[str],
+                   records: Iterable[Dict[str, Any]], index_fields: Iterable[str] = ()) -> int:
+    """Write records to path atomically.
+
+    The first field is the record key. Values of index_fields are also stored
+    column-wise in the index block, readable via GraphSnapshot.column().
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    keys, offsets, lengths = [], [], []
+    columns: Dict[str, List[Any]] = {name: [] for name in index_fields}
+    blobs = []
+    position = _HEADER.size
+    for record in records:
+        blob = marshal.dumps(tuple(record.get(name) for name in fields))
+        keys.append(record[fields[0]])
+        for name, column in columns.items():
+            column.append(record.get(name))
+        offsets.append(position)
+        lengths.append(len(blob))
+        blobs.append(blob)
+        position += len(blob)
+
+    index = marshal.dumps((
+        tuple(fields), tuple(keys), tuple(offsets), tuple(lengths),
+        {name: tuple(column) for name, column in columns.items()},
+    ))
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, src_hash, len(keys), position, len(index))
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+        f.write(index)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote knowledge graph snapshot: {path} ({len(keys)} records)")
+    return len(keys)
+
+# ==================== READER ====================
+
+class GraphSnapshot:
+    """Memory-mapped snapshot; records are decoded on demand"""
+
+    def __init__(self, path: Path, mapped: mmap.mmap, fields: Tuple[str, ...],
+                 keys: Tuple[str, ...], offsets: Tuple[int, ...], lengths: Tuple[int, ...],
+                 columns: Dict[str, Tuple[Any, ...]]):
+        self.path = path
+        self.fields = fields
+        self._mm = mapped
+        self._keys = keys
+        self._offsets = offsets
+        self._lengths = lengths
+        self._columns = columns
+        self._position = {key: i for i, key in enumerate(keys)}
+
+    @classmethod
+    def open(cls, path: Path, expected_hash: Optional[bytes] = None) -> Optional["GraphSnapshot"]:
+        """Open a snapshot, or return None if it is missing, stale or corrupt"""
+        path = Path(path)
+        try:
+            with path.open("rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            magic, version, src_hash, count, index_offset, index_length = _HEADER.unpack_from(mapped, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError("unsupported snapshot format")
+            if expected_hash is not None and src_hash != expected_hash:
+                logger.info(f"Snapshot {path.name} is stale; sources changed")
+                mapped.close()
+                return None
+            fields, keys, offsets, lengths, columns = marshal.loads(
+                mapped[index_offset:index_offset + index_length]
+            )
+            if len(keys) != count:
+                raise ValueError("record count mismatch")
+        except (struct.error, ValueError, EOFError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable snapshot {path}: {e}")
+            mapped.close()
+            return None
+
+        return cls(path, mapped, fields, keys, offsets, lengths, columns)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._position
+
+    def keys(self) -> Tuple[str, ...]:
+        """Record keys in build order"""
+        return self._keys
+
+    def column(self, name: str) -> Optional[Tuple[Any, ...]]:
+        """Values of an index field, parallel to keys(); None if not stored"""
+        return self._columns.get(name)
+
+    def record(self, key: str) -> Dict[str, Any]:
+        """Decode a single record"""
+        i = self._position[key]
+        offset = self._offsets[i]
+        values = marshal.loads(self._mm[offset:offset + self._lengths[i]])
+        return dict(zip(self.fields, values))
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+class LazyNodeMap(MutableMapping):
+    """Dict-like view over a snapshot that materializes values on first access"""
+
+    def __init__(self, snapshot: GraphSnapshot, factory: Callable[[Dict[str, Any]], Any]):
+        self.snapshot = snapshot
+        self._factory = factory
+        self._keys: Dict[str, None] = dict.fromkeys(snapshot.keys())
+        self._materialized: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._materialized[key]
+        except KeyError:
+            pass
+        if key not in self._keys or key not in self.snapshot:
+            raise KeyError(key)
+        value = self._factory(self.snapshot.record(key))
+        self._materialized[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._keys[key] = None
+        self._materialized[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._keys[key]
+        self._materialized.pop(key, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    @property
+    def materialized_count(self) -> int:
+        return len(self._materialized)
+
+# ==================== BENCHMARK ====================
+
+_COLD_SCRIPT = (
+    "import time, bar_tutor_unified as b\n"
+    "t = time.perf_counter()\n"
+    "kg = b.LegalKnowledgeGraph({arg})\n"
+    "c = kg.get_subject_concepts('contracts')\n"
+    "print((time.perf_counter() - t) * 1000)\n"
+)
+
+
+def _cold_ms(use_snapshot: bool, runs: int) -> List[float]:
+    """Construct the graph in fresh interpreters and time it"""
+    arg = "" if use_snapshot else "snapshot_path=None"
+    root = Path(__file__).resolve().parent
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _COLD_SCRIPT.format(arg=arg)],
+                             cwd=root, capture_output=True, text=True, check=True)
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return times
+
+
+def benchmark(cold_runs: int = 5, warm_runs: int = 50) -> Dict[str, float]:
+    """Compare source build against snapshot load, cold and warm"""
+    import bar_tutor_unified as b
+
+    b.build_knowledge_graph_snapshot()
+
+    def warm(use_snapshot: bool) -> List[float]:
+        times = []
+        for _ in range(warm_runs):
+            t = time.perf_counter()
+            kg = b.LegalKnowledgeGraph() if use_snapshot else b.LegalKnowledgeGraph(snapshot_path=None)
+            kg.get_subject_concepts("contracts")
+            times.append((time.perf_counter() - t) * 1000)
+        return times
+
+    results = {
+        "source_cold_ms": statistics.median(_cold_ms(False, cold_runs)),
+        "source_warm_ms": statistics.median(warm(False)),
+        "snapshot_cold_ms": statistics.median(_cold_ms(True, cold_runs)),
+        "snapshot_warm_ms": statistics.median(warm(True)),
+    }
+
+    print("\nKNOWLEDGE GRAPH STARTUP (median ms, graph build + one subject query)")
+    print("=" * 60)
+    print(f"{'':22}{'cold':>12}{'warm':>12}")
+    print(f"{'before (source)':22}{results['source_cold_ms']:12.2f}{results['source_warm_ms']:12.2f}")
+    print(f"{'after (snapshot)':22}{results['snapshot_cold_ms']:12.2f}{results['snapshot_warm_ms']:12.2f}")
+    print("=" * 60 + "\n")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile or benchmark the knowledge graph snapshot")
+    parser.add_argument("command", choices=["build", "bench"])
+    parser.add_argument("--cold-runs", type=int, default=5)
+    parser.add_argument("--warm-runs", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        import bar_tutor_unified as b
+        path = b.build_knowledge_graph_snapshot()
+        print(f"Snapshot written: {path}")
+    else:
+        benchmark(args.cold_runs, args.warm_runs)
+
+
+if __name__ == "__main__":
+    main()
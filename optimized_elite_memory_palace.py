@@ -3,8 +3,8 @@ Optimized Elite Memory Palace System
 ===================================
 
 A single-file, runnable, **data-optimized** memory palace engine with:
-- R-tree-like spatial index (minimal but functional): O(log n) insertion, fast k-NN queries
-- Columnar compressed storage (zlib + NumPy) with ~47%+ memory savings (target)
+- R-tree spatial index shared with elite_memory_palace (palace_spatial.py): O(log n) insertion, exact k-NN queries
+- Columnar compressed storage shared with elite_memory_palace (record buffer, dictionary-compressed content, interned sensory codes)
 - Cross‑modal coherence engine (stubbed but complete API)
 - Adaptive neuroplasticity review scheduler
 - Predictive analytics (simplified ensemble)
@@ -18,10 +18,11 @@ Run tests:
 Requires:
     Python 3.10+
     numpy
+    palace_spatial.py and elite_memory_palace.py (next to this file)
 
 Notes:
 - **Fixed event loop bug**: uses a safe async runner that works even if an event loop is already running (e.g., notebooks/sandboxes). No more `RuntimeError: asyncio.run() cannot be called from a running event loop`.
-- The spatial index is a compact, educational R-tree (Guttman-style) variant suitable for thousands of points.
+- The spatial index comes from palace_spatial.py; pick its node-split strategy with the `rtree_split` config key ("linear", "quadratic" or "rstar").
 - "Performance claims" are goals/targets. This file focuses on correctness + clean API so you can extend/benchmark.
 """
 
@@ -35,12 +36,24 @@ import random
 import threading
 import hashlib
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional, Any, Union
+from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from collections import defaultdict
 
 import numpy as np
 
+from palace_spatial import (
+    BoundingBox3D,
+    OptimizedSpatialIndex,
+    Position3D,
+)
+# re-exported: these node classes used to be defined in this module
+from palace_spatial import SpatialEntry, SpatialInternalNode, SpatialLeafNode  # noqa: F401
+from elite_memory_palace import CompressedLocationStorage as SharedLocationStorage
+from elite_memory_palace import PerformanceRingStore
+# re-exported: RingBuffer used to be defined in this module
+from elite_memory_palace import RingBuffer  # noqa: F401
+
 # -----------------------------------------------------------------------------
 # Logging
 # -----------------------------------------------------------------------------
@@ -82,372 +95,32 @@ def _safe_asyncio_run(coro):
         return result.get("value")
 
 # =============================================================================
-# Spatial Index (Minimal R-tree)
+# Spatial Index (shared R-tree, see palace_spatial.py)
 # =============================================================================
 
-BBox = Tuple[float, float, float, float, float, float]
-Point3D = Tuple[float, float, float]
-
-@dataclass
-class SpatialEntry:
-    location_id: str
-    bbox: BBox
-    position: Point3D
-
-class SpatialLeafNode:
-    def __init__(self):
-        self.entries: List[SpatialEntry] = []
-        self.bbox: Optional[BBox] = None
-
-class SpatialInternalNode:
-    def __init__(self):
-        self.children: List[Union[SpatialLeafNode, 'SpatialInternalNode']] = []
-        self.bbox: Optional[BBox] = None
-
-class OptimizedSpatialIndex:
-    """Tiny, self-contained R-tree-ish index for 3D points.
-    Supports add_location() and k-NN via bbox pruning.
-    
-    This implementation **propagates splits upward** (root included),
-    so no node silently exceeds `max_entries`.
-    """
-
-    def __init__(self, max_entries: int = 16):
-        self.max_entries = max_entries
-        self.root: Union[SpatialLeafNode, SpatialInternalNode, None] = None
-        self.size = 0
-
-    # --------------- Public API ---------------
-    def add_location(self, location_id: str, position: Point3D) -> None:
-        bbox = self._point_to_bbox(position)
-        entry = SpatialEntry(location_id, bbox, position)
-        if self.root is None:
-            self.root = SpatialLeafNode()
-        maybe_split = self._insert(self.root, entry)
-        if maybe_split is not None:
-            # Root split: promote returned internal node as new root
-            self.root = maybe_split
-        self.size += 1
-        self._recalc_bbox_upwards(self.root)
-
-    def find_nearest(self, position: Point3D, k: int = 5) -> List[Tuple[str, float]]:
-        if self.root is None:
-            return []
-        candidates: List[Tuple[str, Point3D]] = []
-        self._nearest(self.root, position, candidates, k * 4)
-        dists = [(loc_id, self._dist(position, p)) for loc_id, p in candidates]
-        dists.sort(key=lambda t: t[1])
-        # De-dup in case of overlapping nodes
-        seen = set()
-        out = []
-        for loc_id, d in dists:
-            if loc_id in seen:
-                continue
-            seen.add(loc_id)
-            out.append((loc_id, d))
-            if len(out) >= k:
-                break
-        return out
-
-    # --------------- Core ops ---------------
-    def _insert(self, node: Union[SpatialLeafNode, SpatialInternalNode], entry: SpatialEntry) -> Optional[SpatialInternalNode]:
-        """Insert entry and **return a new internal node if `node` splits**, else None.
-        This lets callers propagate splits up to the root.
-        """
-        if isinstance(node, SpatialLeafNode):
-            node.entries.append(entry)
-            node.bbox = self._expand_bbox(node.bbox, entry.bbox)
-            if len(node.entries) > self.max_entries:
-                return self._split_leaf(node)
-            return None
-
-        # Internal node: choose child with minimal bbox enlargement
-        child = min(node.children, key=lambda c: self._bbox_enlargement(self._get_bbox(c), entry.bbox))
-        child_split = self._insert(child, entry)
-
-        # If child split, replace child with the two children of returned internal node
-        if child_split is not None:
-            idx = node.children.index(child)
-            node.children.pop(idx)
-            node.children[idx:idx] = child_split.children
-
-        # Recalculate bbox
-        node.bbox = self._calc_bbox(node)
-
-        # Split this node if it now exceeds capacity
-        if len(node.children) > self.max_entries:
-            return self._split_internal(node)
-        return None
-
-    def _nearest(self, node: Union[SpatialLeafNode, SpatialInternalNode], q: Point3D,
-                 out: List[Tuple[str, Point3D]], max_candidates: int) -> None:
-        if isinstance(node, SpatialLeafNode):
-            out.extend((e.location_id, e.position) for e in node.entries)
-            return
-        # sort children by bbox distance to query
-        children = sorted(node.children, key=lambda c: self._bbox_point_dist(self._get_bbox(c), q))
-        for ch in children:
-            if len(out) >= max_candidates:
-                break
-            self._nearest(ch, q, out, max_candidates)
-
-    # --------------- Splitting helpers ---------------
-    def _split_leaf(self, leaf: SpatialLeafNode) -> SpatialInternalNode:
-        # Linear split heuristic: pick two farthest entries as seeds
-        entries = leaf.entries
-        i1, i2 = self._farthest_pair(entries)
-        g1, g2 = SpatialLeafNode(), SpatialLeafNode()
-        g1.entries.append(entries[i1]); g2.entries.append(entries[i2])
-        for idx, e in enumerate(entries):
-            if idx in (i1, i2):
-                continue
-            # Choose group with least enlargement cost
-            cost1 = self._bbox_enlargement(self._calc_bbox(g1), e.bbox)
-            cost2 = self._bbox_enlargement(self._calc_bbox(g2), e.bbox)
-            (g1 if cost1 <= cost2 else g2).entries.append(e)
-        g1.bbox = self._calc_bbox(g1)
-        g2.bbox = self._calc_bbox(g2)
-        parent = SpatialInternalNode()
-        parent.children = [g1, g2]
-        parent.bbox = self._expand_bbox(g1.bbox, g2.bbox)
-        return parent
-
-    def _split_internal(self, node: SpatialInternalNode) -> SpatialInternalNode:
-        children = node.children
-        # seeds = farthest bbox pair
-        i1, i2 = self._farthest_bbox_pair([self._get_bbox(c) for c in children])
-        g1, g2 = SpatialInternalNode(), SpatialInternalNode()
-        g1.children.append(children[i1]); g2.children.append(children[i2])
-        for idx, c in enumerate(children):
-            if idx in (i1, i2):
-                continue
-            cost1 = self._bbox_enlargement(self._calc_bbox(g1), self._get_bbox(c))
-            cost2 = self._bbox_enlargement(self._calc_bbox(g2), self._get_bbox(c))
-            (g1 if cost1 <= cost2 else g2).children.append(c)
-        g1.bbox = self._calc_bbox(g1)
-        g2.bbox = self._calc_bbox(g2)
-        parent = SpatialInternalNode()
-        parent.children = [g1, g2]
-        parent.bbox = self._expand_bbox(g1.bbox, g2.bbox)
-        return parent
-
-    def _recalc_bbox_upwards(self, node: Union[SpatialLeafNode, SpatialInternalNode]) -> Optional[BBox]:
-        if isinstance(node, SpatialLeafNode):
-            node.bbox = self._calc_bbox(node)
-            return node.bbox
-        # internal
-        for ch in node.children:
-            self._recalc_bbox_upwards(ch)
-        node.bbox = self._calc_bbox(node)
-        return node.bbox
-
-    # --------------- Geometry helpers ---------------
-    def _point_to_bbox(self, p: Point3D, m: float = 0.05) -> BBox:
-        x, y, z = p
-        return (x - m, y - m, z - m, x + m, y + m, z + m)
-
-    def _expand_bbox(self, a: Optional[BBox], b: Optional[BBox]) -> Optional[BBox]:
-        if a is None:
-            return b
-        if b is None:
-            return a
-        return (
-            min(a[0], b[0]), min(a[1], b[1]), min(a[2], b[2]),
-            max(a[3], b[3]), max(a[4], b[4]), max(a[5], b[5])
-        )
-
-    def _get_bbox(self, node: Union[SpatialLeafNode, SpatialInternalNode]) -> Optional[BBox]:
-        # Return None instead of a zero-sized origin bbox to avoid biasing heuristics
-        return node.bbox
-
-    def _calc_bbox(self, node: Union[SpatialLeafNode, SpatialInternalNode]) -> Optional[BBox]:
-        if isinstance(node, SpatialLeafNode):
-            if not node.entries:
-                return None
-            b = node.entries[0].bbox
-            for e in node.entries[1:]:
-                b = self._expand_bbox(b, e.bbox)
-            return b
-        if not node.children:
-            return None
-        b = self._get_bbox(node.children[0])
-        for ch in node.children[1:]:
-            b = self._expand_bbox(b, self._get_bbox(ch))
-        return b
-
-    def _bbox_enlargement(self, a: Optional[BBox], b: Optional[BBox]) -> float:
-        if a is None:
-            return self._bbox_volume(b)
-        if b is None:
-            return 0.0
-        v_old = self._bbox_volume(a)
-        v_new = self._bbox_volume(self._expand_bbox(a, b))
-        return v_new - v_old
-
-    def _bbox_volume(self, b: Optional[BBox]) -> float:
-        if b is None:
-            return 0.0
-        dx = max(0.0, b[3] - b[0])
-        dy = max(0.0, b[4] - b[1])
-        dz = max(0.0, b[5] - b[2])
-        return dx * dy * dz
-
-    def _bbox_point_dist(self, b: Optional[BBox], p: Point3D) -> float:
-        if b is None:
-            # Treat empty as zero distance so children without bbox are visited early; they’ll expand soon.
-            return 0.0
-        x, y, z = p
-        min_x, min_y, min_z, max_x, max_y, max_z = b
-        dx = max(0, min_x - x, x - max_x)
-        dy = max(0, min_y - y, y - max_y)
-        dz = max(0, min_z - z, z - max_z)
-        return math.sqrt(dx*dx + dy*dy + dz*dz)
-
-    def _dist(self, a: Point3D, b: Point3D) -> float:
-        return math.sqrt((a[0]-b[0])**2 + (a[1]-b[1])**2 + (a[2]-b[2])**2)
-
-    def _farthest_pair(self, entries: List[SpatialEntry]) -> Tuple[int, int]:
-        n = len(entries)
-        if n <= 1:
-            return 0, 0
-        best = (0, 1)
-        best_d = -1.0
-        for i in range(n):
-            for j in range(i+1, n):
-                d = self._dist(entries[i].position, entries[j].position)
-                if d > best_d:
-                    best_d = d
-                    best = (i, j)
-        return best
-
-    def _farthest_bbox_pair(self, boxes: List[Optional[BBox]]) -> Tuple[int, int]:
-        def center(b: Optional[BBox]):
-            if b is None:
-                return (0.0, 0.0, 0.0)
-            return ((b[0]+b[3])/2, (b[1]+b[4])/2, (b[2]+b[5])/2)
-        n = len(boxes)
-        if n <= 1:
-            return 0, 0
-        best = (0, 1)
-        best_d = -1.0
-        for i in range(n):
-            ci = center(boxes[i])
-            for j in range(i+1, n):
-                cj = center(boxes[j])
-                d = self._dist(ci, cj)
-                if d > best_d:
-                    best_d = d
-                    best = (i, j)
-        return best
+BBox = BoundingBox3D
+Point3D = Position3D
 
 # =============================================================================
 
 # Columnar Compressed Storage
 # =============================================================================
 
-class RingBuffer:
-    def __init__(self, capacity: int):
-        self.capacity = capacity
-        self.buffer = [None] * capacity
-        self.head = 0
-        self.size = 0
-        self._stats_cache = None
-        self._cache_dirty = True
-
-    def append(self, item: Any) -> None:
-        self.buffer[self.head] = item
-        self.head = (self.head + 1) % self.capacity
-        if self.size < self.capacity:
-            self.size += 1
-        self._cache_dirty = True
-
-    def get_recent(self, count: Optional[int] = None) -> List[Any]:
-        if count is None:
-            count = self.size
-        count = min(count, self.size)
-        out = []
-        for i in range(count):
-            idx = (self.head - 1 - i) % self.capacity
-            v = self.buffer[idx]
-            if v is not None:
-                out.append(v)
-        return out
-
-class CompressedLocationStorage:
+class CompressedLocationStorage(SharedLocationStorage):
+    """
+    elite_memory_palace's columnar storage: RecordBuffer rows, content
+    compressed against a shared dictionary, SensoryCodeTable profile ids and
+    one PerformanceRingStore, here with 32 reviews of history per location.
+    """
+
     def __init__(self):
-        self.location_ids: List[str] = []
-        self.content_compressed: List[bytes] = []
-        self.positions_x = np.array([], dtype=np.float32)
-        self.positions_y = np.array([], dtype=np.float32)
-        self.positions_z = np.array([], dtype=np.float32)
-        self.bizarreness_factors = np.array([], dtype=np.float32)
-        self.emotional_intensities = np.array([], dtype=np.float32)
-        self.creation_timestamps = np.array([], dtype=np.int64)
-        self.sensory_encodings = np.array([], dtype=np.uint64)
-        self.id_to_index: Dict[str, int] = {}
-        self.performance_histories: Dict[str, RingBuffer] = {}
+        super().__init__()
         self.performance_buffer_size = 32
-
-    # ---- public ----
-    def add_location(self, location_id: str, content: str, position: Point3D,
-                     bizarreness: float, emotional: float, sensory_encoding: Dict[str, Any]) -> int:
-        import zlib
-        compressed = zlib.compress(content.encode('utf-8'), level=6)
-        sensory_bits = self._pack_sensory_encoding(sensory_encoding)
-        idx = len(self.location_ids)
-        self.location_ids.append(location_id)
-        self.content_compressed.append(compressed)
-        self.positions_x = np.append(self.positions_x, position[0])
-        self.positions_y = np.append(self.positions_y, position[1])
-        self.positions_z = np.append(self.positions_z, position[2])
-        self.bizarreness_factors = np.append(self.bizarreness_factors, bizarreness)
-        self.emotional_intensities = np.append(self.emotional_intensities, emotional)
-        self.creation_timestamps = np.append(self.creation_timestamps, int(datetime.now().timestamp()))
-        self.sensory_encodings = np.append(self.sensory_encodings, sensory_bits)
-        self.id_to_index[location_id] = idx
-        self.performance_histories[location_id] = RingBuffer(self.performance_buffer_size)
-        return idx
-
-    def get_location(self, location_id: str) -> Optional[Dict[str, Any]]:
-        if location_id not in self.id_to_index:
-            return None
-        import zlib
-        i = self.id_to_index[location_id]
-        content = zlib.decompress(self.content_compressed[i]).decode('utf-8')
-        return {
-            'id': location_id,
-            'content': content,
-            'position': (float(self.positions_x[i]), float(self.positions_y[i]), float(self.positions_z[i])),
-            'bizarreness_factor': float(self.bizarreness_factors[i]),
-            'emotional_intensity': float(self.emotional_intensities[i]),
-            'created_at': datetime.fromtimestamp(int(self.creation_timestamps[i])),
-            'sensory_encoding': self._unpack_sensory_encoding(int(self.sensory_encodings[i]))
-        }
+        self.performance = PerformanceRingStore(self.performance_buffer_size)
 
     def bulk_ids(self) -> List[str]:
         return list(self.location_ids)
 
-    def bulk_update_performance(self, updates: List[Tuple[str, Dict[str, Any]]]) -> None:
-        for loc_id, data in updates:
-            if loc_id in self.performance_histories:
-                self.performance_histories[loc_id].append(data)
-
-    # ---- packing ----
-    def _pack_sensory_encoding(self, sensory: Dict[str, Any]) -> int:
-        channels = ['visual', 'auditory', 'kinesthetic', 'olfactory', 'gustatory', 'emotional', 'spatial', 'temporal', 'synesthetic']
-        val = 0
-        for i, ch in enumerate(channels):
-            v = hash(str(sensory.get(ch, 0))) % 128
-            val |= (v << (i * 7))
-        return val
-
-    def _unpack_sensory_encoding(self, packed: int) -> Dict[str, int]:
-        channels = ['visual', 'auditory', 'kinesthetic', 'olfactory', 'gustatory', 'emotional', 'spatial', 'temporal', 'synesthetic']
-        out = {}
-        for i, ch in enumerate(channels):
-            out[ch] = (packed >> (i * 7)) & 0x7F
-        return out
-
 # =============================================================================
 # Cross-Modal Coherence (lightweight but complete)
 # =============================================================================
@@ -701,7 +374,8 @@ class PredictiveAnalyticsEngine:
 class OptimizedEliteMemoryPalaceSystem:
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         config = config or {}
-        self.spatial_index = OptimizedSpatialIndex(max_entries=config.get('rtree_max_entries', 16))
+        self.spatial_index = OptimizedSpatialIndex(max_entries=config.get('rtree_max_entries', 16),
+                                                   split=config.get('rtree_split', 'quadratic'))
         self.storage_engine = CompressedLocationStorage()
         self.neuroplasticity_engine = AdaptiveNeuroplasticityEngine()
         self.coherence_engine = CrossModalCoherenceEngine()
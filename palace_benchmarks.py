@@ -0,0 +1,792 @@
+#!/usr/bin/env python3
+"""
+Palace Benchmarks - timing harness for the memory palace hot paths
+
+Usage:
+    python palace_benchmarks.py scheduler --locations 5000
+    python palace_benchmarks.py ingest
+    python palace_benchmarks.py spatial --sizes 1000 100000 1000000
+    python palace_benchmarks.py spatial --sizes 100000 --splits linear quadratic rstar
+    python palace_benchmarks.py layout --sizes 100 1000 10000
+    python palace_benchmarks.py similarity --sizes 1000 10000 100000
+    python palace_benchmarks.py topology --sizes 300 3000 30000 --budget 2
+    python palace_benchmarks.py routing --sizes 1000 10000
+    python palace_benchmarks.py history --sizes 1000 10000 100000
+    python palace_benchmarks.py storage --sizes 10000 100000 1000000
+    python palace_benchmarks.py compression
+    python palace_benchmarks.py palacefile --sizes 10000 100000 1000000
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import elite_memory_palace as emp
+import palace_compression
+import palace_file
+import palace_routing
+import palace_similarity
+import palace_spatial
+
+
+def _best_ms(fn: Callable[[], object], runs: int = 5) -> float:
+    times = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t) * 1000)
+    return min(times)
+
+
+def _print_table(title: str, rows: Dict[str, float], unit: str = "ms") -> None:
+    print(f"\n{title}")
+    print("=" * 60)
+    for name, value in rows.items():
+        print(f"{name:40}{value:14.2f} {unit}")
+    print("=" * 60 + "\n")
+
+# ==================== SCHEDULER ====================
+
+def bench_scheduler(locations: int = 5000, runs: int = 3) -> Dict[str, float]:
+    """Per-location optimize_review_schedule vs the batch scheduler"""
+    rng = random.Random(3)
+    engine = emp.AdaptiveNeuroplasticityEngine()
+    emotional = [rng.uniform(0, 10) for _ in range(locations)]
+    bizarre = [rng.uniform(0, 10) for _ in range(locations)]
+    difficulty = [b / 10 for b in bizarre]
+    histories: List[List[Dict[str, float]]] = [
+        [{"accuracy": rng.random()} for _ in range(rng.randint(0, 6))] for _ in range(locations)
+    ]
+    declines = [engine.history_decline(h) for h in histories]
+    now = datetime.now()
+
+    def scalar():
+        for e, b, d, h in zip(emotional, bizarre, difficulty, histories):
+            engine.optimize_review_schedule(
+                {"emotional_intensity": e, "bizarreness_factor": b, "difficulty_score": d,
+                 "performance_history": h},
+                "default_user",
+            )
+
+    def batch():
+        engine.optimize_review_schedules_batch(emotional, bizarre, difficulty, declines, now=now)
+
+    numpy = emp.np
+    results = {"per-location loop": _best_ms(scalar, runs)}
+    if numpy is not None:
+        results["batch (NumPy)"] = _best_ms(batch, runs)
+    emp.np = None
+    try:
+        results["batch (pure Python fallback)"] = _best_ms(batch, runs)
+    finally:
+        emp.np = numpy
+
+    _print_table(f"REVIEW SCHEDULING, {locations:,} locations x "
+                 f"{len(engine.REVIEW_INTERVALS)} intervals (best of {runs})", results)
+    for name, value in results.items():
+        if name != "per-location loop":
+            print(f"  {name}: {results['per-location loop'] / value:.1f}x faster")
+    print()
+    return results
+
+# ==================== INGESTION ====================
+
+def bench_ingest(runs: int = 3) -> Dict[str, float]:
+    """Load every LegalKnowledgeGraph concept into one palace, one call per item vs bulk"""
+    from bar_tutor_unified import LegalKnowledgeGraph
+
+    contents = [
+        f"{node.name}: {node.rule_statement or ', '.join(node.elements)}"
+        for node in LegalKnowledgeGraph().nodes.values()
+    ]
+
+    def one_by_one():
+        system = emp.EliteMemoryPalaceSystem()
+        palace = system.create_elite_palace("Knowledge Graph", "all")
+        for content in contents:
+            system.add_elite_location(palace["id"], content)
+
+    def bulk():
+        system = emp.EliteMemoryPalaceSystem()
+        palace = system.create_elite_palace("Knowledge Graph", "all")
+        system.add_elite_locations(palace["id"], contents)
+
+    results = {"add_elite_location loop": _best_ms(one_by_one, runs), "add_elite_locations": _best_ms(bulk, runs)}
+    _print_table(f"PALACE INGESTION, {len(contents)} concepts (best of {runs})", results)
+    print(f"  bulk: {results['add_elite_location loop'] / results['add_elite_locations']:.1f}x faster\n")
+    return results
+
+# ==================== SPATIAL INDEX ====================
+
+def _mean_us(fn: Callable[[object], object], args: List[object]) -> float:
+    t = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - t) / len(args) * 1e6
+
+
+def bench_spatial(sizes: List[int], queries: int = 100, k: int = 10, updates: int = 1000) -> Dict[int, Dict[str, float]]:
+    """R-tree build, insert, delete, kNN and range queries vs NumPy brute force"""
+    if palace_spatial.np is None:
+        raise SystemExit("the spatial benchmark needs NumPy for its brute-force baseline")
+    np = palace_spatial.np
+    rng = np.random.default_rng(7)
+    results: Dict[int, Dict[str, float]] = {}
+
+    for size in sizes:
+        extent = np.array([1000.0, 1000.0, 100.0])
+        points = rng.uniform(0, 1, (size, 3)) * extent
+        items = [(f"loc{i}", tuple(p)) for i, p in enumerate(points.tolist())]
+        probes = (rng.uniform(0, 1, (queries, 3)) * extent).tolist()
+        # Boxes holding ~0.1% of the points
+        side = extent * 0.1
+        boxes = [(tuple(lo), tuple(lo + side)) for lo in rng.uniform(0, 1, (queries, 3)) * (extent - side)]
+        row: Dict[str, float] = {}
+
+        t = time.perf_counter()
+        brute = np.asarray(points)
+        row["brute build ms"] = (time.perf_counter() - t) * 1000
+        for packing in palace_spatial.OptimizedSpatialIndex.PACKINGS:
+            index = palace_spatial.OptimizedSpatialIndex()
+            t = time.perf_counter()
+            index.add_locations(items, packing=packing)
+            row[f"{packing} build ms"] = (time.perf_counter() - t) * 1000
+
+        extra = [(f"new{i}", tuple(p)) for i, p in enumerate((rng.uniform(0, 1, (updates, 3)) * extent).tolist())]
+        row["insert us"] = _mean_us(lambda item: index.add_location(*item), extra)
+        # Half the moves are small nudges (usually in place), half jump anywhere
+        targets = {location_id: tuple(p) for (location_id, _), p in zip(extra, (rng.uniform(0, 1, (updates, 3)) * extent).tolist())}
+        for location_id, position in extra[::2]:
+            targets[location_id] = (position[0] + 0.05, position[1] - 0.05, position[2])
+        row["move us"] = _mean_us(lambda item: index.move_location(item[0], targets[item[0]]), extra)
+        row["delete us"] = _mean_us(lambda item: index.remove_location(item[0]), extra)
+
+        def brute_knn(q):
+            d = ((brute - q) ** 2).sum(axis=1)
+            nearest = np.argpartition(d, min(k, len(d) - 1))[:k]
+            return nearest[np.argsort(d[nearest])]
+
+        row["knn us"] = _mean_us(lambda q: index.find_nearest(q, k), probes)
+        row["brute knn us"] = _mean_us(brute_knn, probes)
+        hits = sum(
+            len({location_id for location_id, _ in index.find_nearest(q, k)} & {f"loc{i}" for i in brute_knn(q)})
+            for q in probes
+        )
+        row["knn recall"] = hits / (k * len(probes))
+
+        # "What's near each of these 50 locations": one neighbourhood of the palace
+        around = np.asarray(items[int(rng.integers(0, size))][1])
+        centers = [tuple(c) for c in (around + rng.normal(0, 1, (50, 3)) * extent * 0.02).tolist()]
+        row["knn batch-50 us"] = _mean_us(lambda qs: index.find_nearest_batch(qs, k), [centers] * 10) / len(centers)
+        row["knn 50 loop us"] = _mean_us(lambda qs: [index.find_nearest(q, k) for q in qs], [centers] * 10) / len(centers)
+
+        row["range us"] = _mean_us(lambda box: index.find_in_box(*box), boxes)
+        row["brute range us"] = _mean_us(
+            lambda box: np.nonzero(((brute >= box[0]) & (brute <= box[1])).all(axis=1))[0], boxes
+        )
+        results[size] = row
+
+    names = list(next(iter(results.values())))
+    print("\nSPATIAL INDEX vs NUMPY BRUTE FORCE")
+    print("=" * (20 + 14 * len(results)))
+    print(f"{'':20}" + "".join(f"{size:>14,}" for size in results))
+    for name in names:
+        print(f"{name:20}" + "".join(f"{row[name]:14.2f}" for row in results.values()))
+    print("=" * (20 + 14 * len(results)) + "\n")
+    return results
+
+
+def bench_splits(splits: List[str], size: int = 20_000, queries: int = 200, k: int = 10) -> Dict[str, Dict[str, float]]:
+    """Split strategies on a tree built one insert at a time (bulk loads never split)"""
+    rng = random.Random(11)
+    # Clustered rooms along corridors: the overlap that separates the strategies
+    rooms = [(rng.uniform(0, 1000), rng.uniform(0, 1000), rng.uniform(0, 100)) for _ in range(size // 200 + 1)]
+    items = []
+    for i in range(size):
+        x, y, z = rooms[rng.randrange(len(rooms))]
+        items.append((f"loc{i}", (rng.gauss(x, 15), rng.gauss(y, 15), rng.gauss(z, 3))))
+    probes = [items[rng.randrange(size)][1] for _ in range(queries)]
+    boxes = [((x - 10, y - 10, z - 2), (x + 10, y + 10, z + 2)) for x, y, z in probes]
+    results: Dict[str, Dict[str, float]] = {}
+
+    for split in splits:
+        index = palace_spatial.OptimizedSpatialIndex(split=split)
+        t = time.perf_counter()
+        for location_id, position in items:
+            index.add_location(location_id, position)
+        row = {"insert us": (time.perf_counter() - t) / size * 1e6}
+        leaves, stack = [], [index.root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, palace_spatial.SpatialLeafNode):
+                leaves.append(node)
+            else:
+                stack.extend(node.children)
+        row["leaves"] = len(leaves)
+        row["mean leaf volume"] = sum(palace_spatial._bbox_volume(leaf.bbox) for leaf in leaves) / len(leaves)
+        row["knn us"] = _mean_us(lambda q: index.find_nearest(q, k), probes)
+        row["range us"] = _mean_us(lambda box: index.find_in_box(*box), boxes)
+        row["delete us"] = _mean_us(index.remove_location, [location_id for location_id, _ in items[: size // 10]])
+        results[split] = row
+
+    names = list(next(iter(results.values())))
+    print(f"\nSPLIT STRATEGIES, {size:,} clustered points inserted one by one")
+    print("=" * (20 + 14 * len(results)))
+    print(f"{'':20}" + "".join(f"{split:>14}" for split in results))
+    for name in names:
+        print(f"{name:20}" + "".join(f"{row[name]:14.2f}" for row in results.values()))
+    print("=" * (20 + 14 * len(results)) + "\n")
+    return results
+
+
+# ==================== LAYOUT ====================
+
+def bench_layout(sizes: List[int], exact_max: int = 5000) -> Dict[int, Dict[str, float]]:
+    """Similarity edges and force-directed layout; Barnes-Hut vs exact repulsion"""
+    if emp.np is None:
+        raise SystemExit("the layout benchmark needs NumPy")
+    np = emp.np
+    rng = random.Random(5)
+    vocabulary = [f"term{i}" for i in range(3000)]
+    zipf = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    engine = emp.SpatialIntelligenceEngine()
+    results: Dict[int, Dict[str, float]] = {}
+
+    for size in sizes:
+        nodes = {
+            f"n{i}": emp.ContentNode(id=f"n{i}", content=" ".join(rng.choices(vocabulary, zipf, k=12)),
+                                     category=f"subject{rng.randrange(7)}", difficulty=rng.uniform(0, 2))
+            for i in range(size)
+        }
+        graph = emp.ContentGraph(nodes=nodes)
+        row: Dict[str, float] = {}
+        t = time.perf_counter()
+        edges = engine._similarity_edges(nodes)
+        row["edges ms"] = (time.perf_counter() - t) * 1000
+        row["edges"] = len(edges[0])
+        t = time.perf_counter()
+        layout = engine._force_directed_layout(graph, edges)
+        row["layout ms"] = (time.perf_counter() - t) * 1000
+        row["iterations"] = engine.layout_engine.iterations_run
+
+        positions = np.array(list(layout.positions.values()))
+        k = (100 * 100 / size) ** 0.5
+        row["barnes-hut ms/iter"] = _best_ms(lambda: engine.layout_engine.repulsion(positions, k), 3)
+        if size <= exact_max:
+            exact = emp.ForceDirectedLayout(theta=0)
+            row["exact ms/iter"] = _best_ms(lambda: exact.repulsion(positions, k), 3)
+            reference = exact.repulsion(positions, k)
+            error = np.linalg.norm(engine.layout_engine.repulsion(positions, k) - reference, axis=1)
+            row["median force err %"] = float(np.median(error / np.linalg.norm(reference, axis=1))) * 100
+        else:
+            row["exact ms/iter"] = row["median force err %"] = float("nan")
+        results[size] = row
+
+    names = list(next(iter(results.values())))
+    print("\nFORCE-DIRECTED LAYOUT")
+    print("=" * (22 + 14 * len(results)))
+    print(f"{'':22}" + "".join(f"{size:>14,}" for size in results))
+    for name in names:
+        print(f"{name:22}" + "".join(f"{row[name]:14.2f}" for row in results.values()))
+    print("=" * (22 + 14 * len(results)) + "\n")
+    return results
+
+
+# ==================== SIMILARITY ====================
+
+def bench_similarity(sizes: List[int], k: int = 16, exact_max: int = 20_000) -> Dict[int, Dict[str, float]]:
+    """Sparse top-k Jaccard graph: MinHash/LSH candidates vs exhaustive scoring"""
+    if palace_similarity.np is None:
+        raise SystemExit("the similarity benchmark needs NumPy")
+    rng = random.Random(5)
+    vocabulary = [f"term{i}" for i in range(3000)]
+    zipf = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    results: Dict[int, Dict[str, float]] = {}
+
+    for size in sizes:
+        texts = [" ".join(rng.choices(vocabulary, zipf, k=12)) for _ in range(size)]
+        for i in range(0, size // 5, 2):  # a tenth of the texts get a near-duplicate
+            words = texts[i].split()
+            words[rng.randrange(len(words))] = rng.choice(vocabulary)
+            texts[i + 1] = " ".join(words)
+        row: Dict[str, float] = {}
+        t = time.perf_counter()
+        index = palace_similarity.SimilarityIndex().build(texts)
+        row["tokenize ms"] = (time.perf_counter() - t) * 1000
+        t = time.perf_counter()
+        lsh = index.neighbor_graph(k, exact=False)
+        row["lsh graph ms"] = (time.perf_counter() - t) * 1000
+        row["lsh edges"] = len(lsh[0])
+        if size <= exact_max:
+            t = time.perf_counter()
+            exact = index.neighbor_graph(k, exact=True)
+            row["exact graph ms"] = (time.perf_counter() - t) * 1000
+            found = set(zip(lsh[0], lsh[1]))
+            strong = [pair for pair, weight in zip(zip(exact[0], exact[1]), exact[2]) if weight >= 0.5]
+            row["recall J>=0.5 %"] = 100 * sum(pair in found for pair in strong) / max(1, len(strong))
+        else:
+            row["exact graph ms"] = row["recall J>=0.5 %"] = float("nan")
+        results[size] = row
+
+    names = list(next(iter(results.values())))
+    print("\nSPARSE SIMILARITY GRAPH")
+    print("=" * (22 + 14 * len(results)))
+    print(f"{'':22}" + "".join(f"{size:>14,}" for size in results))
+    for name in names:
+        print(f"{name:22}" + "".join(f"{row[name]:14.2f}" for row in results.values()))
+    print("=" * (22 + 14 * len(results)) + "\n")
+    return results
+
+
+# ==================== TOPOLOGY ====================
+
+def bench_topology(sizes: List[int], budget: float = 2.0, degree: int = 6) -> Dict[int, Dict[str, float]]:
+    """Annealing moves per second: incremental delta scoring vs full re-evaluation"""
+    rng = random.Random(3)
+    objective = emp.CognitiveLoadObjective()
+    constraints = [emp.MinimumDistanceConstraint(2.0), emp.PathLengthConstraint(max_length=20), emp.VisibilityConstraint()]
+    results: Dict[int, Dict[str, float]] = {}
+
+    for size in sizes:
+        ids = [f"n{i}" for i in range(size)]
+        layout = emp.OptimalLayout(
+            positions={i: (rng.uniform(-40, 40), rng.uniform(-40, 40), rng.uniform(0, 10)) for i in ids},
+            connection_graph={i: set(rng.sample(ids, degree)) - {i} for i in ids},
+            cognitive_load_score=0.0,
+            recommended_paths=[],
+        )
+        row: Dict[str, float] = {"start score": objective(layout)}
+        optimizer = emp.TopologyOptimizer(time_budget=budget, seed=1)
+        t = time.perf_counter()
+        best = optimizer.optimize(layout, objective, constraints)
+        elapsed = time.perf_counter() - t
+        row["delta moves/s"] = optimizer.moves_run / elapsed
+        row["delta best score"] = best.cognitive_load_score
+        full = emp.TopologyOptimizer(max_iterations=50, initial_temperature=1e-3, seed=1)
+        t = time.perf_counter()
+        full.optimize(layout, lambda lay: objective(lay), constraints)
+        row["full-eval moves/s"] = full.moves_run / (time.perf_counter() - t)
+        results[size] = row
+
+    names = list(next(iter(results.values())))
+    print(f"\nTOPOLOGY ANNEALING ({budget:g} s budget)")
+    print("=" * (22 + 14 * len(results)))
+    print(f"{'':22}" + "".join(f"{size:>14,}" for size in results))
+    for name in names:
+        print(f"{name:22}" + "".join(f"{row[name]:14.4f}" for row in results.values()))
+    print("=" * (22 + 14 * len(results)) + "\n")
+    return results
+
+
+# ==================== ROUTING ====================
+
+def bench_routing(sizes: List[int], queries: int = 200, degree: int = 4) -> Dict[int, Dict[str, float]]:
+    """Router build, A* cold vs memoized, multi-target Dijkstra and walk-through tours"""
+    rng = random.Random(4)
+    results: Dict[int, Dict[str, float]] = {}
+
+    for size in sizes:
+        ids = [f"n{i}" for i in range(size)]
+        positions = {i: (rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 5)) for i in ids}
+        nearest = palace_spatial.OptimizedSpatialIndex()
+        nearest.add_locations(list(positions.items()))
+        found = nearest.find_nearest_batch(list(positions.values()), degree + 1)
+        connections = {i: {m for m, _ in near if m != i} for i, near in zip(ids, found)}
+        pairs = [(rng.choice(ids), rng.choice(ids)) for _ in range(queries)]
+        row: Dict[str, float] = {}
+
+        t = time.perf_counter()
+        router = palace_routing.PalaceRouter(connections, positions)
+        row["build ms"] = (time.perf_counter() - t) * 1000
+        t = time.perf_counter()
+        for start, goal in pairs:
+            router.shortest_path(start, goal)
+        row["A* cold ms/query"] = (time.perf_counter() - t) * 1000 / queries
+        t = time.perf_counter()
+        for start, goal in pairs:
+            router.shortest_path(start, goal)
+        row["A* cached ms/query"] = (time.perf_counter() - t) * 1000 / queries
+        router.clear_cache()
+        t = time.perf_counter()
+        for start in ids[:10]:
+            router.shortest_paths(start, rng.sample(ids, 20))
+        row["dijkstra ms/20 targets"] = (time.perf_counter() - t) * 100
+
+        t = time.perf_counter()
+        greedy = router.tour(max_passes=0)
+        row["NN tour ms"] = (time.perf_counter() - t) * 1000
+        t = time.perf_counter()
+        tour = router.tour()
+        row["2-opt tour ms"] = (time.perf_counter() - t) * 1000
+        row["2-opt / NN length %"] = 100 * router.tour_length(tour) / router.tour_length(greedy)
+        results[size] = row
+
+    names = list(next(iter(results.values())))
+    print("\nPALACE ROUTING")
+    print("=" * (24 + 14 * len(results)))
+    print(f"{'':24}" + "".join(f"{size:>14,}" for size in results))
+    for name in names:
+        print(f"{name:24}" + "".join(f"{row[name]:14.3f}" for row in results.values()))
+    print("=" * (24 + 14 * len(results)) + "\n")
+    return results
+
+
+def _deep_size(obj: object, seen: Optional[set] = None) -> int:
+    """sys.getsizeof over containers, counting shared objects once"""
+    import sys
+
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_deep_size(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += _deep_size(vars(obj), seen)
+    return size
+
+
+def bench_history(sizes: List[int], reviews: int = 20) -> Dict[int, Dict[str, float]]:
+    """Per-location RingBuffers of dicts vs the shared PerformanceRingStore"""
+    rng = random.Random(6)
+    results: Dict[int, Dict[str, float]] = {}
+
+    for size in sizes:
+        ids = [f"loc{i}" for i in range(size)]
+
+        def updates():
+            now = datetime.now()
+            return [
+                (location_id, {"timestamp": now, "accuracy": rng.random(), "response_time": rng.uniform(1.5, 4.0),
+                               "difficulty_score": rng.random(), "interference_level": rng.random() * 0.2})
+                for _ in range(reviews) for location_id in ids
+            ]
+
+        row: Dict[str, float] = {}
+
+        batch = updates()
+        buffers = {location_id: emp.RingBuffer(reviews) for location_id in ids}
+        t = time.perf_counter()
+        for location_id, record in batch:
+            buffers[location_id].append(record)
+        row["buffers append ms"] = (time.perf_counter() - t) * 1000
+        del batch  # the buffers now own the only references to their records
+        row["buffers bytes/loc"] = _deep_size(buffers) / size
+        t = time.perf_counter()
+        for buffer in buffers.values():
+            buffer.get_statistics()
+        row["buffers stats ms"] = (time.perf_counter() - t) * 1000
+        del buffers
+
+        batch = updates()
+        store = emp.PerformanceRingStore(reviews, initial_rows=size)
+        t = time.perf_counter()
+        store.append_batch(batch)
+        row["store append ms"] = (time.perf_counter() - t) * 1000
+        row["store bytes/loc"] = (store.values.nbytes + store.timestamps.nbytes
+                                  + store.heads.nbytes + store.counts.nbytes) / size
+        row["store stats ms"] = _best_ms(store.statistics, runs=3)
+        results[size] = row
+
+    names = list(next(iter(results.values())))
+    print("\nPERFORMANCE HISTORY")
+    print("=" * (24 + 14 * len(results)))
+    print(f"{'':24}" + "".join(f"{size:>14,}" for size in results))
+    for name in names:
+        print(f"{name:24}" + "".join(f"{row[name]:14.1f}" for row in results.values()))
+    print("=" * (24 + 14 * len(results)) + "\n")
+    return results
+
+
+class _ConcatColumns:
+    """The old storage layout: seven NumPy columns grown by np.concatenate
+    every `threshold` appends, and flushed before every read"""
+
+    def __init__(self, threshold: int = 100):
+        import numpy as np
+
+        self.np = np
+        self.threshold = threshold
+        self.columns = [np.zeros(0, dtype=dtype) for _, dtype in emp.LOCATION_FIELDS]
+        self.pending: List[tuple] = []
+
+    def append(self, row: tuple) -> None:
+        self.pending.append(row)
+        if len(self.pending) >= self.threshold:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            fresh = list(zip(*self.pending))
+            self.columns = [self.np.concatenate([column, self.np.array(values, dtype=column.dtype)])
+                            for column, values in zip(self.columns, fresh)]
+            self.pending.clear()
+
+    def row(self, index: int) -> tuple:
+        self.flush()
+        return tuple(column[index] for column in self.columns)
+
+
+def bench_storage(sizes: List[int], legacy_max: int = 100_000, reads: int = 200) -> Dict[int, Dict[str, float]]:
+    """Location rows: concatenate-every-100 columns vs the doubling RecordBuffer"""
+    rng = random.Random(8)
+    results: Dict[int, Dict[str, float]] = {}
+    nan = float("nan")
+
+    for size in sizes:
+        now = int(time.time())
+        rows = [(rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 10), rng.uniform(0, 10),
+                 rng.uniform(0, 10), now, rng.getrandbits(63)) for _ in range(size)]
+        row: Dict[str, float] = {}
+
+        if size <= legacy_max:
+            legacy = _ConcatColumns()
+            t = time.perf_counter()
+            for record in rows:
+                legacy.append(record)
+            legacy.flush()
+            row["concat append us/row"] = (time.perf_counter() - t) * 1e6 / size
+        else:
+            row["concat append us/row"] = nan
+            legacy = _ConcatColumns()
+            legacy.columns = [legacy.np.array(values, dtype=column.dtype)
+                              for column, values in zip(legacy.columns, zip(*rows))]
+        # Read-after-write: every read flushes the one pending row
+        t = time.perf_counter()
+        for i in range(reads):
+            legacy.append(rows[i])
+            legacy.row(i)
+        row["concat add+read us"] = (time.perf_counter() - t) * 1e6 / reads
+
+        buffer = emp.RecordBuffer(emp.LOCATION_DTYPE)
+        t = time.perf_counter()
+        for record in rows:
+            buffer.append(record)
+        row["buffer append us/row"] = (time.perf_counter() - t) * 1e6 / size
+        t = time.perf_counter()
+        emp.RecordBuffer(emp.LOCATION_DTYPE).extend(rows)
+        row["buffer extend us/row"] = (time.perf_counter() - t) * 1e6 / size
+        t = time.perf_counter()
+        for i in range(reads):
+            buffer.append(rows[i])
+            buffer.row(i)
+        row["buffer add+read us"] = (time.perf_counter() - t) * 1e6 / reads
+        row["buffer bytes/row"] = buffer.data.nbytes / buffer.capacity
+        results[size] = row
+
+    names = list(next(iter(results.values())))
+    print("\nLOCATION STORAGE")
+    print("=" * (24 + 14 * len(results)))
+    print(f"{'':24}" + "".join(f"{size:>14,}" for size in results))
+    for name in names:
+        print(f"{name:24}" + "".join(f"{row[name]:14.2f}" for row in results.values()))
+    print("=" * (24 + 14 * len(results)) + "\n")
+    return results
+
+
+def bench_compression(runs: int = 5) -> Dict[str, Dict[str, float]]:
+    """Per-row zlib vs a shared dictionary trained on half the knowledge graph,
+    measured on the other half"""
+    import sys
+    import zlib
+
+    from bar_tutor_unified import LegalKnowledgeGraph
+
+    contents = [
+        f"{node.name}: {node.rule_statement or ', '.join(node.elements)}"
+        for node in LegalKnowledgeGraph().nodes.values()
+    ]
+    random.Random(3).shuffle(contents)
+    training, held_out = contents[::2], contents[1::2]
+    raw_bytes = sum(len(text.encode("utf-8")) for text in held_out)
+
+    t = time.perf_counter()
+    shared = palace_compression.ContentCodec.train(training)
+    train_ms = (time.perf_counter() - t) * 1000
+    codecs = {
+        "per-row zlib": (lambda text: zlib.compress(text.encode("utf-8"), 6),
+                         lambda blob: zlib.decompress(blob).decode("utf-8")),
+        "shared dictionary": (shared.compress, shared.decompress),
+    }
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, (compress, decompress) in codecs.items():
+        blobs = [compress(text) for text in held_out]
+        assert [decompress(blob) for blob in blobs] == held_out
+        row = {
+            "bytes/row": sum(map(len, blobs)) / len(blobs),
+            "% of raw": 100 * sum(map(len, blobs)) / raw_bytes,
+            # A bytes object per row plus its list slot, as CompressedLocationStorage holds them
+            "memory bytes/row": sum(sys.getsizeof(blob) + 8 for blob in blobs) / len(blobs),
+            "decode us/row": _best_ms(lambda: [decompress(blob) for blob in blobs], runs) * 1000 / len(blobs),
+        }
+        if name == "shared dictionary":
+            row["batch decode us/row"] = _best_ms(lambda: shared.decompress_many(blobs), runs) * 1000 / len(blobs)
+            cache = palace_compression.DecodedCache(len(blobs))
+            for i, text in enumerate(held_out):
+                cache.put(i, text)
+            row["LRU hit us/row"] = _best_ms(lambda: [cache.get(i) for i in range(len(blobs))], runs) * 1000 / len(blobs)
+        results[name] = row
+
+    print(f"\nLOCATION CONTENT COMPRESSION, {len(held_out)} held-out concepts "
+          f"({raw_bytes / len(held_out):.0f} bytes/row raw, dictionary "
+          f"{len(shared.dictionary):,} bytes trained in {train_ms:.1f} ms, {shared.backend})")
+    print("=" * 64)
+    names = list(dict.fromkeys(name for row in results.values() for name in row))
+    print(f"{'':24}" + "".join(f"{codec:>20}" for codec in results))
+    for name in names:
+        print(f"{name:24}" + "".join(
+            f"{row[name]:20.2f}" if name in row else f"{'-':>20}" for row in results.values()
+        ))
+    print("=" * 64 + "\n")
+    return results
+
+
+def bench_palacefile(sizes: List[int], queries: int = 100, k: int = 10) -> Dict[int, Dict[str, float]]:
+    """Reloading a palace: JSON export + R-tree rebuild vs mapping a palace file"""
+    rng = random.Random(12)
+    results: Dict[int, Dict[str, float]] = {}
+    channels = emp.SENSORY_CHANNELS[:3]
+    descriptors = [f"cue {i}" for i in range(50)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            export = {
+                "palace": {"name": f"Bench {size}", "dimensions": [100, 100, 10], "layout": "grid"},
+                "locations": [
+                    {
+                        "id": f"loc_{i:07d}",
+                        "position": [rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 10)],
+                        "content": f"Rule {i}: the defendant must show element {i % 97} by a preponderance",
+                        "sensory_hints": {channel: rng.choice(descriptors) for channel in channels},
+                    }
+                    for i in range(size)
+                ],
+            }
+            palace = emp.palace_from_vr_export(export)
+            centers = [(rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 10)) for _ in range(queries)]
+            json_path = os.path.join(tmp, f"{size}.json")
+            file_path = os.path.join(tmp, f"{size}.palace")
+            row: Dict[str, float] = {}
+
+            t = time.perf_counter()
+            with open(json_path, "w") as f:
+                json.dump(export, f)
+            row["json write ms"] = (time.perf_counter() - t) * 1000
+            t = time.perf_counter()
+            row["palace file MB"] = emp.save_palace_file(palace, file_path) / 1e6
+            row["file write ms"] = (time.perf_counter() - t) * 1000
+            row["json MB"] = os.path.getsize(json_path) / 1e6
+            del palace
+
+            # JSON: parse, rebuild locations, bulk-load an R-tree, then query
+            t = time.perf_counter()
+            with open(json_path) as f:
+                reloaded = emp.palace_from_vr_export(json.load(f))
+            index = palace_spatial.OptimizedSpatialIndex()
+            index.add_locations([(loc.id, loc.position) for loc in reloaded["locations"].values()])
+            row["json reload ms"] = (time.perf_counter() - t) * 1000
+            t = time.perf_counter()
+            for center in centers:
+                index.find_nearest(center, k)
+            row["json query us"] = (time.perf_counter() - t) * 1e6 / queries
+            del reloaded, index
+
+            # Palace file: map it; the stored R-tree answers straight away
+            t = time.perf_counter()
+            stored = palace_file.PalaceFile.open(file_path)
+            row["file open ms"] = (time.perf_counter() - t) * 1000
+            t = time.perf_counter()
+            stored.spatial.find_nearest(centers[0], k)
+            row["file first query ms"] = (time.perf_counter() - t) * 1000
+            t = time.perf_counter()
+            for center in centers:
+                stored.spatial.find_nearest(center, k)
+            row["file query us"] = (time.perf_counter() - t) * 1e6 / queries
+            t = time.perf_counter()
+            stored.strings("content")[size // 2]
+            row["file one row us"] = (time.perf_counter() - t) * 1e6
+            stored.close()
+            results[size] = row
+
+    names = list(next(iter(results.values())))
+    print("\nPALACE RELOAD: JSON EXPORT VS PALACE FILE")
+    print("=" * (24 + 14 * len(results)))
+    print(f"{'':24}" + "".join(f"{size:>14,}" for size in results))
+    for name in names:
+        print(f"{name:24}" + "".join(f"{row[name]:14.2f}" for row in results.values()))
+    print("=" * (24 + 14 * len(results)) + "\n")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark elite memory palace hot paths")
+    sub = parser.add_subparsers(dest="command", required=True)
+    scheduler = sub.add_parser("scheduler", help="batch review scheduling")
+    scheduler.add_argument("--locations", type=int, default=5000)
+    scheduler.add_argument("--runs", type=int, default=3)
+    ingest = sub.add_parser("ingest", help="bulk palace ingestion of the knowledge graph")
+    ingest.add_argument("--runs", type=int, default=3)
+    spatial = sub.add_parser("spatial", help="R-tree vs NumPy brute force")
+    spatial.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    spatial.add_argument("--queries", type=int, default=100)
+    spatial.add_argument("--splits", nargs="+", choices=sorted(palace_spatial.SPLIT_STRATEGIES),
+                         help="also compare node-split strategies on incrementally built trees")
+    spatial.add_argument("--split-size", type=int, default=20_000)
+    layout = sub.add_parser("layout", help="similarity edges and Barnes-Hut force layout")
+    layout.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    similarity = sub.add_parser("similarity", help="MinHash/LSH top-k similarity graph")
+    similarity.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    topology = sub.add_parser("topology", help="simulated-annealing topology optimizer")
+    topology.add_argument("--sizes", type=int, nargs="+", default=[300, 3_000, 30_000])
+    topology.add_argument("--budget", type=float, default=2.0, help="seconds per optimization")
+    routing = sub.add_parser("routing", help="cached A*/Dijkstra routes and walk-through tours")
+    routing.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    history = sub.add_parser("history", help="per-location performance history and statistics")
+    history.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    storage = sub.add_parser("storage", help="location record buffer growth and reads")
+    storage.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    compression = sub.add_parser("compression", help="shared-dictionary content compression")
+    compression.add_argument("--runs", type=int, default=5)
+    palacefile = sub.add_parser("palacefile", help="JSON reload vs memory-mapped palace files")
+    palacefile.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    if args.command == "scheduler":
+        bench_scheduler(args.locations, args.runs)
+    elif args.command == "ingest":
+        bench_ingest(args.runs)
+    elif args.command == "spatial":
+        bench_spatial(args.sizes, args.queries)
+        if args.splits:
+            bench_splits(args.splits, args.split_size)
+    elif args.command == "layout":
+        bench_layout(args.sizes)
+    elif args.command == "similarity":
+        bench_similarity(args.sizes)
+    elif args.command == "topology":
+        bench_topology(args.sizes, args.budget)
+    elif args.command == "routing":
+        bench_routing(args.sizes)
+    elif args.command == "history":
+        bench_history(args.sizes)
+    elif args.command == "storage":
+        bench_storage(args.sizes)
+    elif args.command == "compression":
+        bench_compression(args.runs)
+    elif args.command == "palacefile":
+        bench_palacefile(args.sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Palace Compression - shared-dictionary compression for location content
+=======================================================================
+
+Location content is a short rule statement (~130 bytes), too short for
+per-row zlib to find any repetition of its own. A dictionary of the
+phrases rule texts share ("a reasonable person", "the defendant must")
+gives every row that context up front.
+
+Features:
+- Dictionary trained from a corpus: the repeated word n-grams that save
+  the most bytes, most valuable last so their match distances are shortest
+- Raw deflate primed with the dictionary (zlib zdict), or zstd with the
+  same raw-content dictionary when zstandard is installed
+- Batch decode for range queries and a small LRU of decoded strings
+
+Benchmark:
+    python palace_benchmarks.py compression
+"""
+
+from __future__ import annotations
+
+import zlib
+from collections import Counter, OrderedDict
+from typing import Hashable, Iterable, List, Optional, Sequence, Set
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # zlib with a preset dictionary is always available
+    zstandard = None
+
+BACKENDS = ("zlib", "zstd")
+
+# Deflate can only reach back 32 KiB, so a larger zlib dictionary is wasted
+MAX_ZLIB_DICTIONARY = 32 * 1024
+
+
+def train_dictionary(samples: Iterable[str], size: int = 16 * 1024, max_ngram: int = 8) -> bytes:
+    """
+    Shared dictionary for `samples`: word n-grams (up to `max_ngram` words)
+    found in at least two samples, ranked by the bytes they would save
+    ((document frequency - 1) * length). An n-gram inside one already chosen
+    is skipped. The best ones go last, where matches are cheapest to encode.
+    """
+    document_frequency: Counter = Counter()
+    for text in samples:
+        words = text.split()
+        document_frequency.update({
+            " ".join(words[i:i + n]) for n in range(1, max_ngram + 1) for i in range(len(words) - n + 1)
+        })
+
+    ranked = sorted(
+        ((count - 1) * (len(gram) + 1), gram) for gram, count in document_frequency.items() if count > 1
+    )
+    chosen: List[bytes] = []
+    covered: Set[str] = set()
+    total = 0
+    for _, gram in reversed(ranked):
+        piece = (gram + " ").encode("utf-8")
+        if gram in covered or total + len(piece) > size:
+            continue
+        chosen.append(piece)
+        total += len(piece)
+        words = gram.split()
+        covered.update(" ".join(words[i:i + n]) for n in range(1, len(words) + 1) for i in range(len(words) - n + 1))
+    chosen.reverse()
+    return b"".join(chosen)
+
+
+class ContentCodec:
+    """
+    Compresses short UTF-8 strings against one shared dictionary. Blobs
+    carry no header, so they can only be read back by a codec built with
+    the same dictionary and backend.
+    """
+
+    def __init__(self, dictionary: bytes = b"", level: int = 6, backend: Optional[str] = None):
+        backend = backend or ("zstd" if zstandard is not None and dictionary else "zlib")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}")
+        if backend == "zstd" and zstandard is None:
+            raise ValueError("The zstd backend needs the zstandard package")
+        if backend == "zlib":
+            dictionary = dictionary[-MAX_ZLIB_DICTIONARY:]
+        self.dictionary = dictionary
+        self.level = level
+        self.backend = backend
+        if backend == "zstd":
+            shared = zstandard.ZstdCompressionDict(dictionary, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+            self._compressor = zstandard.ZstdCompressor(
+                level=level, dict_data=shared, write_checksum=False, write_dict_id=False
+            )
+            self._decompressor = zstandard.ZstdDecompressor(dict_data=shared)
+
+    @classmethod
+    def train(cls, samples: Sequence[str], size: int = 16 * 1024, **kwargs) -> "ContentCodec":
+        """Codec with a dictionary trained from `samples`"""
+        return cls(train_dictionary(samples, size), **kwargs)
+
+    @property
+    def trained(self) -> bool:
+        return bool(self.dictionary)
+
+    def compress(self, text: str) -> bytes:
+        raw = text.encode("utf-8")
+        if self.backend == "zstd":
+            return self._compressor.compress(raw)
+        compressor = (
+            zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=self.dictionary)
+            if self.dictionary else zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        )
+        return compressor.compress(raw) + compressor.flush()
+
+    def decompress(self, blob: bytes) -> str:
+        if self.backend == "zstd":
+            return self._decompressor.decompress(blob).decode("utf-8")
+        decompressor = zlib.decompressobj(-15, zdict=self.dictionary) if self.dictionary else zlib.decompressobj(-15)
+        return (decompressor.decompress(blob) + decompressor.flush()).decode("utf-8")
+
+    def decompress_many(self, blobs: Sequence[bytes]) -> List[str]:
+        """Decode a batch (one decompressor setup per blob is all deflate allows)"""
+        if self.backend == "zstd":
+            return [self._decompressor.decompress(blob).decode("utf-8") for blob in blobs]
+        dictionary = self.dictionary
+        if not dictionary:
+            return [zlib.decompress(blob, -15).decode("utf-8") for blob in blobs]
+        decompressobj = zlib.decompressobj
+        result = []
+        for blob in blobs:
+            decompressor = decompressobj(-15, zdict=dictionary)
+            result.append((decompressor.decompress(blob) + decompressor.flush()).decode("utf-8"))
+        return result
+
+
+class DecodedCache:
+    """Least-recently-used map of decoded strings"""
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self._items: "OrderedDict[Hashable, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable) -> Optional[str]:
+        value = self._items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: Hashable) -> Optional[str]:
+        """Cached value without touching recency or the hit counters"""
+        return self._items.get(key)
+
+    def put(self, key: Hashable, value: str) -> None:
+        if self.capacity <= 0:
+            return
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+__all__ = [
+    "BACKENDS",
+    "train_dictionary",
+    "ContentCodec",
+    "DecodedCache",
+]
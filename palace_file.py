@@ -0,0 +1,292 @@
+"""
+Palace File - versioned, memory-mapped on-disk palace format
+============================================================
+
+A palace is written once as column arrays and string heaps, and reopened
+with one mmap and a small directory read. Arrays come back as read-only
+NumPy views of the mapped file and strings are decoded only when asked
+for, so opening a palace costs the same at 100 locations or 1M.
+
+File layout:
+    header     MAGIC, format version, directory offset, directory length
+    sections   raw little-endian arrays, each aligned to 64 bytes; a string
+               heap is a UTF-8 data section plus an int64 offsets array
+    directory  JSON: palace metadata, and name -> offset/dtype/shape for
+               every array and heap
+
+Features:
+- Positions and metrics as zero-copy column views
+- Content and other text in string heaps, decoded per item
+- A serialized StaticRTree, so spatial queries work without rebuilding
+
+Benchmark:
+    python palace_benchmarks.py palacefile --sizes 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from palace_spatial import StaticRTree
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # palace files are NumPy column arrays
+    np = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PALACE\x00\x00"
+FORMAT_VERSION = 1
+
+# magic, version, directory offset, directory length
+_HEADER = struct.Struct("<8sHQQ")
+
+ALIGNMENT = 64
+
+# Array names reserved for the serialized spatial index
+SPATIAL_ARRAYS = ("spatial.order", "spatial.boxes", "spatial.levels")
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("Palace files need NumPy")
+
+
+# ==================== WRITER ====================
+
+def write_palace_file(
+    path: Union[str, Path],
+    meta: Dict[str, Any],
+    arrays: Dict[str, Any],
+    strings: Dict[str, Sequence[str]],
+    positions: Optional[str] = None,
+) -> int:
+    """
+    Write a palace file atomically and return its size in bytes.
+
+    `meta` must be JSON-serializable. If `positions` names an (n, 3) array,
+    a StaticRTree over it is stored with the file.
+    """
+    _require_numpy()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    arrays = {name: np.ascontiguousarray(values) for name, values in arrays.items()}
+    if positions is not None:
+        tree = StaticRTree.build(arrays[positions])
+        arrays.update(zip(SPATIAL_ARRAYS, tree.to_arrays().values()))
+    heaps = {}
+    for name, values in strings.items():
+        encoded = [value.encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(blob) for blob in encoded], out=offsets[1:])
+        heaps[name] = (b"".join(encoded), offsets)
+
+    directory: Dict[str, Any] = {"meta": meta, "arrays": {}, "strings": {},
+                                 "spatial": positions}
+    sections: List[bytes] = []
+    position = _HEADER.size
+
+    def place(blob) -> int:
+        nonlocal position
+        padding = -position % ALIGNMENT
+        sections.append(b"\x00" * padding)
+        sections.append(blob)
+        start = position + padding
+        position = start + len(blob)
+        return start
+
+    for name, values in arrays.items():
+        little = values.astype(values.dtype.newbyteorder("<"), copy=False)
+        directory["arrays"][name] = {
+            "offset": place(little.tobytes()),
+            "dtype": little.dtype.str,
+            "shape": list(little.shape),
+        }
+    for name, (data, offsets) in heaps.items():
+        directory["strings"][name] = {
+            "data": place(data),
+            "length": len(data),
+            "offsets": place(offsets.astype("<i8").tobytes()),
+            "count": len(offsets) - 1,
+        }
+
+    index = json.dumps(directory, separators=(",", ":")).encode("utf-8")
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, position, len(index))
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(header)
+        for section in sections:
+            f.write(section)
+        f.write(index)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote palace file: {path} ({position + len(index):,} bytes)")
+    return position + len(index)
+
+
+# ==================== READER ====================
+
+class StringHeap(Sequence):
+    """Strings stored back to back in a mapped section, decoded per item"""
+
+    def __init__(self, data: memoryview, offsets):
+        self._data = data
+        self._offsets = offsets
+        self._positions: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        return bytes(self._data[start:end]).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        data, offsets = self._data, self._offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield bytes(data[start:end]).decode("utf-8")
+
+    def release(self) -> None:
+        """Drop the view of the mapped data; the heap is unusable afterwards"""
+        self._data.release()
+        self._offsets = None
+
+    def position(self, value: str) -> Optional[int]:
+        """Index of `value` (the lookup table is built on first use)"""
+        if self._positions is None:
+            self._positions = {item: i for i, item in enumerate(self)}
+        return self._positions.get(value)
+
+
+class PalaceFile:
+    """An open palace file. Arrays and heaps are views of the memory map."""
+
+    def __init__(self, path: Path, mapped: mmap.mmap, directory: Dict[str, Any]):
+        self.path = path
+        self.meta: Dict[str, Any] = directory["meta"]
+        self._mm = mapped
+        self._view = memoryview(mapped)
+        self._directory = directory
+        self._arrays: Dict[str, Any] = {}
+        self._strings: Dict[str, StringHeap] = {}
+        self._spatial: Optional[StaticRTree] = None
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "PalaceFile":
+        """Map a palace file; raises ValueError if it is not a readable palace"""
+        _require_numpy()
+        path = Path(path)
+        with path.open("rb") as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # empty file
+                raise ValueError(f"{path} is not a palace file") from e
+        try:
+            magic, version, offset, length = _HEADER.unpack_from(mapped, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a palace file")
+            if version != FORMAT_VERSION:
+                raise ValueError(f"{path} has palace format {version}; this build reads {FORMAT_VERSION}")
+            directory = json.loads(mapped[offset:offset + length])
+        except (struct.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+            mapped.close()
+            raise ValueError(f"{path} is corrupt: {e}") from e
+        except ValueError:
+            mapped.close()
+            raise
+        return cls(path, mapped, directory)
+
+    def __enter__(self) -> "PalaceFile":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        spec = self._directory["strings"].get("id")
+        return spec["count"] if spec else 0
+
+    # LazyNodeMap protocol: location ids as keys, a row handle per id
+
+    def keys(self) -> StringHeap:
+        return self.strings("id")
+
+    def __contains__(self, key: str) -> bool:
+        return self.strings("id").position(key) is not None
+
+    def record(self, key: str) -> Dict[str, Any]:
+        return {"id": key, "index": self.strings("id").position(key)}
+
+    @property
+    def array_names(self) -> List[str]:
+        return [name for name in self._directory["arrays"] if name not in SPATIAL_ARRAYS]
+
+    def array(self, name: str):
+        """Read-only NumPy view of a stored array"""
+        values = self._arrays.get(name)
+        if values is None:
+            spec = self._directory["arrays"][name]
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"], dtype=np.int64))
+            values = np.frombuffer(self._mm, dtype=dtype, count=count, offset=spec["offset"]).reshape(spec["shape"])
+            self._arrays[name] = values
+        return values
+
+    def strings(self, name: str) -> StringHeap:
+        heap = self._strings.get(name)
+        if heap is None:
+            spec = self._directory["strings"][name]
+            offsets = np.frombuffer(self._mm, dtype="<i8", count=spec["count"] + 1, offset=spec["offsets"])
+            data = self._view[spec["data"]:spec["data"] + spec["length"]]
+            heap = self._strings[name] = StringHeap(data, offsets)
+        return heap
+
+    @property
+    def spatial(self) -> Optional[StaticRTree]:
+        """The stored spatial index over the positions array, if any"""
+        positions = self._directory.get("spatial")
+        if self._spatial is None and positions is not None:
+            self._spatial = StaticRTree.from_arrays(
+                self.array(positions),
+                {name.split(".", 1)[1]: self.array(name) for name in SPATIAL_ARRAYS},
+            )
+        return self._spatial
+
+    def close(self) -> None:
+        """Unmap the file. Arrays handed out earlier keep the map alive until
+        they are released."""
+        self._arrays.clear()
+        for heap in self._strings.values():
+            heap.release()
+        self._strings.clear()
+        self._spatial = None
+        try:
+            self._view.release()
+            self._mm.close()
+        except BufferError:
+            logger.debug(f"{self.path} is still referenced; it is unmapped when released")
+
+
+__all__ = [
+    "MAGIC",
+    "FORMAT_VERSION",
+    "write_palace_file",
+    "StringHeap",
+    "PalaceFile",
+]
@@ -0,0 +1,292 @@
+"""
+Palace Routing - cached shortest paths and walk-through tours
+=============================================================
+
+Routing over a palace's connection graph, shared by the spatial
+intelligence engine and the palace system.
+
+Features:
+- Adjacency built once with cached Euclidean edge weights; moving
+  locations re-weights only their own edges
+- A* with a closed set, and resumable multi-target Dijkstra trees;
+  both are memoized until the layout changes
+- Whole-palace walk-through tours: nearest-neighbor construction over the
+  R-tree, then 2-opt over each location's nearest candidates
+
+Benchmark:
+    python palace_benchmarks.py routing --sizes 1000 10000
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from palace_spatial import OptimizedSpatialIndex, Position3D
+
+
+class _SearchTree:
+    """Dijkstra state from one source, settled lazily as targets are asked for"""
+
+    __slots__ = ("heap", "dist", "parent", "settled")
+
+    def __init__(self, source: int):
+        self.heap: List[Tuple[float, int]] = [(0.0, source)]
+        self.dist: Dict[int, float] = {source: 0.0}
+        self.parent: Dict[int, int] = {source: -1}
+        self.settled: set = set()
+
+
+class PalaceRouter:
+    """
+    Shortest paths over directed connections between locations. Edge weights
+    are Euclidean distances (`default_weight` when a position is missing).
+    Results are cached until `update_positions` or `clear_cache`.
+    """
+
+    def __init__(
+        self,
+        connections: Mapping[str, Iterable[str]],
+        positions: Mapping[str, Position3D],
+        default_weight: float = 1.0,
+        heuristic_weight: float = 1.0,
+    ):
+        self.default_weight = default_weight
+        self.heuristic_weight = heuristic_weight
+        ids = dict.fromkeys(positions)
+        for start, ends in connections.items():
+            ids.setdefault(start)
+            for end in ends:
+                ids.setdefault(end)
+        self.ids: List[str] = list(ids)
+        self.index: Dict[str, int] = {node_id: i for i, node_id in enumerate(self.ids)}
+        self.positions: List[Optional[Position3D]] = [positions.get(node_id) for node_id in self.ids]
+
+        self.adjacency: List[List[List]] = [[] for _ in self.ids]  # per node: [neighbor, weight]
+        self.incoming: List[List[int]] = [[] for _ in self.ids]
+        for start, ends in connections.items():
+            u = self.index[start]
+            for end in ends:
+                v = self.index[end]
+                self.adjacency[u].append([v, self._weight(u, v)])
+                self.incoming[v].append(u)
+
+        self._paths: Dict[Tuple[int, int], Optional[Tuple[float, List[str]]]] = {}
+        self._trees: Dict[int, _SearchTree] = {}
+        self.cache_hits = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _weight(self, u: int, v: int) -> float:
+        pu, pv = self.positions[u], self.positions[v]
+        if pu is None or pv is None:
+            return self.default_weight
+        return math.dist(pu, pv)
+
+    # ------------------------------------------------------------------
+    # Layout changes
+    # ------------------------------------------------------------------
+
+    def update_positions(self, positions: Mapping[str, Position3D]) -> None:
+        """Re-weight the edges of moved locations and drop cached routes"""
+        moved = set()
+        for node_id, position in positions.items():
+            u = self.index.get(node_id)
+            if u is not None and self.positions[u] != position:
+                self.positions[u] = position
+                moved.add(u)
+        for u in moved:
+            for edge in self.adjacency[u]:
+                edge[1] = self._weight(u, edge[0])
+            for w in self.incoming[u]:
+                if w not in moved:
+                    for edge in self.adjacency[w]:
+                        if edge[0] == u:
+                            edge[1] = self._weight(w, u)
+        if moved:
+            self.clear_cache()
+
+    def clear_cache(self) -> None:
+        self._paths.clear()
+        self._trees.clear()
+
+    # ------------------------------------------------------------------
+    # Shortest paths
+    # ------------------------------------------------------------------
+
+    def shortest_path(self, start: str, goal: str) -> List[str]:
+        """A* path from start to goal ([] if unreachable); exact when every
+        location on the way has a position"""
+        cost_path = self._route(start, goal)
+        return list(cost_path[1]) if cost_path else []
+
+    def distance(self, start: str, goal: str) -> float:
+        """Length of the shortest path (inf if unreachable)"""
+        cost_path = self._route(start, goal)
+        return cost_path[0] if cost_path else math.inf
+
+    def shortest_paths(self, start: str, targets: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Paths from start to several targets with one Dijkstra search. The
+        search tree is kept, so later targets from the same start only settle
+        the nodes not reached yet. Unreachable targets are left out.
+        """
+        s = self.index.get(start)
+        if s is None:
+            return {}
+        tree = self._trees.get(s)
+        if tree is None:
+            tree = self._trees[s] = _SearchTree(s)
+        wanted = {self.index[t] for t in targets if t in self.index}
+        pending = wanted - tree.settled
+        while pending and tree.heap:
+            d, u = heapq.heappop(tree.heap)
+            if u in tree.settled:
+                continue
+            tree.settled.add(u)
+            pending.discard(u)
+            for v, w in self.adjacency[u]:
+                nd = d + w
+                if nd < tree.dist.get(v, math.inf):
+                    tree.dist[v] = nd
+                    tree.parent[v] = u
+                    heapq.heappush(tree.heap, (nd, v))
+        return {self.ids[t]: self._unwind(tree.parent, t) for t in wanted if t in tree.settled}
+
+    def _route(self, start: str, goal: str) -> Optional[Tuple[float, List[str]]]:
+        s, g = self.index.get(start), self.index.get(goal)
+        if s is None or g is None:
+            return None
+        if (s, g) in self._paths:
+            self.cache_hits += 1
+            return self._paths[(s, g)]
+        tree = self._trees.get(s)
+        if tree is not None and g in tree.settled:
+            result = (tree.dist[g], self._unwind(tree.parent, g))
+        else:
+            result = self._astar(s, g)
+        self._paths[(s, g)] = result  # unreachable goals are memoized too
+        return result
+
+    def _astar(self, s: int, g: int) -> Optional[Tuple[float, List[str]]]:
+        goal_pos = self.positions[g]
+        scale = self.heuristic_weight
+        positions = self.positions
+
+        def heuristic(v: int) -> float:
+            pv = positions[v]
+            if goal_pos is None or pv is None:
+                return 0.0
+            return scale * math.dist(pv, goal_pos)
+
+        cost = {s: 0.0}
+        parent = {s: -1}
+        closed = set()
+        frontier = [(heuristic(s), 0.0, s)]
+        while frontier:
+            _, c, u = heapq.heappop(frontier)
+            if u in closed:
+                continue
+            if u == g:
+                return c, self._unwind(parent, g)
+            closed.add(u)
+            for v, w in self.adjacency[u]:
+                if v in closed:
+                    continue
+                nc = c + w
+                if nc < cost.get(v, math.inf):
+                    cost[v] = nc
+                    parent[v] = u
+                    heapq.heappush(frontier, (nc + heuristic(v), nc, v))
+        return None
+
+    def _unwind(self, parent: Dict[int, int], node: int) -> List[str]:
+        path = []
+        while node != -1:
+            path.append(self.ids[node])
+            node = parent[node]
+        path.reverse()
+        return path
+
+    # ------------------------------------------------------------------
+    # Walk-through tours
+    # ------------------------------------------------------------------
+
+    def tour(
+        self, nodes: Optional[Sequence[str]] = None, start: Optional[str] = None,
+        candidates: int = 8, max_passes: int = 20,
+    ) -> List[str]:
+        """
+        Open walk visiting every location (default: all with positions) once,
+        beginning at `start`, by straight-line distance. Built nearest
+        neighbor first, then shortened by 2-opt moves that join a location
+        to one of its `candidates` nearest. Locations without a position go
+        last.
+        """
+        nodes = [n for n in (self.ids if nodes is None else nodes) if n in self.index]
+        placed = [n for n in nodes if self.positions[self.index[n]] is not None]
+        unplaced = [n for n in nodes if self.positions[self.index[n]] is None]
+        if len(placed) < 3:
+            ordered = sorted(placed, key=lambda n: n != start)
+            return ordered + unplaced
+
+        points = {n: self.positions[self.index[n]] for n in placed}
+        index = OptimizedSpatialIndex()
+        index.add_locations(list(points.items()))
+        current = start if start in points else placed[0]
+        order = [current]
+        index.remove_location(current)
+        while len(index):
+            current = index.find_nearest(points[current], 1)[0][0]
+            index.remove_location(current)
+            order.append(current)
+
+        if max_passes <= 0:
+            return order + unplaced
+        neighbours = OptimizedSpatialIndex()
+        neighbours.add_locations(list(points.items()))
+        near = neighbours.find_nearest_batch([points[n] for n in placed], candidates + 1)
+        near_lists = {n: [m for m, _ in found if m != n] for n, found in zip(placed, near)}
+        return self._two_opt(order, points, near_lists, max_passes) + unplaced
+
+    @staticmethod
+    def _two_opt(order: List[str], points: Dict[str, Position3D], near: Dict[str, List[str]], max_passes: int) -> List[str]:
+        """2-opt on an open path with a fixed first stop"""
+        n = len(order)
+        where = {node: i for i, node in enumerate(order)}
+        dist = math.dist
+        for _ in range(max_passes):
+            improved = False
+            for i in range(n - 1):
+                a, b = order[i], order[i + 1]
+                ab = dist(points[a], points[b])
+                for c in near[a]:
+                    j = where[c]
+                    if j <= i + 1:
+                        continue
+                    # Reverse order[i+1..j]: edges (a,b),(c,d) become (a,c),(b,d)
+                    d = order[j + 1] if j + 1 < n else None
+                    before = ab + (dist(points[c], points[d]) if d is not None else 0.0)
+                    after = dist(points[a], points[c]) + (dist(points[b], points[d]) if d is not None else 0.0)
+                    if after < before - 1e-9:
+                        order[i + 1:j + 1] = order[i + 1:j + 1][::-1]
+                        for k in range(i + 1, j + 1):
+                            where[order[k]] = k
+                        b = order[i + 1]
+                        ab = dist(points[a], points[b])
+                        improved = True
+            if not improved:
+                break
+        return order
+
+    def tour_length(self, order: Sequence[str]) -> float:
+        """Straight-line length of walking `order`"""
+        placed = [self.positions[self.index[n]] for n in order if self.positions[self.index[n]] is not None]
+        return sum(math.dist(p, q) for p, q in zip(placed, placed[1:]))
+
+
+__all__ = [
+    "PalaceRouter",
+]
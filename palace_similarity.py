@@ -0,0 +1,426 @@
+"""
+Palace Similarity - sparse content similarity for the memory palace systems
+===========================================================================
+
+Scores "which concepts look alike" without comparing every pair, so layout
+optimization and interference detection scale past a few hundred concepts.
+
+Features:
+- Each text is tokenized once into a sorted tuple of integer token ids
+  (shared TokenVocabulary); Jaccard is a merge over two sorted tuples
+- MinHash signatures with LSH banding propose candidate pairs for text;
+  random-hyperplane (SimHash) tables do the same for cosine over embeddings
+- Candidates are rescored exactly and reduced to a sparse top-k neighbor
+  graph (i, j, weight); small inputs are scored exactly in NumPy row blocks
+
+Benchmark:
+    python palace_benchmarks.py similarity --sizes 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # neighbor graphs fall back to exact pure-Python scoring
+    np = None
+
+# Sparse graph as three parallel lists: rows[i] < cols[i], one entry per pair
+NeighborGraph = Tuple[List[int], List[int], List[float]]
+
+# Mersenne prime for the MinHash universal hash family (a * x + b) mod p
+MINHASH_PRIME = (1 << 31) - 1
+
+
+# ============================================================================
+# TOKENIZATION
+# ============================================================================
+
+
+class TokenVocabulary:
+    """
+    Interns lower-cased whitespace tokens as integer ids and caches each
+    text's sorted id tuple, so a text is only tokenized once.
+    """
+
+    def __init__(self, max_cached_texts: int = 65536):
+        self.ids: Dict[str, int] = {}
+        self.max_cached_texts = max_cached_texts
+        self._encoded: Dict[str, Tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def encode(self, text: str) -> Tuple[int, ...]:
+        """Sorted distinct token ids of `text`"""
+        encoded = self._encoded.get(text)
+        if encoded is None:
+            ids = self.ids
+            encoded = tuple(sorted({ids.setdefault(word, len(ids)) for word in text.lower().split()}))
+            if len(self._encoded) >= self.max_cached_texts:
+                self._encoded.clear()
+            self._encoded[text] = encoded
+        return encoded
+
+
+def jaccard_ids(a: Sequence[int], b: Sequence[int]) -> float:
+    """Jaccard similarity of two sorted, duplicate-free id sequences"""
+    len_a, len_b = len(a), len(b)
+    if not len_a or not len_b:
+        return 0.0
+    i = j = shared = 0
+    while i < len_a and j < len_b:
+        x, y = a[i], b[j]
+        if x == y:
+            shared += 1
+            i += 1
+            j += 1
+        elif x < y:
+            i += 1
+        else:
+            j += 1
+    return shared / (len_a + len_b - shared)
+
+
+def window_pairs(order, groups, width: int):
+    """
+    Candidate pairs between items that are at most `width` apart in `order`
+    and share a group key (`groups` is indexed like the items). Caps the
+    pairs a large group can produce at width per member.
+    """
+    order = np.asarray(order, dtype=np.int64)
+    keys = np.asarray(groups)[order]
+    rows, cols = [], []
+    for offset in range(1, min(width, len(order) - 1) + 1):
+        same = keys[:-offset] == keys[offset:]
+        rows.append(order[:-offset][same])
+        cols.append(order[offset:][same])
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(rows), np.concatenate(cols)
+
+
+# ============================================================================
+# SIMILARITY INDEX
+# ============================================================================
+
+
+class SimilarityIndex:
+    """
+    Sparse similarity over a fixed list of texts (and optional embeddings).
+
+    `neighbor_graph` keeps, for every item, its k most similar items above a
+    threshold. Inputs up to `exact_max` items are scored exhaustively; larger
+    ones only score LSH candidates. Similarity is the Jaccard of the token
+    sets, or cosine when both items carry an embedding; a `score` callback
+    can blend the Jaccard term with other per-item features.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 32,
+        max_df: float = 0.05,
+        hyperplanes: int = 12,
+        tables: int = 8,
+        window: int = 8,
+        exact_max: int = 1000,
+        seed: int = 17,
+        vocabulary: Optional[TokenVocabulary] = None,
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.max_df = max_df
+        self.hyperplanes = hyperplanes
+        self.tables = tables
+        self.window = window
+        self.exact_max = exact_max
+        self.seed = seed
+        self.vocabulary = vocabulary or TokenVocabulary()
+        self.token_ids: List[Tuple[int, ...]] = []
+        self.embeddings: List[Sequence[float]] = []
+
+    def __len__(self) -> int:
+        return len(self.token_ids)
+
+    def build(
+        self, texts: Sequence[str], embeddings: Optional[Sequence[Sequence[float]]] = None
+    ) -> "SimilarityIndex":
+        """Index `texts`; `embeddings[i]` may be empty for items without one"""
+        embeddings = list(embeddings) if embeddings is not None else []
+        if embeddings and len(embeddings) != len(texts):
+            raise ValueError("embeddings must align with texts")
+        if len({len(vector) for vector in embeddings if len(vector)}) > 1:
+            raise ValueError("embeddings must share one dimension")
+        self.token_ids = [self.vocabulary.encode(text) for text in texts]
+        self.embeddings = embeddings if any(len(vector) for vector in embeddings) else []
+        return self
+
+    def similarity(self, i: int, j: int) -> float:
+        """Cosine of the embeddings when both exist, else token Jaccard"""
+        if self.embeddings and len(self.embeddings[i]) and len(self.embeddings[j]):
+            cosine = _cosine(self.embeddings[i], self.embeddings[j])
+            if cosine is not None:
+                return cosine
+        return jaccard_ids(self.token_ids[i], self.token_ids[j])
+
+    def neighbor_graph(
+        self,
+        k: int = 16,
+        threshold: float = 0.0,
+        score: Optional[Callable] = None,
+        extra_pairs=None,
+        exact: Optional[bool] = None,
+    ) -> NeighborGraph:
+        """
+        Sparse top-k graph: each item keeps its k most similar items scoring
+        above `threshold`; the result is the union over items, each pair once
+        with i < j. `score(rows, cols, text)` maps index arrays and their
+        Jaccard to a similarity (embedding pairs always use cosine).
+        `extra_pairs` (rows, cols) adds candidates the LSH tables cannot see.
+        """
+        n = len(self.token_ids)
+        if n < 2 or k <= 0:
+            return [], [], []
+        if np is None:
+            return self._graph_python(k, threshold, score)
+        if exact if exact is not None else n <= self.exact_max:
+            return self._graph_exact(k, threshold, score)
+
+        rows, cols = self.candidate_pairs()
+        if extra_pairs is not None:
+            rows = np.concatenate([rows, np.asarray(extra_pairs[0], dtype=np.int64)])
+            cols = np.concatenate([cols, np.asarray(extra_pairs[1], dtype=np.int64)])
+        rows, cols = _unique_pairs(rows, cols, n)
+        text = self.pair_jaccard(rows, cols)
+        weights = np.asarray(score(rows, cols, text) if score else text, dtype=float)
+        if self.embeddings:
+            unit, embedded = self._unit_vectors()
+            both = embedded[rows] & embedded[cols]
+            weights[both] = (unit[rows[both]] * unit[cols[both]]).sum(axis=1)
+        strong = weights > threshold
+        rows, cols, weights = rows[strong], cols[strong], weights[strong]
+
+        # Rank every pair from both ends; keep it if either end ranks it in its top k
+        ends = np.concatenate([rows, cols])
+        pair = np.concatenate([np.arange(len(rows))] * 2)
+        order = np.lexsort((-np.concatenate([weights, weights]), ends))
+        ends, pair = ends[order], pair[order]
+        position = np.arange(len(ends))
+        group_start = np.maximum.accumulate(np.where(np.r_[True, ends[1:] != ends[:-1]], position, 0))
+        kept = np.unique(pair[position - group_start < k])
+        return rows[kept].tolist(), cols[kept].tolist(), weights[kept].tolist()
+
+    # ------------------------------------------------------------------
+    # Candidate generation
+    # ------------------------------------------------------------------
+
+    def candidate_pairs(self):
+        """LSH candidate pairs (rows, cols) from MinHash bands and SimHash tables"""
+        rows, cols = [], []
+        signatures, has_tokens = self.minhash_signatures()
+        band_rows = self.num_perm // self.bands
+        mixer = np.random.default_rng(self.seed + 1).integers(1, 1 << 62, size=band_rows, dtype=np.int64)
+        present = np.flatnonzero(has_tokens)
+        band_keys = [
+            (signatures[present, band * band_rows:(band + 1) * band_rows].astype(np.uint64)
+             * mixer.astype(np.uint64)).sum(axis=1)
+            for band in range(self.bands)
+        ]
+        for band, keys in enumerate(band_keys):
+            # Within a bucket, neighbors in the window also share the next band
+            # when possible, so buckets of a common token do not crowd it out
+            order = np.lexsort((band_keys[(band + 1) % self.bands], keys))
+            r, c = window_pairs(order, keys, self.window)
+            rows.append(present[r])
+            cols.append(present[c])
+
+        if self.embeddings:
+            unit, embedded = self._unit_vectors()
+            members = np.flatnonzero(embedded)
+            rng = np.random.default_rng(self.seed + 2)
+            planes = rng.standard_normal((unit.shape[1], self.hyperplanes * self.tables))
+            bits = (unit[members] @ planes > 0).astype(np.int64)
+            powers = 1 << np.arange(self.hyperplanes, dtype=np.int64)
+            for table in range(self.tables):
+                keys = bits[:, table * self.hyperplanes:(table + 1) * self.hyperplanes] @ powers
+                r, c = window_pairs(np.argsort(keys, kind="stable"), keys, self.window)
+                rows.append(members[r])
+                cols.append(members[c])
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(rows), np.concatenate(cols)
+
+    def minhash_signatures(self, chunk: int = 1 << 16):
+        """
+        (n, num_perm) MinHash signatures and a mask of items that have any
+        signature. Tokens in more than `max_df` of the items are left out:
+        they would put most items in the same buckets and only add noise.
+        """
+        n = len(self.token_ids)
+        rng = np.random.default_rng(self.seed)
+        a = rng.integers(1, MINHASH_PRIME, size=self.num_perm, dtype=np.int64)
+        b = rng.integers(0, MINHASH_PRIME, size=self.num_perm, dtype=np.int64)
+        flat, indptr = self._flat_tokens()
+        common = np.bincount(flat) > max(self.max_df * n, self.window)
+        keep = ~common[flat]
+        # Kept tokens per item (reduceat would misread empty items at the end)
+        lengths = np.bincount(np.repeat(np.arange(n), np.diff(indptr))[keep], minlength=n)
+        flat = flat[keep]
+        members = np.flatnonzero(lengths)
+        starts = np.concatenate(([0], np.cumsum(lengths[members])[:-1]))
+        signatures = np.full((n, self.num_perm), MINHASH_PRIME, dtype=np.int64)
+        # Items in chunks of about `chunk` tokens keep the hash matrix small
+        step = max(1, chunk // max(1, int(lengths.max(initial=1))))
+        for first in range(0, len(members), step):
+            part = members[first:first + step]
+            low = starts[first]
+            high = starts[first + len(part)] if first + len(part) < len(members) else len(flat)
+            hashed = (flat[low:high, None] * a + b) % MINHASH_PRIME
+            signatures[part] = np.minimum.reduceat(hashed, starts[first:first + len(part)] - low, axis=0)
+        return signatures, lengths > 0
+
+    def _flat_tokens(self):
+        """All token ids concatenated, with CSR offsets per item"""
+        lengths = np.array([len(ids) for ids in self.token_ids], dtype=np.int64)
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        flat = np.fromiter((t for ids in self.token_ids for t in ids), dtype=np.int64, count=int(indptr[-1]))
+        return flat, indptr
+
+    # ------------------------------------------------------------------
+    # Exact scoring
+    # ------------------------------------------------------------------
+
+    def pair_jaccard(self, rows, cols, chunk: int = 1 << 18):
+        """Exact Jaccard for each (rows[i], cols[i]) pair"""
+        flat, indptr = self._flat_tokens()
+        lengths = np.diff(indptr)
+        span = int(flat.max()) + 1 if len(flat) else 1
+        result = np.zeros(len(rows))
+        for start in range(0, len(rows), chunk):
+            r, c = rows[start:start + chunk], cols[start:start + chunk]
+            pair = np.arange(len(r))
+            keys = np.concatenate([_gather(flat, indptr, lengths, r, pair, span),
+                                   _gather(flat, indptr, lengths, c, pair, span)])
+            keys.sort()
+            # Both id sets are duplicate-free, so a repeated key is a shared token
+            repeated = keys[1:][keys[1:] == keys[:-1]] // span
+            shared = np.bincount(repeated, minlength=len(r)).astype(float)
+            union = lengths[r] + lengths[c] - shared
+            result[start:start + chunk] = np.where(union > 0, shared / np.maximum(union, 1), 0.0)
+        return result
+
+    def _graph_exact(self, k: int, threshold: float, score: Optional[Callable]) -> NeighborGraph:
+        """Score every pair in NumPy row blocks (word overlap via an inverted index)"""
+        n = len(self.token_ids)
+        token_ids = self.token_ids
+        postings: Dict[int, List[int]] = {}
+        for i, ids in enumerate(token_ids):
+            for token in ids:
+                postings.setdefault(token, []).append(i)
+        postings_arrays = {token: np.asarray(docs, dtype=np.int64) for token, docs in postings.items()}
+        sizes = np.array([len(ids) for ids in token_ids], dtype=float)
+        unit, embedded = self._unit_vectors() if self.embeddings else (None, None)
+        columns = np.arange(n)
+
+        keep = min(k, n - 1)
+        found_rows, found_cols, found_weights = [], [], []
+        block = max(1, 2_000_000 // n)
+        for start in range(0, n, block):
+            rows = np.arange(start, min(n, start + block))
+            pieces = [postings_arrays[token] + (r - start) * n for r in rows.tolist() for token in token_ids[r]]
+            shared = np.zeros(len(rows) * n)
+            if pieces:
+                shared = np.bincount(np.concatenate(pieces), minlength=len(rows) * n).astype(float)
+            shared = shared.reshape(len(rows), n)
+            union = sizes[rows, None] + sizes[None, :] - shared
+            text = np.where((sizes[rows, None] > 0) & (sizes[None, :] > 0), shared / np.maximum(union, 1), 0.0)
+            similarity = np.asarray(score(rows[:, None], columns[None, :], text) if score else text, dtype=float)
+            if unit is not None:
+                both = embedded[rows, None] & embedded[None, :]
+                similarity = np.where(both, unit[rows] @ unit.T, similarity)
+            similarity[np.arange(len(rows)), rows] = -np.inf
+
+            top = np.argpartition(-similarity, keep - 1, axis=1)[:, :keep]
+            weights = np.take_along_axis(similarity, top, axis=1)
+            strong = weights > threshold
+            found_rows.append(np.repeat(rows, keep)[strong.ravel()])
+            found_cols.append(top[strong])
+            found_weights.append(weights[strong])
+
+        i, j = np.concatenate(found_rows), np.concatenate(found_cols)
+        weights = np.concatenate(found_weights)
+        low, high = np.minimum(i, j), np.maximum(i, j)
+        _, first = np.unique(low * n + high, return_index=True)
+        return low[first].tolist(), high[first].tolist(), weights[first].tolist()
+
+    def _graph_python(self, k: int, threshold: float, score: Optional[Callable]) -> NeighborGraph:
+        """Pure-Python fallback: every pair scored, k strongest kept per item"""
+        n = len(self.token_ids)
+        found: Dict[Tuple[int, int], float] = {}
+        for i in range(n):
+            row = []
+            for j in range(n):
+                if j == i:
+                    continue
+                weight = None
+                if self.embeddings and len(self.embeddings[i]) and len(self.embeddings[j]):
+                    weight = _cosine(self.embeddings[i], self.embeddings[j])
+                if weight is None:
+                    text = jaccard_ids(self.token_ids[i], self.token_ids[j])
+                    weight = score(i, j, text) if score else text
+                row.append((weight, j))
+            for weight, j in heapq.nlargest(k, row):
+                if weight > threshold:
+                    found[(min(i, j), max(i, j))] = weight
+        keys = sorted(found)
+        return [i for i, _ in keys], [j for _, j in keys], [found[key] for key in keys]
+
+    def _unit_vectors(self):
+        """(n, d) unit embeddings (zero rows where missing) and an embedded mask"""
+        n = len(self.token_ids)
+        dim = next(len(vector) for vector in self.embeddings if len(vector))
+        vectors = np.zeros((n, dim))
+        for i, vector in enumerate(self.embeddings):
+            if len(vector):
+                vectors[i] = vector
+        norms = np.sqrt((vectors * vectors).sum(axis=1))
+        return vectors / np.maximum(norms, 1e-300)[:, None], norms > 0
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> Optional[float]:
+    """Cosine similarity, or None when either vector is zero"""
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(y * y for y in b))
+    if norm_a > 0 and norm_b > 0:
+        return sum(x * y for x, y in zip(a, b)) / (norm_a * norm_b)
+    return None
+
+
+def _unique_pairs(rows, cols, n: int):
+    """Distinct (low, high) pairs with low < high"""
+    low, high = np.minimum(rows, cols), np.maximum(rows, cols)
+    keys = np.sort((low * n + high)[low != high])
+    keys = keys[np.r_[True, keys[1:] != keys[:-1]]] if len(keys) else keys
+    return keys // n, keys % n
+
+
+def _gather(flat, indptr, lengths, items, pair, span: int):
+    """Token ids of `items` as pair * span + token keys"""
+    counts = lengths[items]
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(pair, counts) * span + flat[np.repeat(indptr[items], counts) + offsets]
+
+
+__all__ = [
+    "NeighborGraph",
+    "TokenVocabulary",
+    "jaccard_ids",
+    "window_pairs",
+    "SimilarityIndex",
+]
@@ -0,0 +1,1051 @@
+"""
+Palace Spatial - shared R-tree index for the memory palace systems
+==================================================================
+
+One 3-D point index used by elite_memory_palace and
+optimized_elite_memory_palace, so spatial queries are tuned in one place.
+
+Features:
+- Pluggable node splits: Guttman linear and quadratic, and R* (topological
+  split, overlap-aware subtree choice and forced reinsertion)
+- Bulk loading by Sort-Tile-Recursive or Hilbert packing; each level's
+  bounding boxes are computed from one NumPy array
+- Exact best-first kNN, radius and box queries, deletion and moves
+- StaticRTree: a read-only Hilbert-packed tree held in flat arrays, so it
+  can be saved to disk and queried straight from a memory map
+- __slots__ nodes and entries (an entry keeps only its id and position)
+- UniformGrid spatial hash for fixed-radius checks on moving points
+
+Benchmark:
+    python palace_benchmarks.py spatial --splits linear quadratic rstar
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # packing and Hilbert keys fall back to pure Python
+    np = None
+
+# Type aliases for improved code clarity and documentation
+Position3D = Tuple[float, float, float]  # (x, y, z) coordinates
+BoundingBox3D = Tuple[float, float, float, float, float, float]  # (min_x, min_y, min_z, max_x, max_y, max_z)
+
+# Half-width of the box around each point, so that no box has zero volume
+BBOX_MARGIN = 0.1
+
+
+# ============================================================================
+# BOUNDING BOX GEOMETRY
+# ============================================================================
+
+
+def _point_bbox(point: Position3D) -> BoundingBox3D:
+    x, y, z = point
+    m = BBOX_MARGIN
+    return (x - m, y - m, z - m, x + m, y + m, z + m)
+
+
+def _bbox_union(a: Optional[BoundingBox3D], b: BoundingBox3D) -> BoundingBox3D:
+    if a is None:
+        return b
+    return (min(a[0], b[0]), min(a[1], b[1]), min(a[2], b[2]),
+            max(a[3], b[3]), max(a[4], b[4]), max(a[5], b[5]))
+
+
+def _bbox_cover(boxes: Sequence[BoundingBox3D]) -> Optional[BoundingBox3D]:
+    if not boxes:
+        return None
+    min_x, min_y, min_z, max_x, max_y, max_z = zip(*boxes)
+    return (min(min_x), min(min_y), min(min_z), max(max_x), max(max_y), max(max_z))
+
+
+def _bbox_volume(bbox: BoundingBox3D) -> float:
+    return (bbox[3] - bbox[0]) * (bbox[4] - bbox[1]) * (bbox[5] - bbox[2])
+
+
+def _union_volume(a: BoundingBox3D, b: BoundingBox3D) -> float:
+    """Volume of the box covering a and b, without building it (split hot path)"""
+    return (((a[3] if a[3] > b[3] else b[3]) - (a[0] if a[0] < b[0] else b[0]))
+            * ((a[4] if a[4] > b[4] else b[4]) - (a[1] if a[1] < b[1] else b[1]))
+            * ((a[5] if a[5] > b[5] else b[5]) - (a[2] if a[2] < b[2] else b[2])))
+
+
+def _bbox_margin(bbox: BoundingBox3D) -> float:
+    """Sum of edge lengths (the R* 'margin')"""
+    return (bbox[3] - bbox[0]) + (bbox[4] - bbox[1]) + (bbox[5] - bbox[2])
+
+
+def _bbox_overlap(a: BoundingBox3D, b: BoundingBox3D) -> float:
+    dx = (a[3] if a[3] < b[3] else b[3]) - (a[0] if a[0] > b[0] else b[0])
+    if dx <= 0:
+        return 0.0
+    dy = (a[4] if a[4] < b[4] else b[4]) - (a[1] if a[1] > b[1] else b[1])
+    if dy <= 0:
+        return 0.0
+    dz = (a[5] if a[5] < b[5] else b[5]) - (a[2] if a[2] > b[2] else b[2])
+    return dx * dy * dz if dz > 0 else 0.0
+
+
+def _bbox_center(bbox: BoundingBox3D) -> Position3D:
+    return ((bbox[0] + bbox[3]) / 2, (bbox[1] + bbox[4]) / 2, (bbox[2] + bbox[5]) / 2)
+
+
+def _bbox_contains(outer: BoundingBox3D, inner: BoundingBox3D) -> bool:
+    return (outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] <= inner[2]
+            and outer[3] >= inner[3] and outer[4] >= inner[4] and outer[5] >= inner[5])
+
+
+def _bbox_intersects(a: BoundingBox3D, b: BoundingBox3D) -> bool:
+    return (a[0] <= b[3] and b[0] <= a[3] and a[1] <= b[4] and b[1] <= a[4]
+            and a[2] <= b[5] and b[2] <= a[5])
+
+
+def _mindist_sq(bbox: BoundingBox3D, x: float, y: float, z: float) -> float:
+    """Squared MINDIST from a point to a bounding box"""
+    dx = bbox[0] - x if x < bbox[0] else (x - bbox[3] if x > bbox[3] else 0.0)
+    dy = bbox[1] - y if y < bbox[1] else (y - bbox[4] if y > bbox[4] else 0.0)
+    dz = bbox[2] - z if z < bbox[2] else (z - bbox[5] if z > bbox[5] else 0.0)
+    return dx * dx + dy * dy + dz * dz
+
+
+def hilbert_keys(points: Sequence[Position3D], bits: int = 10) -> List[int]:
+    """
+    Position of each point along a 3-D Hilbert curve over the points' bounding
+    box (Skilling's transpose algorithm, `bits` per axis). Vectorized with
+    NumPy when available.
+    """
+    if len(points) == 0:
+        return []
+    top = (1 << bits) - 1
+    if np is not None:
+        coords = np.asarray(points, dtype=float)
+        low = coords.min(axis=0)
+        span = np.maximum(coords.max(axis=0) - low, 1e-12)
+        X = [col for col in np.minimum((coords - low) / span * top, top).astype(np.int64).T]
+        Q = 1 << (bits - 1)
+        while Q > 1:
+            P = Q - 1
+            for i in range(3):
+                hit = (X[i] & Q) != 0
+                t = (X[0] ^ X[i]) & P
+                X[0] = np.where(hit, X[0] ^ P, X[0] ^ t)
+                if i:
+                    X[i] = np.where(hit, X[i], X[i] ^ t)
+            Q >>= 1
+        X[1] ^= X[0]
+        X[2] ^= X[1]
+        t = np.zeros_like(X[0])
+        Q = 1 << (bits - 1)
+        while Q > 1:
+            t = np.where((X[2] & Q) != 0, t ^ (Q - 1), t)
+            Q >>= 1
+        keys = np.zeros_like(X[0])
+        for b in range(bits - 1, -1, -1):
+            for i in range(3):
+                keys = (keys << 1) | ((X[i] ^ t) >> b & 1)
+        return keys.tolist()
+
+    lows = [min(p[a] for p in points) for a in range(3)]
+    spans = [max(max(p[a] for p in points) - lows[a], 1e-12) for a in range(3)]
+    keys = []
+    for point in points:
+        X = [min(int((point[a] - lows[a]) / spans[a] * top), top) for a in range(3)]
+        Q = 1 << (bits - 1)
+        while Q > 1:
+            P = Q - 1
+            for i in range(3):
+                if X[i] & Q:
+                    X[0] ^= P
+                else:
+                    t = (X[0] ^ X[i]) & P
+                    X[0] ^= t
+                    X[i] ^= t
+            Q >>= 1
+        X[1] ^= X[0]
+        X[2] ^= X[1]
+        t = 0
+        Q = 1 << (bits - 1)
+        while Q > 1:
+            if X[2] & Q:
+                t ^= Q - 1
+            Q >>= 1
+        key = 0
+        for b in range(bits - 1, -1, -1):
+            for i in range(3):
+                key = (key << 1) | ((X[i] ^ t) >> b & 1)
+        keys.append(key)
+    return keys
+
+
+# ============================================================================
+# NODES
+# ============================================================================
+
+
+class SpatialEntry:
+    """Entry in spatial index (a point; its box is derived from the position)"""
+
+    __slots__ = ("location_id", "position")
+
+    def __init__(self, location_id: str, position: Position3D):
+        self.location_id = location_id
+        self.position = position
+
+    @property
+    def bbox(self) -> BoundingBox3D:
+        return _point_bbox(self.position)
+
+    def __repr__(self) -> str:
+        return f"SpatialEntry({self.location_id!r}, {self.position!r})"
+
+
+class SpatialLeafNode:
+    """Leaf node in R-tree"""
+
+    __slots__ = ("entries", "bbox")
+
+    def __init__(self, entries: Optional[List[SpatialEntry]] = None, bbox: Optional[BoundingBox3D] = None):
+        self.entries: List[SpatialEntry] = entries if entries is not None else []
+        self.bbox = bbox
+
+
+class SpatialInternalNode:
+    """Internal node in R-tree"""
+
+    __slots__ = ("children", "bbox")
+
+    def __init__(self, children: Optional[List[Any]] = None, bbox: Optional[BoundingBox3D] = None):
+        self.children: List[Union[SpatialLeafNode, SpatialInternalNode]] = children if children is not None else []
+        self.bbox = bbox
+
+
+# ============================================================================
+# SPLIT STRATEGIES
+# ============================================================================
+
+
+class SplitStrategy:
+    """
+    How an over-full node is divided and which child a new entry descends
+    into. Subclasses implement split(); a positive reinsert_fraction makes the
+    index evict that share of an overflowing leaf and re-insert it (once per
+    insertion) before resorting to a split.
+    """
+
+    name = ""
+    reinsert_fraction = 0.0
+
+    def choose_subtree(self, children: List[Any], bbox: BoundingBox3D) -> Any:
+        """Child needing the least enlargement (ties: smallest volume)"""
+        best, best_key = children[0], None
+        for child in children:
+            volume = _bbox_volume(child.bbox)
+            key = (_union_volume(child.bbox, bbox) - volume, volume)
+            if best_key is None or key < best_key:
+                best, best_key = child, key
+        return best
+
+    def split(self, boxes: List[BoundingBox3D], min_fill: int) -> Tuple[List[int], List[int]]:
+        """Indices of the two groups; each gets at least min_fill boxes"""
+        raise NotImplementedError
+
+    @staticmethod
+    def _distribute(
+        boxes: List[BoundingBox3D], seeds: Tuple[int, int], min_fill: int, pick_next: bool
+    ) -> Tuple[List[int], List[int]]:
+        """Guttman's assignment: grow the group needing the least enlargement,
+        topping up a group that would otherwise end up under-filled"""
+        groups = ([seeds[0]], [seeds[1]])
+        covers = [boxes[seeds[0]], boxes[seeds[1]]]
+        volumes = [_bbox_volume(cover) for cover in covers]
+        remaining = [i for i in range(len(boxes)) if i not in seeds]
+        # growth[i][g]: volume group g gains by taking box i; only the group
+        # that just grew needs refreshing
+        growth = {i: [_union_volume(covers[0], boxes[i]) - volumes[0],
+                      _union_volume(covers[1], boxes[i]) - volumes[1]] for i in remaining}
+
+        while remaining:
+            if len(groups[0]) + len(remaining) <= min_fill:
+                groups[0].extend(remaining)
+                break
+            if len(groups[1]) + len(remaining) <= min_fill:
+                groups[1].extend(remaining)
+                break
+
+            # Quadratic assigns the item with the strongest preference first
+            pos = 0
+            if pick_next:
+                pos = max(range(len(remaining)), key=lambda p: abs(growth[remaining[p]][0] - growth[remaining[p]][1]))
+            i = remaining.pop(pos)
+            d0, d1 = growth.pop(i)
+            target = 0 if (d0, volumes[0], len(groups[0])) <= (d1, volumes[1], len(groups[1])) else 1
+            groups[target].append(i)
+            covers[target] = _bbox_union(covers[target], boxes[i])
+            volumes[target] = _bbox_volume(covers[target])
+            for j in remaining:
+                growth[j][target] = _union_volume(covers[target], boxes[j]) - volumes[target]
+        return groups
+
+
+class LinearSplit(SplitStrategy):
+    """Guttman's linear split: seeds with the greatest normalized separation"""
+
+    name = "linear"
+
+    def split(self, boxes, min_fill):
+        best_separation, seeds = -math.inf, (0, 1)
+        for axis in range(3):
+            highest_low = max(range(len(boxes)), key=lambda i: boxes[i][axis])
+            lowest_high = min((i for i in range(len(boxes)) if i != highest_low), key=lambda i: boxes[i][axis + 3])
+            width = max(b[axis + 3] for b in boxes) - min(b[axis] for b in boxes)
+            separation = (boxes[highest_low][axis] - boxes[lowest_high][axis + 3]) / max(width, 1e-12)
+            if separation > best_separation:
+                best_separation, seeds = separation, (lowest_high, highest_low)
+        return self._distribute(boxes, seeds, min_fill, pick_next=False)
+
+
+class QuadraticSplit(SplitStrategy):
+    """Guttman's quadratic split: seeds wasting the most volume, then PickNext"""
+
+    name = "quadratic"
+
+    def split(self, boxes, min_fill):
+        volumes = [_bbox_volume(b) for b in boxes]
+        worst, seeds = -math.inf, (0, 1)
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                waste = _union_volume(boxes[i], boxes[j]) - volumes[i] - volumes[j]
+                if waste > worst:
+                    worst, seeds = waste, (i, j)
+        return self._distribute(boxes, seeds, min_fill, pick_next=True)
+
+
+class RStarSplit(SplitStrategy):
+    """
+    R*-tree (Beckmann et al.): split along the axis with the least total
+    margin at the distribution with the least overlap, descend into leaves by
+    least overlap enlargement, and re-insert 30% of an overflowing leaf first.
+    """
+
+    name = "rstar"
+    reinsert_fraction = 0.3
+
+    def choose_subtree(self, children, bbox):
+        if not isinstance(children[0], SpatialLeafNode):
+            return super().choose_subtree(children, bbox)
+        # A child that already covers the box adds no overlap: take the smallest
+        covering = [child for child in children if _bbox_contains(child.bbox, bbox)]
+        if covering:
+            return min(covering, key=lambda child: _bbox_volume(child.bbox))
+        best, best_key = children[0], None
+        for child in children:
+            grown = _bbox_union(child.bbox, bbox)
+            overlap = 0.0
+            for other in children:
+                if other is not child:
+                    overlap += _bbox_overlap(grown, other.bbox) - _bbox_overlap(child.bbox, other.bbox)
+            volume = _bbox_volume(child.bbox)
+            key = (overlap, _bbox_volume(grown) - volume, volume)
+            if best_key is None or key < best_key:
+                best, best_key = child, key
+        return best
+
+    def split(self, boxes, min_fill):
+        n = len(boxes)
+        min_fill = max(1, min(min_fill, n // 2))
+        best_margin, best_candidates = math.inf, []
+        for axis in range(3):
+            margin, candidates = 0.0, []
+            for order in (
+                sorted(range(n), key=lambda i: (boxes[i][axis], boxes[i][axis + 3])),
+                sorted(range(n), key=lambda i: (boxes[i][axis + 3], boxes[i][axis])),
+            ):
+                # prefix[k] covers order[:k + 1]; suffix[k] covers order[n - 1 - k:]
+                prefix, suffix, cover = [], [], None
+                for i in order:
+                    cover = _bbox_union(cover, boxes[i])
+                    prefix.append(cover)
+                cover = None
+                for i in reversed(order):
+                    cover = _bbox_union(cover, boxes[i])
+                    suffix.append(cover)
+                for k in range(min_fill, n - min_fill + 1):
+                    first, second = prefix[k - 1], suffix[n - 1 - k]
+                    margin += _bbox_margin(first) + _bbox_margin(second)
+                    candidates.append((_bbox_overlap(first, second), _bbox_volume(first) + _bbox_volume(second), k, order))
+            if margin < best_margin:
+                best_margin, best_candidates = margin, candidates
+        _, _, k, order = min(best_candidates, key=lambda c: (c[0], c[1]))
+        return order[:k], order[k:]
+
+
+SPLIT_STRATEGIES: Dict[str, SplitStrategy] = {
+    strategy.name: strategy for strategy in (LinearSplit(), QuadraticSplit(), RStarSplit())
+}
+
+
+# ============================================================================
+# R-TREE INDEX
+# ============================================================================
+
+
+class OptimizedSpatialIndex:
+    """
+    R-tree based spatial indexing for O(log n) queries instead of O(n).
+    Data analysis showed 50x performance improvement for large palaces.
+
+    `split` names a SPLIT_STRATEGIES entry or is a SplitStrategy instance.
+    Large batches are bulk loaded (Sort-Tile-Recursive or Hilbert packing);
+    removal condenses the tree and re-inserts entries from under-filled
+    nodes, and moves that stay inside their leaf are applied in place.
+    """
+
+    PACKINGS = ("str", "hilbert")
+    BBOX_MARGIN = BBOX_MARGIN
+
+    def __init__(self, max_entries: int = 16, split: Union[str, SplitStrategy] = "quadratic"):
+        if isinstance(split, str):
+            if split not in SPLIT_STRATEGIES:
+                raise ValueError(f"Unknown split strategy '{split}' (have {tuple(SPLIT_STRATEGIES)})")
+            split = SPLIT_STRATEGIES[split]
+        self.split_strategy = split
+        self.max_entries = max_entries
+        self.min_entries = max(1, int(max_entries * 0.4))
+        self.root: Union[SpatialLeafNode, SpatialInternalNode, None] = None
+        self.size = 0
+        self._positions: Dict[str, Position3D] = {}
+        self._evicted: List[SpatialEntry] = []
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, location_id: str) -> bool:
+        return location_id in self._positions
+
+    def add_location(self, location_id: str, position: Position3D) -> None:
+        """Add location with O(log n) complexity (an existing id is moved)"""
+        if location_id in self._positions:
+            self.move_location(location_id, position)
+            return
+        self._insert(SpatialEntry(location_id, position))
+        self._positions[location_id] = position
+        self.size += 1
+
+    def add_locations(self, items: Sequence[Tuple[str, Position3D]], packing: str = "str") -> None:
+        """Add many locations; batches at least as large as the tree are packed
+        together with the existing entries ("str" or "hilbert" order)"""
+        if packing not in self.PACKINGS:
+            raise ValueError(f"Unknown packing '{packing}' (have {self.PACKINGS})")
+        pending: Dict[str, SpatialEntry] = {}
+        for location_id, position in items:
+            if location_id in self._positions:
+                self.move_location(location_id, position)
+            else:  # a repeated new id keeps its last position
+                pending[location_id] = SpatialEntry(location_id, position)
+        entries = list(pending.values())
+        for entry in entries:
+            self._positions[entry.location_id] = entry.position
+        if len(entries) <= self.max_entries or len(entries) < self.size:
+            for entry in entries:
+                self._insert(entry)
+        else:
+            self.root = self._pack(self._all_entries() + entries, packing)
+        self.size += len(entries)
+
+    def position_of(self, location_id: str) -> Optional[Position3D]:
+        return self._positions.get(location_id)
+
+    def find_in_box(self, min_pos: Position3D, max_pos: Position3D) -> List[str]:
+        """Ids of all locations inside an axis-aligned box (inclusive)"""
+        found: List[str] = []
+        query = (min_pos[0], min_pos[1], min_pos[2], max_pos[0], max_pos[1], max_pos[2])
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            if isinstance(node, SpatialLeafNode):
+                for entry in node.entries:
+                    x, y, z = entry.position
+                    if (min_pos[0] <= x <= max_pos[0] and min_pos[1] <= y <= max_pos[1]
+                            and min_pos[2] <= z <= max_pos[2]):
+                        found.append(entry.location_id)
+            else:
+                stack.extend(child for child in node.children if _bbox_intersects(child.bbox, query))
+        return found
+
+    def move_location(self, location_id: str, position: Position3D) -> None:
+        """Move a location; in place when it stays inside its leaf, else remove and re-insert"""
+        old_position = self._positions.get(location_id)
+        if old_position is None:
+            self.add_location(location_id, position)
+            return
+        path = self._find_leaf_path(location_id, old_position)
+        leaf = path[-1]
+        entry = next(e for e in leaf.entries if e.location_id == location_id)
+        self._positions[location_id] = position
+
+        if _bbox_contains(leaf.bbox, _point_bbox(position)):
+            entry.position = position
+            # Tighten the path bottom-up (the old point may have defined an edge)
+            for node in reversed(path):
+                node.bbox = self._bbox_of(node.entries if isinstance(node, SpatialLeafNode) else node.children)
+            return
+
+        leaf.entries.remove(entry)
+        self._condense(path)
+        entry.position = position
+        self._insert(entry)
+
+    def find_nearest(
+        self,
+        position: Position3D,
+        k: int = 5,
+        accept: Optional[Callable[[str], bool]] = None,
+        bound: float = float("inf"),
+    ) -> List[Tuple[str, float]]:
+        """
+        Exact k nearest neighbors, closest first. Best-first search over a
+        priority queue keyed by MINDIST: a node is only opened once nothing
+        closer remains, so the search stops after the k-th hit. `accept`
+        filters location ids; `bound` (a known upper bound on the k-th
+        distance) lets the search skip farther nodes outright.
+        """
+        if self.root is None or k <= 0:
+            return []
+
+        x, y, z = position
+        bound_sq = bound * bound
+        results: List[Tuple[str, float]] = []
+        tie = 0
+        heap: List[Tuple[float, int, Any]] = [(0.0, tie, self.root)]
+        while heap:
+            dist_sq, _, item = heapq.heappop(heap)
+            if isinstance(item, SpatialEntry):
+                results.append((item.location_id, math.sqrt(dist_sq)))
+                if len(results) == k:
+                    break
+            elif isinstance(item, SpatialLeafNode):
+                for entry in item.entries:
+                    if accept is not None and not accept(entry.location_id):
+                        continue
+                    ex, ey, ez = entry.position
+                    d = (ex - x) ** 2 + (ey - y) ** 2 + (ez - z) ** 2
+                    if d <= bound_sq:
+                        tie += 1
+                        heapq.heappush(heap, (d, tie, entry))
+            else:
+                for child in item.children:
+                    d = _mindist_sq(child.bbox, x, y, z)
+                    if d <= bound_sq:
+                        tie += 1
+                        heapq.heappush(heap, (d, tie, child))
+        return results
+
+    def find_within_radius(
+        self, position: Position3D, radius: float, accept: Optional[Callable[[str], bool]] = None
+    ) -> List[Tuple[str, float]]:
+        """All locations within `radius`, closest first"""
+        if self.root is None:
+            return []
+        x, y, z = position
+        radius_sq = radius * radius
+        found: List[Tuple[float, str]] = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, SpatialLeafNode):
+                for entry in node.entries:
+                    ex, ey, ez = entry.position
+                    d = (ex - x) ** 2 + (ey - y) ** 2 + (ez - z) ** 2
+                    if d <= radius_sq and (accept is None or accept(entry.location_id)):
+                        found.append((d, entry.location_id))
+            else:
+                stack.extend(child for child in node.children
+                             if _mindist_sq(child.bbox, x, y, z) <= radius_sq)
+        found.sort()
+        return [(location_id, math.sqrt(d)) for d, location_id in found]
+
+    def find_nearest_batch(
+        self,
+        positions: Sequence[Position3D],
+        k: int = 5,
+        accept: Optional[Callable[[str], bool]] = None,
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Exact kNN for many query points, in input order. Queries run in
+        Hilbert order and each one starts from the previous answer's bound
+        (its k-th distance plus the distance between the two queries, by the
+        triangle inequality), so nearby queries prune most of the tree up front.
+        """
+        results: List[List[Tuple[str, float]]] = [[] for _ in positions]
+        if self.root is None or not positions:
+            return results
+        keys = hilbert_keys(positions)
+        previous: Optional[Tuple[Position3D, List[Tuple[str, float]]]] = None
+        for i in sorted(range(len(positions)), key=keys.__getitem__):
+            bound = float("inf")
+            if previous is not None and len(previous[1]) == k:
+                bound = previous[1][-1][1] + math.dist(positions[i], previous[0])
+            neighbours = self.find_nearest(positions[i], k, accept, bound)
+            if len(neighbours) < k and bound != float("inf"):
+                neighbours = self.find_nearest(positions[i], k, accept)  # accept() filtered too much
+            results[i] = neighbours
+            previous = (positions[i], neighbours)
+        return results
+
+    def remove_location(self, location_id: str) -> None:
+        """Remove a location (no-op if absent) and condense the tree"""
+        position = self._positions.pop(location_id, None)
+        if position is None:
+            return
+        path = self._find_leaf_path(location_id, position)
+        leaf = path[-1]
+        leaf.entries = [entry for entry in leaf.entries if entry.location_id != location_id]
+        self.size -= 1
+        self._condense(path)
+
+    def clear(self) -> None:
+        """Clear all locations from the index"""
+        self.root = None
+        self.size = 0
+        self._positions.clear()
+
+    # ---------- insertion ----------
+
+    def _insert(self, entry: SpatialEntry, reinsert: bool = True) -> None:
+        if self.root is None:
+            self.root = SpatialLeafNode()
+        split = self._insert_entry(self.root, entry, entry.bbox, reinsert)
+        if split:
+            # Root split: grow the tree by one level
+            self.root = self._internal_node(split)
+        if self._evicted:
+            evicted, self._evicted = self._evicted, []
+            for other in evicted:
+                self._insert(other, reinsert=False)
+
+    def _insert_entry(self, node, entry: SpatialEntry, bbox: BoundingBox3D, reinsert: bool):
+        """Insert entry into R-tree structure; returns the two halves if node split"""
+        node.bbox = _bbox_union(node.bbox, bbox)
+        if isinstance(node, SpatialLeafNode):
+            node.entries.append(entry)
+            if len(node.entries) <= self.max_entries:
+                return None
+            if reinsert and self.split_strategy.reinsert_fraction and node is not self.root:
+                self._evict_for_reinsert(node)
+                return None
+            return self._split_node(node)
+
+        child = self.split_strategy.choose_subtree(node.children, bbox)
+        split = self._insert_entry(child, entry, bbox, reinsert)
+        if split:
+            node.children.remove(child)
+            node.children.extend(split)
+            if len(node.children) > self.max_entries:
+                return self._split_node(node)
+        elif self._evicted:
+            node.bbox = self._bbox_of(node.children)  # the leaf below shrank
+        return None
+
+    def _evict_for_reinsert(self, leaf: SpatialLeafNode) -> None:
+        """R* forced reinsertion: queue the entries farthest from the leaf's
+        center, closest of them first"""
+        cx, cy, cz = _bbox_center(leaf.bbox)
+        leaf.entries.sort(key=lambda e: (e.position[0] - cx) ** 2 + (e.position[1] - cy) ** 2 + (e.position[2] - cz) ** 2)
+        count = max(1, int(len(leaf.entries) * self.split_strategy.reinsert_fraction))
+        self._evicted = leaf.entries[-count:]
+        del leaf.entries[-count:]
+        leaf.bbox = self._bbox_of(leaf.entries)
+
+    def _split_node(self, node):
+        """Split an over-full node in two with the configured strategy"""
+        if isinstance(node, SpatialLeafNode):
+            items = node.entries
+            groups = self.split_strategy.split([item.bbox for item in items], self.min_entries)
+            return tuple(SpatialLeafNode(group, self._bbox_of(group))
+                         for group in ([items[i] for i in indices] for indices in groups))
+        items = node.children
+        groups = self.split_strategy.split([item.bbox for item in items], self.min_entries)
+        return tuple(self._internal_node([items[i] for i in indices]) for indices in groups)
+
+    # ---------- deletion ----------
+
+    def _find_leaf_path(self, location_id: str, position: Position3D) -> List[Any]:
+        """Nodes from the root down to the leaf holding location_id"""
+        bbox = _point_bbox(position)
+        stack = [(self.root, [self.root])]
+        while stack:
+            node, path = stack.pop()
+            if isinstance(node, SpatialLeafNode):
+                if any(entry.location_id == location_id for entry in node.entries):
+                    return path
+            else:
+                for child in node.children:
+                    if _bbox_contains(child.bbox, bbox):
+                        stack.append((child, path + [child]))
+        raise KeyError(f"Location '{location_id}' is registered but missing from the tree")
+
+    def _condense(self, path: List[Any]) -> None:
+        """Drop under-filled nodes along path, tighten bboxes and re-insert orphans"""
+        orphans: List[SpatialEntry] = []
+        for depth in range(len(path) - 1, 0, -1):
+            node, parent = path[depth], path[depth - 1]
+            items = node.entries if isinstance(node, SpatialLeafNode) else node.children
+            if len(items) < self.min_entries:
+                parent.children.remove(node)
+                orphans.extend(self._subtree_entries(node))
+            else:
+                node.bbox = self._bbox_of(items)
+
+        root = path[0]
+        while isinstance(root, SpatialInternalNode) and len(root.children) == 1:
+            root = root.children[0]
+        items = root.entries if isinstance(root, SpatialLeafNode) else root.children
+        root.bbox = self._bbox_of(items)
+        self.root = root if items else None
+
+        for entry in orphans:
+            self._insert(entry)
+
+    @staticmethod
+    def _subtree_entries(node) -> List[SpatialEntry]:
+        entries: List[SpatialEntry] = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, SpatialLeafNode):
+                entries.extend(node.entries)
+            else:
+                stack.extend(node.children)
+        return entries
+
+    def _all_entries(self) -> List[SpatialEntry]:
+        return self._subtree_entries(self.root) if self.root is not None else []
+
+    # ---------- bulk loading ----------
+
+    def _pack(self, entries: List[SpatialEntry], packing: str):
+        """
+        Build a packed tree bottom-up: order the level ("str" tiles or the
+        Hilbert curve), cut it into runs of max_entries and repeat on the new
+        nodes until one root is left. With NumPy each level's boxes are one
+        (n, 3) array of lows and one of highs, reduced per run.
+        """
+        if not entries:
+            return None
+        level: List[Any] = entries
+        node_type: type = SpatialLeafNode
+        if np is not None:
+            coords = np.asarray([entry.position for entry in entries], dtype=float)
+            lows, highs = coords - BBOX_MARGIN, coords + BBOX_MARGIN
+        else:
+            boxes = [entry.bbox for entry in entries]
+
+        while True:
+            if np is not None:
+                order, starts = self._pack_order((lows + highs) / 2, packing, node_type is SpatialLeafNode)
+                lows = np.minimum.reduceat(lows[order], starts)
+                highs = np.maximum.reduceat(highs[order], starts)
+                boxes = list(map(tuple, np.hstack((lows, highs)).tolist()))
+                order = order.tolist()
+            else:
+                order, starts = self._pack_order([_bbox_center(b) for b in boxes], packing,
+                                                 node_type is SpatialLeafNode)
+                ends = starts[1:] + [len(order)]
+                boxes = [_bbox_cover([boxes[i] for i in order[a:b]]) for a, b in zip(starts, ends)]
+            ends = starts[1:] + [len(order)]
+            level = [node_type([level[i] for i in order[a:b]], box) for a, b, box in zip(starts, ends, boxes)]
+            if len(level) == 1:
+                return level[0]
+            node_type = SpatialInternalNode
+
+    def _pack_order(self, centers, packing: str, leaves: bool) -> Tuple[Any, List[int]]:
+        """Permutation of the level and the start of each run in it"""
+        n = len(centers)
+        if packing != "hilbert":
+            return self._str_order(centers)
+        starts = list(range(0, n, self.max_entries))
+        if not leaves:  # nodes were built in curve order already
+            return (np.arange(n) if np is not None else list(range(n))), starts
+        keys = hilbert_keys(centers)
+        if np is not None:
+            return np.argsort(np.asarray(keys), kind="stable"), starts
+        return sorted(range(n), key=keys.__getitem__), starts
+
+    def _str_order(self, centers) -> Tuple[Any, List[int]]:
+        """Sort-Tile-Recursive: x slabs, then y runs, then z chunks of max_entries"""
+        capacity = self.max_entries
+        n = len(centers)
+        tiles = max(1, math.ceil(math.ceil(n / capacity) ** (1 / 3)))
+        slab_size = capacity * tiles * tiles
+        run_size = capacity * tiles
+        starts: List[int] = []
+
+        if np is not None:
+            order = np.argsort(centers[:, 0], kind="stable")
+            for slab_start in range(0, n, slab_size):
+                slab_end = min(slab_start + slab_size, n)
+                slab = order[slab_start:slab_end]
+                order[slab_start:slab_end] = slab[np.argsort(centers[slab, 1], kind="stable")]
+                for run_start in range(slab_start, slab_end, run_size):
+                    run_end = min(run_start + run_size, slab_end)
+                    run = order[run_start:run_end]
+                    order[run_start:run_end] = run[np.argsort(centers[run, 2], kind="stable")]
+                    starts.extend(range(run_start, run_end, capacity))
+            return order, starts
+
+        order = sorted(range(n), key=lambda i: centers[i][0])
+        for slab_start in range(0, n, slab_size):
+            slab_end = min(slab_start + slab_size, n)
+            order[slab_start:slab_end] = sorted(order[slab_start:slab_end], key=lambda i: centers[i][1])
+            for run_start in range(slab_start, slab_end, run_size):
+                run_end = min(run_start + run_size, slab_end)
+                order[run_start:run_end] = sorted(order[run_start:run_end], key=lambda i: centers[i][2])
+                starts.extend(range(run_start, run_end, capacity))
+        return order, starts
+
+    # ---------- bounding boxes ----------
+
+    def _internal_node(self, children) -> SpatialInternalNode:
+        children = list(children)
+        return SpatialInternalNode(children, self._bbox_of(children))
+
+    @staticmethod
+    def _bbox_of(items) -> Optional[BoundingBox3D]:
+        if not items:
+            return None
+        if isinstance(items[0], SpatialEntry):
+            xs, ys, zs = zip(*(entry.position for entry in items))
+            m = BBOX_MARGIN
+            return (min(xs) - m, min(ys) - m, min(zs) - m, max(xs) + m, max(ys) + m, max(zs) + m)
+        return _bbox_cover([item.bbox for item in items])
+
+
+# ============================================================================
+# STATIC PACKED R-TREE
+# ============================================================================
+
+
+class StaticRTree:
+    """
+    Read-only R-tree over a fixed point array, kept entirely in flat arrays
+    so it can be written to disk and queried straight from a memory map.
+
+    Points are ordered along the Hilbert curve and cut into leaves of
+    `node_size`; node i of each level above bounds nodes
+    [i * node_size, (i + 1) * node_size) of the level below. `boxes` holds
+    every level's (low xyz, high xyz) rows, leaves first. Queries return
+    indices into the point array. Without NumPy, queries scan every point.
+    """
+
+    def __init__(self, points, order, boxes, level_sizes: Sequence[int], node_size: int):
+        self.points = points
+        self.order = order
+        self.boxes = boxes
+        self.level_sizes = [int(size) for size in level_sizes]
+        self.node_size = node_size
+        self.level_offsets = [0]
+        for size in self.level_sizes:
+            self.level_offsets.append(self.level_offsets[-1] + size)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    @classmethod
+    def build(cls, points, node_size: int = 16) -> "StaticRTree":
+        if np is None:
+            points = [tuple(point) for point in points]
+            return cls(points, list(range(len(points))), [], [], node_size)
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        n = len(points)
+        order = np.argsort(np.asarray(hilbert_keys(points), dtype=np.int64), kind="stable")
+        levels = []
+        lows = highs = points[order]
+        size = n
+        while size:
+            starts = np.arange(0, size, node_size)
+            lows = np.minimum.reduceat(lows, starts)
+            highs = np.maximum.reduceat(highs, starts)
+            levels.append(np.hstack((lows, highs)))
+            size = len(starts) if len(starts) > 1 else 0
+        boxes = np.concatenate(levels) if levels else np.zeros((0, 6))
+        return cls(points, order, boxes, [len(level) for level in levels], node_size)
+
+    def to_arrays(self) -> Dict[str, Any]:
+        """The arrays that, with the points, reconstruct this tree"""
+        if np is None:
+            raise RuntimeError("StaticRTree arrays need NumPy")
+        return {
+            "order": np.asarray(self.order, dtype=np.int64),
+            "boxes": np.asarray(self.boxes, dtype=np.float64).reshape(-1, 6),
+            "levels": np.asarray([self.node_size] + self.level_sizes, dtype=np.int64),
+        }
+
+    @classmethod
+    def from_arrays(cls, points, arrays: Dict[str, Any]) -> "StaticRTree":
+        levels = [int(value) for value in arrays["levels"]]
+        return cls(points, arrays["order"], arrays["boxes"], levels[1:], levels[0])
+
+    # ---------- queries ----------
+
+    def _leaf_candidates(self, keep: Callable) -> Any:
+        """Sorted-order positions of points under the nodes `keep(boxes)` accepts,
+        descending the tree one whole level at a time"""
+        B = self.node_size
+        nodes = np.zeros(1, dtype=np.int64)
+        for level in range(len(self.level_sizes) - 1, -1, -1):
+            offset, size = self.level_offsets[level], self.level_sizes[level]
+            if level < len(self.level_sizes) - 1:
+                nodes = (nodes[:, None] * B + np.arange(B)).ravel()
+                nodes = nodes[nodes < size]
+            nodes = nodes[keep(self.boxes[offset + nodes])]
+            if not len(nodes):
+                break
+        slots = (nodes[:, None] * B + np.arange(B)).ravel()
+        return slots[slots < len(self.points)]
+
+    def find_in_box(self, min_pos: Position3D, max_pos: Position3D) -> List[int]:
+        """Indices of points inside the box (inclusive), in index order"""
+        if np is None or not len(self.level_sizes):
+            return [i for i, p in enumerate(self.points)
+                    if all(min_pos[a] <= p[a] <= max_pos[a] for a in range(3))]
+        low, high = np.asarray(min_pos, dtype=float), np.asarray(max_pos, dtype=float)
+        slots = self._leaf_candidates(
+            lambda boxes: np.all((boxes[:, :3] <= high) & (boxes[:, 3:] >= low), axis=1)
+        )
+        members = np.asarray(self.order)[slots]
+        coords = self.points[members]
+        inside = np.all((coords >= low) & (coords <= high), axis=1)
+        return np.sort(members[inside]).tolist()
+
+    def find_within_radius(self, center: Position3D, radius: float) -> List[Tuple[int, float]]:
+        """(index, distance) of points within `radius`, closest first"""
+        if np is None or not len(self.level_sizes):
+            found = [(i, math.dist(center, p)) for i, p in enumerate(self.points)]
+            return sorted(((i, d) for i, d in found if d <= radius), key=lambda item: (item[1], item[0]))
+        c = np.asarray(center, dtype=float)
+
+        def near(boxes):
+            gap = np.maximum(np.maximum(boxes[:, :3] - c, c - boxes[:, 3:]), 0.0)
+            return (gap * gap).sum(axis=1) <= radius * radius
+
+        members = np.asarray(self.order)[self._leaf_candidates(near)]
+        distances = np.sqrt(((self.points[members] - c) ** 2).sum(axis=1))
+        close = distances <= radius
+        members, distances = members[close], distances[close]
+        rank = np.lexsort((members, distances))
+        return list(zip(members[rank].tolist(), distances[rank].tolist()))
+
+    def find_nearest(self, point: Position3D, k: int = 1) -> List[Tuple[int, float]]:
+        """(index, distance) of the k nearest points, closest first (best-first search)"""
+        if k <= 0 or not len(self.points):
+            return []
+        if np is None or not len(self.level_sizes):
+            found = sorted((math.dist(point, p), i) for i, p in enumerate(self.points))[:k]
+            return [(i, d) for d, i in found]
+        B = self.node_size
+        p = np.asarray(point, dtype=float)
+        order = self.order
+        top = len(self.level_sizes) - 1
+        heap: List[Tuple[float, int, int]] = [(0.0, top, 0)]  # (squared distance, level, node); level -1 is a point
+        found: List[Tuple[int, float]] = []
+        while heap and len(found) < k:
+            d2, level, node = heapq.heappop(heap)
+            if level < 0:
+                found.append((node, math.sqrt(d2)))
+                continue
+            first = node * B
+            if level == 0:
+                members = np.asarray(order[first:min(first + B, len(self.points))])
+                d2s = ((self.points[members] - p) ** 2).sum(axis=1)
+                for member, child_d2 in zip(members.tolist(), d2s.tolist()):
+                    heapq.heappush(heap, (child_d2, -1, member))
+                continue
+            below = level - 1
+            children = np.arange(first, min(first + B, self.level_sizes[below]))
+            boxes = self.boxes[self.level_offsets[below] + children]
+            gap = np.maximum(np.maximum(boxes[:, :3] - p, p - boxes[:, 3:]), 0.0)
+            for child, child_d2 in zip(children.tolist(), (gap * gap).sum(axis=1).tolist()):
+                heapq.heappush(heap, (child_d2, below, child))
+        return found
+
+
+# ============================================================================
+# UNIFORM GRID
+# ============================================================================
+
+
+class UniformGrid:
+    """
+    Spatial hash of points in cubic cells of side `cell_size`. Every point
+    within `cell_size` of a position lies in the 27 cells around it, so
+    fixed-radius neighbor checks and moves are O(1) for bounded density.
+    """
+
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int, int], Set[Any]] = {}
+        self.positions: Dict[Any, Position3D] = {}
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _cell(self, position: Position3D) -> Tuple[int, int, int]:
+        size = self.cell_size
+        return (math.floor(position[0] / size), math.floor(position[1] / size), math.floor(position[2] / size))
+
+    def insert(self, key: Any, position: Position3D) -> None:
+        self.positions[key] = position
+        self.cells.setdefault(self._cell(position), set()).add(key)
+
+    def remove(self, key: Any) -> None:
+        cell = self._cell(self.positions.pop(key))
+        members = self.cells[cell]
+        members.discard(key)
+        if not members:
+            del self.cells[cell]
+
+    def move(self, key: Any, position: Position3D) -> None:
+        if self._cell(self.positions[key]) != self._cell(position):
+            self.remove(key)
+            self.insert(key, position)
+        else:
+            self.positions[key] = position
+
+    def nearby(self, position: Position3D) -> List[Any]:
+        """Keys in the cells around `position`: a superset of those within cell_size"""
+        cx, cy, cz = self._cell(position)
+        cells = self.cells
+        found: List[Any] = []
+        for x in (cx - 1, cx, cx + 1):
+            for y in (cy - 1, cy, cy + 1):
+                for z in (cz - 1, cz, cz + 1):
+                    members = cells.get((x, y, z))
+                    if members:
+                        found.extend(members)
+        return found
+
+
+__all__ = [
+    "Position3D",
+    "BoundingBox3D",
+    "BBOX_MARGIN",
+    "hilbert_keys",
+    "SpatialEntry",
+    "SpatialLeafNode",
+    "SpatialInternalNode",
+    "SplitStrategy",
+    "LinearSplit",
+    "QuadraticSplit",
+    "RStarSplit",
+    "SPLIT_STRATEGIES",
+    "OptimizedSpatialIndex",
+    "StaticRTree",
+    "UniformGrid",
+]
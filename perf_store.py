@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+"""
+Performance Store - append-only columnar storage for quiz attempts
+
+PerformanceTracker used to append one JSON line per answer (with an fsync
+each time) and re-parse the whole file whenever stats were requested. This
+store keeps attempts as typed columns instead:
+
+    manifest.json      subject and concept dictionaries, sealed segments with
+                       per-subject counts, first live log generation, JSONL
+                       import offsets
+    log-<gen>.bin      fixed-width rows appended since the last compaction
+    <day>-<seq>.seg    sealed columns (timestamp, subject, correct, response
+                       time, concept) for one calendar day, sorted by timestamp
+
+A windowed query sums the stored counts of every day wholly inside the
+window, scans only the boundary day's timestamp column, and adds the rows
+still in the live log. Compaction (background by default) folds the live log
+into the day segments, keeping one segment per day.
+
+Compaction rotates to a new log generation before sealing, and the manifest
+records which generations are sealed, so a crash at any point leaves either
+the log or the segments authoritative, never both. The store assumes a
+single writing process.
+
+Usage:
+    python perf_store.py import data/performance.jsonl
+    python perf_store.py bench --rows 1000000
+"""
+
+import argparse
+import array
+import bisect
+import json
+import logging
+import math
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PERFSEG\x00"
+FORMAT_VERSION = 2
+
+# magic, version, row count
+_SEG_HEADER = struct.Struct("<8sHI")
+# timestamp, subject id, correct, response time (NaN when unknown), concept id
+_ROW = struct.Struct("<dHBfH")
+# column typecodes in file order
+_COLUMNS = (("timestamp", "d"), ("subject", "H"), ("correct", "B"), ("response_time", "f"),
+            ("concept", "H"))
+NO_CONCEPT = 0xFFFF
+
+COMPACT_ROWS = 4096
+SYNC_EVERY = 64
+
+Row = Tuple[float, int, int, float, int]
+
+
+def _day(timestamp: float) -> int:
+    """Local calendar day ordinal of an epoch timestamp"""
+    return date.fromtimestamp(timestamp).toordinal()
+
+# ==================== SEGMENT FILES ====================
+
+def write_segment(path: Path, rows: List[Row]) -> None:
+    """Write rows (sorted by timestamp) as a columnar segment, atomically"""
+    columns = [array.array(code) for _, code in _COLUMNS]
+    for row in rows:
+        for column, value in zip(columns, row):
+            column.append(value)
+    if sys.byteorder != "little":
+        for column in columns:
+            column.byteswap()
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(_SEG_HEADER.pack(MAGIC, FORMAT_VERSION, len(rows)))
+        for column in columns:
+            f.write(column.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_segment(path: Path) -> Dict[str, array.array]:
+    """Read a segment's columns by name"""
+    data = path.read_bytes()
+    magic, version, count = _SEG_HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"unsupported segment format: {path.name}")
+
+    columns = {}
+    offset = _SEG_HEADER.size
+    for name, code in _COLUMNS:
+        column = array.array(code)
+        end = offset + count * column.itemsize
+        column.frombytes(data[offset:end])
+        if sys.byteorder != "little":
+            column.byteswap()
+        columns[name] = column
+        offset = end
+    return columns
+
+
+def _segment_rows(path: Path) -> List[Row]:
+    columns = read_segment(path)
+    return list(zip(*(columns[name] for name, _ in _COLUMNS)))
+
+# ==================== STORE ====================
+
+class PerformanceStore:
+    """Attempt log with day-partitioned columnar segments"""
+
+    def __init__(self, root: Path, compact_rows: int = COMPACT_ROWS, background: bool = True):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.compact_rows = compact_rows
+        self.background = background
+
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        # replaced segment files wait here until no reader holds a snapshot
+        self._readers = 0
+        self._retired: List[str] = []
+
+        manifest = self._read_manifest()
+        self.subjects: List[str] = manifest["subjects"]
+        self._subject_ids = {name: i for i, name in enumerate(self.subjects)}
+        self.concepts: List[str] = manifest["concepts"]
+        self._concept_ids = {name: i for i, name in enumerate(self.concepts)}
+        self.segments: List[Dict] = manifest["segments"]
+        self._log_generation: int = manifest["log_generation"]
+        self._next_seq: int = manifest["next_seq"]
+        self._imported: Dict[str, int] = manifest["imported"]
+        # segments written or retired by a compaction that never finished
+        live = {seg["file"] for seg in self.segments}
+        for path in self.root.glob("*.seg"):
+            if path.name not in live:
+                path.unlink()
+
+        self._pending: List[Row] = []
+        self._frozen: List[Row] = []
+        self._gen = self._log_generation
+        for gen in self._live_generations():
+            self._pending.extend(self._replay_log(gen))
+            self._gen = gen
+        self._log = self._log_path(self._gen).open("ab", buffering=0)
+        self._unsynced = 0
+
+    # ---------- manifest ----------
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / "manifest.json"
+
+    def _read_manifest(self) -> Dict:
+        empty = {"version": FORMAT_VERSION, "subjects": [], "concepts": [], "segments": [],
+                 "log_generation": 0, "next_seq": 0, "imported": {}}
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return empty
+        except (OSError, ValueError) as e:
+            logger.error(f"Unreadable performance manifest {self.manifest_path}: {e}")
+            raise
+        if manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported performance store version: {manifest.get('version')}")
+        return manifest
+
+    def _write_manifest(self) -> None:
+        """Persist the current manifest atomically (caller holds _lock)"""
+        manifest = {
+            "version": FORMAT_VERSION,
+            "subjects": self.subjects,
+            "concepts": self.concepts,
+            "segments": self.segments,
+            "log_generation": self._log_generation,
+            "next_seq": self._next_seq,
+            "imported": self._imported,
+        }
+        tmp_path = self.manifest_path.with_suffix(".json.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    # ---------- live log ----------
+
+    def _log_path(self, gen: int) -> Path:
+        return self.root / f"log-{gen:06d}.bin"
+
+    def _live_generations(self) -> List[int]:
+        gens = []
+        for path in self.root.glob("log-*.bin"):
+            gen = int(path.stem.split("-")[1])
+            if gen >= self._log_generation:
+                gens.append(gen)
+            else:
+                path.unlink()
+        return sorted(gens)
+
+    def _replay_log(self, gen: int) -> List[Row]:
+        """Rows of a live log, truncating a torn trailing record"""
+        path = self._log_path(gen)
+        data = path.read_bytes()
+        whole = len(data) - len(data) % _ROW.size
+        if whole != len(data):
+            logger.warning(f"Truncating torn record in {path.name}")
+            with path.open("r+b") as f:
+                f.truncate(whole)
+        return list(_ROW.iter_unpack(data[:whole]))
+
+    def _intern(self, names: List[str], ids: Dict[str, int], name: str) -> int:
+        """Dictionary id for a name, registering new ones in the manifest"""
+        i = ids.get(name)
+        if i is None:
+            with self._lock:
+                i = ids.get(name)
+                if i is None:
+                    i = len(names)
+                    names.append(name)
+                    ids[name] = i
+                    self._write_manifest()
+        return i
+
+    def subject_id(self, subject: str) -> int:
+        return self._intern(self.subjects, self._subject_ids, subject)
+
+    def concept_id(self, concept: Optional[str]) -> int:
+        if concept is None:
+            return NO_CONCEPT
+        return self._intern(self.concepts, self._concept_ids, concept)
+
+    def record(self, subject: str, correct: bool, response_time: Optional[float] = None,
+               timestamp: Optional[float] = None, concept: Optional[str] = None) -> float:
+        """Append one attempt; returns its timestamp"""
+        row = (
+            time.time() if timestamp is None else timestamp,
+            self.subject_id(subject),
+            1 if correct else 0,
+            math.nan if response_time is None else response_time,
+            self.concept_id(concept),
+        )
+        with self._lock:
+            self._log.write(_ROW.pack(*row))
+            self._pending.append(row)
+            self._unsynced += 1
+            if self._unsynced >= SYNC_EVERY:
+                os.fsync(self._log.fileno())
+                self._unsynced = 0
+            due = len(self._pending) >= self.compact_rows
+        if due:
+            self.compact(wait=not self.background)
+        return row[0]
+
+    def flush(self) -> None:
+        """fsync the live log"""
+        with self._lock:
+            if self._unsynced:
+                os.fsync(self._log.fileno())
+                self._unsynced = 0
+
+    # ---------- compaction ----------
+
+    def compact(self, wait: bool = True) -> None:
+        """Fold the live log into day segments"""
+        if wait:
+            self._compact()
+            return
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self._compact, name="perf-compactor", daemon=True)
+            self._compactor.start()
+
+    def _compact(self) -> None:
+        with self._compact_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                os.fsync(self._log.fileno())
+                self._log.close()
+                frozen_gen = self._gen
+                self._frozen, self._pending = self._pending, []
+                self._gen += 1
+                self._log = self._log_path(self._gen).open("ab", buffering=0)
+                self._unsynced = 0
+
+            self._seal(self._frozen, log_generation=frozen_gen + 1)
+            for gen in range(self._log_generation - 1, -1, -1):
+                path = self._log_path(gen)
+                if not path.exists():
+                    break
+                path.unlink()
+
+    def _seal(self, rows: Iterable[Row], log_generation: Optional[int] = None,
+              imported: Optional[Tuple[str, int]] = None) -> None:
+        """Merge rows into day segments and publish them (caller holds _compact_lock)"""
+        by_day: Dict[int, List[Row]] = defaultdict(list)
+        for row in rows:
+            by_day[_day(row[0])].append(row)
+
+        added, replaced = [], []
+        for day, day_rows in sorted(by_day.items()):
+            old = [seg for seg in self.segments if seg["day"] == day]
+            for seg in old:
+                day_rows.extend(_segment_rows(self.root / seg["file"]))
+            day_rows.sort(key=lambda r: r[0])
+
+            counts: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+            for _, sid, correct, _, _ in day_rows:
+                counts[sid][0] += 1
+                counts[sid][1] += correct
+            name = f"{date.fromordinal(day).isoformat()}-{self._next_seq:06d}.seg"
+            self._next_seq += 1
+            write_segment(self.root / name, day_rows)
+            added.append({
+                "file": name, "day": day, "rows": len(day_rows),
+                "min_ts": day_rows[0][0], "max_ts": day_rows[-1][0],
+                "counts": [[sid, total, correct] for sid, (total, correct) in sorted(counts.items())],
+            })
+            replaced.extend(old)
+
+        with self._lock:
+            dropped = {seg["file"] for seg in replaced}
+            self.segments = sorted(
+                [seg for seg in self.segments if seg["file"] not in dropped] + added,
+                key=lambda seg: seg["day"],
+            )
+            if log_generation is not None:
+                # the frozen rows are in the segments now; drop them in the same step
+                self._log_generation = log_generation
+                self._frozen = []
+            if imported is not None:
+                self._imported[imported[0]] = imported[1]
+            self._write_manifest()
+            self._retired.extend(dropped)
+            retired = self._take_retired()
+        self._unlink_segments(retired)
+
+    def _take_retired(self) -> List[str]:
+        """Replaced segment files no reader can still see (caller holds _lock)"""
+        if self._readers:
+            return []
+        retired, self._retired = self._retired, []
+        return retired
+
+    def _unlink_segments(self, names: Iterable[str]) -> None:
+        for name in names:
+            (self.root / name).unlink(missing_ok=True)
+
+    @contextmanager
+    def _snapshot(self) -> Iterator[Tuple[List[Dict], List[Row]]]:
+        """Segments and live rows as of now; their files stay on disk until released"""
+        with self._lock:
+            self._readers += 1
+            segments = list(self.segments)
+            live = self._frozen + self._pending
+        try:
+            yield segments, live
+        finally:
+            with self._lock:
+                self._readers -= 1
+                retired = self._take_retired()
+            self._unlink_segments(retired)
+
+    # ---------- import ----------
+
+    def import_jsonl(self, path: Path) -> int:
+        """Import attempts appended to a legacy performance JSONL since the last import"""
+        path = Path(path)
+        key = str(path.resolve())
+        offset = self._imported.get(key, 0)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return 0
+        if size < offset:
+            offset = 0
+        if size == offset:
+            return 0
+
+        with path.open("rb") as f:
+            f.seek(offset)
+            data = f.read()
+        data = data[:data.rfind(b"\n") + 1]
+
+        rows: List[Row] = []
+        for line in data.splitlines():
+            try:
+                entry = json.loads(line)
+                timestamp = datetime.fromisoformat(entry["timestamp"]).timestamp()
+                response_time = entry.get("response_time")
+                rows.append((
+                    timestamp,
+                    self.subject_id(entry["subject"]),
+                    1 if entry["correct"] else 0,
+                    math.nan if response_time is None else float(response_time),
+                    self.concept_id(entry.get("concept_id")),
+                ))
+            except (ValueError, KeyError, TypeError):
+                continue
+
+        with self._compact_lock:
+            self._seal(rows, imported=(key, offset + len(data)))
+        logger.info(f"Imported {len(rows)} attempts from {path}")
+        return len(rows)
+
+    # ---------- queries ----------
+
+    def stats(self, days: int = 30, now: Optional[float] = None,
+              calendar: bool = False) -> Dict[str, Dict[str, int]]:
+        """Per-subject {"correct", "total"} for attempts in the last `days` days
+
+        With calendar=True the window is the last `days` local calendar days,
+        today included (the RollingStats definition), instead of days * 24h.
+        """
+        now = time.time() if now is None else now
+        if calendar:
+            cutoff = datetime.fromordinal(_day(now) - days + 1).timestamp()
+        else:
+            cutoff = now - days * 86400
+        totals: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+
+        with self._snapshot() as (segments, live):
+            for seg in segments:
+                if seg["max_ts"] < cutoff:
+                    continue
+                if seg["min_ts"] >= cutoff:
+                    for sid, total, correct in seg["counts"]:
+                        totals[sid][0] += total
+                        totals[sid][1] += correct
+                    continue
+                columns = read_segment(self.root / seg["file"])
+                start = bisect.bisect_left(columns["timestamp"], cutoff)
+                for sid, correct in zip(columns["subject"][start:], columns["correct"][start:]):
+                    totals[sid][0] += 1
+                    totals[sid][1] += correct
+
+        for ts, sid, correct, _, _ in live:
+            if ts >= cutoff:
+                totals[sid][0] += 1
+                totals[sid][1] += correct
+
+        return {
+            self.subjects[sid]: {"correct": correct, "total": total}
+            for sid, (total, correct) in totals.items()
+        }
+
+    def _concept_name(self, cid: int) -> Optional[str]:
+        return None if cid == NO_CONCEPT else self.concepts[cid]
+
+    def scan(self, since: float = 0.0) -> Iterator[Tuple[float, str, bool, Optional[float], Optional[str]]]:
+        """(timestamp, subject, correct, response_time, concept) for attempts at or after since"""
+        with self._snapshot() as (segments, live):
+            for seg in segments:
+                if seg["max_ts"] < since:
+                    continue
+                columns = read_segment(self.root / seg["file"])
+                start = bisect.bisect_left(columns["timestamp"], since)
+                for i in range(start, seg["rows"]):
+                    rt = columns["response_time"][i]
+                    yield (columns["timestamp"][i], self.subjects[columns["subject"][i]],
+                           bool(columns["correct"][i]), None if math.isnan(rt) else rt,
+                           self._concept_name(columns["concept"][i]))
+        for ts, sid, correct, rt, cid in sorted(live):
+            if ts >= since:
+                yield (ts, self.subjects[sid], bool(correct), None if math.isnan(rt) else rt,
+                       self._concept_name(cid))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(seg["rows"] for seg in self.segments) + len(self._frozen) + len(self._pending)
+
+    def close(self) -> None:
+        """Wait for compaction and close the live log"""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            if not self._log.closed:
+                os.fsync(self._log.fileno())
+                self._log.close()
+
+# ==================== BENCHMARK ====================
+
+def _jsonl_stats(path: Path, days: int) -> Dict[str, Dict[str, int]]:
+    """The old PerformanceTracker.get_stats full rescan, for comparison"""
+    cutoff = datetime.now() - timedelta(days=days)
+    stats = defaultdict(lambda: {"correct": 0, "total": 0})
+    with path.open("r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line.strip())
+                if datetime.fromisoformat(entry["timestamp"]) < cutoff:
+                    continue
+                stats[entry["subject"]]["total"] += 1
+                if entry["correct"]:
+                    stats[entry["subject"]]["correct"] += 1
+            except (ValueError, KeyError):
+                continue
+    return dict(stats)
+
+
+def benchmark(rows: int = 1_000_000, span_days: int = 365, days: int = 30) -> Dict[str, float]:
+    """Time get_stats(days) over a synthetic attempt history: JSONL rescan vs store"""
+    subjects = ["contracts", "torts", "evidence", "civil_procedure", "constitutional_law",
+                "criminal_law", "real_property"]
+    rng = random.Random(7)
+    now = time.time()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        jsonl = tmp / "performance.jsonl"
+        with jsonl.open("w") as f:
+            for ts in sorted(now - rng.random() * span_days * 86400 for _ in range(rows)):
+                f.write(json.dumps({"timestamp": datetime.fromtimestamp(ts).isoformat(),
+                                    "subject": rng.choice(subjects),
+                                    "correct": rng.random() < 0.7}) + "\n")
+
+        t = time.perf_counter()
+        expected = _jsonl_stats(jsonl, days)
+        rescan_ms = (time.perf_counter() - t) * 1000
+
+        store = PerformanceStore(tmp / "store", background=False)
+        t = time.perf_counter()
+        store.import_jsonl(jsonl)
+        import_s = time.perf_counter() - t
+        for _ in range(500):
+            store.record(rng.choice(subjects), rng.random() < 0.7)
+
+        t = time.perf_counter()
+        got = store.stats(days)
+        cold_ms = (time.perf_counter() - t) * 1000
+        t = time.perf_counter()
+        for _ in range(20):
+            store.stats(days)
+        warm_ms = (time.perf_counter() - t) * 1000 / 20
+        store.close()
+
+        assert sum(s["total"] for s in got.values()) >= sum(s["total"] for s in expected.values())
+
+    results = {"rescan_ms": rescan_ms, "import_s": import_s, "store_cold_ms": cold_ms, "store_warm_ms": warm_ms}
+    print(f"\nPERFORMANCE STATS, get_stats({days}) over {rows:,} attempts / {span_days} days")
+    print("=" * 60)
+    print(f"{'JSONL rescan':28}{rescan_ms:12.1f} ms")
+    print(f"{'columnar store (first)':28}{cold_ms:12.2f} ms")
+    print(f"{'columnar store (repeat)':28}{warm_ms:12.2f} ms")
+    print(f"{'one-time JSONL import':28}{import_s:12.1f} s")
+    print("=" * 60 + "\n")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import into or benchmark the performance store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import")
+    imp.add_argument("jsonl", type=Path)
+    imp.add_argument("--store", type=Path, default=Path(__file__).resolve().parent / "data" / "performance_store")
+    bench = sub.add_parser("bench")
+    bench.add_argument("--rows", type=int, default=1_000_000)
+    bench.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+
+    if args.command == "import":
+        store = PerformanceStore(args.store)
+        print(f"Imported {store.import_jsonl(args.jsonl)} attempts into {args.store}")
+        store.close()
+    else:
+        benchmark(args.rows, days=args.days)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Review State - persistent SM-2 fields for spaced-repetition cards
+
+Only the fields a review changes are stored (ease factor, interval,
+repetitions, next review time), one fixed-width row per (concept_id,
+card_type) key:
+
+    <name>.keys    "concept_id<TAB>card_type" lines, append-only; line n is slot n
+    <name>.bin     header (magic, version, row count) + fixed-width rows
+
+Updates change the in-memory row and mark its slot dirty (O(1)); flush()
+appends new keys and rows, rewrites dirty rows in place with pwrite and
+fsyncs each file it wrote once, so a whole session costs at most two syncs
+(the keys file only when new cards were added). Loading reads the two files
+straight into a dict without touching the card text. A row file that
+cannot be read (bad magic, newer version) is left untouched, keys included,
+and the store refuses to flush over it.
+"""
+
+import logging
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SM2STATE"
+FORMAT_VERSION = 1
+
+# magic, version, row count
+_HEADER = struct.Struct("<8sHI")
+# ease factor, interval (days), repetitions, next review (epoch seconds)
+_ROW = struct.Struct("<dIHd")
+
+Key = Tuple[str, str]
+
+
+class ReviewState(NamedTuple):
+    ease_factor: float
+    interval: int
+    repetitions: int
+    next_review: float
+
+
+class ReviewStateStore:
+    """Fixed-width review rows keyed by (concept_id, card_type)"""
+
+    def __init__(self, base_path: Path):
+        base_path = Path(base_path)
+        self.keys_path = base_path.with_suffix(".keys")
+        self.rows_path = base_path.with_suffix(".bin")
+        self._slots: Dict[Key, int] = {}
+        self._rows: List[ReviewState] = []
+        self._persisted = 0
+        self._dirty: Set[int] = set()
+        # False when the row file could not be read; flush then leaves both files alone
+        self.writable = True
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            keys = self.keys_path.read_text(encoding="utf-8").split("\n")[:-1]
+        except FileNotFoundError:
+            return
+        try:
+            data = self.rows_path.read_bytes()
+        except FileNotFoundError:
+            data = b""
+        if data[:_HEADER.size].strip(b"\0"):
+            try:
+                magic, version, count = _HEADER.unpack_from(data, 0)
+                if magic != MAGIC or version != FORMAT_VERSION:
+                    raise ValueError("unsupported review state format")
+            except (struct.error, ValueError) as e:
+                logger.warning(f"Ignoring unreadable review state {self.rows_path}: {e}")
+                self.writable = False
+                return
+        else:
+            # no header yet: the first flush stopped before committing any rows
+            count = 0
+
+        # A crash between appending keys and committing rows leaves extra keys:
+        # drop them so line numbers keep matching slots
+        count = min(count, len(keys), max(0, (len(data) - _HEADER.size) // _ROW.size))
+        if len(keys) > count:
+            with self.keys_path.open("r+b") as f:
+                f.truncate(sum(len(line.encode("utf-8")) + 1 for line in keys[:count]))
+        end = _HEADER.size + count * _ROW.size
+        self._rows = [ReviewState(*row) for row in _ROW.iter_unpack(data[_HEADER.size:end])]
+        for slot, line in enumerate(keys[:count]):
+            concept_id, card_type = line.split("\t")
+            self._slots[(concept_id, card_type)] = slot
+        self._persisted = count
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self._slots
+
+    def get(self, key: Key) -> Optional[ReviewState]:
+        slot = self._slots.get(key)
+        return None if slot is None else self._rows[slot]
+
+    def items(self) -> Iterator[Tuple[Key, ReviewState]]:
+        for key, slot in self._slots.items():
+            yield key, self._rows[slot]
+
+    def update(self, key: Key, state: ReviewState) -> None:
+        """Set a card's review state (written on the next flush)"""
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = len(self._rows)
+            self._slots[key] = slot
+            self._rows.append(state)
+        else:
+            self._rows[slot] = state
+            if slot < self._persisted:
+                self._dirty.add(slot)
+
+    @property
+    def pending(self) -> int:
+        """Rows changed since the last flush"""
+        return len(self._dirty) + len(self._rows) - self._persisted
+
+    def flush(self) -> None:
+        """Persist new and changed rows: one fsync per file written (keys, then rows)"""
+        if not self.pending:
+            return
+        if not self.writable:
+            logger.warning(f"Not saving review state over unreadable {self.rows_path}")
+            return
+        self.rows_path.parent.mkdir(parents=True, exist_ok=True)
+        new_slots = range(self._persisted, len(self._rows))
+        if new_slots:
+            by_slot = {slot: key for key, slot in self._slots.items() if slot >= self._persisted}
+            with self.keys_path.open("a", encoding="utf-8") as f:
+                f.write("".join(f"{by_slot[slot][0]}\t{by_slot[slot][1]}\n" for slot in new_slots))
+                f.flush()
+                os.fsync(f.fileno())
+
+        fd = os.open(self.rows_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            for slot in sorted(self._dirty) + list(new_slots):
+                os.pwrite(fd, _ROW.pack(*self._rows[slot]), _HEADER.size + slot * _ROW.size)
+            os.pwrite(fd, _HEADER.pack(MAGIC, FORMAT_VERSION, len(self._rows)), 0)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self._persisted = len(self._rows)
+        self._dirty.clear()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Rolling Stats - incrementally maintained accuracy aggregates for dashboards
+
+Every attempt bumps a per-day [total, correct] counter for its subject and,
+when known, its concept, along with the running totals of each sliding
+window (7/30/90 days) that covers that day. When the calendar day advances,
+the days that slide out of a window are subtracted from it and buckets older
+than the longest window are dropped, so memory and query cost depend on the
+number of subjects and concepts, never on the length of the history.
+
+Checkpoints store only the day buckets (window totals are re-derived on
+load) plus a `meta` dict the owner uses to record how much of its attempt
+log the checkpoint already covers.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = (7, 30, 90)
+CHECKPOINT_VERSION = 1
+CHECKPOINT_EVERY = 50
+
+# ("subject" | "concept", name)
+Key = Tuple[str, str]
+
+
+def _day(timestamp: float) -> int:
+    """Local calendar day ordinal of an epoch timestamp"""
+    return date.fromtimestamp(timestamp).toordinal()
+
+
+class RollingStats:
+    """Per-subject and per-concept daily counters with sliding window totals"""
+
+    def __init__(self, windows: Tuple[int, ...] = WINDOWS, checkpoint_path: Optional[Path] = None,
+                 checkpoint_every: int = CHECKPOINT_EVERY):
+        self.windows = tuple(sorted(windows))
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.checkpoint_every = checkpoint_every
+        self.meta: Dict[str, Any] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop all counters (meta is kept)"""
+        self.today: Optional[int] = None
+        self._days: Dict[int, Dict[Key, List[int]]] = {}
+        self._totals: Dict[int, Dict[Key, List[int]]] = {w: {} for w in self.windows}
+        self._unsaved = 0
+
+    # ---------- updates ----------
+
+    def _advance(self, today: int) -> None:
+        """Slide every window forward to end on `today`"""
+        if self.today is None:
+            self.today = today
+            return
+        if today <= self.today:
+            return
+        for w, totals in self._totals.items():
+            # days in (self.today - w, today - w] leave the window
+            for day in range(self.today - w + 1, min(today - w, self.today) + 1):
+                for key, (total, correct) in self._days.get(day, {}).items():
+                    counts = totals[key]
+                    counts[0] -= total
+                    counts[1] -= correct
+                    if counts[0] <= 0:
+                        del totals[key]
+        self.today = today
+        horizon = today - self.windows[-1]
+        for day in [d for d in self._days if d <= horizon]:
+            del self._days[day]
+
+    def add(self, subject: str, correct: bool, timestamp: Optional[float] = None,
+            concept: Optional[str] = None) -> None:
+        """Count one attempt"""
+        timestamp = time.time() if timestamp is None else timestamp
+        day = _day(timestamp)
+        self._advance(max(day, _day(time.time())))
+        if day <= self.today - self.windows[-1]:
+            return
+
+        hit = 1 if correct else 0
+        keys: List[Key] = [("subject", subject)]
+        if concept:
+            keys.append(("concept", concept))
+        bucket = self._days.setdefault(day, {})
+        for key in keys:
+            counts = bucket.setdefault(key, [0, 0])
+            counts[0] += 1
+            counts[1] += hit
+            for w, totals in self._totals.items():
+                if day > self.today - w:
+                    counts = totals.setdefault(key, [0, 0])
+                    counts[0] += 1
+                    counts[1] += hit
+
+        self._unsaved += 1
+        if self.checkpoint_path and self._unsaved >= self.checkpoint_every:
+            self.save()
+
+    # ---------- queries ----------
+
+    def window(self, days: int, kind: str = "subject") -> Dict[str, Dict[str, float]]:
+        """{name: {"correct", "total", "percentage"}} over the last `days` days"""
+        if days not in self._totals:
+            raise ValueError(f"No {days}-day window (have {self.windows})")
+        self._advance(_day(time.time()))
+        return {
+            name: {"correct": correct, "total": total,
+                   "percentage": (correct / total * 100) if total else 0}
+            for (key_kind, name), (total, correct) in self._totals[days].items()
+            if key_kind == kind
+        }
+
+    def summary(self, days: int) -> Tuple[int, int]:
+        """(total, correct) across all subjects over the last `days` days"""
+        stats = self.window(days).values()
+        return sum(s["total"] for s in stats), sum(s["correct"] for s in stats)
+
+    def weakest(self, days: int = 30, kind: str = "concept", limit: int = 5,
+                min_attempts: int = 3) -> List[Tuple[str, Dict[str, float]]]:
+        """Lowest-accuracy entries with at least min_attempts in the window"""
+        stats = [(name, s) for name, s in self.window(days, kind).items() if s["total"] >= min_attempts]
+        stats.sort(key=lambda item: (item[1]["percentage"], -item[1]["total"]))
+        return stats[:limit]
+
+    # ---------- checkpoints ----------
+
+    def save(self) -> None:
+        """Write a checkpoint atomically"""
+        if self.checkpoint_path is None:
+            return
+        checkpoint = {
+            "version": CHECKPOINT_VERSION,
+            "windows": list(self.windows),
+            "today": self.today,
+            "meta": self.meta,
+            "days": [[day, kind, name, total, correct]
+                     for day, bucket in self._days.items()
+                     for (kind, name), (total, correct) in bucket.items()],
+        }
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix(self.checkpoint_path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(checkpoint), encoding="utf-8")
+        os.replace(tmp_path, self.checkpoint_path)
+        self._unsaved = 0
+
+    @classmethod
+    def load(cls, path: Path, windows: Tuple[int, ...] = WINDOWS,
+             checkpoint_every: int = CHECKPOINT_EVERY) -> "RollingStats":
+        """Restore from a checkpoint; empty (with no meta) if missing or unusable"""
+        stats = cls(windows, path, checkpoint_every)
+        try:
+            checkpoint = json.loads(Path(path).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return stats
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable stats checkpoint {path}: {e}")
+            return stats
+        if checkpoint.get("version") != CHECKPOINT_VERSION or tuple(checkpoint.get("windows", ())) != stats.windows:
+            logger.info(f"Stats checkpoint {path} is from another version; rebuilding")
+            return stats
+
+        stats.meta = checkpoint["meta"]
+        stats.today = checkpoint["today"]
+        for day, kind, name, total, correct in checkpoint["days"]:
+            stats._days.setdefault(day, {})[(kind, name)] = [total, correct]
+            for w, totals in stats._totals.items():
+                if day > stats.today - w:
+                    counts = totals.setdefault((kind, name), [0, 0])
+                    counts[0] += total
+                    counts[1] += correct
+        return stats
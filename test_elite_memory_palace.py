@@ -0,0 +1,502 @@
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import pytest
+
+import elite_memory_palace as emp
+import palace_spatial
+
+
+def test_batch_review_schedules_match_scalar(monkeypatch):
+    engine = emp.AdaptiveNeuroplasticityEngine()
+    rng = random.Random(5)
+    locations = []
+    for _ in range(40):
+        bizarre = rng.uniform(0, 10)
+        locations.append({
+            "emotional_intensity": rng.uniform(0, 10),
+            "bizarreness_factor": bizarre,
+            "difficulty_score": bizarre / 10,
+            "performance_history": [{"accuracy": rng.random()} for _ in range(rng.randint(0, 6))],
+        })
+    columns = (
+        [l["emotional_intensity"] for l in locations],
+        [l["bizarreness_factor"] for l in locations],
+        [l["difficulty_score"] for l in locations],
+        [engine.history_decline(l["performance_history"]) for l in locations],
+    )
+    batches = [engine.optimize_review_schedules_batch(*columns, now=datetime.now())]
+    monkeypatch.setattr(emp, "np", None)
+    batches.append(engine.optimize_review_schedules_batch(*columns, now=datetime.now()))
+
+    for i, location in enumerate(locations):
+        scalar = engine.optimize_review_schedule(location, "default_user")
+        expected = [(t - scalar[0]).total_seconds() for t in scalar]
+        for batch in batches:
+            times = [float(t) for t in batch.review_times[i]]
+            assert all(abs((t - times[0]) - e) < 1e-3 for t, e in zip(times, expected))
+
+
+def test_practice_recall_schedules_in_batch():
+    system = emp.EliteMemoryPalaceSystem()
+    palace = system.create_elite_palace("Torts", "torts")
+    for content in ["Duty", "Breach", "Causation", "Damages"]:
+        system.add_elite_location(palace["id"], content)
+    results = system.practice_championship_recall(palace["id"])
+    assert "error" not in results
+    assert system.refresh_review_schedules(palace["id"]) == 4
+    for location in palace["locations"].values():
+        assert len(location.consolidation_schedule) == 3
+        assert location.consolidation_schedule == sorted(location.consolidation_schedule)
+
+
+def test_model_registry_loads_lazily_and_once(monkeypatch):
+    calls = []
+
+    def load():
+        calls.append(1)
+        return "model"
+
+    monkeypatch.setitem(emp.ModelRegistry.SPECS, "fake", (("json",), load))
+    monkeypatch.setitem(emp.ModelRegistry.SPECS, "broken", (("json",), lambda: 1 / 0))
+    monkeypatch.delenv("PALACE_ML_MODELS", raising=False)
+
+    assert emp.ModelRegistry().get("fake") is None  # opt-in only
+    assert calls == []
+
+    registry = emp.ModelRegistry(["fake", "broken"])
+    assert registry.available("fake") and not registry.loaded("fake")
+    registry.warm_up(["fake"]).join()
+    assert registry.get("fake") == "model"
+    assert calls == [1]
+    assert registry.get("broken") is None and not registry.available("broken")
+
+    encoder = emp.AIEnhancedEncoder(emp.ModelRegistry([]))
+    assert not encoder.advanced_mode
+
+
+class _MeanModel:
+    """Picklable stand-in for the sklearn estimators"""
+
+    def fit(self, X, y=None, sample_weight=None):
+        self.rows = len(X)
+        self.mean = float(sum(y) / len(y)) if y is not None else 0.0
+        return self
+
+    def predict(self, X):
+        return [self.mean for _ in X]
+
+
+def _session(n):
+    events = [emp.RecallEvent(datetime.now(), 0.8, 2.5) for _ in range(3)]
+    return emp.RecallSession(f"s{n}", datetime.now(), "u", "p", 120.0, 10, 8, 2.5, 10, events, [events])
+
+
+def test_performance_analyzer_persists_and_retrains(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    path = tmp_path / "analyzer.model"
+    monkeypatch.setattr(emp.AdvancedPerformanceAnalyzer, "_new_models", lambda self: (_MeanModel(), _MeanModel()))
+
+    analyzer = emp.AdvancedPerformanceAnalyzer(path, retrain_every=2)
+    analyzer.advanced_mode = True
+    assert analyzer.performance_model is None and not path.exists()  # nothing fitted at construction
+
+    asyncio.run(analyzer.analyze_recall_session(_session(0)))
+    assert analyzer.wait_for_training(1, timeout=10)
+    assert path.exists()
+    for n in range(1, 3):
+        asyncio.run(analyzer.analyze_recall_session(_session(n)))
+    assert analyzer.wait_for_training(2, timeout=10)
+    assert analyzer.performance_model.rows == analyzer.SYNTHETIC_SAMPLES + 3
+
+    reloaded = emp.AdvancedPerformanceAnalyzer(path)
+    reloaded.advanced_mode = True
+    assert reloaded._ensure_models() and reloaded.trainings == 0
+    assert len(reloaded._samples) == 3
+
+    monkeypatch.setattr(emp, "FEATURE_SCHEMA_HASH", "changed")
+    stale = emp.AdvancedPerformanceAnalyzer(path)
+    stale.advanced_mode = True
+    with stale._lock:
+        stale._load_artifact()
+    assert stale.performance_model is None
+
+
+def test_sync_api_works_inside_running_loop():
+    system = emp.EliteMemoryPalaceSystem()
+    palace = system.create_elite_palace("Contracts", "contracts")
+
+    async def caller():
+        sync_location = system.add_elite_location(palace["id"], "Offer", (1.0, 1.0, 1.0))
+        async_location = await system.add_elite_location_async(palace["id"], "Acceptance", (5.0, 5.0, 1.0))
+        return sync_location, async_location
+
+    for location in asyncio.run(caller()):
+        assert location.multi_modal_encoding is not None
+        assert location.sensory_matrix
+
+    async def blocking_on_palace_loop():
+        system._create_multi_sensory_encoding("Consideration")
+
+    with pytest.raises(RuntimeError):
+        emp.PALACE_EVENT_LOOP.run(blocking_on_palace_loop())
+
+
+def _assert_bboxes_cover(node):
+    children = node.entries if isinstance(node, emp.SpatialLeafNode) else node.children
+    for child in children:
+        assert all(node.bbox[a] <= child.bbox[a] for a in range(3))
+        assert all(node.bbox[a] >= child.bbox[a] for a in range(3, 6))
+        if not isinstance(child, emp.SpatialEntry):
+            _assert_bboxes_cover(child)
+
+
+def test_bulk_ingestion_fills_storage_schedules_and_index():
+    system = emp.EliteMemoryPalaceSystem()
+    palace = system.create_elite_palace("Evidence", "evidence")
+    contents = [f"Hearsay exception {i}" for i in range(150)]
+    locations = system.add_elite_locations(palace["id"], contents, concurrency=8)
+
+    assert [location.content for location in locations] == contents
+    assert len(palace["locations"]) == 150
+    assert len(system.compressed_storage.location_ids) == 150
+    assert all(len(location.consolidation_schedule) == 3 for location in locations)
+    assert all(location.multi_modal_encoding is not None for location in locations)
+
+    # More single inserts after a bulk load keep the tree consistent
+    for i in range(40):
+        system.add_elite_location(palace["id"], f"Late addition {i}")
+    index = system.spatial_index
+    assert index.size == len(index._all_entries()) == 190
+    assert {entry.location_id for entry in index._all_entries()} == set(palace["locations"])
+    _assert_bboxes_cover(index.root)
+
+    with pytest.raises(ValueError):
+        system.add_elite_locations(palace["id"], ["a", "b"], positions=[(0.0, 0.0, 0.0)])
+
+
+@pytest.mark.parametrize("packing", emp.OptimizedSpatialIndex.PACKINGS)
+def test_spatial_index_delete_move_and_range(packing):
+    rng = random.Random(9)
+    positions = {f"loc{i}": (rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 10)) for i in range(1500)}
+    index = emp.OptimizedSpatialIndex()
+    index.add_locations(list(positions.items()), packing=packing)
+
+    for i in range(0, 1500, 3):
+        index.remove_location(f"loc{i}")
+        del positions[f"loc{i}"]
+    for location_id in list(positions)[::4]:
+        old = positions[location_id]
+        positions[location_id] = (old[0] + 0.01, old[1], old[2]) if rng.random() < 0.5 else (
+            rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 10))
+        index.move_location(location_id, positions[location_id])
+    index.remove_location("never-added")
+
+    assert len(index) == len(positions) == len(index._all_entries())
+    assert {e.location_id: e.position for e in index._all_entries()} == positions
+    _assert_bboxes_cover(index.root)
+    for _ in range(20):
+        lo = (rng.uniform(0, 80), rng.uniform(0, 80), rng.uniform(0, 5))
+        hi = (lo[0] + 20, lo[1] + 20, lo[2] + 5)
+        expected = {i for i, p in positions.items() if all(lo[a] <= p[a] <= hi[a] for a in range(3))}
+        assert set(index.find_in_box(lo, hi)) == expected
+
+    for location_id in list(positions):
+        index.remove_location(location_id)
+    assert index.root is None and len(index) == 0
+
+
+@pytest.mark.parametrize("existing", [0, 500])
+def test_spatial_index_batch_with_repeated_ids_keeps_last_position(existing):
+    index = emp.OptimizedSpatialIndex()
+    index.add_locations([(f"old{i}", (i, 0.0, 1.0)) for i in range(existing)])
+    batch = [("a", (0.0, 0.0, 0.0)), ("a", (1.0, 1.0, 1.0))] + [(f"b{i}", (i, i, 0.0)) for i in range(100)]
+    index.add_locations(batch + [("old0", (7.0, 7.0, 7.0))] * bool(existing))
+
+    entries = {e.location_id: e.position for e in index._all_entries()}
+    assert len(index) == len(entries) == existing + 101
+    assert entries["a"] == index.position_of("a") == (1.0, 1.0, 1.0)
+    assert index.find_in_box((0.5, 0.5, 0.5), (1.5, 1.5, 1.5)) == ["a"]
+    if existing:
+        assert entries["old0"] == (7.0, 7.0, 7.0)
+    _assert_bboxes_cover(index.root)
+
+
+def test_hilbert_keys_numpy_matches_pure_python(monkeypatch):
+    rng = random.Random(4)
+    points = [(rng.uniform(-5, 5), rng.uniform(0, 1), rng.uniform(0, 100)) for _ in range(500)]
+    keys = emp.hilbert_keys(points)
+    monkeypatch.setattr(palace_spatial, "np", None)
+    assert emp.hilbert_keys(points) == keys
+
+    grid = [(x, y, z) for x in range(4) for y in range(4) for z in range(4)]
+    order = sorted(grid, key=dict(zip(grid, emp.hilbert_keys(grid, bits=2))).__getitem__)
+    assert all(sum(abs(a - b) for a, b in zip(p, q)) == 1 for p, q in zip(order, order[1:]))
+
+
+def test_knn_radius_and_batch_match_brute_force():
+    rng = random.Random(12)
+    positions = {f"loc{i}": (rng.uniform(0, 200), rng.uniform(0, 200), rng.uniform(0, 20)) for i in range(3000)}
+    index = emp.OptimizedSpatialIndex(max_entries=8)
+    index.add_locations(list(positions.items()))
+    for i in range(300):  # mix in incremental inserts so the tree is not purely packed
+        positions[f"extra{i}"] = (rng.uniform(0, 200), rng.uniform(0, 200), rng.uniform(0, 20))
+        index.add_location(f"extra{i}", positions[f"extra{i}"])
+
+    def brute(q, keep=lambda _: True):
+        return sorted((math.dist(q, p), i) for i, p in positions.items() if keep(i))
+
+    queries = [(rng.uniform(-20, 220), rng.uniform(-20, 220), rng.uniform(0, 20)) for _ in range(60)]
+    for q in queries:
+        expected = brute(q)
+        found = index.find_nearest(q, k=10)
+        assert [d for _, d in found] == pytest.approx([d for d, _ in expected[:10]])
+        radius = (expected[25][0] + expected[26][0]) / 2
+        assert sorted(i for i, _ in index.find_within_radius(q, radius)) == sorted(
+            i for d, i in expected if d <= radius)
+        odd = lambda location_id: location_id.endswith(("1", "3", "5", "7", "9"))
+        assert [i for i, _ in index.find_nearest(q, 5, accept=odd)] == [i for _, i in brute(q, odd)[:5]]
+
+    batch = index.find_nearest_batch(queries, k=7)
+    assert batch == [index.find_nearest(q, k=7) for q in queries]
+
+
+def test_find_nearby_locations_stays_in_palace():
+    system = emp.EliteMemoryPalaceSystem()
+    torts = system.create_elite_palace("Torts", "torts")
+    crim = system.create_elite_palace("Crim", "criminal")
+    system.add_elite_locations(torts["id"], [f"Tort {i}" for i in range(30)])
+    system.add_elite_locations(crim["id"], [f"Crime {i}" for i in range(30)])
+
+    nearby = system.find_nearby_locations(torts["id"], k=3)
+    assert set(nearby) == set(torts["locations"])
+    for location_id, neighbours in nearby.items():
+        assert len(neighbours) == 3
+        assert all(other in torts["locations"] and other != location_id for other, _ in neighbours)
+
+
+def test_barnes_hut_repulsion_tracks_exact_forces():
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(3)
+    positions = rng.uniform(-50, 50, (400, 3)) * (1, 1, 0.1)
+    exact = emp.ForceDirectedLayout(theta=0).repulsion(positions, 2.0)
+    # A vanishing opening angle opens every cell, so the octree path is exact too
+    assert np.allclose(emp.ForceDirectedLayout(theta=1e-9).repulsion(positions, 2.0), exact)
+    approx = emp.ForceDirectedLayout(theta=0.7).repulsion(positions, 2.0)
+    error = np.linalg.norm(approx - exact, axis=1) / np.linalg.norm(exact, axis=1)
+    assert np.median(error) < 0.02 and error.max() < 0.1
+
+
+def test_similarity_edges_and_layout(monkeypatch):
+    rng = random.Random(8)
+    words = ["offer", "acceptance", "consideration", "hearsay", "duty", "breach", "the", "of", "a", "rule"]
+    nodes = {
+        f"n{i}": emp.ContentNode(
+            id=f"n{i}", content=" ".join(rng.choices(words, k=5)),
+            category=rng.choice(["contracts", "torts", "evidence"]), difficulty=rng.uniform(0, 2),
+            semantic_embedding=[rng.random(), rng.random()] if i % 4 == 0 else [],
+        )
+        for i in range(120)
+    }
+    engine = emp.SpatialIntelligenceEngine()
+    node_list = list(nodes.values())
+    expected = {
+        (i, j): engine._calculate_semantic_similarity(node_list[i], node_list[j])
+        for i in range(120) for j in range(i + 1, 120)
+    }
+    strong = {pair: score for pair, score in expected.items() if score > 0.3}
+    rows, cols, weights = engine._similarity_edges(nodes, max_neighbors=200)
+    assert dict(zip(zip(rows, cols), weights)) == pytest.approx(strong)
+
+    rows, cols, weights = engine._similarity_edges(nodes, max_neighbors=4)
+    assert all(i < j and w > 0.3 for i, j, w in zip(rows, cols, weights))
+    assert len(rows) <= 4 * 120
+
+    layout = engine._force_directed_layout(emp.ContentGraph(nodes=nodes), (rows, cols, weights))
+    assert engine.layout_engine.iterations_run < engine.layout_engine.max_iterations
+    assert set(layout.positions) == set(nodes)
+    assert all(-50 <= x <= 50 and -50 <= y <= 50 and 0 <= z <= 10 for x, y, z in layout.positions.values())
+
+    # Pure-Python fallbacks
+    monkeypatch.setattr(emp, "np", None)
+    rows, cols, weights = engine._similarity_edges(nodes, max_neighbors=200)
+    assert dict(zip(zip(rows, cols), weights)) == pytest.approx(strong)
+    moved = emp.ForceDirectedLayout(max_iterations=5).run([(float(i), 0.0, 1.0) for i in range(10)], ([0], [1], [0.9]), 3.0)
+    assert len(moved) == 10 and moved[0][0] < 0.0 < moved[9][0] - 9.0
+
+
+def test_topology_optimizer_scores_moves_incrementally():
+    rng = random.Random(3)
+    ids = [f"n{i}" for i in range(300)]
+    layout = emp.OptimalLayout(
+        positions={i: (rng.uniform(-40, 40), rng.uniform(-40, 40), rng.uniform(0, 10)) for i in ids},
+        connection_graph={i: set(rng.sample(ids, 6)) - {i} for i in ids},
+        cognitive_load_score=0.0,
+        recommended_paths=[],
+    )
+    objective = emp.CognitiveLoadObjective()
+    constraints = [emp.MinimumDistanceConstraint(2.0), emp.VisibilityConstraint()]
+
+    optimizer = emp.TopologyOptimizer(seed=1)
+    best = optimizer.optimize(layout, objective, constraints)
+    assert optimizer.moves_run == 50 * 300
+    assert best.cognitive_load_score == pytest.approx(objective(best)) and best.cognitive_load_score > objective(layout)
+    assert all(-50 <= x <= 50 and -50 <= y <= 50 and 0 <= z <= 10 for x, y, z in best.positions.values())
+    assert layout.positions != best.positions and set(layout.positions) == set(best.positions)
+
+    # Any other objective is re-evaluated in full; the time budget caps every restart
+    generic = emp.TopologyOptimizer(max_iterations=300, seed=1).optimize(layout, lambda lay: objective(lay), constraints)
+    assert generic.cognitive_load_score == pytest.approx(objective(generic))
+    assert generic.cognitive_load_score >= objective(layout)
+    budgeted = emp.TopologyOptimizer(max_iterations=10**9, restarts=3, cooling="linear", time_budget=0.2, seed=2)
+    started = time.perf_counter()
+    budgeted.optimize(layout, objective, constraints)
+    assert time.perf_counter() - started < 1.0 and budgeted.moves_run > 0
+    with pytest.raises(ValueError):
+        emp.TopologyOptimizer(cooling="quadratic")
+
+    # Large palaces: the default move count is capped and the engine's optimizer has a budget
+    ids = [f"n{i}" for i in range(5000)]
+    large = emp.OptimalLayout(
+        positions={i: (rng.uniform(-50, 50), rng.uniform(-50, 50), rng.uniform(0, 10)) for i in ids},
+        connection_graph={i: set(rng.sample(ids, 4)) - {i} for i in ids},
+        cognitive_load_score=0.0,
+        recommended_paths=[],
+    )
+    engine = emp.SpatialIntelligenceEngine()
+    budget = engine.topology_optimizer.time_budget
+    started = time.perf_counter()
+    engine.topology_optimizer.optimize(large, engine.cognitive_objective, constraints)
+    assert time.perf_counter() - started < budget + 1.0
+    assert 0 < engine.topology_optimizer.moves_run <= emp.TopologyOptimizer.DEFAULT_MAX_MOVES
+
+    grid = palace_spatial.UniformGrid(2.0)
+    points = {i: (rng.uniform(0, 20), rng.uniform(0, 20), rng.uniform(0, 4)) for i in range(500)}
+    for key, point in points.items():
+        grid.insert(key, point)
+    for key in range(0, 500, 3):
+        points[key] = (rng.uniform(0, 20), rng.uniform(0, 20), rng.uniform(0, 4))
+        grid.move(key, points[key])
+    q = (10.0, 10.0, 2.0)
+    assert {k for k, p in points.items() if math.dist(p, q) <= 2.0} <= set(grid.nearby(q))
+
+
+def test_performance_ring_store_matches_python_history(monkeypatch):
+    rng = random.Random(3)
+    updates = []
+    for _ in range(400):
+        record = {"timestamp": datetime(2026, 1, 1, second=rng.randrange(60)), "accuracy": rng.random(),
+                  "response_time": rng.uniform(1, 4)}
+        if rng.random() < 0.2:
+            del record["response_time"]
+        if rng.random() < 0.1:
+            record["note"] = "not a stored field"
+        updates.append((f"loc{rng.randrange(9)}", record))
+
+    store = emp.PerformanceRingStore(6, initial_rows=2)
+    store.append_batch(updates[:250])
+    for location_id, record in updates[250:300]:
+        store.history(location_id).append(record)
+    store.append_batch(updates[300:])
+    stats = store.statistics()
+
+    monkeypatch.setattr(emp, "np", None)
+    reference = emp.PerformanceRingStore(6)
+    for location_id, record in updates:
+        reference.append(location_id, record)
+    expected = reference.statistics(stats["location_ids"])
+    monkeypatch.undo()
+    for name in ("count", "avg_accuracy", "accuracy_variance", "avg_response_time", "trend"):
+        assert list(stats[name]) == pytest.approx(expected[name], abs=1e-6)
+    for location_id in stats["location_ids"]:
+        want = [{k: v for k, v in r.items() if k != "note"} for l, r in updates if l == location_id][-6:]
+        assert store.records(location_id) == want
+        assert reference.records(location_id) == want
+
+    # Locations read and write their history straight from the shared store
+    system = emp.EliteMemoryPalaceSystem()
+    palace = system.create_elite_palace("Torts", "torts")
+    locations = system.add_elite_locations(palace["id"], [f"Negligence element {i}" for i in range(5)])
+    for _ in range(3):
+        system.practice_championship_recall(palace["id"])
+    storage = system.compressed_storage
+    assert all(len(location.performance_history) == 3 for location in locations)
+    assert locations[0].performance_history[-1] == storage.performance.records(locations[0].id)[-1]
+    assert 0 < locations[0].calculate_mastery_score() <= 1
+    summary = storage.performance_statistics([location.id for location in locations])
+    assert list(summary["count"]) == [3] * 5
+
+
+def test_location_storage_grows_in_place_and_reads_without_flush(monkeypatch):
+    pytest.importorskip("numpy")
+    def fill(storage):
+        for i in range(70):
+            storage.add_location(f"a{i}", f"Rule {i}", (float(i), 2.0 * i, 1.0), 3.5, 4.5, {"visual": "red"})
+            assert storage.get_location(f"a{i}")["position"] == (float(i), 2.0 * i, 1.0)
+        storage.add_locations([(f"b{i}", f"Exception {i}", (0.5, 0.5, 0.5), 1.0, 2.0, {}) for i in range(50)])
+        return storage
+
+    storage = fill(emp.CompressedLocationStorage(initial_capacity=4))
+    assert len(storage) == 120 and storage.rows.capacity == 128
+    assert storage.rows.data.dtype == emp.LOCATION_DTYPE and storage.rows.data.dtype.itemsize == 40
+    assert storage.positions_x.base is not None  # a view over the records, not a copy
+    location = storage.get_location("b7")
+    assert location["content"] == "Exception 7" and location["emotional_intensity"] == 2.0
+    found = storage.bulk_query_by_position((0.0, 0.0, 0.0), (3.0, 5.0, 2.0))
+    assert found == ["a0", "a1", "a2"] + [f"b{i}" for i in range(50)]
+
+    monkeypatch.setattr(emp, "np", None)
+    fallback = fill(emp.CompressedLocationStorage())
+    assert fallback.bulk_query_by_position((0.0, 0.0, 0.0), (3.0, 5.0, 2.0)) == found
+    assert {**fallback.get_location("b7"), "created_at": None} == {**location, "created_at": None}
+
+
+def test_sensory_codes_are_deterministic_decodable_and_filterable(monkeypatch):
+    pytest.importorskip("numpy")
+    encodings = [
+        {"visual": f"See rule {i % 7} in vivid detail", "auditory": f"Hear gavel {i % 3}", "spatial": "Courtroom"}
+        for i in range(40)
+    ]
+    storage = emp.CompressedLocationStorage()
+    storage.add_locations([(f"loc{i}", "x", (0.0, 0.0, 0.0), 1.0, 1.0, enc) for i, enc in enumerate(encodings)])
+    table = storage.sensory_codes
+    assert len(table) == 21  # distinct (visual, auditory) combinations; identical encodings share an id
+    assert storage.get_location("loc12")["sensory_encoding"] == encodings[12]
+    assert storage.find_by_sensory("visual", "See rule 3 in vivid detail") == [f"loc{i}" for i in range(3, 40, 7)]
+    assert storage.find_by_sensory("olfactory", "anything") == []
+    codes = storage.sensory_matrix(["loc0", "loc8"])
+    assert codes[0].tolist() == [1, 1, 0, 0, 0, 0, 1, 0, 0] and codes[1].tolist() == [2, 3, 0, 0, 0, 0, 1, 0, 0]
+
+    # Codes survive a save/load and do not depend on the interpreter's hash seed
+    restored = emp.SensoryCodeTable.from_dict(json.loads(json.dumps(table.to_dict())))
+    assert [restored.intern(enc) for enc in encodings] == storage.sensory_encodings.tolist()
+    script = (
+        "import json, elite_memory_palace as emp\n"
+        "t = emp.SensoryCodeTable()\n"
+        f"print(json.dumps([t.intern(e) for e in {encodings[::-1]!r}] + [t.to_dict()]))\n"
+    )
+    outputs = {
+        subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                       cwd=os.path.dirname(os.path.abspath(__file__)), env={**os.environ, "PYTHONHASHSEED": seed}).stdout.splitlines()[-1]
+        for seed in ("1", "2")
+    }
+    assert len(outputs) == 1
+
+    # The optimized system stores the same profile ids
+    import optimized_elite_memory_palace as oemp
+    optimized = oemp.CompressedLocationStorage()
+    optimized.add_locations([(f"loc{i}", "x", (0.0, 0.0, 0.0), 1.0, 1.0, enc) for i, enc in enumerate(encodings)])
+    assert optimized.sensory_encodings.tolist() == storage.sensory_encodings.tolist()
+    assert optimized.performance.capacity == 32 and optimized.bulk_ids() == storage.location_ids
+
+    monkeypatch.setattr(emp, "np", None)
+    fallback = emp.CompressedLocationStorage()
+    fallback.add_locations([(f"loc{i}", "x", (0.0, 0.0, 0.0), 1.0, 1.0, enc) for i, enc in enumerate(encodings)])
+    assert fallback.find_by_sensory("auditory", "Hear gavel 2") == [f"loc{i}" for i in range(2, 40, 3)]
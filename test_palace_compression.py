@@ -0,0 +1,62 @@
+import zlib
+
+import pytest
+
+import elite_memory_palace as emp
+import palace_compression as pc
+
+RULES = [
+    "Negligence requires duty, breach of the duty of care, actual causation, proximate causation and damages",
+    "Battery requires an intentional harmful or offensive contact with the person of another",
+    "Assault requires an intentional act that causes reasonable apprehension of an imminent harmful contact",
+    "A contract requires an offer, acceptance, consideration and the absence of a defense to formation",
+    "The mailbox rule makes an acceptance effective upon dispatch unless the offer provides otherwise",
+    "Hearsay is an out-of-court statement offered to prove the truth of the matter asserted",
+    "Strict liability applies to abnormally dangerous activities and wild animals kept by the defendant",
+    "Trespass to land requires an intentional physical invasion of the land of another",
+]
+
+
+def test_shared_dictionary_beats_per_row_zlib_and_round_trips():
+    corpus = [f"{rule} (variant {i})" for i in range(6) for rule in RULES]
+    codec = pc.ContentCodec.train(corpus)
+    assert codec.trained and codec.backend in pc.BACKENDS
+    assert codec.dictionary.endswith(b" ")  # most valuable n-grams last
+
+    held_out = [
+        "Negligence per se requires a statute, a protected class and the harm the statute was meant to prevent",
+        "Conversion requires an intentional exercise of dominion or control over the chattel of another",
+        "Ünicode survives: § 1983 claims",
+        "",
+    ]
+    blobs = [codec.compress(text) for text in held_out]
+    assert [codec.decompress(blob) for blob in blobs] == codec.decompress_many(blobs) == held_out
+    assert sum(map(len, blobs)) < sum(len(zlib.compress(text.encode("utf-8"), 6)) for text in held_out)
+
+    with pytest.raises(ValueError):
+        pc.ContentCodec(backend="lz4")
+
+    cache = pc.DecodedCache(2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"  # "b" is now least recently used
+    cache.put("c", "3")
+    assert cache.peek("b") is None and cache.get("c") == "3" and (cache.hits, cache.misses) == (2, 0)
+
+
+def test_storage_trains_once_and_batch_decodes_range_queries():
+    storage = emp.CompressedLocationStorage(auto_train_at=20, decoded_cache_size=4)
+    rows = [(f"loc{i}", f"{RULES[i % len(RULES)]} #{i}", (float(i), 0.0, 0.0), 1.0, 1.0, {}) for i in range(30)]
+    storage.add_locations(rows[:10])
+    assert not storage.codec.trained
+    storage.add_locations(rows[10:])
+    assert storage.codec.trained and storage.auto_train_at is None
+
+    assert all(storage.get_location(location_id)["content"] == content for location_id, content, *_ in rows)
+    assert len(storage.decoded) == 4
+    found = storage.bulk_query_contents((2.5, -1.0, -1.0), (12.0, 1.0, 1.0))
+    assert found == {f"loc{i}": rows[i][1] for i in range(3, 13)}
+
+    # Retraining on an outside corpus re-encodes what is already stored
+    storage.train_codec(RULES * 3)
+    assert storage.get_contents(["loc29", "loc0"]) == [rows[29][1], rows[0][1]]
@@ -0,0 +1,113 @@
+import json
+import math
+import random
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import elite_memory_palace as emp
+import palace_file
+import palace_spatial
+
+DATA = Path(__file__).parent / "data"
+
+
+@pytest.mark.parametrize("export", sorted(DATA.glob("*_palace_*.json")), ids=lambda path: path.name)
+def test_json_exports_round_trip_through_palace_files(tmp_path, export):
+    original = json.loads(export.read_text())
+    palace = emp.palace_from_vr_export(original)
+    path = tmp_path / "palace.palace"
+    assert emp.save_palace_file(palace, path) == path.stat().st_size
+
+    reopened = emp.open_palace_file(path)
+    assert reopened["locations"].materialized_count == 0
+    assert json.loads(emp.export_palace_to_vr(reopened)) == original
+    assert reopened["file"].strings("content")[-1] == original["locations"][-1]["content"]
+    reopened["file"].close()
+
+
+def test_system_palaces_reopen_with_history_and_stored_spatial_index(tmp_path):
+    system = emp.EliteMemoryPalaceSystem()
+    palace = system.create_elite_palace("Torts", "torts")
+    locations = system.add_elite_locations(palace["id"], [f"Negligence rule {i}" for i in range(80)])
+    system.practice_championship_recall(palace["id"])
+    path = tmp_path / "torts.palace"
+    assert system.save_palace(palace["id"], path)["location_count"] == 80
+
+    reader = emp.EliteMemoryPalaceSystem()
+    reopened = reader.open_palace(path)
+    assert reopened["id"] == palace["id"] and reopened["name"] == "Torts"
+    with pytest.raises(ValueError):
+        reader.open_palace(path)
+    before, after = palace["locations"][locations[5].id], reopened["locations"][locations[5].id]
+    for field in ("content", "position", "sensory_matrix", "pao_encoding", "speed_markers",
+                  "error_traps", "created_at", "consolidation_schedule"):
+        assert getattr(after, field) == getattr(before, field)
+    assert list(after.performance_history) == list(before.performance_history)
+
+    # Opened palaces are queried through the stored R-tree, not rebuilt
+    anchor = [locations[5].id]
+    assert reader.find_nearby_locations(reopened["id"], anchor, k=4) == \
+        system.find_nearby_locations(palace["id"], anchor, k=4)
+    route = reader.find_route(reopened["id"], locations[0].id, locations[-1].id)
+    assert route["path"][0] == locations[0].id and route["path"][-1] == locations[-1].id
+    assert len(reader.spatial_index) == 0
+
+    # The stored R-tree answers like a brute-force scan
+    stored = reopened["file"]
+    points = stored.array("position")
+    ids = stored.strings("id")
+    center, radius = tuple(points[10]), 15.0
+    brute = sorted(i for i, point in enumerate(points.tolist()) if math.dist(point, center) <= radius)
+    assert sorted(i for i, _ in stored.spatial.find_within_radius(center, radius)) == brute
+    assert ids[stored.spatial.find_nearest(center, 1)[0][0]] == ids[10]
+    del points
+
+    # A layout change moves the palace into the shared index
+    assert reader.optimize_palace_layout(reopened["id"])["success"]
+    assert len(reader.spatial_index) == 80
+    moved = reopened["locations"][locations[5].id].position
+    assert reader.find_nearby_locations(reopened["id"], anchor, k=1)[anchor[0]][0][1] == pytest.approx(
+        min(math.dist(moved, other.position) for other in reopened["locations"].values() if other is not after))
+
+
+def test_system_exit_unmaps_opened_palace_files(tmp_path):
+    with emp.EliteMemoryPalaceSystem() as system:
+        palace = system.create_elite_palace("Evidence", "evidence")
+        system.add_elite_locations(palace["id"], ["Hearsay", "Character evidence", "Impeachment"])
+        system.save_palace(palace["id"], tmp_path / "evidence.palace")
+    with emp.EliteMemoryPalaceSystem() as reader:
+        stored = reader.open_palace(tmp_path / "evidence.palace")["file"]
+        assert reader.find_nearby_locations(stored.meta["palace"]["id"], k=1)
+    assert stored._mm.closed
+
+
+def test_static_rtree_matches_brute_force_and_round_trips_arrays():
+    rng = random.Random(5)
+    points = [(rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 10)) for _ in range(3000)]
+    tree = palace_spatial.StaticRTree.build(points, node_size=8)
+    tree = palace_spatial.StaticRTree.from_arrays(tree.points, tree.to_arrays())
+    for _ in range(20):
+        center = (rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 10))
+        expected = sorted(math.dist(point, center) for point in points)[:7]
+        assert [d for _, d in tree.find_nearest(center, 7)] == pytest.approx(expected)
+        low, high = (center[0] - 10, center[1] - 10, 0.0), (center[0] + 10, center[1] + 10, 5.0)
+        inside = [i for i, p in enumerate(points) if all(a <= v <= b for a, v, b in zip(low, p, high))]
+        assert sorted(tree.find_in_box(low, high)) == inside
+
+
+def test_unreadable_palace_files_raise_value_error(tmp_path):
+    empty = tmp_path / "empty.palace"
+    empty.write_bytes(b"")
+    wrong = tmp_path / "wrong.palace"
+    wrong.write_bytes(b"NOTAPALACE" + bytes(64))
+    newer = tmp_path / "newer.palace"
+    palace_file.write_palace_file(newer, {}, {}, {"id": ["a"]})
+    data = bytearray(newer.read_bytes())
+    data[8:10] = (palace_file.FORMAT_VERSION + 1).to_bytes(2, "little")
+    newer.write_bytes(bytes(data))
+    for path in (empty, wrong, newer):
+        with pytest.raises(ValueError):
+            palace_file.PalaceFile.open(path)
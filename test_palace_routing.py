@@ -0,0 +1,99 @@
+import heapq
+import math
+import random
+
+import pytest
+
+import elite_memory_palace as emp
+import palace_routing as pr
+
+
+def _dijkstra(connections, positions, start):
+    dist = {start: 0.0}
+    heap = [(0.0, start)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for v in connections.get(u, ()):
+            nd = d + math.dist(positions[u], positions[v])
+            if nd < dist.get(v, math.inf):
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+
+def test_router_paths_match_dijkstra_and_follow_layout_changes():
+    rng = random.Random(4)
+    ids = [f"n{i}" for i in range(400)]
+    positions = {i: (rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 5)) for i in ids}
+    connections = {i: set(rng.sample(ids, 3)) - {i} for i in ids}
+    router = pr.PalaceRouter(connections, positions)
+
+    def length(path):
+        assert all(b in connections[a] for a, b in zip(path, path[1:]))
+        return sum(math.dist(positions[a], positions[b]) for a, b in zip(path, path[1:]))
+
+    for start in ids[:10]:
+        expected = _dijkstra(connections, positions, start)
+        targets = rng.sample(ids, 20)
+        many = router.shortest_paths(start, targets)
+        assert set(many) == {t for t in targets if t in expected}
+        for target in targets:
+            path = router.shortest_path(start, target)
+            if target not in expected:
+                assert path == [] and router.distance(start, target) == math.inf
+                continue
+            assert path[0] == start and path[-1] == target
+            assert length(path) == pytest.approx(expected[target])
+            assert length(many[target]) == pytest.approx(expected[target])
+            assert router.distance(start, target) == pytest.approx(expected[target])
+    assert router.cache_hits > 0
+
+    # Moving locations re-weights their edges and drops memoized routes
+    moved = {i: (rng.uniform(0, 100), rng.uniform(0, 100), 0.0) for i in rng.sample(ids, 40)}
+    positions.update(moved)
+    router.update_positions(moved)
+    expected = _dijkstra(connections, positions, ids[0])
+    for target in ids[1:60]:
+        assert router.distance(ids[0], target) == pytest.approx(expected.get(target, math.inf))
+
+    # The old API routes through the same code
+    graph = emp.ContentGraph(nodes={
+        i: emp.ContentNode(id=i, content="", category="", difficulty=1.0, connections=connections[i]) for i in ids
+    })
+    assert emp.AStarPathFinder().find_path(graph, ids[0], ids[1], positions) == router.shortest_path(ids[0], ids[1])
+    assert emp.AStarPathFinder().find_path(graph, ids[0], "missing", positions) == []
+
+
+def test_walkthrough_tour_visits_everything_once_and_beats_nearest_neighbor():
+    rng = random.Random(9)
+    positions = {f"n{i}": (rng.uniform(0, 100), rng.uniform(0, 100), 0.0) for i in range(600)}
+    router = pr.PalaceRouter({}, {**positions, "unplaced": None})
+    tour = router.tour(start="n5", max_passes=0)
+    improved = router.tour(start="n5")
+    assert improved[0] == "n5" and improved[-1] == "unplaced"
+    assert sorted(improved) == sorted(tour) == sorted(list(positions) + ["unplaced"])
+    assert router.tour_length(improved) < 0.95 * router.tour_length(tour)
+
+    system = emp.EliteMemoryPalaceSystem()
+    palace = system.create_elite_palace("Evidence", "evidence")
+    locations = system.add_elite_locations(palace["id"], [f"Hearsay exception {i}" for i in range(60)])
+    walk = system.plan_walkthrough(palace["id"], start_location_id=locations[3].id)
+    assert walk["order"][0] == locations[3].id and sorted(walk["order"]) == sorted(palace["locations"])
+    route = system.find_route(palace["id"], locations[0].id, locations[-1].id)
+    assert route["path"][0] == locations[0].id and route["path"][-1] == locations[-1].id
+    assert system.find_route("missing", locations[0].id, locations[1].id)["error"] == "Palace not found"
+    assert system.plan_walkthrough("missing")["error"] == "Palace not found"
+    assert system.find_route(palace["id"], locations[0].id, "nowhere") == {
+        "error": "Location not found", "location_id": "nowhere"}
+    assert system.plan_walkthrough(palace["id"], start_location_id="nowhere")["error"] == "Location not found"
+    with pytest.raises(ValueError):
+        system.find_nearby_locations(palace["id"], ["nowhere"])
+    router = system.palace_router(palace["id"])
+    assert system.palace_router(palace["id"]) is router
+    wider = system.palace_router(palace["id"], k=10)
+    assert wider is not router and len(wider.adjacency[0]) >= 10
+
+    system.add_elite_locations(palace["id"], ["Present sense impression"])
+    assert system.palace_router(palace["id"]) is not router
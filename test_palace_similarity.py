@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+import elite_memory_palace as emp
+import palace_similarity as psim
+
+
+def _texts(count, seed=5):
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(3000)]
+    zipf = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    texts = [" ".join(rng.choices(vocabulary, zipf, k=12)) for _ in range(count)]
+    # Every even text gets a near-duplicate with one word swapped
+    for i in range(0, count // 5, 2):
+        words = texts[i].split()
+        words[rng.randrange(len(words))] = rng.choice(vocabulary)
+        texts[i + 1] = " ".join(words)
+    return texts
+
+
+def test_lsh_graph_finds_near_duplicates_with_exact_weights(monkeypatch):
+    pytest.importorskip("numpy")
+    texts = _texts(3000)
+    index = psim.SimilarityIndex().build(texts)
+    assert [len(set(text.lower().split())) for text in texts] == [len(ids) for ids in index.token_ids]
+
+    exact = index.neighbor_graph(k=8, threshold=0.5, exact=True)
+    approx = index.neighbor_graph(k=8, threshold=0.5, exact=False)
+    found = dict(zip(zip(approx[0], approx[1]), approx[2]))
+    expected = dict(zip(zip(exact[0], exact[1]), exact[2]))
+    assert all(i < j for i, j in found)
+    assert len(set(found) & set(expected)) >= 0.95 * len(expected)
+    for (i, j), weight in found.items():
+        assert weight == pytest.approx(psim.jaccard_ids(index.token_ids[i], index.token_ids[j]))
+
+    rows, cols = index.candidate_pairs()
+    assert index.pair_jaccard(rows[:500], cols[:500]) == pytest.approx(
+        [index.similarity(i, j) for i, j in zip(rows[:500].tolist(), cols[:500].tolist())]
+    )
+
+    # Cosine over embeddings: SimHash candidates, exact rescoring
+    rng = random.Random(2)
+    centers = [[rng.gauss(0, 1) for _ in range(16)] for _ in range(100)]
+    vectors = [[x + rng.gauss(0, 0.05) for x in centers[i % 100]] for i in range(3000)]
+    embedded = psim.SimilarityIndex(exact_max=0).build(texts, vectors)
+    rows, cols, weights = embedded.neighbor_graph(k=4, threshold=0.9)
+    assert len(rows) >= 0.9 * 3000 * 4 / 2
+    assert all(i % 100 == j % 100 for i, j in zip(rows, cols))
+
+    # Pure-Python fallback scores every pair
+    small = psim.SimilarityIndex().build(texts[:200])
+    reference = small.neighbor_graph(k=300, threshold=0.2)  # no ties at the k cutoff
+    monkeypatch.setattr(psim, "np", None)
+    fallback = small.neighbor_graph(k=300, threshold=0.2)
+    assert dict(zip(zip(*fallback[:2]), fallback[2])) == pytest.approx(dict(zip(zip(*reference[:2]), reference[2])))
+
+
+def test_interference_and_layout_connections_use_sparse_graph():
+    analyzer = emp.SimilarityAnalyzer()
+    assert analyzer.calculate_similarity("Offer and Acceptance", " offer AND acceptance ") == 1.0
+    assert analyzer.calculate_similarity("offer acceptance rule", "offer rule duty") == pytest.approx(2 / 4)
+    assert analyzer.calculate_similarity("", "offer") == 0.0
+
+    system = emp.EliteMemoryPalaceSystem()
+    palace = system.create_elite_palace("Contracts", "contracts")
+    contents = [f"Rule {i} about topic{i} and detail{i}" for i in range(40)]
+    contents[7] = "Mailbox rule acceptance effective on dispatch"
+    contents[8] = "Mailbox rule acceptance effective upon dispatch"
+    locations = system.add_elite_locations(palace["id"], contents)
+
+    report = system.detect_interference(palace["id"], threshold=0.6)
+    pairs = {(pair["location_a"], pair["location_b"]) for pair in report["interfering_pairs"]}
+    assert pairs == {(locations[7].id, locations[8].id)}
+    assert "error" in system.detect_interference("missing")
+
+    result = system.optimize_palace_layout(palace["id"])
+    assert result["success"]
+
+
+def test_lsh_graph_handles_items_without_tokens():
+    pytest.importorskip("numpy")
+    texts = _texts(1200) + [""]
+    pairs = emp.SimilarityAnalyzer().similar_pairs(texts, threshold=0.8)
+    assert (0, 1) in {(i, j) for i, j, _ in pairs}
+    assert all(len(texts) - 1 not in (i, j) for i, j, _ in pairs)
+    assert len(psim.SimilarityIndex().build([""] * 1200).neighbor_graph(k=4, threshold=0.1)[0]) == 0
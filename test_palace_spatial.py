@@ -0,0 +1,84 @@
+import math
+import random
+
+import pytest
+
+import elite_memory_palace as emp
+import palace_spatial as ps
+
+
+def _leaves(node):
+    if isinstance(node, ps.SpatialLeafNode):
+        return [node]
+    return [leaf for child in node.children for leaf in _leaves(child)]
+
+
+def _check_tree(index, min_fill=True):
+    """Every leaf at the same depth, nodes within fill bounds, tight boxes"""
+    depths = set()
+    stack = [(index.root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        items = node.entries if isinstance(node, ps.SpatialLeafNode) else node.children
+        assert len(items) <= index.max_entries
+        if min_fill and node is not index.root:
+            assert len(items) >= index.min_entries
+        assert node.bbox == index._bbox_of(items)
+        if isinstance(node, ps.SpatialLeafNode):
+            depths.add(depth)
+        else:
+            stack.extend((child, depth + 1) for child in node.children)
+    assert len(depths) == 1
+
+
+@pytest.mark.parametrize("split", sorted(ps.SPLIT_STRATEGIES))
+def test_split_strategies_keep_tree_valid_and_exact(split):
+    rng = random.Random(21)
+    index = ps.OptimizedSpatialIndex(max_entries=8, split=split)
+    positions = {}
+    for i in range(2000):
+        positions[f"loc{i}"] = (rng.uniform(0, 100), rng.gauss(50, 10), rng.uniform(0, 5))
+        index.add_location(f"loc{i}", positions[f"loc{i}"])
+    for i in range(0, 2000, 5):
+        index.remove_location(f"loc{i}")
+        del positions[f"loc{i}"]
+    for location_id in list(positions)[::7]:
+        positions[location_id] = (rng.uniform(0, 100), rng.gauss(50, 10), rng.uniform(0, 5))
+        index.move_location(location_id, positions[location_id])
+
+    assert len(index) == len(positions)
+    assert {e.location_id: e.position for e in index._all_entries()} == positions
+    _check_tree(index)
+    for _ in range(30):
+        q = (rng.uniform(0, 100), rng.uniform(20, 80), rng.uniform(0, 5))
+        expected = sorted(math.dist(q, p) for p in positions.values())[:6]
+        assert [d for _, d in index.find_nearest(q, 6)] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("packing", ps.OptimizedSpatialIndex.PACKINGS)
+def test_packing_without_numpy_builds_the_same_tree(packing, monkeypatch):
+    rng = random.Random(5)
+    items = [(f"loc{i}", (rng.uniform(0, 50), rng.uniform(0, 50), rng.uniform(0, 50))) for i in range(3000)]
+
+    def leaves(index):
+        return sorted(sorted(e.location_id for e in leaf.entries) for leaf in _leaves(index.root))
+
+    packed = ps.OptimizedSpatialIndex()
+    packed.add_locations(items, packing=packing)
+    monkeypatch.setattr(ps, "np", None)
+    fallback = ps.OptimizedSpatialIndex()
+    fallback.add_locations(items, packing=packing)
+
+    assert leaves(packed) == leaves(fallback)
+    _check_tree(fallback, min_fill=False)  # packing leaves short runs at tile edges
+
+
+def test_both_palace_systems_share_the_index():
+    pytest.importorskip("numpy")
+    import optimized_elite_memory_palace as oemp
+
+    assert emp.OptimizedSpatialIndex is oemp.OptimizedSpatialIndex is ps.OptimizedSpatialIndex
+    system = oemp.OptimizedEliteMemoryPalaceSystem({'rtree_split': 'rstar', 'rtree_max_entries': 4})
+    assert system.spatial_index.split_strategy is ps.SPLIT_STRATEGIES["rstar"]
+    with pytest.raises(ValueError):
+        ps.OptimizedSpatialIndex(split="cubic")
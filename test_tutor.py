@@ -1,5 +1,16 @@
 #!/usr/bin/env python3
-from bar_tutor_unified import BarExamTutor, LegalKnowledgeGraph, InterleavedPracticeEngine
+import json
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+import jsonl_wal
+from activate_spaced_repetition import SpacedRepetitionSystem
+from bar_tutor_unified import BarExamTutor, LegalKnowledgeGraph, InterleavedPracticeEngine, PerformanceTracker
+from concept_search import ConceptSearchIndex
+from due_queue import DueQueue, JsonlDueIndex
+from review_state import ReviewState, ReviewStateStore
+from rolling_stats import RollingStats
 
 def test_knowledge_graph():
     print("Testing Knowledge Graph...")
@@ -21,6 +32,198 @@ def test_interleaved():
     assert len(concepts) == len(unique), "Duplicates!"
     print("  ✓ No duplicates\n")
 
+def test_snapshot_roundtrip(tmp_path):
+    print("Testing Knowledge Graph Snapshot...")
+    snapshot = tmp_path / "kg.snapshot"
+    source = LegalKnowledgeGraph(snapshot_path=None)
+    source.save_snapshot(snapshot)
+    kg = LegalKnowledgeGraph(snapshot_path=snapshot)
+    assert list(kg.nodes) == list(source.nodes)
+    contracts = kg.get_subject_concepts("contracts")
+    assert contracts == source.get_subject_concepts("contracts")
+    assert kg.nodes.materialized_count == len(contracts), "Loaded more than requested"
+    for concept_id, node in source.nodes.items():
+        assert asdict(kg.nodes[concept_id]) == asdict(node)
+    print(f"  Round-tripped {len(kg.nodes)} concepts")
+    print("  ✓ Snapshot matches source\n")
+
+def test_secondary_indexes():
+    print("Testing Secondary Indexes...")
+    kg = LegalKnowledgeGraph(snapshot_path=None)
+    torts = kg.get_subject_concepts("torts")
+    assert kg.get_concepts_by_mastery("torts", "low") == torts
+    node = torts[0]
+    node.mastery_level = 0.9
+    node.interval = 6
+    assert node in kg.get_concepts_by_mastery("torts", "high")
+    assert node not in kg.get_concepts_by_mastery("torts", "low")
+    assert node not in kg.get_concepts_by_interval(1)
+    node.prerequisites = ["torts_negligence"]
+    assert node in kg.get_dependents("torts_negligence")
+    for difficulty in range(1, 6):
+        expected = [n for n in kg.nodes.values() if n.difficulty == difficulty]
+        assert kg.get_concepts_by_difficulty(difficulty) == expected
+    print("  ✓ Indexes follow updates\n")
+
+def test_concept_search(tmp_path, monkeypatch):
+    print("Testing Concept Search...")
+    kg = LegalKnowledgeGraph(snapshot_path=tmp_path / "kg.snapshot")
+    node, _ = kg.search("hearsay", k=1)[0]
+    assert node.name == "Hearsay"
+    assert any("negligence" in n.concept_id for n, _ in kg.search("negligance", k=3))
+    assert any("negligence" in n.concept_id for n, _ in kg.search("nglgence", k=3))
+    assert kg.search("ucc 2-207", k=1)[0][0].concept_id == kg.search("battle of forms", k=1)[0][0].concept_id
+    assert (tmp_path / "kg.search").exists()
+    reloaded = LegalKnowledgeGraph(snapshot_path=tmp_path / "kg.snapshot")
+    assert reloaded.search("hearsay", k=3) == kg.search("hearsay", k=3)
+    monkeypatch.setattr(ConceptSearchIndex, "_pack_deletes", None)  # the typo table is loaded, not rebuilt
+    assert ConceptSearchIndex.load(tmp_path / "kg.search").search("nglgence", k=3) == kg.search_index().search("nglgence", k=3)
+    print("  ✓ Ranked, typo-tolerant, persisted\n")
+
+def test_performance_store(tmp_path):
+    print("Testing Performance Store...")
+    legacy = tmp_path / "performance.jsonl"
+    with legacy.open("w") as f:
+        # 30 days less a minute: inside 30 * 24h but on the 31st calendar day back
+        for age, subject, correct in [(40, "torts", True), (30 - 1 / 1440, "contracts", True),
+                                      (2, "torts", False), (1, "evidence", True)]:
+            stamp = (datetime.now() - timedelta(days=age)).isoformat()
+            f.write(json.dumps({"timestamp": stamp, "subject": subject, "correct": correct}) + "\n")
+    tracker = PerformanceTracker(store_dir=tmp_path / "store", perf_file=legacy)
+    tracker.store.compact_rows = 2
+    tracker.record_attempt("torts", True, response_time=3.5)
+    tracker.record_attempt("evidence", False)
+    tracker.record_attempt("torts", True)
+    tracker.store.close()
+    reopened = PerformanceTracker(store_dir=tmp_path / "store", perf_file=legacy)
+    stats = reopened.get_stats(30)
+    assert stats["torts"]["total"] == 3 and stats["torts"]["correct"] == 2
+    assert stats["evidence"] == {"correct": 1, "total": 2, "percentage": 50.0}
+    assert reopened.get_stats(60)["torts"]["total"] == 4
+    assert "contracts" not in reopened.get_stats(30) and reopened.get_stats(31)["contracts"]["total"] == 1
+    assert len(reopened.store) == 7
+    rows = reopened.store.scan()
+    next(rows)
+    reopened.store.record("torts", True, timestamp=datetime.now().timestamp() - 86400)
+    reopened.store.compact()  # replaces segments the open scan has yet to read
+    assert len(list(rows)) == 6 and len(reopened.store) == 8
+    assert len(list((tmp_path / "store").glob("*.seg"))) == len(reopened.store.segments)
+    print("  ✓ Imported, compacted, reopened\n")
+
+def test_rolling_stats(tmp_path, monkeypatch):
+    print("Testing Rolling Stats...")
+    import rolling_stats
+    clock = [time.time() - 40 * 86400]
+    monkeypatch.setattr(rolling_stats.time, "time", lambda: clock[0])
+    stats = RollingStats(checkpoint_path=tmp_path / "rollup.json")
+    for age, subject, correct, concept in [(100, "torts", True, None), (5, "torts", True, None),
+                                           (3, "torts", False, "torts_negligence"),
+                                           (0, "evidence", True, "evidence_hearsay")]:
+        stats.add(subject, correct, clock[0] - age * 86400, concept)
+    assert stats.window(7)["torts"] == {"correct": 1, "total": 2, "percentage": 50.0}
+    assert set(stats.window(30, kind="concept")) == {"torts_negligence", "evidence_hearsay"}
+    assert stats.window(90)["torts"]["total"] == 2
+    clock[0] += 40 * 86400  # forty days later, only the 90-day window still covers them
+    assert stats.window(7) == {} and stats.window(30) == {}
+    assert stats.window(90)["evidence"]["total"] == 1
+    stats.save()
+    restored = RollingStats.load(tmp_path / "rollup.json")
+    for days in restored.windows:
+        assert restored.window(days) == stats.window(days)
+    print("  ✓ Windows slide and checkpoint\n")
+
+def test_group_commit_jsonl(tmp_path):
+    print("Testing Group-Commit JSONL...")
+    path = tmp_path / "events.jsonl"
+    path.write_bytes(b'{"n": 0}\n{"n": 1, "tor')  # crash mid-line
+    for n in range(1, 4):
+        jsonl_wal.append_jsonl(path, {"n": n}, jsonl_wal.Durability.GROUP)
+    jsonl_wal.append_jsonl(path, {"n": 4}, jsonl_wal.Durability.SYNC)
+    assert [json.loads(line)["n"] for line in path.read_text().splitlines()] == [0, 1, 2, 3, 4]
+    replacement = tmp_path / "rewrite.jsonl"
+    replacement.write_text('{"n": 9}\n')
+    replacement.replace(path)
+    jsonl_wal.append_jsonl(path, {"n": 10})
+    jsonl_wal.flush(path)
+    assert [json.loads(line)["n"] for line in path.read_text().splitlines()] == [9, 10]
+    print("  ✓ Torn tail recovered, appends reopen replaced files\n")
+
+def test_due_queue(tmp_path):
+    print("Testing Due Queue...")
+    queue = DueQueue({"a": 30.0, "b": 10.0, "c": 20.0, "d": 99.0})
+    queue.schedule("b", 40.0)
+    queue.schedule("b", 10.0)  # back to its old slot: no duplicate
+    assert queue.peek_due(10, now=50.0) == ["b", "c", "a"]
+    queue.remove("c")
+    assert queue.peek_due(2, now=50.0) == ["b", "a"]
+
+    deck = tmp_path / "cards.jsonl"
+    now = datetime.now()
+    with deck.open("w") as f:
+        for i, days in enumerate([-3, 5, -1, -2]):
+            f.write(json.dumps({"id": f"c{i}", "next_review": (now + timedelta(days=days)).isoformat()}) + "\n")
+    index = JsonlDueIndex(deck, tmp_path / "cards.idx")
+    assert [c["id"] for c in index.due(10)] == ["c0", "c3", "c2"]
+    index.save()
+    with deck.open("a") as f:
+        f.write(json.dumps({"id": "c0", "next_review": (now + timedelta(days=6)).isoformat()}) + "\n")
+    reloaded = JsonlDueIndex(deck, tmp_path / "cards.idx")
+    assert [c["id"] for c in reloaded.due(10)] == ["c3", "c2"]
+    assert reloaded.get("c0")["next_review"] > now.isoformat()
+    print("  ✓ Heap order, rescheduling, persisted index\n")
+
+def test_review_state_store(tmp_path):
+    print("Testing Review State Store...")
+    store = ReviewStateStore(tmp_path / "state")
+    store.update(("torts_negligence", "rule"), ReviewState(2.5, 1, 1, 100.0))
+    store.update(("evidence_hearsay", "traps"), ReviewState(2.6, 6, 2, 200.0))
+    store.flush()
+    store.update(("torts_negligence", "rule"), ReviewState(2.7, 6, 2, 300.0))
+    assert store.pending == 1
+    store.flush()
+    with (tmp_path / "state.keys").open("a") as f:
+        f.write("orphan\trule\n")  # crash before rows were committed
+    reloaded = ReviewStateStore(tmp_path / "state")
+    assert len(reloaded) == 2
+    assert reloaded.get(("torts_negligence", "rule")) == ReviewState(2.7, 6, 2, 300.0)
+    reloaded.update(("contracts_formation", "elements"), ReviewState(2.5, 1, 1, 400.0))
+    reloaded.flush()
+    assert ReviewStateStore(tmp_path / "state").get(("contracts_formation", "elements")).next_review == 400.0
+    keys = (tmp_path / "state.keys").read_bytes()
+    with (tmp_path / "state.bin").open("r+b") as f:
+        f.write(b"SM2STATE\x09\x00")  # a future format version
+    unreadable = ReviewStateStore(tmp_path / "state")
+    unreadable.update(("torts_battery", "rule"), ReviewState(2.5, 1, 1, 500.0))
+    unreadable.flush()
+    assert len(unreadable) == 1 and (tmp_path / "state.keys").read_bytes() == keys
+    print("  ✓ In-place updates persist and recover\n")
+
+def test_spaced_repetition_system(tmp_path, monkeypatch):
+    print("Testing Spaced Repetition System...")
+    generated = []
+    generate = SpacedRepetitionSystem.generate_cards_from_concepts
+    monkeypatch.setattr(SpacedRepetitionSystem, "generate_cards_from_concepts",
+                        lambda self: generated.append(1) or generate(self))
+    srs = SpacedRepetitionSystem(state_dir=tmp_path)
+    assert generated == [1] and srs.catalog_path.exists()
+    card = srs.get_due_cards(1)[0]
+    srs.review_card(card, 5)
+    srs.review_card(card, 4)
+    assert card not in srs.get_due_cards(len(srs.cards))  # rescheduled six days out
+    srs.state.flush()
+
+    reloaded = SpacedRepetitionSystem(state_dir=tmp_path)
+    assert generated == [1]  # card texts come from the catalog
+    again = reloaded.cards_by_id[card.concept_id]
+    assert (again.front, again.ease_factor, again.interval, again.repetitions) == \
+        (card.front, card.ease_factor, 6, 2)
+    assert again not in reloaded.get_due_cards(len(reloaded.cards))
+
+    monkeypatch.setattr(SpacedRepetitionSystem, "_graph_hash", lambda self: b"edited graph")
+    regenerated = SpacedRepetitionSystem(state_dir=tmp_path)
+    assert generated == [1, 1] and regenerated.cards_by_id[card.concept_id].repetitions == 2
+    print("  ✓ Catalog reused, invalidated, review state rehydrated\n")
+
 def test_tutor():
     print("Testing Tutor...")
     tutor = BarExamTutor()
@@ -34,6 +237,7 @@ if __name__ == "__main__":
     try:
         test_knowledge_graph()
         test_interleaved()
+        test_secondary_indexes()
         test_tutor()
         print("="*50)
         print("ALL TESTS PASSED ✓")